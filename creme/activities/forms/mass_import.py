@@ -42,6 +42,7 @@ from creme.persons.models import Civility
 
 from .. import constants
 from ..models import ActivityType, Calendar
+from ..utils import ActivityCollisionsIndex
 from . import fields as act_fields
 from .activity_type import ActivityTypeField
 
@@ -618,6 +619,8 @@ def get_massimport_form_builder(header_dict, choices):
             )
 
             self.user_participants = []
+            # NB: the form is used for all the lines of the file.
+            self.collisions_index = ActivityCollisionsIndex()
 
         def clean_participating_users(self):
             user_contacts = self.cleaned_data['participating_users']
@@ -651,6 +654,7 @@ def get_massimport_form_builder(header_dict, choices):
             cdata = self.cleaned_data
             user = instance.user
             participant_ids = set()
+            participants = []
 
             if updated:
                 # TODO: improve get_participant_relations() (not retrieve real entities)
@@ -670,6 +674,9 @@ def get_massimport_form_builder(header_dict, choices):
                     )
                     participant_ids.add(participating_contact.id)
 
+                if participating_contact not in participants:
+                    participants.append(participating_contact)
+
             # We could create a cache in self (or even put a cache-per-request
             # in Calendar.get_user_default_calendar() but the import can take a
             # long time, & the default Calendar could change
@@ -706,6 +713,18 @@ def get_massimport_form_builder(header_dict, choices):
                 if part_user is not None:
                     add_to_default_calendar(part_user)
 
+            # Collisions (they do not cancel the import of the line) ----
+            if instance.floating_type != constants.FLOATING:
+                collisions_index = self.collisions_index
+
+                for collision in collisions_index.check(
+                    instance.start, instance.end, participants,
+                    busy=instance.busy, exclude_activity_id=instance.id,
+                ):
+                    self.append_error(collision)
+
+                collisions_index.add(instance, participants)
+
             # Subjects ----
             subjects, err_messages = cdata['subjects'].extract_value(line, self.user)
 
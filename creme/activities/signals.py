@@ -2,7 +2,7 @@
 
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2015-2020  Hybird
+#    Copyright (C) 2015-2021  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -24,6 +24,7 @@ from django.conf import settings
 from django.db.models import signals
 from django.dispatch import receiver
 
+from creme.creme_core import signals as core_signals
 from creme.creme_core.models import Relation
 from creme.persons import constants as persons_constants
 from creme.persons import get_organisation_model
@@ -92,6 +93,12 @@ def _set_orga_as_subject(sender, instance, **kwargs):
     )
 
 
+@receiver(core_signals.post_bulk_create, sender=Relation)
+def _set_orgas_as_subject(sender, instances, **kwargs):
+    for relation in instances:
+        _set_orga_as_subject(sender=sender, instance=relation)
+
+
 @receiver(signals.post_save, sender=settings.AUTH_USER_MODEL)
 def _create_default_calendar(sender, instance, created, **kwargs):
     if created and not instance.is_staff and instance.is_active:
@@ -50,7 +50,7 @@ from ..forms.activity import (
     UserMessagesSubCell,
 )
 from ..models import ActivitySubType, ActivityType, Calendar, Status
-from ..utils import check_activity_collisions
+from ..utils import ActivityCollisionsIndex, check_activity_collisions
 from .base import (
     Activity,
     Contact,
@@ -1991,6 +1991,180 @@ class ActivityTestCase(_ActivitiesTestCase):
             busy=False, participants=[c1, c2],
         )
 
+    @skipIfCustomContact
+    def test_collision02(self):
+        "Several participants => one query."
+        user = self.login()
+
+        create_dt = self.create_datetime
+        create_activity = partial(
+            Activity.objects.create,
+            user=user, type_id=constants.ACTIVITYTYPE_MEETING,
+        )
+        act1 = create_activity(
+            title='meet01',
+            start=create_dt(year=2010, month=10, day=1, hour=12, minute=0),
+            end=create_dt(year=2010, month=10, day=1, hour=13, minute=0),
+        )
+        act2 = create_activity(
+            title='meet02',
+            start=create_dt(year=2010, month=10, day=1, hour=12, minute=30),
+            end=create_dt(year=2010, month=10, day=1, hour=14, minute=0),
+        )
+
+        create_contact = partial(Contact.objects.create, user=user)
+        contacts = [
+            create_contact(first_name=f'first_name{i}', last_name=f'last_name{i}')
+            for i in range(1, 6)
+        ]
+        c1, c2, c3, c4, c5 = contacts
+
+        create_rel = partial(
+            Relation.objects.create, type_id=constants.REL_SUB_PART_2_ACTIVITY, user=user,
+        )
+        create_rel(subject_entity=c1, object_entity=act1)
+        create_rel(subject_entity=c1, object_entity=act2)
+        create_rel(subject_entity=c3, object_entity=act1)
+        create_rel(subject_entity=c4, object_entity=act2)
+
+        start = create_dt(year=2010, month=10, day=1, hour=11, minute=0)
+        end = create_dt(year=2010, month=10, day=1, hour=12, minute=45)
+
+        with self.assertNumQueries(1):
+            collisions = check_activity_collisions(start, end, contacts)
+
+        msg = _(
+            '{participant} already participates to the activity '
+            '«{activity}» between {start} and {end}.'
+        ).format
+        self.assertListEqual(
+            [
+                # NB: the activity which starts last
+                msg(participant=c1, activity=act2, start='12:30:00', end='12:45:00'),
+                msg(participant=c3, activity=act1, start='12:00:00', end='12:45:00'),
+                msg(participant=c4, activity=act2, start='12:30:00', end='12:45:00'),
+            ],
+            collisions,
+        )
+
+        # Exclude
+        self.assertListEqual(
+            [msg(participant=c3, activity=act1, start='12:00:00', end='12:45:00')],
+            check_activity_collisions(
+                start, end, [c3, c4], exclude_activity_id=act2.id,
+            ),
+        )
+
+    @skipIfCustomContact
+    def test_collisions_index(self):
+        user = self.login()
+
+        create_dt = self.create_datetime
+        create_activity = partial(
+            Activity.objects.create,
+            user=user, type_id=constants.ACTIVITYTYPE_MEETING,
+        )
+        act1 = create_activity(
+            title='meet01',
+            start=create_dt(year=2010, month=10, day=1, hour=8, minute=0),
+            end=create_dt(year=2010, month=10, day=1, hour=18, minute=0),
+        )
+        act2 = create_activity(
+            title='meet02', busy=True,
+            start=create_dt(year=2010, month=10, day=2, hour=14, minute=0),
+            end=create_dt(year=2010, month=10, day=2, hour=15, minute=0),
+        )
+
+        create_contact = partial(Contact.objects.create, user=user)
+        c1 = create_contact(first_name='first_name1', last_name='last_name1')
+        c2 = create_contact(first_name='first_name2', last_name='last_name2')
+
+        create_rel = partial(
+            Relation.objects.create,
+            subject_entity=c1, type_id=constants.REL_SUB_PART_2_ACTIVITY, user=user,
+        )
+        create_rel(object_entity=act1)
+        create_rel(object_entity=act2)
+
+        index = ActivityCollisionsIndex()
+        msg = _(
+            '{participant} already participates to the activity '
+            '«{activity}» between {start} and {end}.'
+        ).format
+
+        with self.assertNumQueries(1):
+            collisions = index.check(
+                create_dt(year=2010, month=10, day=1, hour=17, minute=0),
+                create_dt(year=2010, month=10, day=1, hour=19, minute=0),
+                [c1, c2],
+            )
+        self.assertListEqual(
+            [msg(participant=c1, activity=act1, start='17:00:00', end='18:00:00')],
+            collisions,
+        )
+
+        with self.assertNumQueries(0):
+            # Long activity which starts before
+            self.assertEqual(1, len(index.check(
+                create_dt(year=2010, month=10, day=1, hour=12, minute=0),
+                create_dt(year=2010, month=10, day=1, hour=13, minute=0),
+                [c1],
+            )))
+            # Touching
+            self.assertFalse(index.check(
+                create_dt(year=2010, month=10, day=1, hour=18, minute=0),
+                create_dt(year=2010, month=10, day=1, hour=19, minute=0),
+                [c1, c2],
+            ))
+            # Excluded
+            self.assertFalse(index.check(
+                create_dt(year=2010, month=10, day=1, hour=12, minute=0),
+                create_dt(year=2010, month=10, day=1, hour=13, minute=0),
+                [c1], exclude_activity_id=act1.id,
+            ))
+            # Not busy
+            self.assertFalse(index.check(
+                create_dt(year=2010, month=10, day=1, hour=12, minute=0),
+                create_dt(year=2010, month=10, day=1, hour=13, minute=0),
+                [c1], busy=False,
+            ))
+            self.assertEqual(1, len(index.check(
+                create_dt(year=2010, month=10, day=2, hour=14, minute=30),
+                create_dt(year=2010, month=10, day=2, hour=16, minute=0),
+                [c1], busy=False,
+            )))
+
+        # New activity
+        act3 = create_activity(
+            title='meet03',
+            start=create_dt(year=2010, month=10, day=3, hour=10, minute=0),
+            end=create_dt(year=2010, month=10, day=3, hour=11, minute=0),
+        )
+        create_rel(subject_entity=c2, object_entity=act3)
+        index.add(act3, [c2])
+
+        with self.assertNumQueries(0):
+            collisions = index.check(
+                create_dt(year=2010, month=10, day=3, hour=10, minute=30),
+                create_dt(year=2010, month=10, day=3, hour=12, minute=0),
+                [c1, c2],
+            )
+        self.assertListEqual(
+            [msg(participant=c2, activity=act3, start='10:30:00', end='11:00:00')],
+            collisions,
+        )
+
+        # Modified activity
+        act3.start = create_dt(year=2010, month=10, day=3, hour=15, minute=0)
+        act3.end = create_dt(year=2010, month=10, day=3, hour=16, minute=0)
+        act3.save()
+        index.add(act3, [c2])
+        self.assertFalse(index.check(
+            create_dt(year=2010, month=10, day=3, hour=10, minute=30),
+            create_dt(year=2010, month=10, day=3, hour=12, minute=0),
+            [c2],
+        ))
+
     def test_listviews(self):
         user = self.login()
         self.assertFalse(Activity.objects.all())
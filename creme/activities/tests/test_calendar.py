@@ -10,7 +10,7 @@ from django.core.management import call_command
 from django.test.utils import override_settings
 from django.urls import reverse
 from django.utils.html import escape
-from django.utils.timezone import get_current_timezone, make_naive
+from django.utils.timezone import get_current_timezone, make_naive, now
 from django.utils.translation import gettext as _
 from parameterized import parameterized
 
@@ -1081,6 +1081,265 @@ class CalendarTestCase(_ActivitiesTestCase):
             [(d['id'], d['calendar']) for d in response.json()],
         )
 
+    @skipIfCustomActivity
+    def test_activities_data_conditional(self):
+        "ETag & Last-Modified."
+        user = self.login()
+        cal1 = Calendar.objects.get_default_calendar(user)
+        cal2 = Calendar.objects.create(user=user, name='Other Cal #1', is_custom=True)
+
+        start = self.create_datetime(year=2013, month=3, day=1)
+        end   = self.create_datetime(year=2013, month=3, day=31, hour=23, minute=59)
+
+        create = partial(
+            Activity.objects.create,
+            user=user, type_id=constants.ACTIVITYTYPE_TASK,
+        )
+        act1 = create(title='Act#1', start=start, end=start + timedelta(hours=1))
+        act2 = create(title='Act#2', start=end - timedelta(hours=2), end=end)
+        act1.calendars.set([cal1])
+        act2.calendars.set([cal1])
+
+        url = reverse('activities__calendars_activities')
+        data = {
+            'calendar_id': [cal1.id, cal2.id],
+            'start': start.strftime('%s'),
+            'end': end.strftime('%s'),
+        }
+        response1 = self.assertGET200(url, data=data)
+        self.assertEqual(2, len(response1.json()))
+
+        etag = response1.get('ETag')
+        self.assertTrue(etag)
+        self.assertTrue(response1.get('Last-Modified'))
+        self.assertIn('no-cache', response1.get('Cache-Control'))
+
+        # Not modified
+        response2 = self.client.get(url, data=data, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, response2.status_code)
+        self.assertFalse(response2.content)
+
+        response3 = self.client.get(
+            url, data=data, HTTP_IF_MODIFIED_SINCE=response1['Last-Modified'],
+        )
+        self.assertEqual(304, response3.status_code)
+
+        # Other period
+        response4 = self.client.get(
+            url, HTTP_IF_NONE_MATCH=etag,
+            data={**data, 'end': (end - timedelta(days=1)).strftime('%s')},
+        )
+        self.assertEqual(200, response4.status_code)
+        self.assertEqual(1, len(response4.json()))
+
+        # Activity moved to another calendar
+        act2.calendars.set([cal2])
+        response5 = self.client.get(url, data=data, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response5.status_code)
+        self.assertNotEqual(etag, response5['ETag'])
+        self.assertListEqual(
+            [cal2.id, cal1.id],
+            [d['calendar'] for d in response5.json()],
+        )
+
+        # Activity modified
+        etag = response5['ETag']
+        act1.title = 'Act#1 (edited)'
+        act1.save()
+        response6 = self.client.get(url, data=data, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response6.status_code)
+
+        # Activity deleted
+        etag = response6['ETag']
+        act1.delete()
+        response7 = self.client.get(url, data=data, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response7.status_code)
+        self.assertEqual(1, len(response7.json()))
+
+    @skipIfCustomActivity
+    def test_activities_data_conditional_relations(self):
+        "ETag & participants/credentials."
+        user = self.login(is_superuser=False)
+        cal = Calendar.objects.get_default_calendar(user)
+
+        create_sc = partial(SetCredentials.objects.create, role=self.role)
+        create_sc(
+            value=EntityCredentials.VIEW | EntityCredentials.CHANGE,
+            set_type=SetCredentials.ESET_OWN,
+        )
+        sc = create_sc(value=EntityCredentials.VIEW, set_type=SetCredentials.ESET_ALL)
+
+        start = self.create_datetime(year=2013, month=3, day=1)
+        end   = self.create_datetime(year=2013, month=3, day=31, hour=23, minute=59)
+
+        act = Activity.objects.create(
+            user=self.other_user, type_id=constants.ACTIVITYTYPE_TASK,
+            title='Act#1', start=start, end=start + timedelta(hours=1),
+        )
+        act.calendars.set([cal])
+
+        url = reverse('activities__calendars_activities')
+        data = {
+            'calendar_id': [cal.id],
+            'start': start.strftime('%s'),
+            'end': end.strftime('%s'),
+        }
+        response1 = self.assertGET200(url, data=data)
+        self.assertFalse(response1.json()[0]['editable'])
+
+        etag = response1['ETag']
+        self.assertEqual(
+            304, self.client.get(url, data=data, HTTP_IF_NONE_MATCH=etag).status_code,
+        )
+
+        # New participant
+        Relation.objects.create(
+            user=user,
+            subject_entity=self.other_user.linked_contact,
+            type_id=constants.REL_SUB_PART_2_ACTIVITY,
+            object_entity=act,
+        )
+        response2 = self.client.get(url, data=data, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response2.status_code)
+        self.assertNotEqual(etag, response2['ETag'])
+
+        # Credentials
+        etag = response2['ETag']
+        sc.value = EntityCredentials.VIEW | EntityCredentials.CHANGE
+        sc.save()
+        response3 = self.client.get(url, data=data, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response3.status_code)
+        self.assertTrue(response3.json()[0]['editable'])
+
+    @skipIfCustomActivity
+    def test_activities_delta(self):
+        user = self.login()
+        cal1 = Calendar.objects.get_default_calendar(user)
+        cal2 = Calendar.objects.create(user=user, name='Other Cal #1', is_custom=True)
+
+        start = self.create_datetime(year=2013, month=3, day=1)
+        end   = self.create_datetime(year=2013, month=3, day=31, hour=23, minute=59)
+
+        create = partial(
+            Activity.objects.create,
+            user=user, type_id=constants.ACTIVITYTYPE_TASK,
+        )
+        act1 = create(title='Act#1', start=start, end=start + timedelta(hours=1))
+        act2 = create(title='Act#2', start=end - timedelta(hours=2), end=end)
+        act3 = create(title='Act#3', start=start, end=start + timedelta(hours=1))
+        act1.calendars.set([cal1])
+        act2.calendars.set([cal1, cal2])
+        act3.calendars.set([cal2])
+
+        url = reverse('activities__calendars_activities_delta')
+        data = {
+            'calendar_id': [cal1.id, cal2.id],
+            'start': start.strftime('%s'),
+            'end': end.strftime('%s'),
+        }
+
+        # No token => all activities
+        content1 = self.assertGET200(url, data=data).json()
+        self.assertIsInstance(content1, dict)
+        self.assertCountEqual(
+            [(act1.id, cal1.id), (act2.id, cal1.id), (act2.id, cal2.id), (act3.id, cal2.id)],
+            [(d['id'], d['calendar']) for d in content1.get('changed')],
+        )
+        self.assertCountEqual(
+            [[act1.id, cal1.id], [act2.id, cal1.id], [act2.id, cal2.id], [act3.id, cal2.id]],
+            content1.get('keys'),
+        )
+
+        token = content1.get('token')
+        self.assertTrue(token)
+
+        # Old modifications are ignored
+        old_date = now() - timedelta(hours=1)
+        Activity.objects.filter(id__in=[act1.id, act2.id, act3.id]).update(modified=old_date)
+
+        content2 = self.assertGET200(url, data={**data, 'token': token}).json()
+        self.assertListEqual([], content2['changed'])
+        self.assertEqual(4, len(content2['keys']))
+
+        # ---
+        act1.title = 'Act#1 (edited)'
+        act1.save()
+        act3.delete()
+
+        content3 = self.assertGET200(url, data={**data, 'token': content2['token']}).json()
+        self.assertListEqual(
+            [(act1.id, cal1.id, 'Act#1 (edited)')],
+            [(d['id'], d['calendar'], d['title']) for d in content3['changed']],
+        )
+        self.assertCountEqual(
+            [[act1.id, cal1.id], [act2.id, cal1.id], [act2.id, cal2.id]],
+            content3['keys'],
+        )
+
+        # Invalid token => all activities
+        content4 = self.assertGET200(url, data={**data, 'token': 'invalid'}).json()
+        self.assertEqual(3, len(content4['changed']))
+
+    @skipIfCustomActivity
+    def test_calendar_ical(self):
+        user = self.login()
+        other_user = self.other_user
+
+        cal1 = Calendar.objects.get_default_calendar(user)
+        cal2 = Calendar.objects.create(
+            user=other_user, name='Private Cal', is_custom=True, is_public=False,
+        )
+
+        create_dt = self.create_datetime
+        create = partial(
+            Activity.objects.create,
+            user=user, type_id=constants.ACTIVITYTYPE_TASK,
+        )
+        act1 = create(
+            title='Act#1',
+            start=create_dt(year=2013, month=3, day=1, hour=10),
+            end=create_dt(year=2013, month=3, day=1, hour=11),
+        )
+        act2 = create(
+            title='Act#2', type_id=constants.ACTIVITYTYPE_MEETING,
+            start=create_dt(year=2013, month=3, day=2, hour=10),
+            end=create_dt(year=2013, month=3, day=2, hour=11),
+        )
+        act3 = create(title='Floating', floating_type=constants.FLOATING)
+        act4 = create(
+            title='Deleted',
+            start=create_dt(year=2013, month=3, day=2, hour=10),
+            end=create_dt(year=2013, month=3, day=2, hour=11),
+            is_deleted=True,
+        )
+        act5 = create(
+            title='Other calendar',
+            start=create_dt(year=2013, month=3, day=2, hour=10),
+            end=create_dt(year=2013, month=3, day=2, hour=11),
+        )
+
+        for act in (act1, act2, act3, act4):
+            act.calendars.set([cal1])
+        act5.calendars.set([cal2])
+
+        response = self.assertGET200(reverse('activities__calendar_ical', args=(cal1.id,)))
+        self.assertTrue(response.streaming)
+        self.assertEqual('text/calendar', response['Content-Type'])
+        self.assertTrue(response['Content-Disposition'].startswith('attachment; filename='))
+
+        content = b''.join(response.streaming_content).decode()
+        self.assertTrue(content.startswith('BEGIN:VCALENDAR\nVERSION:2.0\n'))
+        self.assertTrue(content.endswith('\nEND:VCALENDAR'))
+        self.assertEqual(2, content.count('BEGIN:VEVENT'))
+        self.assertIn('SUMMARY:Act#1\n', content)
+        self.assertIn('SUMMARY:Act#2\n', content)
+        self.assertIn(f'CATEGORIES:{_("Meeting")}\n', content)
+        self.assertNotIn('Floating', content)
+        self.assertNotIn('Deleted', content)
+
+        # Private calendar of another user
+        self.assertGET404(reverse('activities__calendar_ical', args=(cal2.id,)))
+
     @override_settings(ACTIVITIES_DEFAULT_CALENDAR_IS_PUBLIC=False)
     def test_selected_calendars_in_session(self):
         user = self.login()
@@ -201,6 +201,72 @@ class MassImportActivityTestCase(_ActivitiesTestCase, MassImportBaseTestCaseMixi
         )
         self.assertEqual(act3, jr_error.entity.get_real_entity())
 
+    def test_import_collisions(self):
+        "Collisions are reported, but the lines are imported."
+        user = self.login()
+
+        create_dt = self.create_datetime
+        act0 = Activity.objects.create(
+            user=user, title='Meeting#0', type_id=constants.ACTIVITYTYPE_MEETING,
+            busy=True,
+            start=create_dt(year=2014, month=5, day=28, hour=9),
+            end=create_dt(year=2014, month=5, day=28, hour=11),
+        )
+        Relation.objects.create(
+            subject_entity=user.linked_contact,
+            type_id=constants.REL_SUB_PART_2_ACTIVITY,
+            object_entity=act0,
+            user=user,
+        )
+
+        title1 = 'Task#1'; start1 = '2014-05-28 10:00'; end1 = '2014-05-28 12:00'
+        # NB: collides with Task#1 too, but imported activities are not busy
+        title2 = 'Task#2'; start2 = '2014-05-28 10:30'; end2 = '2014-05-28 13:00'
+        title3 = 'Task#3'; start3 = '2014-05-28 13:00'; end3 = '2014-05-28 14:00'
+        lines = [(title1, start1, end1), (title2, start2, end2), (title3, start3, end3)]
+
+        doc = self._build_csv_doc(lines)
+        response = self.client.post(
+            self._build_import_url(Activity), follow=True,
+            data={
+                **self.lv_import_data,
+                'document': doc.id,
+                'user': user.id,
+                'start_colselect': 2,
+                'end_colselect': 3,
+                'type_selector': self._acttype_field_value(constants.ACTIVITYTYPE_TASK),
+
+                'my_participation_0': True,
+                'my_participation_1': Calendar.objects.get_default_calendar(user).pk,
+            },
+        )
+        self.assertNoFormError(response)
+
+        job = self._execute_job(response)
+        results = self._get_job_results(job)
+        self.assertEqual(len(lines), len(results))
+
+        self.get_object_or_fail(Activity, title=title1)
+        self.get_object_or_fail(Activity, title=title2)
+        act3 = self.get_object_or_fail(Activity, title=title3)
+
+        msg = _(
+            '{participant} already participates to the activity '
+            '«{activity}» between {start} and {end}.'
+        ).format
+        contact = user.linked_contact
+        messages = {r.entity.get_real_entity().title: r.messages for r in results}
+        self.assertListEqual(
+            [msg(participant=contact, activity=act0, start='10:00:00', end='11:00:00')],
+            messages[title1],
+        )
+        self.assertListEqual(
+            [msg(participant=contact, activity=act0, start='10:30:00', end='11:00:00')],
+            messages[title2],
+        )
+        self.assertIsNone(messages[title3])
+        self.assertEqual(constants.NARROW, act3.floating_type)
+
     @skipIfCustomContact
     @skipIfCustomOrganisation
     def test_import02(self):
@@ -18,6 +18,11 @@ calendar_patterns = [
         calendar.ActivitiesData.as_view(),
         name='activities__calendars_activities',
     ),
+    re_path(
+        r'^activities/delta[/]?$',
+        calendar.ActivitiesDelta.as_view(),
+        name='activities__calendars_activities_delta',
+    ),
     re_path(
         r'^select[/]?$',
         calendar.CalendarsSelection.as_view(),
@@ -38,6 +43,11 @@ calendar_patterns = [
         calendar.CalendarEdition.as_view(),
         name='activities__edit_calendar',
     ),
+    re_path(
+        r'^(?P<calendar_id>\d+)/ical[/]?$',
+        calendar.CalendarICal.as_view(),
+        name='activities__calendar_ical',
+    ),
     re_path(
         r'^delete/(?P<calendar_id>\d+)[/]?$',
         calendar.CalendarDeletion.as_view(),
@@ -2,7 +2,7 @@
 
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2009-2020  Hybird
+#    Copyright (C) 2009-2021  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -18,14 +18,18 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+from django.db.models import F
 from django.db.models.query_utils import Q
 from django.utils.timezone import localtime
 from django.utils.translation import gettext as _
 
-from creme.creme_core.models import Relation, SettingValue
+from creme.creme_core.models import SettingValue
 
 from . import get_activity_model
-from .constants import FLOATING_TIME, NARROW, REL_SUB_PART_2_ACTIVITY
+from .constants import FLOATING_TIME, NARROW, REL_OBJ_PART_2_ACTIVITY
 from .setting_keys import auto_subjects_key
 
 
@@ -41,68 +45,187 @@ def get_last_day_of_a_month(date):
     return last_day
 
 
+def _collision_message(participant, activity, activity_start, activity_end):
+    collision_start = max(activity_start.time(), localtime(activity.start).time())
+    collision_end = min(activity_end.time(), localtime(activity.end).time())
+
+    return _(
+        '{participant} already participates to the activity '
+        '«{activity}» between {start} and {end}.'
+    ).format(
+        participant=participant,
+        activity=activity,
+        start=collision_start,
+        end=collision_end,
+    )
+
+
 def check_activity_collisions(
         activity_start,
         activity_end,
         participants,
         busy=True,
         exclude_activity_id=None):
+    """Search the activities of some participants which collide with a period.
+    Only one query is performed, whatever the number of participants.
+    @param activity_start: Start of the period (datetime instance).
+    @param activity_end: End of the period (datetime instance).
+    @param participants: Iterable of Contacts.
+    @param busy: If False, only the busy activities collide.
+    @param exclude_activity_id: ID of an activity to ignore (generally the one
+           which is edited).
+    @return A list of messages (one per participant with a collision).
+    """
     if not activity_start:
         return
 
-    collision_test = ~(Q(end__lte=activity_start) | Q(start__gte=activity_end))
+    participants = [*participants]
+    busy_args = {} if busy else {'busy': True}
+    # TODO: test is_deleted=True
+    activities = get_activity_model().objects.filter(
+        ~(Q(end__lte=activity_start) | Q(start__gte=activity_end)),
+        is_deleted=False,
+        floating_type__in=(NARROW, FLOATING_TIME),
+        relations__type=REL_OBJ_PART_2_ACTIVITY,
+        relations__object_entity__in=[p.id for p in participants],
+        **busy_args
+    ).annotate(participant_id=F('relations__object_entity'))
+
+    if exclude_activity_id is not None:
+        activities = activities.exclude(id=exclude_activity_id)
+
+    # NB: activities are ordered by '-start' ; we keep the first one for each participant.
+    colliding_activities = {}
+    for activity in activities:
+        colliding_activities.setdefault(activity.participant_id, activity)
+
     collisions = []
 
     for participant in participants:
-        # Find activities of participant
-        activity_req = Relation.objects.filter(
-            subject_entity=participant.id, type=REL_SUB_PART_2_ACTIVITY,
-        )
-
-        # Exclude current activity if asked
-        if exclude_activity_id is not None:
-            activity_req = activity_req.exclude(object_entity=exclude_activity_id)
-
-        # Get id of activities of participant
-        activity_ids = activity_req.values_list('object_entity__id', flat=True)
-
-        # Do collision request
-        # TODO: can be done with less queries ?
-        #       eg:  Activity.objects.filter(
-        #                relations__object_entity=participant.id,
-        #                relations__object_entity__type=REL_OBJ_PART_2_ACTIVITY,
-        #            ).filter(collision_test)
-        busy_args = {} if busy else {'busy': True}
-        # TODO: test is_deleted=True
-        colliding_activity = get_activity_model().objects.filter(
-            collision_test,
+        colliding_activity = colliding_activities.get(participant.id)
+
+        if colliding_activity is not None:
+            collisions.append(_collision_message(
+                participant, colliding_activity, activity_start, activity_end,
+            ))
+
+    return collisions
+
+
+class ActivityCollisionsIndex:
+    """Index of the activities of participants, used to check the collisions of
+    many periods (eg: when activities are imported) without performing queries
+    for each period.
+
+    The activities of a participant are retrieved the first time this
+    participant is checked (with one query for all the new participants of a
+    check) ; the activities created/modified after that must be registered
+    with add().
+
+    For each participant, activities are sorted by start ; with the maximum
+    duration of these activities, only the activities which start in
+    [period_start - max_duration, period_end[ have to be checked.
+    """
+    class _Periods:
+        def __init__(self):
+            self.starts = []
+            self.activities = []
+            self.max_duration = timedelta()
+
+        def add(self, activity):
+            self.remove(activity.id)
+
+            start = activity.start
+            index = bisect_right(self.starts, start)
+            self.starts.insert(index, start)
+            self.activities.insert(index, activity)
+            self.max_duration = max(self.max_duration, activity.end - start)
+
+        def remove(self, activity_id):
+            for index, activity in enumerate(self.activities):
+                if activity.id == activity_id:
+                    del self.starts[index]
+                    del self.activities[index]
+                    break
+
+        def search(self, start, end, busy, exclude_activity_id):
+            "Get the colliding activity with the latest start (or None)."
+            starts = self.starts
+            activities = self.activities
+            first_index = bisect_right(starts, start - self.max_duration)
+
+            for index in range(bisect_left(starts, end) - 1, first_index - 1, -1):
+                activity = activities[index]
+
+                if activity.end > start and activity.id != exclude_activity_id and \
+                   (busy or activity.busy):
+                    return activity
+
+            return None
+
+    def __init__(self):
+        self._periods = {}
+
+    def _load(self, participant_ids):
+        missing_ids = [pid for pid in participant_ids if pid not in self._periods]
+        if not missing_ids:
+            return
+
+        all_periods = self._periods
+        for participant_id in missing_ids:
+            all_periods[participant_id] = self._Periods()
+
+        for activity in get_activity_model().objects.filter(
             is_deleted=False,
-            pk__in=activity_ids,
             floating_type__in=(NARROW, FLOATING_TIME),
-            **busy_args
-        ).first()
+            relations__type=REL_OBJ_PART_2_ACTIVITY,
+            relations__object_entity__in=missing_ids,
+        ).annotate(participant_id=F('relations__object_entity')):
+            all_periods[activity.participant_id].add(activity)
 
-        if colliding_activity is not None:
-            collision_start = max(
-                activity_start.time(), localtime(colliding_activity.start).time(),
-            )
-            collision_end = min(
-                activity_end.time(), localtime(colliding_activity.end).time(),
-            )
+    def add(self, activity, participants):
+        """Register an activity (new one, or with new dates) for some
+        participants which have already been checked.
+        @param activity: Instance of Activity.
+        @param participants: Iterable of Contacts.
+        """
+        for participant in participants:
+            periods = self._periods.get(participant.id)
+
+            if periods is not None:
+                if activity.floating_type in (NARROW, FLOATING_TIME) and \
+                   not activity.is_deleted:
+                    periods.add(activity)
+                else:
+                    periods.remove(activity.id)
+
+    def check(self,
+              activity_start,
+              activity_end,
+              participants,
+              busy=True,
+              exclude_activity_id=None):
+        "See check_activity_collisions()."
+        if not activity_start:
+            return
+
+        participants = [*participants]
+        self._load([p.id for p in participants])
+
+        collisions = []
 
-            collisions.append(
-                _(
-                    '{participant} already participates to the activity '
-                    '«{activity}» between {start} and {end}.'
-                ).format(
-                    participant=participant,
-                    activity=colliding_activity,
-                    start=collision_start,
-                    end=collision_end,
-                )
+        for participant in participants:
+            colliding_activity = self._periods[participant.id].search(
+                start=activity_start, end=activity_end,
+                busy=busy, exclude_activity_id=exclude_activity_id,
             )
 
-    return collisions
+            if colliding_activity is not None:
+                collisions.append(_collision_message(
+                    participant, colliding_activity, activity_start, activity_end,
+                ))
+
+        return collisions
 
 
 def get_ical_date(date_time):
@@ -111,16 +234,28 @@ def get_ical_date(date_time):
     return f'{dt.year}{dt.month:02}{dt.day:02}T{dt.hour:02}{dt.minute:02}{dt.second:02}Z'
 
 
+def iter_ical(activities):
+    """Generator version of get_ical() ; useful to stream big calendars.
+    @param activities: Iterable of Activities.
+    """
+    yield """BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//CremeCRM//CremeCRM//EN
+"""
+
+    for activity in activities:
+        yield activity.as_ical_event()
+
+    yield """
+END:VCALENDAR"""
+
+
 def get_ical(activities):
     """Return a normalized iCalendar string
     BEWARE: each parameter has to be separated by \n ONLY no spaces allowed!
     Example : BEGIN:VCALENDAR\nVERSION:2.0
     """
-    return """BEGIN:VCALENDAR
-VERSION:2.0
-PRODID:-//CremeCRM//CremeCRM//EN
-{}
-END:VCALENDAR""".format(''.join(a.as_ical_event() for a in activities))
+    return ''.join(iter_ical(activities))
 
 
 def is_auto_orga_subject_enabled():
@@ -2,7 +2,7 @@
 
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2009-2020  Hybird
+#    Copyright (C) 2009-2021  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -23,31 +23,50 @@ from collections import defaultdict
 from copy import copy
 from datetime import datetime, timedelta
 from functools import partial
+from hashlib import md5
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import PermissionDenied
-from django.db.models import Prefetch, Q
+from django.db.models import Count, Max, Prefetch, Q, Sum
 from django.db.transaction import atomic
-from django.http import HttpResponse
-from django.shortcuts import render
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
-from django.utils.timezone import get_current_timezone, make_naive, now
-from django.utils.translation import gettext
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.utils.timezone import (
+    get_current_timezone,
+    get_current_timezone_name,
+    make_naive,
+    now,
+    utc,
+)
+from django.utils.translation import get_language, gettext
 from django.utils.translation import gettext_lazy as _
 
 from creme.creme_core.core.exceptions import ConflictError
 from creme.creme_core.http import CremeJsonResponse
-from creme.creme_core.models import DeletionCommand, EntityCredentials, Job
+from creme.creme_core.models import (
+    DeletionCommand,
+    EntityCredentials,
+    Job,
+    Relation,
+)
 from creme.creme_core.utils import bool_from_str_extended, get_from_POST_or_404
 from creme.creme_core.utils.dates import make_aware_dt
+from creme.creme_core.utils.secure_filename import secure_filename
 from creme.creme_core.utils.unicode_collation import collator
 from creme.creme_core.views import generic
 
 from .. import constants, get_activity_model
 from ..forms import calendar as calendar_forms
 from ..models import Calendar
-from ..utils import check_activity_collisions, get_last_day_of_a_month
+from ..utils import (
+    check_activity_collisions,
+    get_last_day_of_a_month,
+    iter_ical,
+)
 
 logger = logging.getLogger(__name__)
 Activity = get_activity_model()
@@ -205,11 +224,27 @@ class ActivitiesData(CalendarsMixin, generic.CheckedView):
     calendar_ids_session_key = CalendarView.calendar_ids_session_key
 
     def get(self, request, *args, **kwargs):
-        return self.response_class(
-            self.get_activities_data(request),
-            safe=False,  # Result is not a dictionary
+        calendars = self.get_selected_calendars(request)
+        etag, last_modified = self.get_validators(request, calendars=calendars)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified,
         )
 
+        if response is None:
+            response = self.response_class(
+                self.get_activities_data(request, calendars=calendars),
+                safe=False,  # Result is not a dictionary
+            )
+
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+
+        # NB: the browser has to re-validate its cached data at each call.
+        patch_cache_control(response, private=True, no_cache=True)
+
+        return response
+
     @staticmethod
     def _activity_2_dict(activity, user):
         "Returns a 'jsonifiable' dictionary."
@@ -258,32 +293,39 @@ class ActivitiesData(CalendarsMixin, generic.CheckedView):
                 copied.calendar = calendar
                 yield copied
 
-    def get_activities_data(self, request):
+    def get_activities_data(self, request, calendars=None):
+        """Get the data of the Activities.
+        @param calendars: Result of get_selected_calendars() ;
+               <None> means it is computed.
+        """
         user = request.user
 
-        calendar_ids = [cal.id for cal in self.get_calendars(request)]
-        self.save_calendar_ids(request, calendar_ids)
+        if calendars is None:
+            calendars = self.get_selected_calendars(request)
+
+        calendar_ids = [cal.id for cal in calendars]
 
         start = self.get_start(request)
         end   = self.get_end(request=request, start=start)
 
         # TODO: label when no calendar related to the participant of an unavailability
-        activities = EntityCredentials.filter(
-            user,
-            Activity.objects
-                    .filter(is_deleted=False)
-                    .filter(self.get_date_q(start=start, end=end))
-                    .filter(calendars__in=calendar_ids)
-                    .distinct()
+        return self._activities_2_dicts(
+            activities=self.get_activities(
+                user=user, calendar_ids=calendar_ids, start=start, end=end,
+            ),
+            calendar_ids=calendar_ids,
+            user=user,
+        )
+
+    def _activities_2_dicts(self, *, activities, calendar_ids, user):
+        activities = activities.distinct().prefetch_related(Prefetch(
             # NB: we already filter by calendars ; maybe a future Django version
             #     will allow us to annotate the calendar ID directly
             #     (distinct() would have to be removed of course)
-                    .prefetch_related(Prefetch(
-                        'calendars',
-                        queryset=Calendar.objects.filter(id__in=calendar_ids),
-                        to_attr='concerned_calendars',
-                    ))
-        )
+            'calendars',
+            queryset=Calendar.objects.filter(id__in=calendar_ids),
+            to_attr='concerned_calendars',
+        ))
 
         activity_2_dict = partial(self._activity_2_dict, user=user)
 
@@ -292,6 +334,93 @@ class ActivitiesData(CalendarsMixin, generic.CheckedView):
             for a in self._get_one_activity_per_calendar(activities)
         ]
 
+    def get_activities(self, *, user, calendar_ids, start, end):
+        "Get the Activities in some calendars, which are in a period of time."
+        return EntityCredentials.filter(
+            user,
+            Activity.objects
+                    .filter(is_deleted=False)
+                    .filter(self.get_date_q(start=start, end=end))
+                    .filter(calendars__in=calendar_ids)
+        )
+
+    def get_validators(self, request, calendars=None):
+        """Get the validators used by the conditional requests (If-None-Match,
+        If-Modified-Since) ; they are computed with a few aggregate queries,
+        without retrieving the Activities.
+        @param calendars: Result of get_selected_calendars() ;
+               <None> means it is computed.
+        @return A tuple (ETag, last_modification_timestamp).
+                The timestamp is None if there is no Activity.
+        """
+        user = request.user
+
+        if calendars is None:
+            calendars = self.get_selected_calendars(request)
+
+        calendar_ids = [cal.id for cal in calendars]
+
+        start = self.get_start(request)
+        end   = self.get_end(request=request, start=start)
+
+        activities = self.get_activities(
+            user=user, calendar_ids=calendar_ids, start=start, end=end,
+        )
+
+        # NB: the aggregation is performed on the "calendars" relationship,
+        #     to detect the activities which are moved to another calendar.
+        agg = Activity.calendars.through.objects.filter(
+            calendar__in=calendar_ids, activity__in=activities,
+        ).aggregate(
+            count=Count('id'),
+            ids=Sum('id'),
+            last_modified=Max('activity__modified'),
+        )
+        last_modified = agg['last_modified']
+
+        # NB: the participants (& subjects...) are Relations, which do not
+        #     modify the Activities.
+        rel_agg = Relation.objects.filter(
+            subject_entity__in=activities.values('id'),
+        ).aggregate(count=Count('id'), ids=Sum('id'))
+
+        digest = md5()
+        for part in (
+            user.id,
+            user.role_id,
+            get_language(),
+            get_current_timezone_name(),
+            start.isoformat(),
+            end.isoformat(),
+            *(f'{cal.id}:{cal.get_color}' for cal in calendars),
+            agg['count'],
+            agg['ids'],
+            last_modified.isoformat() if last_modified else '',
+            rel_agg['count'],
+            rel_agg['ids'],
+            *self._credentials_version(user),
+        ):
+            digest.update(f'{part}#'.encode())
+
+        return (
+            quote_etag(digest.hexdigest()),
+            None if last_modified is None else int(last_modified.timestamp()),
+        )
+
+    @staticmethod
+    def _credentials_version(user):
+        "The credentials modify the retrieved Activities & their field 'editable'."
+        if user.is_superuser:
+            yield 'superuser'
+        else:
+            for creds in user.role._get_setcredentials():
+                yield (
+                    f'{creds.id}:{creds.value}:{creds.set_type}:{creds.ctype_id}:'
+                    f'{creds.forbidden}:{creds.efilter_id}'
+                )
+
+            yield ','.join(str(team.id) for team in user.teams)
+
     @staticmethod
     def get_date_q(start, end):
         return Q(start__range=(start, end)) | Q(end__gt=start, start__lt=end)
@@ -308,6 +437,13 @@ class ActivitiesData(CalendarsMixin, generic.CheckedView):
             now().replace(day=1)
         )
 
+    def get_selected_calendars(self, request):
+        "Get the selected calendars (see get_calendars()) & save their IDs in the session."
+        calendars = [*self.get_calendars(request)]
+        self.save_calendar_ids(request, [cal.id for cal in calendars])
+
+        return calendars
+
     def save_calendar_ids(self, request, calendar_ids):
         # TODO: GET argument to avoid saving ?
         key = self.calendar_ids_session_key
@@ -317,6 +453,71 @@ class ActivitiesData(CalendarsMixin, generic.CheckedView):
             session[key] = calendar_ids
 
 
+class ActivitiesDelta(ActivitiesData):
+    """Get the changes in the Activities of some calendars since a previous call.
+
+    The GET arguments are the same as ActivitiesData, plus "token" (returned by
+    the previous call ; without token, all the Activities are returned).
+
+    The response is a JSON dictionary with the keys:
+      - "token": to pass to the next call.
+      - "changed": list of the Activities (see ActivitiesData) modified since
+        the previous call.
+      - "keys": list of pairs [activity_id, calendar_id] for all the Activities
+        of the period. The client removes the events which are not in this list,
+        & retrieves all the Activities again if a key is unknown (ie: an
+        Activity has been added to a calendar).
+    """
+    token_arg = 'token'
+
+    # NB: the field "modified" is set before the transaction is committed ; so
+    #     an Activity committed after the computing of the previous token could
+    #     have an older modification date.
+    token_margin = timedelta(minutes=1)
+
+    def get(self, request, *args, **kwargs):
+        return self.response_class(self.get_delta(request))
+
+    def get_since(self, request):
+        token = request.GET.get(self.token_arg)
+
+        if token:
+            try:
+                return datetime.fromtimestamp(float(token), tz=utc) - self.token_margin
+            except (ValueError, OverflowError) as e:
+                logger.warning('ActivitiesDelta.get_since(): invalid token (%s)', e)
+
+        return None
+
+    def get_delta(self, request):
+        token_date = now()
+        user = request.user
+
+        calendar_ids = [cal.id for cal in self.get_selected_calendars(request)]
+
+        start = self.get_start(request)
+        end   = self.get_end(request=request, start=start)
+
+        activities = self.get_activities(
+            user=user, calendar_ids=calendar_ids, start=start, end=end,
+        )
+        keys = Activity.calendars.through.objects.filter(
+            calendar__in=calendar_ids, activity__in=activities,
+        ).values_list('activity_id', 'calendar_id')
+
+        since = self.get_since(request)
+        if since is not None:
+            activities = activities.filter(modified__gte=since)
+
+        return {
+            'token': str(token_date.timestamp()),
+            'changed': self._activities_2_dicts(
+                activities=activities, calendar_ids=calendar_ids, user=user,
+            ),
+            'keys': [[*key] for key in keys],
+        }
+
+
 class CalendarsSelection(CalendarsMixin, generic.CheckedView):
     """View which can add & remove selected calendar IDs in the session.
     It's mostly useful to remove IDs without retrieving Activities data
@@ -473,3 +674,38 @@ class CalendarLinking(generic.CremeModelEditionPopup):
     permissions = 'activities'
     pk_url_kwarg = 'activity_id'
     title = _('Change calendar of «{object}»')
+
+
+class CalendarICal(generic.CheckedView):
+    "Stream the Activities of a Calendar as an iCalendar file."
+    permissions = 'activities'
+    calendar_id_url_kwarg = 'calendar_id'
+    chunk_size = 500
+
+    def get_calendar(self):
+        user = self.request.user
+
+        return get_object_or_404(
+            Calendar.objects.filter(Q(is_public=True) | Q(user=user)),
+            id=self.kwargs[self.calendar_id_url_kwarg],
+        )
+
+    def get_activities(self, calendar):
+        return EntityCredentials.filter(
+            self.request.user,
+            Activity.objects.filter(calendars=calendar, is_deleted=False)
+                            .exclude(floating_type=constants.FLOATING)
+                            .select_related('type'),
+        )
+
+    def get(self, request, *args, **kwargs):
+        calendar = self.get_calendar()
+        response = StreamingHttpResponse(
+            iter_ical(self.get_activities(calendar).iterator(chunk_size=self.chunk_size)),
+            content_type='text/calendar',
+        )
+        response['Content-Disposition'] = 'attachment; filename={}'.format(
+            secure_filename(f'{calendar}.ics'),
+        )
+
+        return response
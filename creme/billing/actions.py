@@ -23,10 +23,12 @@ from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
 
 from creme import billing
-from creme.creme_core.gui.actions import UIAction
+from creme.creme_core.gui.actions import BulkEntityAction, UIAction
 
-Invoice = billing.get_invoice_model()
-Quote   = billing.get_quote_model()
+CreditNote = billing.get_credit_note_model()
+Invoice    = billing.get_invoice_model()
+Quote      = billing.get_quote_model()
+SalesOrder = billing.get_sales_order_model()
 
 
 class ExportAction(UIAction):
@@ -55,6 +57,39 @@ class ExportQuoteAction(ExportAction):
     model = Quote
 
 
+class BatchExportAction(BulkEntityAction):
+    type = 'billing-export-selection'
+    url_name = 'billing__batch_export'
+
+    label = _('Download as archive')
+    icon = 'download'
+    help_text = _('Download the selected documents as PDF files in an archive')
+
+    @property
+    def url(self):
+        return reverse(self.url_name, args=(self.ctype.id,))
+
+
+class BatchExportCreditNotesAction(BatchExportAction):
+    id = BatchExportAction.generate_id('billing', 'batch_export_credit_notes')
+    model = CreditNote
+
+
+class BatchExportInvoicesAction(BatchExportAction):
+    id = BatchExportAction.generate_id('billing', 'batch_export_invoices')
+    model = Invoice
+
+
+class BatchExportQuotesAction(BatchExportAction):
+    id = BatchExportAction.generate_id('billing', 'batch_export_quotes')
+    model = Quote
+
+
+class BatchExportSalesOrdersAction(BatchExportAction):
+    id = BatchExportAction.generate_id('billing', 'batch_export_sales_orders')
+    model = SalesOrder
+
+
 class GenerateNumberAction(UIAction):
     id = UIAction.generate_id('billing', 'generate_number')
     type = 'billing-invoice-number'
@@ -2,7 +2,7 @@
 
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2009-2020  Hybird
+#    Copyright (C) 2009-2021  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -18,41 +18,26 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
-import logging
-
-from django.db import IntegrityError
 from django.db.transaction import atomic
 
 from .models import SimpleBillingAlgo
 from .registry import Algo
 
-logger = logging.getLogger(__name__)
-
 
 class SimpleAlgo(Algo):
+    """Numbers are "<prefix><counter>", with a counter per couple
+    (organisation, ContentType) stored in a SimpleBillingAlgo instance.
+
+    The counter is incremented in place, within a transaction which locks its
+    row (SELECT ... FOR UPDATE) ; so concurrent generations wait for each
+    other instead of retrying.
+    """
     def generate_number(self, organisation, ct, *args, **kwargs):
-        # We cannot use F() to increment the number,
-        # because it's return the number of lines, not the lines themselves
-        # ( & we need the line to get the incremented value without race condition)
-        while True:
-            old_conf = SimpleBillingAlgo.objects.filter(
+        with atomic():
+            conf = SimpleBillingAlgo.objects.select_for_update().filter(
                 organisation=organisation, ct=ct,
             ).order_by('-last_number')[0]
-            conf = SimpleBillingAlgo(
-                organisation=old_conf.organisation,
-                ct=old_conf.ct,
-                prefix=old_conf.prefix,
-                last_number=old_conf.last_number + 1,
-            )
-
-            try:
-                with atomic():
-                    # Remember the <unique_together = ("organisation", "last_number", "ct")>
-                    # in SimpleBillingAlgo.Meta
-                    conf.save(force_insert=True)
-                    SimpleBillingAlgo.objects.filter(pk=old_conf.id).delete()
-            except IntegrityError as e:  # Problem with the 'unique_together' constraint
-                logger.debug('SimpleAlgo.generate_number() (save new conf): %s', e)
-                continue
+            conf.last_number += 1
+            conf.save(update_fields=('last_number',))
 
-            return conf.prefix + str(conf.last_number)
+        return f'{conf.prefix}{conf.last_number}'
@@ -107,6 +107,11 @@ class BillingConfig(CremeAppConfig):
             actions.ExportInvoiceAction,
             actions.ExportQuoteAction,
             actions.GenerateNumberAction,
+        ).register_bulk_actions(
+            actions.BatchExportCreditNotesAction,
+            actions.BatchExportInvoicesAction,
+            actions.BatchExportQuotesAction,
+            actions.BatchExportSalesOrdersAction,
         )
 
     def register_billing_algorithm(self):
@@ -30,7 +30,7 @@ from creme.creme_core.gui.bricks import (
     QuerysetBrick,
     SimpleBrick,
 )
-from creme.creme_core.models import Relation, SettingValue
+from creme.creme_core.models import Job, Relation, SettingValue
 from creme.creme_core.utils.unicode_collation import collator
 from creme.persons import bricks as persons_bricks
 
@@ -398,6 +398,24 @@ class BillingExportersBrick(Brick):
         ))
 
 
+class BatchExportArchiveBrick(Brick):
+    id_ = Brick.generate_id('billing', 'batch_export_archive')
+    verbose_name = _('Generated archive')
+    template_name = 'billing/bricks/batch-export-archive.html'
+    dependencies = (Job,)
+    configurable = False
+
+    def detailview_display(self, context):
+        from .creme_jobs import batch_export_type
+
+        job = context['job']
+
+        return self._render(self.get_template_context(
+            context,
+            archive=batch_export_type.get_archive(job) if job.is_finished else None,
+        ))
+
+
 class PersonsStatisticsBrick(Brick):
     id_ = Brick.generate_id('billing', 'persons__statistics')
     verbose_name = _('Billing statistics')
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2021  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+import logging
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from os import path
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.translation import gettext
+from django.utils.translation import gettext_lazy as _
+from django.utils.translation import ngettext
+
+from creme.creme_core.creme_jobs.base import JobProgress, JobType
+from creme.creme_core.models import EntityJobResult, FileRef, Job
+from creme.creme_core.utils.file_handling import FileCreator
+from creme.creme_core.utils.secure_filename import secure_filename
+from creme.creme_core.utils.translation import get_model_verbose_name
+
+from .exporters import BillingExportEngineManager
+from .models import ExporterConfigItem
+
+logger = logging.getLogger(__name__)
+
+
+def _init_export_worker():
+    import django
+
+    django.setup()
+
+
+def export_document(job_id, entity_id):
+    """Export one billing document for the job "Batch export".
+    This function is run by the workers' processes.
+
+    @return A tuple (entity_id, basename, file_path, content, error)
+            where "file_path" is the path of the generated file if the exporter
+            creates a FileRef, "content" the generated bytes if it returns a
+            response, and "error" a message if the export failed.
+    """
+    try:
+        job = Job.objects.get(id=job_id)
+        entity_type = ContentType.objects.get_for_id(job.data['ctype'])
+        model = entity_type.model_class()
+        user = job.user
+
+        entity = model._default_manager.get(id=entity_id)
+        has_perm = user.has_perm_to_view_or_die
+        has_perm(entity)
+        has_perm(entity.source)
+        has_perm(entity.target)
+
+        config_item = ExporterConfigItem.objects.get(content_type=entity_type)
+        exporter = BillingExportEngineManager().exporter(
+            engine_id=config_item.engine_id,
+            flavour_id=config_item.flavour_id,
+            model=model,
+        )
+        if exporter is None:
+            raise ValueError(gettext(
+                'The configured exporter is invalid ; '
+                'go to the configuration of the app «Billing».'
+            ))
+
+        result = exporter.export(entity=entity, user=user)
+    except Exception as e:
+        logger.exception('Error in export_document() [entity_id=%s]', entity_id)
+        return entity_id, None, None, None, str(e)
+
+    if isinstance(result, HttpResponse):
+        return (
+            entity_id,
+            secure_filename(f'{entity._meta.verbose_name}_{entity.id}.pdf'),
+            None,
+            result.content,
+            None,
+        )
+
+    return entity_id, result.basename, result.filedata.path, None, None
+
+
+class _BatchExportType(JobType):
+    """Export several billing documents with the configured exporter, & bundle
+    the generated files into an archive.
+
+    The documents are rendered by a pool of processes (see the setting
+    "BILLING_BATCH_EXPORT_WORKERS").
+    """
+    id           = JobType.generate_id('billing', 'batch_export')
+    verbose_name = _('Export of billing documents')
+
+    def _get_model(self, job):
+        return ContentType.objects.get_for_id(job.data['ctype']).model_class()
+
+    def _iter_exports(self, job, entity_ids):
+        workers = settings.BILLING_BATCH_EXPORT_WORKERS
+        export = partial(export_document, job.id)
+
+        if workers:
+            # NB: the DB connections must not be shared with the forked processes.
+            connections.close_all()
+
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=_init_export_worker) as executor:
+                yield from executor.map(export, entity_ids)
+        else:
+            yield from map(export, entity_ids)
+
+    def _execute(self, job):
+        user = job.user
+        entity_ids = job.data['entities']
+        model = self._get_model(job)
+        create_result = partial(EntityJobResult.objects.create, job=job)
+
+        archive_name = secure_filename(f'{model._meta.verbose_name_plural}.zip')
+        archive_path = FileCreator(
+            dir_path=path.join(settings.MEDIA_ROOT, 'upload', 'billing'),
+            name=archive_name,
+        ).create()
+        file_ref = FileRef.objects.create(
+            user=user,
+            filedata='upload/billing/' + path.basename(archive_path),
+            basename=archive_name,
+        )
+
+        # NB: PDF files are already compressed.
+        with zipfile.ZipFile(archive_path, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for entity_id, basename, file_path, content, error in self._iter_exports(
+                job, entity_ids,
+            ):
+                if error is not None:
+                    create_result(
+                        entity_id=(
+                            entity_id
+                            if model._default_manager.filter(id=entity_id).exists() else
+                            None
+                        ),
+                        messages=[error],
+                    )
+                    continue
+
+                if file_path is not None:
+                    archive.write(file_path, arcname=basename)
+                else:
+                    archive.writestr(basename, content)
+
+                create_result(entity_id=entity_id)
+
+        job_data = job.data
+        job_data['archive'] = file_ref.id
+        job.data = job_data
+        job.save()
+
+    def get_archive(self, job):
+        "Get the FileRef of the generated archive (or None)."
+        fileref_id = job.data.get('archive')
+
+        return None if fileref_id is None else FileRef.objects.filter(id=fileref_id).first()
+
+    def progress(self, job):
+        total = len(job.data['entities'])
+        count = EntityJobResult.objects.filter(job=job).count()
+
+        return JobProgress(
+            percentage=int(count * 100 / total) if total else None,
+            label=ngettext(
+                '{count} document has been processed.',
+                '{count} documents have been processed.',
+                count
+            ).format(count=count),
+        )
+
+    @property
+    def results_bricks(self):
+        from creme.creme_core.bricks import EntityJobErrorsBrick
+
+        from .bricks import BatchExportArchiveBrick
+
+        return [BatchExportArchiveBrick(), EntityJobErrorsBrick()]
+
+    def get_description(self, job):
+        try:
+            count = len(job.data['entities'])
+            model = self._get_model(job)
+            desc = [
+                ngettext(
+                    'Export {count} «{model}»',
+                    'Export {count} «{model}»',
+                    count
+                ).format(count=count, model=get_model_verbose_name(model, count)),
+            ]
+        except Exception:
+            logger.exception('Error in _BatchExportType.get_description')
+            desc = ['?']
+
+        return desc
+
+    def get_stats(self, job):
+        result_qs = EntityJobResult.objects.filter(job=job)
+        count = result_qs.filter(raw_messages__isnull=True).count()
+        errors_count = result_qs.filter(raw_messages__isnull=False).count()
+        stats = [
+            ngettext(
+                '{count} document has been exported.',
+                '{count} documents have been exported.',
+                count
+            ).format(count=count),
+        ]
+
+        if errors_count:
+            stats.append(
+                ngettext(
+                    '{count} document cannot be exported.',
+                    '{count} documents cannot be exported.',
+                    errors_count
+                ).format(count=errors_count)
+            )
+
+        return stats
+
+
+batch_export_type = _BatchExportType()
+jobs = (batch_export_type,)
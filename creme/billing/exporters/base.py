@@ -38,6 +38,8 @@ if TYPE_CHECKING:
 
     from creme.creme_core.models import CremeEntity, FileRef
 
+    from .cache import ExportCache
+
 logger = logging.getLogger(__name__)
 AGNOSTIC = 'AGNOSTIC'
 FlavourId = str
@@ -89,6 +91,11 @@ class BillingExporter:
     """
     ID_SEPARATOR = '|'
 
+    # Set to True in child classes which generate files (ie: FileRef) which
+    # can be re-used while the exported entity has not been modified
+    # (see the setting "BILLING_EXPORTERS_CACHE").
+    cacheable: bool = False
+
     def __init__(self, *,
                  verbose_name: str,
                  engine: 'BillingExportEngine',
@@ -102,6 +109,15 @@ class BillingExporter:
                user) -> Union['FileRef', 'HttpResponse']:
         raise NotImplementedError()
 
+    @property
+    def cache(self) -> Optional['ExportCache']:
+        "Get the cache for the generated files, or None if it is not used."
+        if not (self.cacheable and settings.BILLING_EXPORTERS_CACHE):
+            return None
+
+        from .cache import ExportCache
+        return ExportCache(self)
+
     @property
     def id(self) -> ExporterId:
         return ExporterId(
@@ -115,6 +131,13 @@ class BillingExporter:
         """
         raise NotImplementedError()
 
+    @property
+    def template_paths(self) -> Iterator[str]:
+        """Get the paths of the templates used to render the files.
+        Used to invalidate the cached files when a template is modified.
+        """
+        yield from ()
+
 
 class BillingExportEngine:
     """Base class for exporter engines.
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2021  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+import hashlib
+import logging
+from os import path
+from shutil import copy
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.utils.translation import get_language
+
+from creme.creme_core.models import FileRef
+from creme.creme_core.utils.file_handling import (
+    FileCreator,
+    IncrFileNameSuffixGenerator,
+)
+
+from ..constants import REL_OBJ_HAS_LINE
+
+if TYPE_CHECKING:
+    from creme.creme_core.models import CremeEntity
+
+    from .base import BillingExporter
+
+logger = logging.getLogger(__name__)
+
+
+class ExportCache:
+    """Content-addressed store for the files generated by the exporters.
+
+    The key of a generated file is a digest of everything which can modify the
+    output: the exporter (engine & flavour), the version of its templates, the
+    current language, the document & its modification date, its lines, its
+    addresses, its payment information (& other related instances) and the
+    related organisations. The generated files are stored with this digest as
+    name (the user-friendly name is stored in FileRef.basename), so a new
+    export of a document which has not changed just re-uses the existing file.
+    The copies made for the other users are named "<digest>-<user ID>", so the
+    files are retrieved by their exact path (see get()).
+
+    Files are <FileRef> instances which are temporary ; so the cache is
+    naturally purged by the job "Temporary files cleaner".
+    """
+    relative_dir_path = 'upload/billing'
+
+    def __init__(self, exporter: 'BillingExporter'):
+        self.exporter = exporter
+
+    @property
+    def dir_path(self) -> str:
+        return path.join(settings.MEDIA_ROOT, *self.relative_dir_path.split('/'))
+
+    def _templates_version(self) -> Iterator[str]:
+        for template_path in self.exporter.template_paths:
+            try:
+                origin = get_template(template_path).origin.name
+                yield f'{template_path}@{path.getmtime(origin)}'
+            except (TemplateDoesNotExist, OSError, AttributeError):
+                logger.warning('ExportCache: cannot get the version of "%s"', template_path)
+                yield template_path
+
+    @staticmethod
+    def _instance_version(instance) -> str:
+        if instance is None:
+            return ''
+
+        return '/'.join(
+            str(getattr(instance, field.attname))
+            for field in instance._meta.concrete_fields
+        )
+
+    def _lines_version(self, entity: 'CremeEntity') -> Iterator[str]:
+        from ..registry import lines_registry
+
+        for line_cls in lines_registry:
+            agg = line_cls.objects.filter(
+                relations__object_entity=entity.id,
+                relations__type=REL_OBJ_HAS_LINE,
+            ).aggregate(count=Count('id'), last=Max('modified'))
+
+            yield f'{line_cls.__name__}:{agg["count"]}:{agg["last"]}'
+
+    def key(self, entity: 'CremeEntity') -> str:
+        "Get the digest identifying the file generated for an entity."
+        parts = [
+            self.exporter.id,
+            *self._templates_version(),
+            get_language() or '',
+            str(entity.entity_type_id),
+            str(entity.id),
+            str(entity.modified),
+            *self._lines_version(entity),
+            self._instance_version(entity.billing_address),
+            self._instance_version(entity.shipping_address),
+            self._instance_version(entity.payment_info),
+            self._instance_version(entity.additional_info),
+            self._instance_version(entity.payment_terms),
+        ]
+
+        for related in (entity.source, entity.target):
+            parts.append(f'{related.id}:{related.modified}')
+
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode())
+            digest.update(b'\0')
+
+        return digest.hexdigest()
+
+    def get(self, *, key: str, user, basename: str) -> Optional[FileRef]:
+        """Get a FileRef instance corresponding to a key.
+        @param key: Result of key().
+        @param user: Owner of the returned FileRef.
+        @param basename: User-friendly name of the file.
+        @return A FileRef instance, or None if there is no file in the cache.
+                If the file has been generated for another user, it is copied
+                (a FileRef belongs to one user).
+        """
+        source_ref = None
+        extension = path.splitext(basename)[1]
+
+        # NB: exact paths, in order to use the index of FileRef.filedata.
+        for file_ref in FileRef.objects.filter(
+            filedata__in=[
+                f'{self.relative_dir_path}/{key}{extension}',
+                f'{self.relative_dir_path}/{key}-{user.id}{extension}',
+            ],
+        ).order_by('-id'):
+            file_path = file_ref.filedata.path
+
+            # NB: empty files are being generated (or their generation failed).
+            if not path.exists(file_path) or not path.getsize(file_path):
+                continue
+
+            if file_ref.user_id == user.id:
+                return file_ref
+
+            if source_ref is None:
+                source_ref = file_ref
+
+        if source_ref is None:
+            return None
+
+        final_path = self.create_path(key=f'{key}-{user.id}', extension=extension)
+        copy(source_ref.filedata.path, final_path)
+
+        return self.create_fileref(file_path=final_path, user=user, basename=basename)
+
+    def create_path(self, *, key: str, extension: str) -> str:
+        "Create a new empty file for a key, & return its absolute path."
+        return FileCreator(
+            dir_path=self.dir_path,
+            name=f'{key}{extension}',
+            generators=(IncrFileNameSuffixGenerator,),
+        ).create()
+
+    def create_fileref(self, *, file_path: str, user, basename: str) -> FileRef:
+        "Create the FileRef related to a path returned by create_path()."
+        return FileRef.objects.create(
+            user=user,
+            filedata=f'{self.relative_dir_path}/{path.basename(file_path)}',
+            basename=basename,
+        )
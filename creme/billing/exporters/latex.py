@@ -20,7 +20,7 @@
 
 import logging
 import subprocess
-from os import path
+from os import path, remove
 from shutil import copy, rmtree
 from tempfile import mkdtemp
 
@@ -44,12 +44,18 @@ logger = logging.getLogger(__name__)
 
 
 class LatexExporter(ContextMixin, base.BillingExporter):
+    cacheable = True
+
     def __init__(self, *, template_path, screenshots, **kwargs):
         super().__init__(**kwargs)
         self.template_path = template_path
         self._screenshots = [*screenshots]
 
-    def generate_pdf(self, *, content, dir_path, basename):
+    def generate_pdf(self, *, content, dir_path, basename, final_path=None):
+        """Generate the PDF file with pdflatex.
+        @param final_path: Path of the (existing & empty) file to fill ;
+               <None> means a new file is created in "upload/billing/".
+        """
         latex_file_path = path.join(dir_path, f'{basename}.tex')
 
         # NB: we precise the encoding or it oddly crashes on some systems...
@@ -82,15 +88,26 @@ class LatexExporter(ContextMixin, base.BillingExporter):
                 'please contact your administrator.'
             ))
 
-        final_path = FileCreator(
-            dir_path=path.join(settings.MEDIA_ROOT, 'upload', 'billing'),
-            name=pdf_basename,
-        ).create()
+        if final_path is None:
+            final_path = FileCreator(
+                dir_path=path.join(settings.MEDIA_ROOT, 'upload', 'billing'),
+                name=pdf_basename,
+            ).create()
+
         copy(temp_pdf_file_path, final_path)
 
         return final_path, pdf_basename
 
     def export(self, entity, user):
+        basename = secure_filename(f'{entity._meta.verbose_name}_{entity.id}')
+        cache = self.cache
+
+        if cache is not None:
+            cache_key = cache.key(entity)
+            file_ref = cache.get(key=cache_key, user=user, basename=f'{basename}.pdf')
+            if file_ref is not None:
+                return file_ref
+
         template = loader.get_template(self.template_path)
         context = self.get_context_data(object=entity)
         tmp_dir_path = mkdtemp(prefix='creme_billing_latex')
@@ -98,12 +115,24 @@ class LatexExporter(ContextMixin, base.BillingExporter):
         with override(language=self.flavour.language):
             content = template.render(context)
 
-        final_path, pdf_basename = self.generate_pdf(
-            content=content,
-            dir_path=tmp_dir_path,
-            basename=secure_filename(f'{entity._meta.verbose_name}_{entity.id}'),
+        cache_path = None if cache is None else cache.create_path(
+            key=cache_key, extension='.pdf',
         )
 
+        try:
+            final_path, pdf_basename = self.generate_pdf(
+                content=content,
+                dir_path=tmp_dir_path,
+                basename=basename,
+                final_path=cache_path,
+            )
+        except Exception:
+            # NB: we do not keep an empty file in the cache
+            if cache_path is not None:
+                remove(cache_path)
+
+            raise
+
         # TODO: context manager which can avoid file cleaning on exception ?
         rmtree(tmp_dir_path)
 
@@ -113,6 +142,10 @@ class LatexExporter(ContextMixin, base.BillingExporter):
             basename=pdf_basename,
         )
 
+    @property
+    def template_paths(self):
+        yield self.template_path
+
     @property
     def screenshots(self):
         yield from self._screenshots
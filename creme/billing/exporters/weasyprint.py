@@ -19,7 +19,7 @@
 ################################################################################
 
 import logging
-from os import path
+from os import path, remove
 
 from django.conf import settings
 from django.template.loader import get_template
@@ -39,6 +39,8 @@ logger = logging.getLogger(__name__)
 
 
 class WeasyprintExporter(ContextMixin, base.BillingExporter):
+    cacheable = True
+
     def __init__(self, *, html_template_path, css_template_path, screenshots, **kwargs):
         super().__init__(**kwargs)
         self.html_template_path = html_template_path
@@ -46,6 +48,15 @@ class WeasyprintExporter(ContextMixin, base.BillingExporter):
         self._screenshots = [*screenshots]
 
     def export(self, entity, user):
+        basename = secure_filename(f'{entity._meta.verbose_name}_{entity.id}.pdf')
+        cache = self.cache
+
+        if cache is not None:
+            cache_key = cache.key(entity)
+            file_ref = cache.get(key=cache_key, user=user, basename=basename)
+            if file_ref is not None:
+                return file_ref
+
         html_template = get_template(self.html_template_path)
         css_template = get_template(self.css_template_path)
         context = self.get_context_data(object=entity)
@@ -59,11 +70,13 @@ class WeasyprintExporter(ContextMixin, base.BillingExporter):
         html = HTML(string=html_content)
         css = CSS(string=css_content)
 
-        basename = secure_filename(f'{entity._meta.verbose_name}_{entity.id}.pdf')
-        final_path = FileCreator(
-            dir_path=path.join(settings.MEDIA_ROOT, 'upload', 'billing'),
-            name=basename,
-        ).create()
+        if cache is None:
+            final_path = FileCreator(
+                dir_path=path.join(settings.MEDIA_ROOT, 'upload', 'billing'),
+                name=basename,
+            ).create()
+        else:
+            final_path = cache.create_path(key=cache_key, extension='.pdf')
 
         # NB: we create the FileRef instance as soon as possible to get the
         #     smallest duration when a crash causes a file which have to be
@@ -77,12 +90,21 @@ class WeasyprintExporter(ContextMixin, base.BillingExporter):
         # TODO ?
         # from weasyprint.fonts import FontConfiguration
         # font_config = FontConfiguration()
-        html.write_pdf(
-            final_path,
-            stylesheets=[css],
-            # TODO: ???
-            # font_config=font_config
-        )
+        try:
+            html.write_pdf(
+                final_path,
+                stylesheets=[css],
+                # TODO: ???
+                # font_config=font_config
+            )
+        except Exception:
+            # NB: we do not keep an empty file (in the cache)
+            file_ref.delete()
+
+            if path.exists(final_path):
+                remove(final_path)
+
+            raise
 
         return file_ref
 
@@ -90,6 +112,11 @@ class WeasyprintExporter(ContextMixin, base.BillingExporter):
     def screenshots(self):
         yield from self._screenshots
 
+    @property
+    def template_paths(self):
+        yield self.html_template_path
+        yield self.css_template_path
+
 
 # TODO: factorise with LatexTheme ?
 class WeasyprintTheme:
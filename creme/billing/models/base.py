@@ -26,6 +26,7 @@ from functools import partial
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Sum
 from django.db.transaction import atomic
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
@@ -46,6 +47,7 @@ from ..constants import (
     REL_OBJ_LINE_RELATED_ITEM,
     REL_SUB_BILL_ISSUED,
     REL_SUB_BILL_RECEIVED,
+    REL_SUB_CREDIT_NOTE_APPLIED,
     REL_SUB_HAS_LINE,
 )
 from .algo import ConfigBillingAlgo
@@ -130,6 +132,9 @@ class Base(CremeEntity):
     _target = None
     _target_rel = None
     _creditnotes_cache = None
+    _lines_totals = None  # Tuple (total exclusive of tax, total inclusive of tax)
+    _creditnotes_totals = None  # Tuple (total exclusive of tax, total inclusive of tax)
+    _pending_lines_totals = None  # See apply_line_change()
 
     class Meta:
         abstract = True
@@ -175,6 +180,8 @@ class Base(CremeEntity):
     def invalidate_cache(self):
         self._lines_cache.clear()
         self._creditnotes_cache = None
+        self._lines_totals = None
+        self._creditnotes_totals = None
 
     @property
     def source(self):
@@ -305,25 +312,121 @@ class Base(CremeEntity):
         for line_cls in lines_registry:
             yield from self.get_lines(line_cls)
 
-    def _get_lines_total_n_creditnotes_total(self):
-        creditnotes_total = sum(
-            credit_note.total_no_vat for credit_note in self.get_credit_notes()
-        )
-        lines_total = sum(
-            line.get_price_exclusive_of_tax(self) for line in self.iter_all_lines()
-        )
+    def _get_lines_totals(self):
+        """Get the totals of the lines, as a tuple of Decimals
+        (total exclusive of tax, total inclusive of tax).
+
+        The lines are not instantiated ; only the fields needed to compute the
+        prices are retrieved (with the value of the VAT), with one query per
+        class of line.
+        """
+        totals = self._lines_totals
+
+        if totals is None:
+            from ..registry import lines_registry
+
+            total_no_vat = total_vat = DEFAULT_DECIMAL
+
+            if self.id:
+                document_discount = self.discount
+
+                for line_cls in lines_registry:
+                    compute_prices = line_cls.compute_prices
+
+                    for values in line_cls.objects.filter(
+                        relations__object_entity=self.id,
+                        relations__type=REL_OBJ_HAS_LINE,
+                    ).values_list(*line_cls.PRICE_FIELDS):
+                        quantity, unit_price, discount, discount_unit, vat = values
+                        no_vat, with_vat = compute_prices(
+                            quantity=quantity,
+                            unit_price=unit_price,
+                            discount=discount,
+                            discount_unit=discount_unit,
+                            vat=vat,
+                            document_discount=document_discount,
+                        )
+                        total_no_vat += no_vat
+                        total_vat += with_vat
+
+            self._lines_totals = totals = (total_no_vat, total_vat)
+
+        return totals
+
+    def _get_creditnotes_totals(self):
+        """Get the totals of the (not deleted) applied Credit Notes, as a tuple
+        of Decimals (total exclusive of tax, total inclusive of tax).
+        """
+        totals = self._creditnotes_totals
+
+        if totals is None:
+            credit_notes = self._creditnotes_cache
+
+            if credit_notes is not None:
+                totals = (
+                    sum(cnote.total_no_vat for cnote in credit_notes),
+                    sum(cnote.total_vat for cnote in credit_notes),
+                )
+            elif self.id:
+                from creme.billing import get_credit_note_model
+
+                agg = get_credit_note_model().objects.filter(
+                    relations__type=REL_SUB_CREDIT_NOTE_APPLIED,
+                    relations__object_entity=self.id,
+                    is_deleted=False,
+                ).aggregate(total_no_vat=Sum('total_no_vat'), total_vat=Sum('total_vat'))
+                totals = (
+                    agg['total_no_vat'] or DEFAULT_DECIMAL,
+                    agg['total_vat'] or DEFAULT_DECIMAL,
+                )
+            else:
+                totals = (DEFAULT_DECIMAL, DEFAULT_DECIMAL)
 
-        return lines_total, creditnotes_total
+            self._creditnotes_totals = totals
+
+        return totals
+
+    def _get_lines_total_n_creditnotes_total(self):
+        return self._get_lines_totals()[0], self._get_creditnotes_totals()[0]
 
     def _get_lines_total_n_creditnotes_total_with_tax(self):
-        creditnotes_total = sum(
-            credit_note.total_vat for credit_note in self.get_credit_notes()
-        )
-        lines_total_with_tax = sum(
-            line.get_price_inclusive_of_tax(self) for line in self.iter_all_lines()
-        )
+        return self._get_lines_totals()[1], self._get_creditnotes_totals()[1]
+
+    def apply_line_change(self, *, old_prices=None, new_prices=None):
+        """Update the totals when one line has been created, modified or
+        deleted, & save the instance.
+
+        When it's possible, the totals of the lines are deduced from the stored
+        totals, so the other lines are not retrieved. It's not possible when
+        some Credit Notes are applied, because the stored totals depend on the
+        totals of the Credit Notes at the last save (they can have been modified
+        since) ; so the totals are fully computed.
+        @param old_prices: Prices of the line before the change, as a tuple
+               (exclusive of tax, inclusive of tax) ; None for a creation.
+        @param new_prices: Prices of the line after the change, as a tuple
+               (exclusive of tax, inclusive of tax) ; None for a deletion.
+        """
+        # NB: we lock the row to avoid concurrent modifications of the totals.
+        stored = type(self).objects.select_for_update().filter(
+            pk=self.pk,
+        ).values_list('total_no_vat', 'total_vat').first()
+
+        # NB: a total equal to 0 can be a clamped value (see _get_total()) ;
+        #     the totals of the lines cannot be deduced from it.
+        # NB: we check the Relations (& not the totals of the Credit Notes)
+        #     because a Credit Note can have been modified or trashed since the
+        #     last save.
+        if stored and all(stored) and not self.relations.filter(
+            type=REL_OBJ_CREDIT_NOTE_APPLIED,
+        ).exists():
+            old_no_vat, old_vat = old_prices or (DEFAULT_DECIMAL, DEFAULT_DECIMAL)
+            new_no_vat, new_vat = new_prices or (DEFAULT_DECIMAL, DEFAULT_DECIMAL)
+            self._pending_lines_totals = (
+                stored[0] - old_no_vat + new_no_vat,
+                stored[1] - old_vat + new_vat,
+            )
 
-        return lines_total_with_tax, creditnotes_total
+        self.save()
 
     def _get_total(self):
         lines_total, creditnotes_total = self._get_lines_total_n_creditnotes_total()
@@ -349,29 +452,37 @@ class Base(CremeEntity):
         from ..registry import relationtype_converter
 
         # Not REL_OBJ_CREDIT_NOTE_APPLIED, links to CreditNote are not cloned.
-        relation_create = Relation.objects.create
-        class_map = relationtype_converter.get_class_map(source, self)
+        class_map = {
+            rtype.id: final_rtype.id
+            for rtype, final_rtype in relationtype_converter.get_class_map(source, self).items()
+        }
         super()._copy_relations(
             source,
             # allowed_internal=[REL_SUB_BILL_ISSUED, REL_SUB_BILL_RECEIVED],
         )
 
-        for relation in source.relations.filter(
-                type__is_internal=False,
-                type__is_copiable=True,
-                type__in=class_map.keys()):
-            relation_create(
-                user_id=relation.user_id,
-                subject_entity=self,
-                type=class_map[relation.type],
-                object_entity_id=relation.object_entity_id,
+        if class_map:
+            Relation.objects.safe_bulk_create(
+                Relation(
+                    user_id=user_id,
+                    subject_entity=self,
+                    type_id=class_map[rtype_id],
+                    object_entity_id=object_id,
+                ) for user_id, rtype_id, object_id in source.relations.filter(
+                    type__is_internal=False,
+                    type__is_copiable=True,
+                    type__in=class_map.keys(),
+                ).values_list('user', 'type', 'object_entity')
             )
 
     def _post_clone(self, source):
+        from ..registry import lines_registry
+
         source.invalidate_cache()
 
-        for line in source.iter_all_lines():
-            line.clone(self)
+        # NB: the lines are cloned in bulk (see Line.bulk_clone()).
+        for line_cls in lines_registry:
+            line_cls.bulk_clone(source.get_lines(line_cls), new_related_document=self)
 
     # TODO: factorise with persons ??
     def _post_save_clone(self, source):
@@ -491,6 +602,11 @@ class Base(CremeEntity):
         else:  # Edition
             self.invalidate_cache()
 
+            pending_lines_totals = self._pending_lines_totals
+            if pending_lines_totals is not None:
+                self._lines_totals = pending_lines_totals
+                self._pending_lines_totals = None
+
             self.total_vat    = self._get_total_with_tax()
             self.total_no_vat = self._get_total()
 
@@ -73,6 +73,9 @@ class Line(CremeEntity):
 
     creation_label = _('Create a line')
 
+    # NB: the logic of save() is done by _bulk_insert() (see bulk_clone()).
+    bulk_clonable = True
+
     _related_document = False
     _related_item = None
 
@@ -151,9 +154,111 @@ class Line(CremeEntity):
 
         return super().clone()
 
+    @classmethod
+    @atomic
+    def bulk_clone(cls, sources, new_related_document=None):
+        """Clone several lines with a constant number of queries (see
+        CremeEntity.bulk_clone()) ; the totals of the documents are updated once.
+        @param sources: Instances of <cls>.
+        @param new_related_document: Document of the new lines ; by default,
+               the new lines are related to the document of their source.
+        """
+        sources = [*sources]
+
+        # Retrieve the related items with one query (see _pre_save_clone()).
+        item_relations = [
+            *Relation.objects.filter(
+                type=constants.REL_SUB_LINE_RELATED_ITEM,
+                subject_entity__in=[line.id for line in sources if not line.on_the_fly_item],
+            ),
+        ]
+        Relation.populate_real_object_entities(item_relations)
+        items = {
+            relation.subject_entity_id: relation.object_entity.get_real_entity()
+            for relation in item_relations
+        }
+
+        for line in sources:
+            line._new_related_document = new_related_document or line.related_document
+
+            item = items.get(line.id)
+            if item is not None:
+                line._related_item = item
+
+        return super().bulk_clone(sources)
+
+    @classmethod
+    def _bulk_insert(cls, lines):
+        # NB: see save()
+        for line in lines:
+            assert line._related_document, 'Line.related_document is required'
+            assert bool(line._related_item) ^ bool(line.on_the_fly_item),\
+                'Line.related_item or Line.on_the_fly_item is required'
+
+            line.user_id = line._related_document.user_id
+
+        super()._bulk_insert(lines)
+
+        relations = []
+        for line in lines:
+            relations.append(Relation(
+                subject_entity=line,
+                type_id=constants.REL_OBJ_HAS_LINE,
+                object_entity=line._related_document,
+                user_id=line.user_id,
+            ))
+
+            if line._related_item:
+                relations.append(Relation(
+                    subject_entity=line,
+                    type_id=constants.REL_SUB_LINE_RELATED_ITEM,
+                    object_entity=line._related_item,
+                    user_id=line.user_id,
+                ))
+
+        Relation.objects.safe_bulk_create(relations, check_existing=False)
+
+        # Update the totals (the lines are retrieved once per document)
+        for document in {line._related_document.id: line._related_document
+                         for line in lines}.values():
+            document.save()
+
     def get_absolute_url(self):
         return self.get_related_entity().get_absolute_url()
 
+    # Names of the fields used to compute the prices (see compute_prices()).
+    PRICE_FIELDS = ('quantity', 'unit_price', 'discount', 'discount_unit', 'vat_value__value')
+
+    @classmethod
+    def compute_prices(cls, *,
+                       quantity, unit_price, discount, discount_unit, vat=None,
+                       document_discount=None):
+        """Compute the prices of a line from raw values (ie: without instance
+        of Line) ; useful to compute the totals of many lines efficiently.
+        @param vat: value of the VAT (Decimal, eg: 20 for 20%), or None.
+        @param document_discount: overall discount of the related document (in percent).
+        @return A tuple of Decimals (price exclusive of tax, price inclusive of tax).
+        """
+        Discount = cls.Discount
+
+        if discount_unit == Discount.PERCENT:
+            total_after_first_discount = quantity * (
+                unit_price - (unit_price * discount / 100)
+            )
+        elif discount_unit == Discount.LINE_AMOUNT:
+            total_after_first_discount = quantity * unit_price - discount
+        else:  # ITEM_AMOUNT
+            total_after_first_discount = quantity * (unit_price - discount)
+
+        total_exclusive_of_tax = total_after_first_discount
+        if document_discount:
+            total_exclusive_of_tax -= total_after_first_discount * document_discount / 100
+
+        total_ht = round_to_2(total_exclusive_of_tax)
+        vat_amount = (total_ht * vat / 100) if vat else 0
+
+        return total_ht, round_to_2(total_ht + vat_amount)
+
     def get_price_inclusive_of_tax(self, document=None):
         total_ht = self.get_price_exclusive_of_tax(document)
         vat_value = self.vat_value
@@ -164,30 +269,15 @@ class Line(CremeEntity):
         return round_to_2(self.quantity * self.unit_price)
 
     def get_price_exclusive_of_tax(self, document=None):
-        line_discount   = self.discount
-        unit_price_line = self.unit_price
-        discount_unit   = self.discount_unit
-        Discount = self.Discount
+        document = document if document else self.related_document
 
-        # if discount_unit == constants.DISCOUNT_PERCENT:
-        if discount_unit == Discount.PERCENT:
-            total_after_first_discount = self.quantity * (
-                unit_price_line - (unit_price_line * line_discount / 100)
-            )
-        # elif discount_unit == constants.DISCOUNT_LINE_AMOUNT:
-        elif discount_unit == Discount.LINE_AMOUNT:
-            total_after_first_discount = self.quantity * unit_price_line - line_discount
-        # else:  # DISCOUNT_ITEM_AMOUNT
-        else:  # ITEM_AMOUNT
-            total_after_first_discount = self.quantity * (unit_price_line - line_discount)
-
-        document     = document if document else self.related_document
-        doc_discount = document.discount if document else None
-        total_exclusive_of_tax = total_after_first_discount
-        if doc_discount:
-            total_exclusive_of_tax -= total_after_first_discount * doc_discount / 100
-
-        return round_to_2(total_exclusive_of_tax)
+        return self.compute_prices(
+            quantity=self.quantity,
+            unit_price=self.unit_price,
+            discount=self.discount,
+            discount_unit=self.discount_unit,
+            document_discount=document.discount if document else None,
+        )[0]
 
     def get_related_entity(self):  # For generic views & delete
         return self.related_document
@@ -265,9 +355,35 @@ class Line(CremeEntity):
                     type_id=constants.REL_SUB_LINE_RELATED_ITEM,
                     object_entity=self._related_item,
                 )
+
+            old_values = None
         else:
+            old_values = type(self).objects.filter(
+                pk=self.pk,
+            ).values(*self.PRICE_FIELDS).first()
+
             super().save(*args, **kwargs)
 
         # TODO: problem, if several lines are added/edited at once, lots of
         #  useless queries (workflow engine ??)
-        self.related_document.save()  # Update totals
+        document = self.related_document
+        document_discount = document.discount
+        compute_prices = self.compute_prices
+        document.apply_line_change(  # Update totals
+            old_prices=None if old_values is None else compute_prices(
+                quantity=old_values['quantity'],
+                unit_price=old_values['unit_price'],
+                discount=old_values['discount'],
+                discount_unit=old_values['discount_unit'],
+                vat=old_values['vat_value__value'],
+                document_discount=document_discount,
+            ),
+            new_prices=compute_prices(
+                quantity=self.quantity,
+                unit_price=self.unit_price,
+                discount=self.discount,
+                discount_unit=self.discount_unit,
+                vat=self.vat_value.value if self.vat_value_id else None,
+                document_discount=document_discount,
+            ),
+        )
@@ -2,7 +2,7 @@
 
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2015-2020  Hybird
+#    Copyright (C) 2015-2021  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -152,3 +152,11 @@ def manage_creation_workflows(sender, instance, **kwargs):
                 target=instance.object_entity,
                 user=instance.user,
             )
+
+
+@receiver(core_signals.post_bulk_create, sender=Relation)
+def manage_bulk_created_relations(sender, instances, **kwargs):
+    "See Relation.objects.safe_bulk_create()."
+    for relation in instances:
+        manage_linked_credit_notes(sender=sender, instance=relation)
+        manage_creation_workflows(sender=sender, instance=relation)
@@ -107,6 +107,33 @@ $(document).on('listview-setup-actions', '.ui-creme-listview', function(e, actio
 
         return action;
     });
+
+    actions.register('billing-export-selection', function(url, options, data, e) {
+        var list = this._list;
+
+        return new creme.component.Action(function() {
+            var self = this;
+            var selection = list.selectedRows();
+
+            if (selection.length < 1) {
+                creme.dialogs.warning(gettext("Please select at least one entity."))
+                             .onClose(function() {
+                                 self.cancel();
+                              })
+                             .open();
+            } else {
+                creme.utils.ajaxQuery(url, {action: 'post', warnOnFail: true}, {ids: selection.join(',')})
+                           .onFail(function() {
+                               self.fail();
+                            })
+                           .onDone(function(event, data) {
+                               self.done();
+                               creme.utils.goTo(data);
+                            })
+                           .start();
+            }
+        });
+    });
 });
 
 var billingLinesActions = {
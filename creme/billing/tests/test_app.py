@@ -2,6 +2,7 @@
 
 from functools import partial
 
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 
 from creme.creme_core.models import (
@@ -10,7 +11,10 @@ from creme.creme_core.models import (
     SettingValue,
     Vat,
 )
-from creme.creme_core.tests.base import skipIfNotInstalled
+from creme.creme_core.tests.base import (
+    CremeTransactionTestCase,
+    skipIfNotInstalled,
+)
 from creme.creme_core.tests.views.base import BrickTestCaseMixin
 from creme.persons.tests.base import skipIfCustomOrganisation
 
@@ -37,6 +41,7 @@ from .base import (
     ServiceLine,
     TemplateBase,
     _BillingTestCase,
+    skipIfCustomInvoice,
 )
 
 
@@ -128,6 +133,32 @@ class AppTestCase(BrickTestCaseMixin, _BillingTestCase):
             {simpleconf.ct.model_class() for simpleconf in simpleconfs}
         )
 
+    @skipIfCustomOrganisation
+    @skipIfCustomInvoice
+    def test_simple_algo(self):
+        user = self.create_user()
+        orga = Organisation.objects.create(user=user, name='NERV')
+        self._set_managed(orga)
+
+        ct = ContentType.objects.get_for_model(Invoice)
+        conf = self.get_object_or_fail(SimpleBillingAlgo, organisation=orga, ct=ct)
+        conf.prefix = 'INV'
+        conf.save()
+
+        algo = SimpleAlgo()
+        self.assertEqual('INV1', algo.generate_number(orga, ct))
+        self.assertEqual('INV2', algo.generate_number(orga, ct))
+
+        # Counter updated in place
+        conf = self.get_object_or_fail(SimpleBillingAlgo, organisation=orga, ct=ct)
+        self.assertEqual(2, conf.last_number)
+
+        # Other ContentType => other counter
+        ct_quote = ContentType.objects.get_for_model(Quote)
+        self.assertEqual(
+            f'{settings.QUOTE_NUMBER_PREFIX}1', algo.generate_number(orga, ct_quote),
+        )
+
     def _merge_organisations(self, orga1, orga2):
         user = self.user
         response = self.client.post(
@@ -351,3 +382,56 @@ class AppTestCase(BrickTestCaseMixin, _BillingTestCase):
 
         tree = self.get_html_tree(response.content)
         self.get_brick_node(tree, brick_id)
+
+
+class AlgoBenchmark(CremeTransactionTestCase):
+    def bench_generate_number_concurrency(self):
+        """
+        Little benchmark to see how the generation of numbers behaves when many
+        users create invoices at the same time.
+        """
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        from django.db import connection
+
+        user = self.create_user()
+        orga = Organisation.objects.create(user=user, name='NERV')
+        ct = ContentType.objects.get_for_model(Invoice)
+        ConfigBillingAlgo.objects.create(
+            organisation=orga, ct=ct, name_algo=SimpleBillingAlgo.ALGO_NAME,
+        )
+        SimpleBillingAlgo.objects.create(
+            organisation=orga, last_number=0, prefix='INV', ct=ct,
+        )
+
+        workers = 8
+        numbers_per_worker = 200
+
+        def generate(__):
+            algo = SimpleAlgo()
+
+            try:
+                return [
+                    algo.generate_number(orga, ct)
+                    for __ in range(numbers_per_worker)
+                ]
+            finally:
+                connection.close()
+
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            numbers = [
+                number
+                for worker_numbers in executor.map(generate, range(workers))
+                for number in worker_numbers
+            ]
+
+        elapsed = time.perf_counter() - start
+        self.assertEqual(workers * numbers_per_worker, len({*numbers}))
+
+        print(
+            f'{len(numbers)} numbers in {elapsed:.3f}s '
+            f'({len(numbers) / elapsed:.0f} numbers/s)'
+        )
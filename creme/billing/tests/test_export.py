@@ -1,12 +1,16 @@
 # -*- coding: utf-8 -*-
 
+import zipfile
 from datetime import date
 from decimal import Decimal
 from functools import partial
 from json import dumps as json_dump
+from os import listdir
 from os.path import dirname, exists, join
-from shutil import which
+from shutil import rmtree, which
+from tempfile import mkdtemp
 from unittest import skipIf
+from unittest.mock import patch
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
@@ -15,9 +19,13 @@ from django.urls import reverse
 from django.utils.formats import date_format
 from django.utils.html import escape
 from django.utils.translation import gettext as _
+from django.utils.translation import ngettext
+from django.utils.translation import override as override_language
 
 from creme.billing.bricks import BillingExportersBrick
+from creme.billing.creme_jobs import batch_export_type
 from creme.billing.exporters import BillingExportEngineManager, ExporterFlavour
+from creme.billing.exporters.cache import ExportCache
 from creme.billing.exporters.latex import LatexExportEngine, LatexExporter
 from creme.billing.exporters.xls import XLSExportEngine, XLSExporter
 from creme.billing.models import (
@@ -27,7 +35,14 @@ from creme.billing.models import (
     SettlementTerms,
 )
 from creme.creme_core.auth.entity_credentials import EntityCredentials
-from creme.creme_core.models import FileRef, SetCredentials, Vat
+from creme.creme_core.core.exceptions import ConflictError
+from creme.creme_core.models import (
+    EntityJobResult,
+    FileRef,
+    Job,
+    SetCredentials,
+    Vat,
+)
 from creme.creme_core.tests.forms.base import FieldTestCase
 from creme.creme_core.tests.views.base import BrickTestCaseMixin
 from creme.creme_core.utils.xlrd_utils import XlrdReader
@@ -1559,3 +1574,222 @@ class ExportTestCase(BrickTestCaseMixin, _BillingTestCase):
             content_type=invoice.entity_type,
         ).update(engine_id=LatexExportEngine.id)
         self.assertGET403(self._build_export_url(invoice))
+
+    @skipIfCustomInvoice
+    def test_export_cache(self):
+        user = self.login()
+        invoice = self.create_invoice_n_orgas('My Invoice', discount=0)[0]
+
+        exporter = OnlyInvoiceExportEngine(Invoice).exporter(
+            flavour=ExporterFlavour('FR', 'fr_FR', 'basic'),
+        )
+        self.assertIsNone(exporter.cache)
+
+        exporter.cacheable = True
+        self.assertIsNone(exporter.cache)  # Disabled by default
+
+        with override_settings(BILLING_EXPORTERS_CACHE=True):
+            cache = exporter.cache
+
+        self.assertIsInstance(cache, ExportCache)
+
+        key = cache.key(invoice)
+        self.assertEqual(key, cache.key(invoice))
+        self.assertIsNone(cache.get(key=key, user=user, basename='invoice.pdf'))
+
+        file_path = cache.create_path(key=key, extension='.pdf')
+        self.assertEqual(join(settings.MEDIA_ROOT, 'upload', 'billing'), dirname(file_path))
+
+        with open(file_path, 'wb') as f:
+            f.write(b'%PDF')
+
+        file_ref1 = cache.create_fileref(file_path=file_path, user=user, basename='invoice.pdf')
+        self.assertEqual(file_ref1, cache.get(key=key, user=user, basename='invoice.pdf'))
+
+        # Another user => copy
+        other_user = self.other_user
+        file_ref2 = cache.get(key=key, user=other_user, basename='invoice.pdf')
+        self.assertIsNotNone(file_ref2)
+        self.assertNotEqual(file_ref1, file_ref2)
+        self.assertEqual(other_user, file_ref2.user)
+        self.assertEqual('invoice.pdf', file_ref2.basename)
+        self.assertEqual(
+            f'upload/billing/{key}-{other_user.id}.pdf', file_ref2.filedata.name,
+        )
+        self.assertEqual(file_ref2, cache.get(key=key, user=other_user, basename='invoice.pdf'))
+
+        with open(file_ref2.filedata.path, 'rb') as f:
+            self.assertEqual(b'%PDF', f.read())
+
+        # Modifications invalidate the key
+        invoice = self.refresh(invoice)
+        create_line = partial(
+            ProductLine.objects.create,
+            user=user, related_document=invoice,
+        )
+        create_line(on_the_fly_item='Fly', unit_price=Decimal('10'))
+        invoice = self.refresh(invoice)
+        line_key = cache.key(invoice)
+        self.assertNotEqual(key, line_key)
+
+        # The language invalidates the key
+        with override_language('fr'):
+            fr_key = cache.key(invoice)
+
+        with override_language('en'):
+            en_key = cache.key(invoice)
+
+        self.assertNotEqual(fr_key, en_key)
+
+        # The payment information invalidates the key
+        payment_info = PaymentInformation.objects.create(
+            organisation=invoice.source, name='RIB 1', bank_code='12345',
+        )
+        Invoice.objects.filter(id=invoice.id).update(payment_info=payment_info)
+        invoice = self.refresh(invoice)
+        pi_key = cache.key(invoice)
+        self.assertNotEqual(line_key, pi_key)
+
+        PaymentInformation.objects.filter(id=payment_info.id).update(bank_code='67890')
+        self.assertNotEqual(pi_key, cache.key(self.refresh(invoice)))
+
+    @skipIfCustomInvoice
+    @override_settings(BILLING_EXPORTERS_CACHE=True)
+    def test_export_cache_failed_generation(self):
+        "The cache does not keep an empty file when the generation fails."
+        user = self.login()
+        invoice = self.create_invoice_n_orgas('My Invoice', discount=0)[0]
+
+        exporter = LatexExportEngine(Invoice).exporter(
+            flavour=ExporterFlavour('FR', 'fr_FR', 'clear'),
+        )
+        cache = exporter.cache
+        self.assertIsInstance(cache, ExportCache)
+
+        key = cache.key(invoice)
+        tmp_dir_path = mkdtemp(prefix='creme_billing_tests')
+
+        try:
+            # NB: pdflatex does not generate the PDF file
+            with patch('creme.billing.exporters.latex.subprocess.call'), \
+                    patch('creme.billing.exporters.latex.mkdtemp', return_value=tmp_dir_path):
+                with self.assertRaises(ConflictError):
+                    exporter.export(entity=invoice, user=user)
+        finally:
+            rmtree(tmp_dir_path)
+
+        self.assertFalse([
+            name for name in listdir(cache.dir_path) if name.startswith(key)
+        ])
+        self.assertIsNone(cache.get(key=key, user=user, basename='invoice.pdf'))
+
+    def _build_batch_export_url(self, model):
+        return reverse(
+            'billing__batch_export',
+            args=(ContentType.objects.get_for_model(model).id,),
+        )
+
+    @skipIfCustomInvoice
+    @skipIfCustomProductLine
+    @skipIf(xhtml2pdf_not_installed, 'The lib "xhtml2pdf" is not installed.')
+    @override_settings(
+        BILLING_EXPORTERS=['creme.billing.exporters.xhtml2pdf.Xhtml2pdfExportEngine'],
+        BILLING_BATCH_EXPORT_WORKERS=0,
+    )
+    def test_batch_export(self):
+        user = self.login()
+        invoice1 = self.create_invoice_n_orgas('Invoice #1', discount=0)[0]
+        invoice2 = self.create_invoice_n_orgas('Invoice #2', discount=0)[0]
+
+        ExporterConfigItem.objects.filter(
+            content_type=invoice1.entity_type,
+        ).update(
+            engine_id=Xhtml2pdfExportEngine.id,
+            flavour_id='FR/fr_FR/cappuccino',
+        )
+
+        url = self._build_batch_export_url(Invoice)
+        self.assertGET405(url)
+
+        response = self.assertPOST200(url, data={'ids': f'{invoice1.id},{invoice2.id}'})
+        job = self.get_object_or_fail(Job, type_id=batch_export_type.id, user=user)
+        self.assertEqual(job.get_absolute_url(), response.content.decode())
+        self.assertDictEqual(
+            {'ctype': invoice1.entity_type_id, 'entities': [invoice1.id, invoice2.id]},
+            job.data,
+        )
+        self.assertEqual(
+            [
+                ngettext(
+                    'Export {count} «{model}»',
+                    'Export {count} «{model}»',
+                    2
+                ).format(count=2, model=Invoice._meta.verbose_name_plural),
+            ],
+            job.description,
+        )
+
+        batch_export_type.execute(job)
+
+        job = self.refresh(job)
+        self.assertEqual(Job.STATUS_OK, job.status)
+        self.assertEqual(
+            2, EntityJobResult.objects.filter(job=job, raw_messages__isnull=True).count(),
+        )
+
+        archive = batch_export_type.get_archive(job)
+        self.assertIsInstance(archive, FileRef)
+        self.assertEqual(user, archive.user)
+
+        with zipfile.ZipFile(archive.filedata.path) as zf:
+            self.assertCountEqual(
+                [
+                    '{}_{}.pdf'.format(_('Invoice'), invoice1.id),
+                    '{}_{}.pdf'.format(_('Invoice'), invoice2.id),
+                ],
+                zf.namelist(),
+            )
+
+        progress = job.progress
+        self.assertEqual(100, progress.percentage)
+
+    @override_settings(BILLING_BATCH_EXPORT_WORKERS=0)
+    @skipIfCustomInvoice
+    def test_batch_export_error(self):
+        user = self.login(
+            is_superuser=False, allowed_apps=['persons', 'billing'],
+            creatable_models=[Invoice, Organisation],
+        )
+        SetCredentials.objects.create(
+            role=self.role,
+            value=EntityCredentials.VIEW | EntityCredentials.LINK | EntityCredentials.UNLINK,
+            set_type=SetCredentials.ESET_OWN,
+        )
+
+        invoice = self.create_invoice_n_orgas('Invoice #1', discount=0)[0]
+        invoice.user = self.other_user
+        invoice.save()
+
+        url = self._build_batch_export_url(Invoice)
+        self.assertPOST409(url, data={'ids': ''})
+        self.assertPOST409(self._build_batch_export_url(Organisation), data={'ids': '1'})
+
+        ExporterConfigItem.objects.filter(
+            content_type=invoice.entity_type,
+        ).update(engine_id='')
+        self.assertPOST409(url, data={'ids': str(invoice.id)})
+
+        ExporterConfigItem.objects.filter(
+            content_type=invoice.entity_type,
+        ).update(engine_id=XLSExportEngine.id, flavour_id='')
+        self.assertPOST200(url, data={'ids': str(invoice.id)})
+
+        job = self.get_object_or_fail(Job, type_id=batch_export_type.id, user=user)
+        batch_export_type.execute(job)
+
+        results = EntityJobResult.objects.filter(job=job)
+        self.assertEqual(1, len(results))
+
+        result = results[0]
+        self.assertEqual(invoice.id, result.entity_id)
+        self.assertEqual(1, len(result.messages))
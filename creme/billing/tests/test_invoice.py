@@ -5,6 +5,7 @@ from decimal import Decimal
 from functools import partial
 
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from django.db.models.deletion import ProtectedError
 from django.urls import reverse
@@ -15,11 +16,13 @@ from creme.creme_core.gui import actions
 from creme.creme_core.models import (
     CremeEntity,
     Currency,
+    HistoryLine,
     Relation,
     RelationType,
     SetCredentials,
     Vat,
 )
+from creme.creme_core.models.history import TYPE_AUX_CREATION
 from creme.creme_core.tests.base import CremeTransactionTestCase
 from creme.persons.constants import REL_SUB_CUSTOMER_SUPPLIER
 from creme.persons.tests.base import (
@@ -1106,6 +1109,83 @@ class InvoiceTestCase(_BillingTestCase):
         self.assertEqual(s_addr.name,       shipping_address.name)
         self.assertEqual(s_addr.department, shipping_address.department)
 
+    @skipIfCustomProductLine
+    @skipIfCustomServiceLine
+    def test_clone_lines(self):
+        "Lines are cloned in bulk."
+        user = self.login()
+
+        invoice = self.create_invoice_n_orgas('Invoice001', discount=10)[0]
+        product = self.create_product()
+        service = self.create_service()
+
+        kwargs = {'user': user, 'related_document': invoice}
+        create_pline = partial(ProductLine.objects.create, **kwargs)
+        pline1 = create_pline(related_item=product, unit_price=Decimal('10'), quantity=2)
+        create_pline(on_the_fly_item='otf product', unit_price=Decimal('5.5'))
+        ServiceLine.objects.create(
+            related_item=service, unit_price=Decimal('100'), comment='Hard work', **kwargs
+        )
+
+        invoice = self.refresh(invoice)
+        cloned = self.refresh(invoice.clone())
+        self.assertEqual(invoice.total_no_vat, cloned.total_no_vat)
+        self.assertEqual(invoice.total_vat,    cloned.total_vat)
+
+        cloned_plines = [*cloned.get_lines(ProductLine)]
+        self.assertEqual(2, len(cloned_plines))
+
+        cloned_pline1 = self.get_object_or_fail(ProductLine, id=cloned_plines[0].id)
+        self.assertNotEqual(pline1.id, cloned_pline1.id)
+        self.assertEqual(user, cloned_pline1.user)
+        self.assertEqual(product, cloned_pline1.related_item)
+        self.assertEqual(cloned, cloned_pline1.related_document)
+        self.assertEqual(Decimal('10'), cloned_pline1.unit_price)
+        self.assertEqual(2, cloned_pline1.quantity)
+
+        self.assertEqual('otf product', cloned_plines[1].on_the_fly_item)
+
+        cloned_slines = [*cloned.get_lines(ServiceLine)]
+        self.assertEqual(1, len(cloned_slines))
+        self.assertEqual(service, self.refresh(cloned_slines[0]).related_item)
+        self.assertEqual('Hard work', cloned_slines[0].comment)
+
+        get_ct = ContentType.objects.get_for_model
+        self.assertCountEqual(
+            [get_ct(ProductLine).id, get_ct(ProductLine).id, get_ct(ServiceLine).id],
+            [
+                hline.modifications[0]
+                for hline in HistoryLine.objects.filter(
+                    entity=cloned.id, type=TYPE_AUX_CREATION,
+                )
+                if hline.modifications[0] != get_ct(Address).id
+            ],
+        )
+
+        # Source is not modified
+        self.assertEqual(2, len(invoice.get_lines(ProductLine)))
+        self.assertEqual(1, len(invoice.get_lines(ServiceLine)))
+
+    def test_bulk_clone(self):
+        "Invoices are not bulk-clonable: clone() (& so save()) is called."
+        user = self.login()
+
+        invoice, source, target = self.create_invoice_n_orgas('Invoice001')
+        ServiceLine.objects.create(
+            user=user, related_document=invoice, on_the_fly_item='otf service',
+        )
+
+        self.assertFalse(Invoice.bulk_clonable)
+
+        cloned = self.refresh(Invoice.bulk_clone([invoice])[0])
+        self.assertNotEqual(invoice, cloned)
+        self.assertEqual(invoice.name, cloned.name)
+        self.assertEqual(source, cloned.source)
+        self.assertEqual(target, cloned.target)
+        self.assertRelationCount(1, cloned, REL_SUB_BILL_ISSUED,   source)
+        self.assertRelationCount(1, cloned, REL_SUB_BILL_RECEIVED, target)
+        self.assertEqual(1, len(cloned.get_lines(ServiceLine)))
+
     def test_clone_source_n_target(self):
         "Internal relation-types should not be cloned."
         self.login()
@@ -22,6 +22,7 @@ from creme.products.models import Product, Service, SubCategory
 from creme.products.tests.base import skipIfCustomProduct, skipIfCustomService
 
 from ..constants import (  # DISCOUNT_ITEM_AMOUNT DISCOUNT_LINE_AMOUNT DISCOUNT_PERCENT
+    REL_SUB_CREDIT_NOTE_APPLIED,
     REL_SUB_HAS_LINE,
     REL_SUB_LINE_RELATED_ITEM,
 )
@@ -30,6 +31,7 @@ from .base import (
     ProductLine,
     ServiceLine,
     _BillingTestCase,
+    skipIfCustomCreditNote,
     skipIfCustomInvoice,
     skipIfCustomProductLine,
     skipIfCustomServiceLine,
@@ -1380,6 +1382,156 @@ class LineTestCase(_BillingTestCase):
         # 0.016 rounded up to 0.02
         self.assertEqual(Decimal('0.02'), product_line.get_price_exclusive_of_tax())
 
+    def test_compute_prices(self):
+        compute = ProductLine.compute_prices
+        Discount = ProductLine.Discount
+
+        self.assertTupleEqual(
+            (Decimal('20.00'), Decimal('24.00')),
+            compute(
+                quantity=Decimal('2'), unit_price=Decimal('10'),
+                discount=Decimal('0'), discount_unit=Discount.PERCENT,
+                vat=Decimal('20'),
+            ),
+        )
+        self.assertTupleEqual(
+            (Decimal('16.20'), Decimal('16.20')),
+            compute(
+                quantity=Decimal('2'), unit_price=Decimal('10'),
+                discount=Decimal('10'), discount_unit=Discount.PERCENT,
+                document_discount=Decimal('10'),
+            ),
+        )
+        self.assertTupleEqual(
+            (Decimal('15.00'), Decimal('15.00')),
+            compute(
+                quantity=Decimal('2'), unit_price=Decimal('10'),
+                discount=Decimal('5'), discount_unit=Discount.LINE_AMOUNT,
+            ),
+        )
+        self.assertTupleEqual(
+            (Decimal('10.00'), Decimal('10.70')),
+            compute(
+                quantity=Decimal('2'), unit_price=Decimal('10'),
+                discount=Decimal('5'), discount_unit=Discount.ITEM_AMOUNT,
+                vat=Decimal('7'),
+            ),
+        )
+
+    @skipIfCustomProductLine
+    @skipIfCustomServiceLine
+    def test_incremental_totals(self):
+        user = self.login()
+        invoice = self.create_invoice_n_orgas('Invoice0001', discount=Decimal('10'))[0]
+        vat = Vat.objects.get_or_create(value=Decimal('20'))[0]
+
+        kwargs = {'user': user, 'related_document': invoice, 'vat_value': vat}
+        product_line = ProductLine.objects.create(
+            on_the_fly_item='Flyyy product',
+            unit_price=Decimal('10'), quantity=2,
+            **kwargs
+        )
+        service_line = ServiceLine.objects.create(
+            on_the_fly_item='Flyyy service',
+            unit_price=Decimal('5'), quantity=1,
+            **kwargs
+        )
+
+        invoice = self.refresh(invoice)
+        self.assertEqual(Decimal('22.50'), invoice.total_no_vat)  # (20 + 5) * 0.9
+        self.assertEqual(Decimal('27.00'), invoice.total_vat)
+
+        self.assertTupleEqual(
+            (Decimal('22.50'), Decimal('27.00')),
+            invoice._get_lines_totals(),
+        )
+
+        # Edition => the other lines are not retrieved
+        product_line = self.refresh(product_line)
+        product_line.quantity = 3
+        product_line.save()
+
+        invoice = self.refresh(invoice)
+        self.assertEqual(Decimal('31.50'), invoice.total_no_vat)  # (30 + 5) * 0.9
+        self.assertEqual(Decimal('37.80'), invoice.total_vat)
+
+        # Same result than a full computation
+        invoice.save()
+        invoice = self.refresh(invoice)
+        self.assertEqual(Decimal('31.50'), invoice.total_no_vat)
+        self.assertEqual(Decimal('37.80'), invoice.total_vat)
+
+        # Deletion
+        service_line.delete()
+        invoice = self.refresh(invoice)
+        self.assertEqual(Decimal('27.00'), invoice.total_no_vat)
+        self.assertEqual(Decimal('32.40'), invoice.total_vat)
+
+    @skipIfCustomProductLine
+    def test_incremental_totals_zero(self):
+        "Null totals => full computation."
+        user = self.login()
+        invoice = self.create_invoice_n_orgas('Invoice0001', discount=0)[0]
+
+        kwargs = {'user': user, 'related_document': invoice}
+        line1 = ProductLine.objects.create(
+            on_the_fly_item='Flyyy product #1',
+            unit_price=Decimal('10'), quantity=1,
+            **kwargs
+        )
+        line2 = ProductLine.objects.create(
+            on_the_fly_item='Flyyy product #2',
+            unit_price=Decimal('-10'), quantity=1,
+            **kwargs
+        )
+        invoice = self.refresh(invoice)
+        self.assertEqual(Decimal('0'), invoice.total_no_vat)
+
+        line2 = self.refresh(line2)
+        line2.unit_price = Decimal('-4')
+        line2.save()
+
+        invoice = self.refresh(invoice)
+        self.assertEqual(Decimal('6.00'), invoice.total_no_vat)
+
+        line1 = self.refresh(line1)
+        line1.unit_price = Decimal('20')
+        line1.save()
+        self.assertEqual(Decimal('16.00'), self.refresh(invoice).total_no_vat)
+
+    @skipIfCustomProductLine
+    @skipIfCustomCreditNote
+    def test_incremental_totals_credit_note(self):
+        "Applied Credit Note => full computation."
+        user = self.login()
+        invoice = self.create_invoice_n_orgas('Invoice0001', discount=0)[0]
+
+        create_line = partial(ProductLine.objects.create, user=user)
+        invoice_line = create_line(
+            related_document=invoice, on_the_fly_item='Otf1', unit_price=Decimal('100'),
+        )
+
+        credit_note = self.create_credit_note_n_orgas('Credit Note 001')[0]
+        cnote_line = create_line(
+            related_document=credit_note, on_the_fly_item='Otf2', unit_price=Decimal('30'),
+        )
+        Relation.objects.create(
+            object_entity=invoice, subject_entity=credit_note,
+            type_id=REL_SUB_CREDIT_NOTE_APPLIED, user=user,
+        )
+        self.assertEqual(Decimal('70.00'), self.refresh(invoice).total_no_vat)
+
+        # The Invoice is not saved again
+        cnote_line = self.refresh(cnote_line)
+        cnote_line.unit_price = Decimal('50')
+        cnote_line.save()
+        self.assertEqual(Decimal('50.00'), self.refresh(credit_note).total_no_vat)
+
+        invoice_line = self.refresh(invoice_line)
+        invoice_line.unit_price = Decimal('110')
+        invoice_line.save()
+        self.assertEqual(Decimal('60.00'), self.refresh(invoice).total_no_vat)
+
     @skipIfCustomProductLine
     def test_inneredit(self):
         user = self.login()
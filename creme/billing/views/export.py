@@ -20,15 +20,19 @@
 
 import logging
 
+from django.conf import settings
 from django.http import HttpResponse, HttpResponseRedirect
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils.translation import gettext as _
 
 from creme import billing
 from creme.creme_core.core.exceptions import ConflictError
-from creme.creme_core.models import FileRef
+from creme.creme_core.models import FileRef, Job
+from creme.creme_core.utils import get_from_POST_or_404
 from creme.creme_core.views.generic import CremeModelEditionWizardPopup, base
 
+from ..creme_jobs import batch_export_type
 from ..exporters import BillingExportEngineManager
 from ..forms import export as export_forms
 from ..models import ExporterConfigItem
@@ -112,3 +116,58 @@ class Export(base.EntityRelatedMixin, base.CheckedView):
         assert export_result, FileRef
 
         return HttpResponseRedirect(export_result.get_download_absolute_url())
+
+
+class BatchExport(base.EntityCTypeRelatedMixin, base.CheckedView):
+    """Create a job which exports several billing documents in an archive.
+    The URL of the job is returned (or the URL of the user's jobs if there are
+    too many running jobs).
+    """
+    permissions = 'billing'
+    entity_classes = Export.entity_classes
+    entity_ids_arg = 'ids'
+
+    def check_related_ctype(self, ctype):
+        super().check_related_ctype(ctype)
+
+        if ctype.model_class() not in self.entity_classes:
+            raise ConflictError(f'This model is not a billing document: {ctype}')
+
+    def get_entity_ids(self):
+        try:
+            return [
+                int(s)
+                for s in get_from_POST_or_404(self.request.POST, self.entity_ids_arg).split(',')
+                if s.strip()
+            ]
+        except ValueError as e:
+            raise ConflictError(str(e)) from e
+
+    def post(self, request, *args, **kwargs):
+        user = request.user
+        ctype = self.get_ctype()
+        entity_ids = self.get_entity_ids()
+
+        if not entity_ids:
+            raise ConflictError(_('Please select at least one entity.'))
+
+        config_item = get_object_or_404(ExporterConfigItem, content_type=ctype)
+        if not config_item.engine_id:
+            raise ConflictError(_(
+                'The engine is not configured ; '
+                'go to the configuration of the app «Billing».'
+            ))
+
+        if Job.not_finished_jobs(user).count() >= settings.MAX_JOBS_PER_USER:
+            return HttpResponse(reverse('creme_core__my_jobs'), content_type='text/plain')
+
+        job = Job.objects.create(
+            user=user,
+            type_id=batch_export_type.id,
+            data={
+                'ctype': ctype.id,
+                'entities': entity_ids,
+            },
+        )
+
+        return HttpResponse(job.get_absolute_url(), content_type='text/plain')
@@ -27,6 +27,7 @@ if apps.is_installed('creme.activities'):
 
     from creme.activities import get_activity_model
     from creme.activities.constants import REL_OBJ_ACTIVITY_SUBJECT
+    from creme.creme_core import signals as core_signals
     from creme.creme_core.models import Relation
     from creme.opportunities import get_opportunity_model
 
@@ -58,6 +59,11 @@ if apps.is_installed('creme.activities'):
                     )
                 )
 
+    @receiver(core_signals.post_bulk_create, sender=Relation)
+    def post_bulk_create_relations_opp_subject_activity(sender, instances, **kwargs):
+        for relation in instances:
+            post_save_relation_opp_subject_activity(sender=sender, instance=relation)
+
     @receiver(post_save, sender=get_activity_model())
     def sync_with_activity(sender, instance, created, **kwargs):
         # TODO: optimise (only if title has changed - factorise with HistoryLine ??)
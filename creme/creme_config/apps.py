@@ -72,6 +72,7 @@ class CremeConfigConfig(CremeAppConfig):
             bricks.ExportButtonBrick,
             bricks.FieldsConfigsBrick,
             bricks.CustomBricksConfigBrick,
+            bricks.BricksProfilingBrick,
             bricks.ButtonMenuBrick,
             bricks.UsersBrick,
             bricks.TeamsBrick,
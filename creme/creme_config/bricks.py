@@ -19,6 +19,7 @@
 ################################################################################
 
 import logging
+import os
 from collections import defaultdict
 
 from django.apps import apps
@@ -36,6 +37,7 @@ from creme.creme_core.gui.bricks import (
     BricksManager,
     PaginatedBrick,
     QuerysetBrick,
+    brick_profiler,
     brick_registry,
 )
 from creme.creme_core.gui.button_menu import button_registry
@@ -725,6 +727,45 @@ class CustomBricksConfigBrick(PaginatedBrick):
         return self._render(btc)
 
 
+class BricksProfilingBrick(PaginatedBrick):
+    id_ = PaginatedBrick.generate_id('creme_config', 'bricks_profiling')
+    verbose_name = _('Performances of the blocks')
+    description = _(
+        'Displays the durations of rendering of the blocks (median & 95th percentile), '
+        'computed on their last renders by the current process.\n'
+        'The measures are not shared between the processes of the web server, '
+        'so they can be different after a reload.\n'
+        'Hint: the profiling must be enabled with the setting «BRICKS_PROFILING».'
+    )
+    dependencies = ()
+    read_only = True
+    template_name = 'creme_config/bricks/bricks-profiling.html'
+    page_size = _PAGE_SIZE
+    configurable = False
+
+    brick_registry = brick_registry
+    profiler = brick_profiler
+
+    def _get_verbose_name(self, brick_id):
+        try:
+            return self.brick_registry[brick_id].verbose_name
+        except KeyError:
+            return brick_id
+
+    def detailview_display(self, context):
+        btc = self.get_template_context(
+            context, self.profiler.statistics(),
+            profiling_enabled=self.profiler.enabled,
+            process_id=os.getpid(),
+        )
+
+        get_verbose_name = self._get_verbose_name
+        for stat in btc['page'].object_list:
+            stat['verbose_name'] = get_verbose_name(stat['brick_id'])
+
+        return self._render(btc)
+
+
 class ButtonMenuBrick(Brick):
     id_ = Brick.generate_id('creme_config', 'button_menu')
     verbose_name = 'Button menu configuration'
@@ -5,6 +5,7 @@ from functools import partial
 
 from django.contrib.contenttypes.models import ContentType
 from django.db.models import Q
+from django.test import modify_settings, override_settings
 from django.urls import reverse
 from django.utils.html import escape
 from django.utils.translation import gettext as _
@@ -258,6 +259,32 @@ class BricksConfigTestCase(BrickTestCaseMixin, CremeTestCase):
         self.assertContains(response, fmt(bricks.RelationBricksConfigBrick.id_))
         self.assertContains(response, fmt(bricks.InstanceBricksConfigBrick.id_))
         self.assertContains(response, fmt(bricks.CustomBricksConfigBrick.id_))
+        self.assertContains(response, fmt(bricks.BricksProfilingBrick.id_))
+
+    @override_settings(BRICKS_PROFILING=True)
+    @modify_settings(MIDDLEWARE={
+        'append': 'creme.creme_core.middleware.bricks.BricksProfilingMiddleware',
+    })
+    def test_portal_profiling(self):
+        self.login()
+        gui_bricks.brick_profiler.clear()
+
+        url = reverse('creme_config__bricks')
+        response1 = self.assertGET200(url)
+
+        brick_id = bricks.BrickDetailviewLocationsBrick.id_
+        self.assertIn(
+            f'{brick_id};desc="', response1.get('Server-Timing', ''),
+        )
+
+        response2 = self.assertGET200(url)
+        brick_node = self.get_brick_node(
+            self.get_html_tree(response2.content), bricks.BricksProfilingBrick.id_,
+        )
+        self.assertIn(
+            brick_id,
+            [td.attrib.get('title') for td in brick_node.findall('.//td')],
+        )
 
     @parameterized.expand([
         (False,),
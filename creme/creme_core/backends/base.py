@@ -18,6 +18,9 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+from os.path import basename
+from typing import Iterable
+
 from django.http.response import HttpResponseBase
 
 
@@ -74,3 +77,39 @@ class ExportBackend:
               instance of <django.contrib.auth.get_user_model()>.
         """
         raise NotImplementedError
+
+    def stream(self, filename: str, user, rows: Iterable[list]) -> HttpResponseBase:
+        """Build the response for all the given rows.
+        The default implementation writes all the rows & calls save() ; the
+        back-ends which can send the rows while they are generated (see
+        django.http.StreamingHttpResponse) should override this method.
+        @param filename: file name.
+        @param user: owner of the file ;
+              instance of <django.contrib.auth.get_user_model()>.
+        @param rows: Iterable of rows (see writerow()) ; it can be a generator.
+        @return The response (self.response is set too).
+        """
+        writerow = self.writerow
+
+        for row in rows:
+            writerow(row)
+
+        self.save(filename, user)
+
+        return self.response
+
+    def write_file(self, path: str, rows: Iterable[list]) -> None:
+        """Write all the given rows in a file (eg: exports generated by a job).
+        The default implementation writes the content of the response built
+        by stream(), chunk by chunk for a streaming response.
+        @param path: Absolute path of the file (its content is overridden).
+        @param rows: Iterable of rows (see writerow()) ; it can be a generator.
+        """
+        response = self.stream(basename(path), None, rows)
+
+        with open(path, 'wb') as f:
+            if response.streaming:
+                for chunk in response.streaming_content:
+                    f.write(chunk)
+            else:
+                f.write(response.content)
@@ -20,13 +20,19 @@
 
 import csv
 
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.template.defaultfilters import slugify
 from django.utils.translation import gettext_lazy as _
 
 from .base import ExportBackend
 
 
+class _Echo:
+    "Pseudo-buffer which just returns what is written."
+    def write(self, value):
+        return value
+
+
 class CSVExportBackend(ExportBackend):
     id = 'csv'
     verbose_name = _("CSV File (delimiter: ',')")
@@ -47,6 +53,17 @@ class CSVExportBackend(ExportBackend):
     def save(self, filename, user):
         self.response['Content-Disposition'] = f'attachment; filename="{slugify(filename)}.csv"'
 
+    def stream(self, filename, user, rows):
+        # NB: the csv writer returns the value of write()
+        writer = csv.writer(_Echo(), quoting=csv.QUOTE_ALL, delimiter=self.delimiter)
+        self.response = response = StreamingHttpResponse(
+            (writer.writerow(row) for row in rows),
+            content_type='text/csv',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{slugify(filename)}.csv"'
+
+        return response
+
 
 class SemiCSVExportBackend(CSVExportBackend):
     id = 'scsv'
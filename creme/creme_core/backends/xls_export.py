@@ -58,3 +58,11 @@ class XLSExportBackend(ExportBackend):
 
     def writerow(self, row):
         self.writer.writerow(row)
+
+    def write_file(self, path, rows):
+        writerow = self.writer.writerow
+
+        for row in rows:
+            writerow(row)
+
+        self.writer.save(path)
@@ -32,7 +32,10 @@ from .gui.bricks import Brick, BricksManager, QuerysetBrick
 from .models import (
     CremeEntity,
     CremeProperty,
+    CremePropertyType,
     CustomField,
+    CustomFieldEnumValue,
+    CustomFieldValue,
     EntityJobResult,
     Imprint,
     Job,
@@ -50,6 +53,8 @@ logger = logging.getLogger(__name__)
 class PropertiesBrick(QuerysetBrick):
     id_ = QuerysetBrick.generate_id('creme_core', 'properties')
     dependencies = (CremeProperty,)
+    cacheable = True
+    cache_dependencies = (CremeProperty, CremePropertyType)
     verbose_name = _('Properties')
     description = _(
         'Displays the Properties attached to the current entity. '
@@ -174,6 +179,8 @@ class CustomFieldsBrick(Brick):
         'Custom Fields can be created in the general configuration.'
     )
     dependencies = (CustomField,)
+    cacheable = True
+    cache_dependencies = (CustomField, CustomFieldValue, CustomFieldEnumValue)
     template_name = 'creme_core/bricks/custom-fields.html'
 
     def detailview_display(self, context):
@@ -200,6 +207,7 @@ class HistoryBrick(QuerysetBrick):
     )
     dependencies = '*'
     read_only = True
+    deferred = True
     order_by = '-id'  # faster than '-date'
     template_name = 'creme_core/bricks/history.html'
 
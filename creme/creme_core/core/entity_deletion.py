@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2021  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+import logging
+from collections import defaultdict
+from itertools import islice
+from typing import Iterable, List, Sequence, Tuple
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db.models import ProtectedError
+from django.db.transaction import atomic
+from django.utils.timezone import now
+from django.utils.translation import gettext, ngettext
+
+from ..auth.entity_credentials import EntityCredentials
+from ..models import CremeEntity, Relation
+from ..signals import post_bulk_update
+from .exceptions import ConflictError, SpecificProtectedError
+
+logger = logging.getLogger(__name__)
+
+# Errors are pairs (entity, exception) ; the exception is a PermissionDenied
+# or a ConflictError, with a message which can be displayed to the user.
+DeletionErrors = List[Tuple[CremeEntity, Exception]]
+
+
+class EntitiesDeletor:
+    """Delete some CremeEntities, or send them to the trash, with the
+    credentials of a user.
+
+    The entities which are not in the trash are sent to the trash (excepted
+    the auxiliary entities, which are deleted definitively), & the entities
+    which are already in the trash are deleted definitively.
+
+    Several entities can be checked & sent to the trash with a few queries:
+     - the credentials are checked with one query per model.
+     - the entities are sent to the trash with one query per model (& a few
+       queries for their history), when their class does not override the
+       method <CremeEntity.trash()>. The signal
+       'creme_core.signals.post_bulk_update' is sent for each model.
+
+    Hint: the definitive deletions cannot be performed in bulk (the
+    dependencies of each entity must be deleted or checked) ; so deleting
+    many entities should be done in a job (see the job "entities_deletor").
+    """
+    dependencies_limit = 3
+
+    def __init__(self, user):
+        self.user = user
+
+    def _permission_error(self, entity) -> PermissionDenied:
+        return PermissionDenied(
+            gettext('{entity} : <b>Permission denied</b>').format(
+                entity=entity.allowed_str(self.user),
+            )
+        )
+
+    def _protected_error(self, entity, error: SpecificProtectedError) -> ConflictError:
+        return ConflictError(
+            '{} {}'.format(
+                gettext('«{entity}» can not be deleted.').format(
+                    entity=entity.allowed_str(self.user),
+                ),
+                error.args[0],
+            ),
+        )
+
+    def check_entity(self, entity: CremeEntity) -> None:
+        """Check if an entity can be deleted (or sent to the trash) by the user.
+        @param entity: Instance of a class inheriting CremeEntity.
+        @raise PermissionDenied, ConflictError.
+        """
+        user = self.user
+
+        if entity.get_delete_absolute_url() != CremeEntity.get_delete_absolute_url(entity):
+            raise ConflictError(
+                gettext('«{entity}» does not use the generic deletion view.').format(
+                    entity=entity.allowed_str(user),
+                )
+            )
+
+        if hasattr(entity, 'get_related_entity'):
+            related = entity.get_related_entity()
+
+            if related is None:
+                logger.critical(
+                    'delete_entity(): an auxiliary entity seems orphan (id=%s)',
+                    entity.id,
+                )
+                raise PermissionDenied(
+                    gettext('You are not allowed to delete this entity: {}').format(
+                        entity.allowed_str(user),
+                    )
+                )
+
+            if not user.has_perm_to_change(related):
+                raise self._permission_error(entity)
+        else:
+            if not user.has_perm_to_delete(entity):
+                raise self._permission_error(entity)
+
+    def check_entities(self,
+                       entities: Iterable[CremeEntity],
+                       ) -> Tuple[List[CremeEntity], DeletionErrors]:
+        """Check several entities with a few queries (see check_entity()).
+        @param entities: Instances of classes inheriting CremeEntity.
+        @return A tuple (allowed_entities, errors).
+        """
+        user = self.user
+        allowed = []
+        errors = []
+        entities_per_model = defaultdict(list)
+
+        for entity in entities:
+            if (
+                type(entity) is CremeEntity
+                or hasattr(entity, 'get_related_entity')
+                or entity.get_delete_absolute_url() != CremeEntity.get_delete_absolute_url(entity)
+            ):
+                # NB: the credentials of auxiliary entities depend on their
+                #     related entity, so they are checked one by one (like the
+                #     entities which cannot be filtered by EntityCredentials).
+                try:
+                    self.check_entity(entity)
+                except (PermissionDenied, ConflictError) as e:
+                    errors.append((entity, e))
+                else:
+                    allowed.append(entity)
+            else:
+                entities_per_model[type(entity)].append(entity)
+
+        for model, model_entities in entities_per_model.items():
+            if user.is_superuser:
+                allowed.extend(model_entities)
+                continue
+
+            allowed_ids = {
+                *EntityCredentials.filter(
+                    user,
+                    model._default_manager.filter(id__in=[e.id for e in model_entities]),
+                    EntityCredentials.DELETE,
+                ).values_list('id', flat=True)
+            }
+
+            for entity in model_entities:
+                if entity.id in allowed_ids:
+                    allowed.append(entity)
+                else:
+                    errors.append((entity, self._permission_error(entity)))
+
+        return allowed, errors
+
+    @staticmethod
+    def move_to_trash(entity: CremeEntity) -> bool:
+        "Is the entity sent to the trash (or deleted definitively)?"
+        return False if hasattr(entity, 'get_related_entity') else not entity.is_deleted
+
+    def delete_entity(self, entity: CremeEntity) -> None:
+        """Delete an entity (which has been checked), or send it to the trash.
+        @raise ConflictError.
+        """
+        user = self.user
+
+        try:
+            if self.move_to_trash(entity):
+                entity.trash()
+            else:
+                entity.delete()
+        except SpecificProtectedError as e:
+            raise self._protected_error(entity, e) from e
+        except ProtectedError as e:
+            raise ConflictError(
+                gettext(
+                    '«{entity}» can not be deleted because of its dependencies '
+                    '({dependencies}).'
+                ).format(
+                    entity=entity.allowed_str(user),
+                    dependencies=self.dependencies_to_str(e.args[1]),
+                ),
+            ) from e
+        except Exception as e:
+            logger.exception('Error when trying to empty the trash')
+            raise ConflictError(
+                gettext('«{entity}» deletion caused an unexpected error [{error}].').format(
+                    entity=entity.allowed_str(user),
+                    error=e,
+                ),
+            ) from e
+
+    def delete_entities(self, entities: Iterable[CremeEntity]) -> DeletionErrors:
+        """Delete definitively some entities (which have been checked), one by one.
+        Hint: the entities should be locked (SELECT FOR UPDATE) by the caller.
+        @return The errors (see check_entities()).
+        """
+        errors = []
+
+        for entity in entities:
+            try:
+                with atomic():
+                    self.delete_entity(entity)
+            except ConflictError as e:
+                errors.append((entity, e))
+
+        return errors
+
+    def trash_entities(self, entities: Iterable[CremeEntity]) -> DeletionErrors:
+        """Send some entities (which have been checked) to the trash.
+        The entities whose class does not override the method
+        <CremeEntity.trash()> are updated in bulk.
+        @return The errors (see check_entities()).
+        """
+        errors = []
+        entities_per_model = defaultdict(list)
+
+        for entity in entities:
+            model = type(entity)
+
+            if model.trash is CremeEntity.trash:
+                try:
+                    entity._check_deletion()
+                except SpecificProtectedError as e:
+                    errors.append((entity, self._protected_error(entity, e)))
+                else:
+                    entities_per_model[model].append(entity)
+            else:
+                try:
+                    with atomic():
+                        self.delete_entity(entity)
+                except ConflictError as e:
+                    errors.append((entity, e))
+
+        for model, model_entities in entities_per_model.items():
+            self._bulk_trash(model, model_entities)
+
+        return errors
+
+    @staticmethod
+    def _bulk_trash(model, entities: Sequence[CremeEntity]) -> None:
+        now_value = now()
+
+        with atomic():
+            # NB: the entities which have been sent to the trash in the meantime
+            #     are ignored (no history line is created for them).
+            trashed_ids = {
+                *CremeEntity.objects.select_for_update().filter(
+                    id__in=[e.id for e in entities], is_deleted=False,
+                ).values_list('id', flat=True)
+            }
+            if not trashed_ids:
+                return
+
+            CremeEntity.objects.filter(id__in=trashed_ids).update(
+                is_deleted=True, modified=now_value,
+            )
+
+            trashed = []
+            for entity in entities:
+                if entity.id in trashed_ids:
+                    entity.is_deleted = True
+                    entity.modified = now_value
+                    trashed.append(entity)
+
+            post_bulk_update.send(
+                sender=model, instances=trashed, update_fields=('is_deleted', 'modified'),
+            )
+
+    def dependencies_to_str(self, dependencies: Sequence) -> str:
+        "Humanize the instances which prevent an entity to be deleted."
+        user = self.user
+
+        def deps_generator():
+            not_viewable_count = 0
+            can_view = user.has_perm_to_view
+
+            def is_printable_relation(dep):
+                return isinstance(dep, Relation) and '-object_' not in dep.type_id
+
+            for dep in dependencies:
+                if isinstance(dep, CremeEntity):
+                    if can_view(dep):
+                        yield gettext('«{object}» ({model})').format(
+                            object=dep, model=dep.entity_type,
+                        )
+                    else:
+                        not_viewable_count += 1
+
+            for dep in dependencies:
+                if is_printable_relation(dep) and can_view(dep.object_entity):
+                    yield f'{dep.type.predicate} «{dep.object_entity}»'
+
+            if not_viewable_count:
+                yield ngettext(
+                    '{count} not viewable entity',
+                    '{count} not viewable entities',
+                    not_viewable_count
+                ).format(count=not_viewable_count)
+
+            for dep in dependencies:
+                if is_printable_relation(dep) and not can_view(dep.object_entity):
+                    yield f'{dep.type.predicate} «{settings.HIDDEN_VALUE}»'
+
+            for dep in dependencies:
+                if not isinstance(dep, (CremeEntity, Relation)):
+                    yield str(dep)
+
+        limit = self.dependencies_limit
+        str_deps = [*islice(deps_generator(), limit + 1)]
+
+        do_ellipsis = False
+        if len(str_deps) > limit:
+            str_deps.pop()
+            do_ellipsis = True
+
+        result = ', '.join(str_deps[:limit])
+
+        return result + '…' if do_ellipsis else result
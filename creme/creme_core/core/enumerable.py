@@ -2,7 +2,7 @@
 
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2018-2020  Hybird
+#    Copyright (C) 2018-2021  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -18,11 +18,25 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
-from typing import List, Type
-
-from django.db.models import Field
+from functools import partial, reduce
+from itertools import chain
+from operator import or_
+from time import time
+from typing import Iterable, List, Optional, Sequence, Set, Type
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.core.exceptions import ValidationError
+from django.core.signals import setting_changed
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import CharField, Field, Model, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 from creme.creme_core.models import CremeEntity
+from creme.creme_core.signals import post_bulk_create, post_bulk_update
 from creme.creme_core.utils.collections import ClassKeyedMap
 
 
@@ -52,6 +66,46 @@ class Enumerator:
         """
         raise NotImplementedError
 
+    def filter_choices(self, user, *,
+                       term: str = '',
+                       values: Optional[Iterable] = None,
+                       limit: Optional[int] = None,
+                       offset: int = 0,
+                       ) -> List[dict]:
+        """Return a part of the choices available for the given user ; it is
+        used to retrieve the choices of the big tables incrementally.
+
+        The default implementation filters the result of choices() in Python ;
+        override it to filter in the DB (see QSEnumerator).
+
+        @param user: Instance of User.
+        @param term: If not empty, only the choices whose label contains this
+               string (case-insensitive) are returned.
+        @param values: If not None, only the choices with these values are
+               returned (the values are compared as strings).
+        @param limit: Maximum number of choices ; <None> means no limit.
+        @param offset: Number of (filtered) choices which are skipped.
+        @return: List of choice-dictionaries (see choices()).
+        """
+        choices = self.choices(user)
+
+        if values is not None:
+            str_values = {str(value) for value in values}
+            choices = [c for c in choices if str(c['value']) in str_values]
+
+        if term:
+            term = term.casefold()
+            choices = [c for c in choices if term in str(c['label']).casefold()]
+
+        return choices[offset:None if limit is None else offset + limit]
+
+    def cache_dependencies(self) -> Optional[List[Type[Model]]]:
+        """Get the models which are used to build the choices ; their versions
+        are used to compute the ETag of the choices (see EnumerableVersions).
+        @return A list of models, or <None> if the choices cannot be versioned.
+        """
+        return None
+
     @classmethod
     def instance_as_dict(cls, instance):
         return {
@@ -86,6 +140,10 @@ class Enumerator:
 
 class QSEnumerator(Enumerator):
     """Specialisation of Enumerator to enumerate elements of a QuerySet."""
+    # Names of the fields of the related model which are searched by
+    # filter_choices() ; empty means the viewable CharFields of the model.
+    search_fields: Sequence[str] = ()
+
     def _queryset(self):
         field = self.field
         qs = field.remote_field.model.objects.all()
@@ -93,9 +151,55 @@ class QSEnumerator(Enumerator):
 
         return qs.complex_filter(limit_choices_to) if limit_choices_to else qs
 
+    def _search_fields(self) -> Sequence[str]:
+        return self.search_fields or [
+            field.name
+            for field in self.field.remote_field.model._meta.fields
+            if isinstance(field, CharField) and field.get_tag('viewable')
+        ]
+
     def choices(self, user):
         return [*map(self.instance_as_dict, self._queryset())]
 
+    def filter_choices(self, user, *, term='', values=None, limit=None, offset=0):
+        search_fields = self._search_fields()
+        if term and not search_fields:
+            return super().filter_choices(
+                user, term=term, values=values, limit=limit, offset=offset,
+            )
+
+        qs = self._queryset()
+
+        if values is not None:
+            to_python = qs.model._meta.pk.to_python
+            pks = []
+
+            for value in values:
+                try:
+                    pks.append(to_python(value))
+                except ValidationError:
+                    pass
+
+            qs = qs.filter(pk__in=pks)
+
+        if term:
+            qs = qs.filter(reduce(
+                or_, (Q(**{f'{field_name}__icontains': term}) for field_name in search_fields)
+            ))
+
+        # NB: the order must be stable to paginate.
+        qs = qs.order_by(*(qs.query.order_by or qs.model._meta.ordering), 'pk')
+
+        return [
+            *map(
+                self.instance_as_dict,
+                qs[offset:] if limit is None else qs[offset:offset + limit],
+            ),
+        ]
+
+    def cache_dependencies(self):
+        return [self.field.remote_field.model]
+
 
 class _EnumerableRegistry:
     """Registry which manages the choices available for (enumerable) model fields.
@@ -276,3 +380,149 @@ class _EnumerableRegistry:
 
 
 enumerable_registry = _EnumerableRegistry()
+
+
+class EnumerableVersions:
+    """Versions of the models used to build the choices of the Enumerators ;
+    they are used to compute the ETags of the choices without query (see
+    creme_core.views.enumerable.ChoicesView).
+
+    The version of a model is a counter stored in the cache, which is increased
+    each time an instance of this model is saved or deleted (see the signal
+    handlers below). Only the models returned by the method
+    "cache_dependencies()" of the enumerators of the (enumerable) fields of the
+    entities are versioned.
+
+    The versions are disabled when the setting "ENUMERABLE_CACHE" is empty.
+    """
+    version_key_prefix = 'creme_core-enumerable_version-'
+
+    def __init__(self, registry: _EnumerableRegistry):
+        self._registry = registry
+        self._watched_models: Optional[Set[Type[Model]]] = None
+
+    @property
+    def cache(self) -> Optional[BaseCache]:
+        "The cache which stores the versions ; <None> means that versioning is disabled."
+        alias = settings.ENUMERABLE_CACHE
+
+        return caches[alias] if alias else None
+
+    @property
+    def watched_models(self) -> Set[Type[Model]]:
+        "Models which get a version counter."
+        watched = self._watched_models
+
+        if watched is None:
+            self._watched_models = watched = set()
+            registry = self._registry
+
+            for model in apps.get_models():
+                if not issubclass(model, CremeEntity):
+                    continue
+
+                meta = model._meta
+                for field in chain(meta.fields, meta.many_to_many):
+                    if field.remote_field is None:
+                        continue
+
+                    try:
+                        enumerator = registry.enumerator_by_field(field)
+                    except ValueError:
+                        continue
+
+                    watched.update(enumerator.cache_dependencies() or ())
+
+        return watched
+
+    def reset(self) -> None:
+        "Forget the watched models (they are computed again when needed)."
+        self._watched_models = None
+
+    def _version_key(self, model: Type[Model]) -> str:
+        meta = model._meta
+        return f'{self.version_key_prefix}{meta.app_label}.{meta.model_name}'
+
+    @staticmethod
+    def _initial_version() -> int:
+        # NB: we do not start at 0, so the ETags built with a counter which
+        #     has been evicted from the cache are not used again.
+        return int(time() * 1000)
+
+    def get_versions(self, models: Iterable[Type[Model]]) -> Optional[List[int]]:
+        """Get the current versions of some models.
+        @return A list of integers, or <None> if the versioning is disabled or
+                if a model is not watched.
+        """
+        cache = self.cache
+        if cache is None:
+            return None
+
+        watched = self.watched_models
+        keys = []
+        for model in models:
+            if model not in watched:
+                return None
+
+            keys.append(self._version_key(model))
+
+        found = cache.get_many(keys)
+        versions = []
+
+        for key in keys:
+            version = found.get(key)
+
+            if version is None:
+                version = self._initial_version()
+
+                if not cache.add(key, version, timeout=None):
+                    version = cache.get(key, version)
+
+            versions.append(version)
+
+        return versions
+
+    def _bump_versions(self, cache: BaseCache, models: Iterable[Type[Model]]) -> None:
+        for model in models:
+            key = self._version_key(model)
+
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, self._initial_version(), timeout=None)
+
+    def bump_version(self, model: Type[Model], using: Optional[str] = None) -> None:
+        """Invalidate the ETags which depend on a model.
+        @param model: Model of the saved/deleted instance ; its parent classes
+               are invalidated too.
+        @param using: Alias of the DB used to save/delete the instance.
+        """
+        cache = self.cache
+        if cache is None:
+            return
+
+        watched = self.watched_models
+        models = [cls for cls in model.__mro__ if cls in watched]
+        if not models:
+            return
+
+        self._bump_versions(cache, models)
+
+        # NB: an ETag computed before the end of the transaction would be
+        #     associated to the old data & the new versions.
+        if connections[using or DEFAULT_DB_ALIAS].in_atomic_block:
+            transaction.on_commit(partial(self._bump_versions, cache, models), using=using)
+
+
+enumerable_versions = EnumerableVersions(enumerable_registry)
+
+
+@receiver([post_save, post_delete, post_bulk_create, post_bulk_update])
+def _bump_enumerable_version(sender, **kwargs):
+    enumerable_versions.bump_version(sender, using=kwargs.get('using'))
+
+
+@receiver(setting_changed)
+def _reset_enumerable_versions(sender, setting, **kwargs):
+    if setting == 'ENUMERABLE_CACHE':
+        enumerable_versions.reset()
@@ -19,14 +19,25 @@
 ################################################################################
 
 import logging
-from collections import deque
+import os
+import socket
+import traceback
+from collections import Counter, deque
+from contextlib import suppress
 from datetime import MAXYEAR, datetime, timedelta
 from heapq import heapify, heappop, heappush
-from typing import Optional, Set
+from json import loads as json_load
+from time import monotonic
+from typing import Dict, Iterable, Optional, Set
+from urllib.parse import urlparse
 from uuid import uuid1
 
 from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.db import IntegrityError
 from django.db.models import Q
+from django.db.transaction import atomic
 from django.utils.formats import date_format
 from django.utils.timezone import localtime, now
 from django.utils.translation import activate, gettext
@@ -34,10 +45,12 @@ from django.utils.translation import gettext_lazy as _
 
 from ..creme_jobs.base import JobType
 from ..global_info import set_global_info
-from ..models import Job
+from ..models import Job, JobLease
 from ..utils.dates import make_aware_dt
 from ..utils.imports import import_apps_sub_modules
+from ..utils.serializers import json_encode
 from ..utils.system import enable_exit_handler, python_subprocess
+from .job_workers import JobWorkerPool
 
 logger = logging.getLogger(__name__)
 
@@ -90,6 +103,108 @@ class _JobTypeRegistry:
 job_type_registry = _JobTypeRegistry()
 job_type_registry.autodiscover()
 
+
+class JobProgressChannel:
+    """Channel used by the running jobs to publish snapshots of their progress
+    (status & JobProgress.data) ; so the clients which monitor the jobs get the
+    progress without computing it (generally with queries) at each request.
+
+    The snapshots are stored in the cache "settings.JOBS_PROGRESS_CACHE" ; the
+    channel is disabled when this setting is empty (the clients compute the
+    progress from the DB).
+    """
+    key_prefix = 'creme_core-job_progress-'
+    # Minimum delay (in seconds) between 2 publications of the progress of a
+    # job (excepted the forced ones).
+    min_period = 1
+    # Maximum duration (in seconds) of a snapshot in the cache.
+    timeout = 3600
+
+    def __init__(self):
+        self._last_publications: Dict[int, float] = {}
+
+    @property
+    def cache(self) -> Optional[BaseCache]:
+        "The cache which stores the snapshots ; <None> means that the channel is disabled."
+        alias = settings.JOBS_PROGRESS_CACHE
+
+        return caches[alias] if alias else None
+
+    @property
+    def enabled(self) -> bool:
+        "Are the snapshots published (i.e. is the setting JOBS_PROGRESS_CACHE filled)?"
+        return bool(settings.JOBS_PROGRESS_CACHE)
+
+    def _key(self, job_id: int) -> str:
+        return f'{self.key_prefix}{job_id}'
+
+    def publish(self, job: Job, force: bool = False) -> None:
+        """Store a snapshot of the progress of a job.
+        @param job: Instance of Job.
+        @param force: If False, the publication is ignored when the previous one
+               is too recent (see 'min_period') ; so it can be called for each
+               processed item.
+        """
+        cache = self.cache
+        if cache is None:
+            return
+
+        job_id = job.id
+        now_value = monotonic()
+        last_publication = self._last_publications.get(job_id)
+
+        if (
+            not force
+            and last_publication is not None
+            and now_value - last_publication < self.min_period
+        ):
+            return
+
+        self._last_publications[job_id] = now_value
+
+        try:
+            progress = job.progress
+        except Exception:
+            logger.exception('Error when computing the progress of the job id="%s"', job_id)
+            return
+
+        cache.set(
+            self._key(job_id),
+            {
+                'status':   job.status,
+                'progress': None if progress is None else progress.data,
+                'version':  uuid1().hex,
+            },
+            timeout=self.timeout,
+        )
+
+    def get_many(self, job_ids: Iterable[int]) -> Dict[int, dict]:
+        """Get the last snapshots of some jobs.
+        @return A dictionary ; keys are IDs of Jobs, values are snapshots
+                (dictionaries with keys "status", "progress" & "version").
+                The jobs without snapshot are ignored.
+        """
+        cache = self.cache
+        if cache is None:
+            return {}
+
+        keys = {self._key(job_id): job_id for job_id in job_ids}
+
+        return {
+            keys[key]: snapshot
+            for key, snapshot in cache.get_many([*keys.keys()]).items()
+        }
+
+
+job_progress_channel = JobProgressChannel()
+
+
+def _init_job_worker():
+    # NB: the connection to the queue of the job manager must not be shared
+    #     with the forked worker (see JobWorkerPool).
+    JobSchedulerQueue._main_queue = None
+
+
 CMD_START   = 'START'
 CMD_END     = 'END'
 CMD_REFRESH = 'REFRESH'
@@ -103,6 +218,46 @@ class Command:
         self.data = data
 
 
+def _build_start_command(data):
+    return Command(cmd_type=CMD_START, data_id=int(data))
+
+
+def _build_end_command(data):
+    return Command(cmd_type=CMD_END, data_id=int(data))
+
+
+def _build_refresh_command(data):
+    job_id, refresh_data = data.split('-', 1)
+
+    return Command(cmd_type=CMD_REFRESH, data_id=int(job_id), data=json_load(refresh_data))
+
+
+def _build_ping_command(data):
+    return Command(cmd_type=CMD_PING, data_id=data)
+
+
+COMMANDS = {
+    CMD_START:   _build_start_command,
+    CMD_END:     _build_end_command,
+    CMD_REFRESH: _build_refresh_command,
+    CMD_PING:    _build_ping_command,
+}
+
+
+def _parse_command(raw_command: bytes) -> Optional[Command]:
+    "Build a Command from its serialized version (e.g. b'START-12')."
+    try:
+        cmd_type, data = raw_command.decode().split('-', 1)
+        return COMMANDS[cmd_type](data)
+    except Exception:
+        logger.warning(
+            'Job scheduler queue: invalid command "%s"\n%s',
+            raw_command, traceback.format_exc(),
+        )
+
+    return None
+
+
 class _BaseJobSchedulerQueue:
     verbose_name = 'Abstract queue'  # Overload me
     _main_queue = None
@@ -176,6 +331,130 @@ class _BaseJobSchedulerQueue:
         raise NotImplementedError
 
 
+class LocalJobSchedulerQueue(_BaseJobSchedulerQueue):
+    """Queue which does not need a broker ; the commands are sent to the job
+    manager through a Unix domain socket (datagrams). So the web server & the
+    job manager must run on the same (POSIX) machine.
+
+    The URL in settings.JOBMANAGER_BROKER has the pattern: local:///path/to/socket
+    The directory must be writable by the job manager & the web server ; the
+    sockets get the permissions settings.JOBMANAGER_LOCAL_SOCKET_MODE (& not
+    the ones given by the umask of their creator). By default (0o660), the
+    processes must run with the same OS user, or with users of a shared group
+    which owns the directory (with the "setgid" bit, the sockets get this group).
+    """
+    verbose_name = _('Local queue')
+    scheme = 'local'
+
+    max_command_size = 65536  # In bytes
+    send_timeout = 5  # In seconds
+    pong_timeout = 3  # In seconds
+
+    def __init__(self, url: Optional[str] = None):
+        self.path = urlparse(url or settings.JOBMANAGER_BROKER).path
+        self._socket = None  # Socket which receives the commands (job manager side)
+
+    @staticmethod
+    def _bind(sock: socket.socket, path: str) -> None:
+        sock.bind(path)
+        os.chmod(path, settings.JOBMANAGER_LOCAL_SOCKET_MODE)
+
+    @staticmethod
+    def _send(message: str, path: str, sock: Optional[socket.socket] = None) -> None:
+        if sock is None:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+                LocalJobSchedulerQueue._send(message, path, sock)
+        else:
+            sock.settimeout(LocalJobSchedulerQueue.send_timeout)
+            sock.sendto(message.encode(), path)
+
+    def _send_command(self, message: str) -> bool:
+        try:
+            self._send(message, self.path)
+        except OSError as e:
+            logger.critical('Error when sending command to the local queue [%s]', e)
+            return True
+
+        return False
+
+    def clear(self):
+        "(Re-)create the socket of the job manager ; the pending commands are lost."
+        self.close()
+
+        path = self.path
+        with suppress(FileNotFoundError):
+            os.unlink(path)
+
+        self._socket = sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._bind(sock, path)
+
+    def close(self) -> None:
+        sock = self._socket
+
+        if sock is not None:
+            sock.close()
+            self._socket = None
+
+    def start_job(self, job):
+        logger.info('Job scheduler queue: request START "%s"', job)
+        return self._send_command(f'{CMD_START}-{job.id}')
+
+    def end_job(self, job):
+        logger.info('Job scheduler queue: request END "%s"', job)
+        self._send_command(f'{CMD_END}-{job.id}')
+
+    def refresh_job(self, job, data):
+        logger.info('Job scheduler queue: request REFRESH "%s" (data=%s)', job, data)
+        return self._send_command(f'{CMD_REFRESH}-{job.id}-{json_encode(data)}')
+
+    def get_command(self, timeout):
+        if self._socket is None:
+            self.clear()
+
+        sock = self._socket
+        sock.settimeout(timeout or None)  # NB: 0 means "no timeout"
+
+        try:
+            raw_command = sock.recv(self.max_command_size)
+        except socket.timeout:
+            return None
+
+        return _parse_command(raw_command)
+
+    def _build_pong_path(self, ping_value):
+        return f'{self.path}.pong-{ping_value}'
+
+    def ping(self):
+        value = str(uuid1())
+        logger.info('Job scheduler queue: request PING id="%s"', value)
+        pong_path = self._build_pong_path(value)
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            try:
+                # NB: the job manager writes the answer in this socket.
+                self._bind(sock, pong_path)
+
+                try:
+                    self._send(f'{CMD_PING}-{value}', self.path, sock)
+                    sock.settimeout(self.pong_timeout)
+                    sock.recv(16)
+                except (FileNotFoundError, ConnectionRefusedError, socket.timeout):
+                    # No socket/nobody reads the socket/no answer
+                    return str(self._manager_error)
+                finally:
+                    os.unlink(pong_path)
+            except OSError as e:
+                return self._queue_error(f'{e.__module__}.{e.__class__}: {e}')
+
+        return None
+
+    def pong(self, ping_value):
+        try:
+            self._send('PONG', self._build_pong_path(ping_value))
+        except OSError as e:
+            logger.warning('Job scheduler queue: error when sending PONG [%s]', e)
+
+
 if settings.TESTS_ON:
     class JobSchedulerQueue(_BaseJobSchedulerQueue):
         "Mocking JobSchedulerQueue."
@@ -210,16 +489,12 @@ if settings.TESTS_ON:
         def pong(self, ping_value):
             pass
 else:
-    import traceback
     from functools import wraps
-    from json import loads as json_load
     from time import sleep
 
     from redis import StrictRedis  # TODO: "Redis" with redis3
     from redis.exceptions import RedisError
 
-    from creme.creme_core.utils.serializers import json_encode
-
     def _redis_errors_2_bool(f):
         @wraps(f)
         def _aux(*args, **kwargs):
@@ -233,27 +508,6 @@ else:
 
         return _aux
 
-    def _build_start_command(data):
-        return Command(cmd_type=CMD_START, data_id=int(data))
-
-    def _build_end_command(data):
-        return Command(cmd_type=CMD_END, data_id=int(data))
-
-    def _build_refresh_command(data):
-        job_id, refresh_data = data.split('-', 1)
-
-        return Command(cmd_type=CMD_REFRESH, data_id=int(job_id), data=json_load(refresh_data))
-
-    def _build_ping_command(data):
-        return Command(cmd_type=CMD_PING, data_id=data)
-
-    COMMANDS = {
-        CMD_START:   _build_start_command,
-        CMD_END:     _build_end_command,
-        CMD_REFRESH: _build_refresh_command,
-        CMD_PING:    _build_ping_command,
-    }
-
     # NB: we do not need to build a reliable redis queue (see http://redis.io/commands/rpoplpush )
     #     because the only reliable data come from our RDBMS; Redis is just used an
     #     event broker. If there is a crash, the jobs list is rebuilt from the RDBMS.
@@ -261,13 +515,13 @@ else:
     # TODO: should we rely on a watch dog ??
     # TODO: pub-sub allows to watch the numbers of readers -> use it to (re-)launch the command ?
     # TODO: base class -> children: Redis, AMQP, etc...
-    class JobSchedulerQueue(_BaseJobSchedulerQueue):
+    class RedisJobSchedulerQueue(_BaseJobSchedulerQueue):
         verbose_name = _('Redis queue')
         JOBS_COMMANDS_KEY = 'creme_jobs'
         JOBS_PONG_KEY_PREFIX = 'creme_jobs_pong'
 
-        def __init__(self):
-            self._redis = StrictRedis.from_url(settings.JOBMANAGER_BROKER)
+        def __init__(self, url: Optional[str] = None):
+            self._redis = StrictRedis.from_url(url or settings.JOBMANAGER_BROKER)
 
         def clear(self):
             self._redis.delete(self.JOBS_COMMANDS_KEY)
@@ -301,14 +555,7 @@ else:
 
             if result is not None:  # None == timeout
                 # NB: result == (self.JOBS_KEY, command)
-                try:
-                    cmd_type, data = result[1].decode().split('-', 1)
-                    cmd = COMMANDS[cmd_type](data)
-                except Exception:
-                    logger.warning(
-                        'Job scheduler queue: invalid command "%s"\n%s',
-                        result, traceback.format_exc(),
-                    )
+                cmd = _parse_command(result[1])
 
             return cmd
 
@@ -343,6 +590,16 @@ else:
             # TODO: '10' in settings ?
             self._redis.setex(self._build_pong_key(ping_value), value=1, time=10)
 
+    def get_queue_class(url: str):
+        "Get the class of queue corresponding to the URL of a broker."
+        return (
+            LocalJobSchedulerQueue
+            if urlparse(url).scheme == LocalJobSchedulerQueue.scheme else
+            RedisJobSchedulerQueue
+        )
+
+    JobSchedulerQueue = get_queue_class(settings.JOBMANAGER_BROKER)
+
 
 class JobScheduler:
     """It should run it its own process (see 'creme_job_manager' command),
@@ -363,11 +620,29 @@ class JobScheduler:
     The "period" of pseudo-periodic is computed each time they are run. But
     the manager runs them regularly (see settings.PSEUDO_PERIOD) in order to
     reduce the aftermath of a redis/... connection problem.
+
+    By default each job is executed in a new Python process ; with
+    settings.JOBMANAGER_WORKERS, the jobs are executed by a pool of pre-forked
+    processes (see JobWorkerPool), which avoids the cost of the start of
+    Python/Django for each job.
+
+    The processes are checked regularly (see 'poll_period') ; when a job's
+    process has crashed, the job is marked as failed & ended.
     """
+    # Maximum delay (in seconds) between 2 checks of the processes of the running jobs.
+    poll_period = 5
+
     def __init__(self):
         self._max_user_jobs = settings.MAX_USER_JOBS
         self._queue = JobSchedulerQueue.get_main_queue()
         self._procs = {}  # key: job.id; value: subprocess.Popen instance
+        self._workers: Optional[JobWorkerPool] = JobWorkerPool(
+            size=settings.JOBMANAGER_WORKERS,
+            target=job_type_registry,
+            initializer=_init_job_worker,
+            max_jobs=settings.JOBMANAGER_WORKER_MAX_JOBS,
+            max_memory=settings.JOBMANAGER_WORKER_MAX_MEMORY,
+        ) if settings.JOBMANAGER_WORKERS else None
 
         # Heap, which elements are (wakeup_date, job_instance)
         #   => closer wakeup in the first element.
@@ -478,24 +753,92 @@ class JobScheduler:
                 ' system job -> command is ignored.', repr(user_job),
             )
 
-    def _start_job(self, job: Job):
+    def _pop_user_job(self) -> Job:
+        "Get the next user job to start (the oldest one)."
+        return self._users_jobs.pop()
+
+    def _start_job(self, job: Job) -> bool:
+        """Execute a job in another process.
+        @return False if the job has not been started.
+        """
         logger.info('JobScheduler: start %s', repr(job))
 
-        self._procs[job.id] = python_subprocess(
-            f'import django; '
-            f'django.setup(); '
-            f'from creme.creme_core.core.job import job_type_registry; '
-            f'job_type_registry({job.id})'
-        )
+        workers = self._workers
+        if workers is not None:
+            workers.run(job.id)
+        else:
+            self._procs[job.id] = python_subprocess(
+                f'import django; '
+                f'django.setup(); '
+                f'from creme.creme_core.core.job import job_type_registry; '
+                f'job_type_registry({job.id})'
+            )
+
+        return True
+
+    def _start_system_job(self, job: Job, wakeup: datetime) -> None:
+        if self._start_job(job):
+            self._system_jobs_starts[job.id] = wakeup
+        else:
+            heappush(self._system_jobs, (self._next_wakeup(job, wakeup), job.id, job))
 
     def _end_job(self, job: Job):
         logger.info('JobScheduler: end %s', repr(job))
         proc = self._procs.pop(job.id, None)
         if proc is not None:
-            proc.wait()  # TODO: use return code ??
+            proc.wait()
+
+    def _has_running_jobs(self) -> bool:
+        workers = self._workers
+        return bool(self._procs or (workers is not None and workers.running_job_ids))
+
+    def _needs_polling(self) -> bool:
+        "Does the main loop need to be woken up regularly (see 'poll_period')?"
+        return self._has_running_jobs()
+
+    def _synchronize(self) -> None:
+        "Hook called at each iteration of the main loop."
+        pass
+
+    def _check_processes(self) -> None:
+        """Detect the jobs which process has crashed ; they would never send
+        the command END.
+        """
+        workers = self._workers
+
+        if workers is not None:
+            crashed_job_ids = workers.poll()
+        else:
+            # NB: a process which exits normally has sent the command END
+            #     (handled by _end_job()).
+            crashed_job_ids = [
+                job_id
+                for job_id, proc in self._procs.items()
+                if proc.poll() not in (None, 0)
+            ]
+
+        for job_id in crashed_job_ids:
+            self._handle_crash(job_id)
+
+    def _handle_crash(self, job_id: int) -> None:
+        logger.critical('JobScheduler: the process of the job id=%s has crashed', job_id)
+
+        Job.objects.filter(id=job_id, status=Job.STATUS_WAIT).update(
+            status=Job.STATUS_ERROR,
+            error=gettext('The process of the job has crashed.'),
+        )
+        self._handle_command_end(Command(cmd_type=CMD_END, data_id=job_id))
 
     def _handle_kill(self, *args):
-        logger.info('Job manager stops: %d running job(s)', len(self._procs))
+        workers = self._workers
+        logger.info(
+            'Job manager stops: %d running job(s)',
+            len(self._procs) if workers is None else len(workers.running_job_ids),
+        )
+
+        if workers is not None:
+            workers.stop()
+
         exit()
 
     def _handle_command_end(self, cmd: Command):
@@ -626,16 +969,17 @@ class JobScheduler:
 
         # TODO: all of this in a function wrapped by a try..except and a loop (+ sleep)
         #       which prevents network crashes ?
-        # TODO: regularly use Popen.poll() to check if a child has crashed
-        #       (with a problem which is not a catchable) ?
         self._queue.clear()
         self._retrieve_jobs()
 
+        workers = self._workers
+        if workers is not None:
+            workers.start()
+
         enable_exit_handler(self._handle_kill)
 
         users_jobs = self._users_jobs
         system_jobs = self._system_jobs
-        system_jobs_starts = self._system_jobs_starts
         running_userjob_ids = self._running_userjob_ids
         now_value = now()
 
@@ -664,6 +1008,9 @@ class JobScheduler:
             else:
                 print('No user job at the moment.')
 
+            if workers is not None:
+                print(f'Jobs are executed by a pool of {len(workers)} worker(s).')
+
             print('\nQuit the server with CTRL-BREAK.')
 
         MAX_USER_JOBS = self._max_user_jobs
@@ -675,6 +1022,8 @@ class JobScheduler:
         }.get
 
         while True:
+            self._check_processes()
+            self._synchronize()
             now_value = now()
 
             if system_jobs:
@@ -711,8 +1060,7 @@ class JobScheduler:
                                 real_job.id,
                             )
                     else:
-                        system_jobs_starts[job.id] = wakeup
-                        self._start_job(job)
+                        self._start_system_job(job, wakeup)
 
                     continue  # In order to handle all system jobs which have to be run _now_
             else:
@@ -721,12 +1069,17 @@ class JobScheduler:
                 timeout = 0
 
             while len(running_userjob_ids) <= MAX_USER_JOBS and users_jobs:
-                job = users_jobs.pop()
-                self._start_job(job)
-                running_userjob_ids.add(job.id)
+                job = self._pop_user_job()
+
+                if self._start_job(job):
+                    running_userjob_ids.add(job.id)
+
+            if self._needs_polling():
+                # NB: timeout == 0 means "no timeout"
+                timeout = min(timeout, self.poll_period) if timeout else self.poll_period
 
             cmd = self._queue.get_command(timeout)
-            if cmd is None:  # Time out -> time to run a system job
+            if cmd is None:  # Time out -> time to run a system job/to check the processes
                 continue
 
             cmd_type = cmd.type
@@ -736,3 +1089,253 @@ class JobScheduler:
                 handler(cmd)
             else:
                 logger.warning('JobScheduler: invalid command TYPE: %s', cmd_type)
+
+
+class ClusteredJobScheduler(JobScheduler):
+    """JobScheduler which can run on several nodes (see settings.JOBMANAGER_CLUSTERED),
+    in order to share the load of the jobs (settings.MAX_USER_JOBS is a limit
+    per node).
+
+    A node must own the lease of a job (see JobLease) to execute it ; the lease
+    is extended regularly while the job is running (heartbeat), & released at
+    the end of the job.
+    The commands are received by only one node, so the nodes retrieve the
+    waiting jobs from the DB regularly (see 'poll_period'), & detect the end of
+    their jobs by themselves. The user jobs are started with a per-user
+    fairness: the next job belongs to the user with the fewest running jobs
+    in the cluster.
+
+    When a node dies, its leases expire, & its user jobs are started again
+    (from the beginning) by the other nodes. A node which is alive but has lost
+    some leases (it has been too slow to extend them) stops the related jobs,
+    which are executed by the other nodes now.
+    """
+    def __init__(self, node_id: Optional[str] = None):
+        super().__init__()
+        self.node_id = node_id or f'{socket.gethostname()}-{os.getpid()}'
+        self.lease_duration = lease_duration = timedelta(
+            seconds=settings.JOBMANAGER_LEASE_DURATION,
+        )
+        # NB: several heartbeats before the expiration of a lease.
+        self.poll_period = min(self.poll_period, max(lease_duration.seconds // 3, 1))
+        self._last_synchronization: Optional[datetime] = None
+
+    def _acquire_lease(self, job: Job) -> bool:
+        node_id = self.node_id
+        now_value = now()
+        expiry = now_value + self.lease_duration
+
+        if JobLease.objects.filter(
+            Q(owner=node_id) | Q(expiry__lt=now_value), job_id=job.id,
+        ).update(owner=node_id, heartbeat=now_value, expiry=expiry):
+            return True
+
+        try:
+            with atomic():
+                JobLease.objects.create(
+                    job_id=job.id, owner=node_id, heartbeat=now_value, expiry=expiry,
+                )
+        except IntegrityError:  # Leased by another node (or deleted job)
+            return False
+
+        return True
+
+    def _release_lease(self, job_id: int) -> None:
+        JobLease.objects.filter(job_id=job_id, owner=self.node_id).delete()
+
+    def _running_job_ids(self) -> Set[int]:
+        return {*self._running_userjob_ids, *self._system_jobs_starts.keys()}
+
+    def _pop_user_job(self):
+        users_jobs = self._users_jobs
+        running_counts = Counter(
+            JobLease.objects.filter(
+                expiry__gte=now(), job__user__isnull=False,
+            ).values_list('job__user', flat=True)
+        )
+
+        # NB: the oldest jobs are at the end of the deque.
+        index = min(
+            range(len(users_jobs) - 1, -1, -1),
+            key=lambda i: running_counts[users_jobs[i].user_id],
+        )
+        job = users_jobs[index]
+        del users_jobs[index]
+
+        return job
+
+    def _start_job(self, job):
+        if not self._acquire_lease(job):
+            logger.info('JobScheduler: %s is managed by another node', repr(job))
+            return False
+
+        if job.user_id and not Job.objects.filter(id=job.id, status=Job.STATUS_WAIT).exists():
+            logger.info('JobScheduler: %s has been executed by another node', repr(job))
+            self._release_lease(job.id)
+            return False
+
+        return super()._start_job(job)
+
+    def _start_system_job(self, job, wakeup):
+        if self._acquire_lease(job):
+            last_run = Job.objects.filter(id=job.id).values_list('last_run', flat=True).first()
+
+            if last_run is None or last_run < wakeup:
+                super()._start_system_job(job, wakeup)
+                return
+
+            logger.info('JobScheduler: %s has been executed by another node', repr(job))
+            self._release_lease(job.id)
+        else:
+            logger.info('JobScheduler: %s is running on another node', repr(job))
+
+        # NB: the job is reloaded, because the command REFRESH could have been
+        #     received by another node.
+        job = Job.objects.filter(id=job.id).first()
+        if job is not None:
+            heappush(
+                self._system_jobs,
+                (
+                    max(
+                        self._next_wakeup(job, wakeup),
+                        now() + timedelta(seconds=self.poll_period),
+                    ),
+                    job.id,
+                    job,
+                ),
+            )
+
+    def _check_processes(self):
+        super()._check_processes()
+
+        # The command END could have been received by another node.
+        workers = self._workers
+        alive_job_ids = {*workers.running_job_ids} if workers is not None else {
+            job_id for job_id, proc in self._procs.items() if proc.poll() is None
+        }
+
+        for job_id in self._running_job_ids() - alive_job_ids:
+            self._handle_command_end(Command(cmd_type=CMD_END, data_id=job_id))
+
+    def _handle_command_end(self, cmd):
+        job_id = cmd.data_id
+
+        if job_id in self._running_job_ids():
+            super()._handle_command_end(cmd)
+
+            # NB: the job could have been deleted
+            self._running_userjob_ids.discard(job_id)
+            self._procs.pop(job_id, None)
+            self._release_lease(job_id)
+        else:
+            logger.info(
+                'JobScheduler.handle_command_end() -> the job id=%s is not '
+                'running on this node -> command is ignored.', job_id,
+            )
+
+    def _needs_polling(self):
+        return True
+
+    def _abandon_job(self, job_id: int) -> None:
+        """Stop a job which lease has been lost (i.e. it has been recovered by
+        another node, which executes it now) ; the job & its lease are not
+        modified, they belong to the other node.
+        """
+        logger.warning(
+            'JobScheduler: the lease of the job id=%s has been lost -> '
+            'the job is abandoned by this node.', job_id,
+        )
+
+        workers = self._workers
+        if workers is not None:
+            workers.interrupt(job_id)
+        else:
+            proc = self._procs.pop(job_id, None)
+            if proc is not None and proc.poll() is None:
+                proc.kill()
+                proc.wait()
+
+        self._running_userjob_ids.discard(job_id)
+
+        reference_run = self._system_jobs_starts.pop(job_id, None)
+        if reference_run is not None:
+            job = Job.objects.filter(id=job_id).first()
+
+            if job is not None and job.enabled:
+                heappush(
+                    self._system_jobs,
+                    (self._next_wakeup(job, reference_run), job.id, job),
+                )
+
+    def _owned_job_ids(self, job_ids: Set[int]) -> Set[int]:
+        return {
+            *JobLease.objects.filter(
+                owner=self.node_id, job_id__in=job_ids,
+            ).values_list('job_id', flat=True),
+        }
+
+    def _handle_crash(self, job_id):
+        # NB: if the lease has been lost, the job is executed by another node
+        #     & must not be marked as crashed.
+        if self._owned_job_ids({job_id}):
+            super()._handle_crash(job_id)
+        else:
+            self._abandon_job(job_id)
+
+    def _heartbeat(self, now_value: datetime) -> None:
+        running_ids = self._running_job_ids()
+        if not running_ids:
+            return
+
+        updated_count = JobLease.objects.filter(
+            owner=self.node_id, job_id__in=running_ids,
+        ).update(heartbeat=now_value, expiry=now_value + self.lease_duration)
+
+        # NB: when this node has been too slow to extend its leases (overloaded
+        #     node, DB unreachable...), they have expired & another node has
+        #     recovered the jobs (see _recover_jobs()).
+        if updated_count != len(running_ids):
+            for job_id in running_ids - self._owned_job_ids(running_ids):
+                self._abandon_job(job_id)
+
+    def _recover_jobs(self, now_value: datetime) -> None:
+        "Release the expired leases of the dead nodes."
+        expired_leases = [
+            *JobLease.objects.filter(expiry__lt=now_value).exclude(owner=self.node_id),
+        ]
+
+        for lease in expired_leases:
+            logger.warning(
+                'JobScheduler: the lease of the job id=%s has expired '
+                '(dead node "%s") -> the job is recovered.',
+                lease.job_id, lease.owner,
+            )
+
+        if expired_leases:
+            JobLease.objects.filter(
+                job_id__in=[lease.job_id for lease in expired_leases],
+                expiry__lt=now_value,
+            ).delete()
+
+    def _retrieve_user_jobs(self, now_value: datetime) -> None:
+        "Retrieve the user jobs which have been created on the other nodes."
+        users_jobs = self._users_jobs
+        known_ids = {*self._running_userjob_ids, *(job.id for job in users_jobs)}
+
+        for job in Job.objects.filter(
+            user__isnull=False, status=Job.STATUS_WAIT,
+        ).exclude(
+            id__in=JobLease.objects.filter(expiry__gte=now_value).values('job_id'),
+        ).order_by('id'):
+            if job.id not in known_ids and job.type is not None:
+                users_jobs.appendleft(job)
+
+    def _synchronize(self):
+        now_value = now()
+        last_sync = self._last_synchronization
+
+        if last_sync is None or (now_value - last_sync).total_seconds() >= self.poll_period:
+            self._heartbeat(now_value)
+            self._recover_jobs(now_value)
+            self._retrieve_user_jobs(now_value)
+            self._last_synchronization = now_value
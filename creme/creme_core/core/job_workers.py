@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2021  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+
+import logging
+import multiprocessing
+from typing import Callable, Dict, List, Optional
+
+from django.db import close_old_connections, connections
+
+from ..global_info import clear_global_info
+from ..utils.system import disable_exit_handler
+
+logger = logging.getLogger(__name__)
+
+
+def _memory_usage() -> int:
+    "Peak memory usage of the current process, in KiB (0 means 'unknown')."
+    try:
+        import resource
+    except ImportError:  # Not a POSIX platform
+        return 0
+
+    # NB: KiB on Linux (bytes on macOS, so the limit is reached later).
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _worker_main(connection, target, initializer, max_jobs, max_memory):
+    """Main loop of a worker process: execute the jobs which IDs are received
+    from the pipe, & send back (job_id, recycle) when a job is finished.
+    The loop stops when None is received, or when the worker must be recycled.
+    """
+    # NB: the handlers of the job manager are inherited by the fork.
+    disable_exit_handler()
+
+    if initializer is not None:
+        initializer()
+
+    executed = 0
+
+    try:
+        while True:
+            job_id = connection.recv()
+            if job_id is None:
+                break
+
+            try:
+                target(job_id)
+            except Exception:
+                logger.exception('Job worker: error with the job id=%s', job_id)
+            finally:
+                # Like at the end of a request: the per-request cache (settings
+                # values, configurations...) is not kept for the next job, &
+                # the old connections are closed (see CONN_MAX_AGE).
+                clear_global_info()
+                close_old_connections()
+
+            executed += 1
+            recycle = bool(
+                (max_jobs and executed >= max_jobs)
+                or (max_memory and _memory_usage() >= max_memory * 1024)
+            )
+            connection.send((job_id, recycle))
+
+            if recycle:
+                break
+    except EOFError:  # The job manager has been stopped
+        pass
+
+
+class JobWorker:
+    "Process of a JobWorkerPool, with the pipe used to communicate with it."
+    def __init__(self, process: multiprocessing.Process, connection):
+        self.process = process
+        self.connection = connection
+        self.job_id: Optional[int] = None  # ID of the running job
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        self.process.join(timeout)
+        self.connection.close()
+
+
+class JobWorkerPool:
+    """Pool of pre-forked processes which execute the jobs.
+
+    The processes are forked from the job manager, so they have already loaded
+    the apps (django.setup(), registries...) & a job starts without delay.
+    Each worker executes one job at a time ; when all the workers are busy,
+    a new one is forked (the extra workers are stopped when they are idle).
+
+    A worker is replaced (recycled) after having executed "max_jobs" jobs, or
+    when its memory usage reaches "max_memory" MB, in order to release the
+    resources which are kept by the jobs (leaks, caches...).
+
+    The start method "fork" of multiprocessing is required (i.e. a POSIX platform).
+    """
+    def __init__(self,
+                 size: int,
+                 target: Callable[[int], None],
+                 initializer: Optional[Callable[[], None]] = None,
+                 max_jobs: int = 0,
+                 max_memory: int = 0):
+        """Constructor.
+        @param size: Number of workers kept alive.
+        @param target: Function called (in a worker) with the ID of the job to execute.
+        @param initializer: Function called by each worker when it starts (or None).
+        @param max_jobs: Maximum number of jobs executed by a worker (0 means "no limit").
+        @param max_memory: Memory usage, in MB, which causes the recycling of a
+               worker (0 means "no limit").
+        """
+        self._context = multiprocessing.get_context('fork')
+        self._size = size
+        self._target = target
+        self._initializer = initializer
+        self._max_jobs = max_jobs
+        self._max_memory = max_memory
+
+        self._idle: List[JobWorker] = []
+        self._busy: Dict[int, JobWorker] = {}  # Key: ID of the job
+
+    def __len__(self):
+        return len(self._idle) + len(self._busy)
+
+    @property
+    def running_job_ids(self) -> List[int]:
+        return [*self._busy.keys()]
+
+    def _fork_worker(self) -> JobWorker:
+        parent_connection, child_connection = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(
+                child_connection, self._target, self._initializer,
+                self._max_jobs, self._max_memory,
+            ),
+            name='creme-job-worker',
+        )
+
+        # NB: the DB connections must not be shared with the forked processes.
+        connections.close_all()
+        process.start()
+        child_connection.close()
+        logger.info('JobWorkerPool: new worker (pid=%s)', process.pid)
+
+        return JobWorker(process=process, connection=parent_connection)
+
+    def _fill(self) -> None:
+        idle = self._idle
+
+        while len(self) < self._size:
+            idle.append(self._fork_worker())
+
+    def start(self) -> None:
+        self._fill()
+
+    def run(self, job_id: int) -> None:
+        "Execute a job in an idle worker (a new worker is forked if needed)."
+        idle = self._idle
+
+        while True:
+            worker = idle.pop() if idle else self._fork_worker()
+
+            try:
+                worker.connection.send(job_id)
+            except OSError:  # The worker is dead (BrokenPipeError...)
+                logger.warning('JobWorkerPool: dead worker (pid=%s)', worker.process.pid)
+                worker.close()
+            else:
+                break
+
+        worker.job_id = job_id
+        self._busy[job_id] = worker
+
+    def poll(self) -> List[int]:
+        """Retrieve the workers which have finished their job, replace the
+        recycled/dead workers, & detect the crashes.
+        @return The IDs of the jobs which worker has crashed (so these jobs
+                have not been finished normally).
+        """
+        busy = self._busy
+        idle = self._idle
+        crashed_job_ids = []
+
+        for job_id, worker in [*busy.items()]:
+            # NB: we check the process before the pipe, because a worker which
+            #     is recycled sends its last message before exiting.
+            alive = worker.process.is_alive()
+            connection = worker.connection
+
+            try:
+                message = connection.recv() if connection.poll() else None
+            except (EOFError, OSError):
+                message = None
+
+            if message is not None:
+                del busy[job_id]
+                worker.job_id = None
+
+                if message[1]:  # The worker stops by itself
+                    worker.close(timeout=5)
+                elif len(self) >= self._size:  # Extra worker
+                    connection.send(None)
+                    worker.close(timeout=5)
+                else:
+                    idle.append(worker)
+            elif not alive:
+                logger.critical(
+                    'JobWorkerPool: the worker (pid=%s) has crashed (exit code=%s) '
+                    'during the job id=%s',
+                    worker.process.pid, worker.process.exitcode, job_id,
+                )
+                del busy[job_id]
+                worker.close()
+                crashed_job_ids.append(job_id)
+
+        for worker in [*idle]:
+            if not worker.process.is_alive():
+                logger.warning('JobWorkerPool: dead worker (pid=%s)', worker.process.pid)
+                idle.remove(worker)
+                worker.close()
+
+        self._fill()
+
+        return crashed_job_ids
+
+    def interrupt(self, job_id: int, timeout: float = 5) -> None:
+        """Stop the worker which executes a job (the job is interrupted) ; a
+        new worker is forked if needed.
+        @param job_id: ID of the job ; nothing is done if it is not running.
+        @param timeout: Time (in seconds) given to the worker to stop.
+        """
+        worker = self._busy.pop(job_id, None)
+
+        if worker is not None:
+            logger.warning(
+                'JobWorkerPool: the job id=%s is interrupted (pid=%s)',
+                job_id, worker.process.pid,
+            )
+            worker.process.terminate()
+            worker.close(timeout)
+            self._fill()
+
+    def stop(self, timeout: float = 5) -> None:
+        """Stop all the workers ; the running jobs are interrupted.
+        @param timeout: Time (in seconds) given to the idle workers to stop.
+        """
+        for worker in self._idle:
+            try:
+                worker.connection.send(None)
+            except OSError:
+                pass
+
+        for worker in self._idle:
+            worker.close(timeout)
+
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+        for job_id, worker in self._busy.items():
+            logger.warning(
+                'JobWorkerPool: the job id=%s is interrupted (pid=%s)',
+                job_id, worker.process.pid,
+            )
+            worker.process.terminate()
+            worker.close(timeout)
+
+        self._idle.clear()
+        self._busy.clear()
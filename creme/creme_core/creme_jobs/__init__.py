@@ -1,5 +1,6 @@
 from .batch_process import batch_process_type
 from .deletor import deletor_type
+from .entities_deletor import entities_deletor_type
 from .mass_import import mass_import_type
 from .reminder import reminder_type
 from .temp_files_cleaner import temp_files_cleaner_type
@@ -9,6 +10,7 @@ jobs = (
     temp_files_cleaner_type,
     deletor_type,
     trash_cleaner_type,
+    entities_deletor_type,
     batch_process_type,
     mass_import_type,
     reminder_type,
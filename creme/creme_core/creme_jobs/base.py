@@ -114,6 +114,7 @@ class JobType:
 
         job.last_run = now()
         job.save()
+        self.publish_progress(job, force=True)
 
         try:
             self._execute(job)
@@ -128,6 +129,7 @@ class JobType:
 
         # job.last_run = now()
         job.save()
+        self.publish_progress(job, force=True)
 
         from ..core.job import JobSchedulerQueue
         JobSchedulerQueue.get_main_queue().end_job(job)
@@ -136,6 +138,15 @@ class JobType:
     def generate_id(app_label: str, name: str) -> str:
         return f'{app_label}-{name}'
 
+    def publish_progress(self, job: Job, force: bool = False) -> None:
+        """Publish the progress of a running job, in order to update the
+        clients which monitor it (see creme_core.core.job.JobProgressChannel).
+        Call it in the loop of your '_execute()' method ; the publications
+        are throttled (excepted if 'force' is True).
+        """
+        from ..core.job import job_progress_channel
+        job_progress_channel.publish(job, force=force)
+
     def get_description(self, job: Job) -> List[str]:
         """Get a humanized description, as a list of strings.
         To be overloaded by child classes.
@@ -2,7 +2,7 @@
 
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2016-2020  Hybird
+#    Copyright (C) 2016-2021  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -129,6 +129,8 @@ class _BatchProcessType(JobType):
                             final_entity.save()
                             create_result(entity=final_entity)
 
+                self.publish_progress(job)
+
     def progress(self, job):
         count = EntityJobResult.objects.filter(job=job).count()
         return JobProgress(
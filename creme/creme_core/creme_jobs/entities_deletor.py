@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2021  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from django.db.transaction import atomic
+from django.utils.translation import gettext
+from django.utils.translation import gettext_lazy as _
+from django.utils.translation import ngettext
+
+from ..core.entity_deletion import EntitiesDeletor
+from ..models import CremeEntity, EntityJobResult
+from .base import JobProgress, JobType
+
+
+class _EntitiesDeletorType(JobType):
+    """Delete definitively several CremeEntities, by batches ; it is used by the
+    view which deletes the entities selected in a list-view, when there are too
+    many entities (see the setting "ENTITIES_DELETION_JOB_THRESHOLD").
+
+    The IDs of the entities are stored in job.data['entities'].
+    The entities which cannot be deleted get an EntityJobResult with the error.
+    """
+    id           = JobType.generate_id('creme_core', 'entities_deletor')
+    verbose_name = _('Deletion of entities')
+
+    # Number of entities which are locked & deleted in a transaction.
+    batch_size = 50
+
+    deletor_class = EntitiesDeletor
+
+    def _execute(self, job):
+        deletor = self.deletor_class(user=job.user)
+        entity_ids = job.data['entities']
+        batch_size = self.batch_size
+
+        def create_error(entity, msg):
+            EntityJobResult.objects.update_or_create(
+                job=job, entity=entity, defaults={'messages': [msg]},
+            )
+
+        for start in range(0, len(entity_ids), batch_size):
+            with atomic():
+                entities = [
+                    *CremeEntity.objects.select_for_update().filter(
+                        id__in=entity_ids[start:start + batch_size],
+                    ),
+                ]
+                CremeEntity.populate_real_entities(entities)
+
+                # NB: the credentials may have changed since the creation of the job.
+                allowed_entities, errors = deletor.check_entities(
+                    [entity.get_real_entity() for entity in entities]
+                )
+
+                entities_to_delete = []
+                for entity in allowed_entities:
+                    if deletor.move_to_trash(entity):
+                        create_error(
+                            entity,
+                            gettext('The entity has been restored in the meantime.'),
+                        )
+                    else:
+                        entities_to_delete.append(entity)
+
+                errors.extend(deletor.delete_entities(entities_to_delete))
+
+                for entity, e in errors:
+                    create_error(entity, e.args[0])
+
+            self.publish_progress(job)
+
+    def _deleted_count(self, job) -> int:
+        entity_ids = job.data['entities']
+
+        return len(entity_ids) - CremeEntity.objects.filter(id__in=entity_ids).count()
+
+    def progress(self, job):
+        total = len(job.data['entities'])
+        count = self._deleted_count(job)
+        processed = count + EntityJobResult.objects.filter(job=job).count()
+
+        return JobProgress(
+            percentage=int(processed * 100 / total) if total else None,
+            label=ngettext(
+                '{count} entity deleted.',
+                '{count} entities deleted.',
+                count
+            ).format(count=count),
+        )
+
+    @property
+    def results_bricks(self):
+        from ..bricks import EntityJobErrorsBrick
+        return [EntityJobErrorsBrick()]
+
+    def get_description(self, job):
+        count = len(job.data['entities'])
+
+        return [
+            ngettext(
+                'Delete {count} entity definitively',
+                'Delete {count} entities definitively',
+                count
+            ).format(count=count),
+        ]
+
+    def get_stats(self, job):
+        count = self._deleted_count(job)
+        stats = [
+            ngettext(
+                '{count} entity deleted.',
+                '{count} entities deleted.',
+                count
+            ).format(count=count),
+        ]
+
+        errors_count = EntityJobResult.objects.filter(job=job).count()
+        if errors_count:
+            stats.append(
+                ngettext(
+                    '{count} entity cannot be deleted.',
+                    '{count} entities cannot be deleted.',
+                    errors_count
+                ).format(count=errors_count)
+            )
+
+        return stats
+
+
+entities_deletor_type = _EntitiesDeletorType()
@@ -18,6 +18,8 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+from django.db.models import Case, CharField, F, IntegerField, Q, Value, When
+from django.db.models.functions import Concat, Lower, Substr
 from django.utils.translation import gettext as _
 
 from creme.creme_core.core import enumerable
@@ -26,6 +28,8 @@ from creme.creme_core.utils.unicode_collation import collator
 
 
 class UserEnumerator(enumerable.QSEnumerator):
+    search_fields = ('username', 'first_name', 'last_name')
+
     @classmethod
     def instance_as_dict(cls, instance):
         d = {'value': instance.pk}
@@ -42,16 +46,48 @@ class UserEnumerator(enumerable.QSEnumerator):
 
         return d
 
-    def choices(self, user):
-        choices = super().choices(user)
-
+    @staticmethod
+    def _sort(choices):
         sort_key = collator.sort_key
-        choices.sort(key=lambda d: sort_key('{}#{}'.format(d.get('group', ''), d['label'])))
+        choices.sort(key=lambda d: (sort_key(d.get('group', '')), sort_key(d['label'])))
 
         return choices
 
+    def _queryset(self):
+        # NB: the choices are paginated by filter_choices(), so the DB order
+        #     must be close to the order of _sort() (group then label).
+        sort_key = collator.sort_key
+        teams_group = _('Teams')
+        inactive_group = _('Inactive users')
+        teams_rank = 1 + (sort_key(teams_group) > sort_key(inactive_group))
+
+        return super()._queryset().annotate(
+            enum_group=Case(
+                When(is_team=True, then=Value(teams_rank)),
+                When(is_active=False, then=Value(3 - teams_rank)),
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+            enum_label=Lower(Case(
+                When(
+                    Q(is_team=False) & ~Q(first_name='') & ~Q(last_name=''),
+                    then=Concat(
+                        'first_name', Value(' '), Substr('last_name', 1, 1),
+                        output_field=CharField(),
+                    ),
+                ),
+                default=F('username'),
+                output_field=CharField(),
+            )),
+        ).order_by('enum_group', 'enum_label', 'pk')
+
+    def choices(self, user):
+        return self._sort(super().choices(user))
+
 
 class EntityFilterEnumerator(enumerable.QSEnumerator):
+    search_fields = ('name',)
+
     @classmethod
     def instance_as_dict(cls, instance):
         d = super().instance_as_dict(instance)
@@ -60,14 +96,34 @@ class EntityFilterEnumerator(enumerable.QSEnumerator):
 
         return d
 
-    def choices(self, user):
-        choices = super().choices(user)
-
+    @staticmethod
+    def _sort(choices):
         sort_key = collator.sort_key
-        choices.sort(key=lambda d: sort_key('{}#{}'.format(d['group'], d['label'])))
+        choices.sort(key=lambda d: (sort_key(d['group']), sort_key(d['label'])))
 
         return choices
 
+    def _queryset(self):
+        # NB: the choices are paginated by filter_choices(), so the DB order
+        #     must be close to the order of _sort() (group then label).
+        sort_key = collator.sort_key
+        ctypes = sorted(entity_ctypes(), key=lambda ct: sort_key(str(ct)))
+
+        return super()._queryset().annotate(
+            enum_group=Case(
+                *(
+                    When(entity_type=ct.id, then=Value(rank))
+                    for rank, ct in enumerate(ctypes)
+                ),
+                default=Value(len(ctypes)),
+                output_field=IntegerField(),
+            ),
+            enum_label=Lower('name'),
+        ).order_by('enum_group', 'enum_label', 'pk')
+
+    def choices(self, user):
+        return self._sort(super().choices(user))
+
 
 class EntityCTypeForeignKeyEnumerator(enumerable.Enumerator):
     def choices(self, user):
@@ -75,3 +131,7 @@ class EntityCTypeForeignKeyEnumerator(enumerable.Enumerator):
             {'value': ct_id, 'label': label}
             for ct_id, label in ctype_choices(entity_ctypes())
         ]
+
+    def cache_dependencies(self):
+        # NB: the choices depend only on the language (& it is used by the ETag).
+        return []
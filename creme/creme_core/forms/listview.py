@@ -27,8 +27,10 @@ from re import compile as compile_re
 from typing import Type
 
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
 from django.db.models.query_utils import Q
 from django.forms import Field, Widget
+from django.urls import reverse
 from django.utils.formats import get_format
 from django.utils.functional import cached_property
 from django.utils.timezone import now
@@ -138,12 +140,19 @@ class BooleanLVSWidget(ListViewSearchWidget):
 
 # TODO: extends ChoiceWidget ?
 class SelectLVSWidget(ListViewSearchWidget):
-    """Search-widget to enter a choice among valid choices."""
+    """Search-widget to enter a choice among valid choices.
+
+    The attribute "more" can be a dictionary {"url": ..., "offset": ..., "limit": ...} ;
+    in this case, the choices are a page of the available choices, & the next
+    pages are retrieved by the browser from the URL (see
+    creme_core.views.enumerable.PaginatedChoicesMixin).
+    """
     template_name = 'creme_core/listview/search-widgets/select.html'
 
-    def __init__(self, *, choices=(), **kwargs):
+    def __init__(self, *, choices=(), more=None, **kwargs):
         super().__init__(**kwargs)
         self.choices = choices
+        self.more = more
 
     def _build_groups(self, choices, selected_value):
         # groups = defaultdict(list)  # TODO: when order is kept (py3.6?)
@@ -184,6 +193,7 @@ class SelectLVSWidget(ListViewSearchWidget):
             choices=self.choices, selected_value=w_ctxt['value'],
         )
         w_ctxt['NULL_FK'] = NULL
+        w_ctxt['more'] = self.more
 
         return context
 
@@ -510,12 +520,18 @@ class RegularRelatedField(ListViewSearchField):
     enumerable_registry = enumerable.enumerable_registry
     default_null_label = _('* is empty *')
 
+    # Maximum number of choices given to the widget ; the next choices are
+    # retrieved by the browser page by page. <None> means no limit.
+    choices_limit = 100
+
     def __init__(self, enumerable_registry=None, **kwargs):
         super().__init__(**kwargs)
 
         if enumerable_registry is None:
             enumerable_registry = self.enumerable_registry
 
+        self._enumerator = None
+
         self.choices = self.widget.choices = choices = [
             {'value': '', 'label': pgettext_lazy('creme_core-filter', 'All')},
         ]
@@ -532,7 +548,34 @@ class RegularRelatedField(ListViewSearchField):
         except ValueError as e:
             logger.warning('RegularRelatedField => %s', e)
         else:
-            choices.extend(enumerator.choices(user=self.user))
+            limit = self.choices_limit
+
+            if limit is None:
+                choices.extend(enumerator.choices(user=self.user))
+            else:
+                page = enumerator.filter_choices(self.user, limit=limit + 1)
+
+                if len(page) > limit:
+                    del page[limit:]
+                    self._enumerator = enumerator
+                    self.widget.more = {
+                        'url': self._get_choices_url(field),
+                        'offset': limit,
+                        'limit': limit,
+                    }
+
+                choices.extend(page)
+
+    def _get_choices_url(self, field):
+        field_info = self.cell.field_info
+        model = (
+            self.cell.model if len(field_info) == 1 else field_info[-2].remote_field.model
+        )
+
+        return reverse(
+            'creme_core__enumerable_choices',
+            args=(ContentType.objects.get_for_model(model).id, field.name),
+        )
 
     def _get_field_null_label(self, field):
         try:
@@ -554,6 +597,18 @@ class RegularRelatedField(ListViewSearchField):
                         Q(**{self.cell.value: pk})
                     )
 
+            # NB: the value can belong to a page of choices which has not been
+            #     given to the widget.
+            enumerator = self._enumerator
+            if enumerator is not None:
+                found = enumerator.filter_choices(self.user, values=[value], limit=1)
+
+                if found:
+                    choice = found[0]
+                    self.choices.append(choice)  # NB: the widget displays it as selected
+
+                    return Q(**{self.cell.value: choice['value']})
+
             logger.warning('ForeignKeyField => invalid ID: %s', value)
 
         return super().to_python(value=value)
@@ -1398,6 +1398,8 @@ class ImportForm(CremeModelForm):
                     job_result.messages = self.import_errors
                     job_result.save()
 
+                job.type.publish_progress(job)
+
                 self.import_errors.clear()
 
 
@@ -1538,7 +1540,7 @@ class ImportForm4CremeEntity(ImportForm):
                     user=user,
                 ))
 
-        Relation.objects.safe_multi_save(relations)
+        Relation.objects.safe_bulk_create(relations)
 
 
 def extractorfield_factory(modelfield, header_dict, choices, **kwargs):
@@ -226,7 +226,7 @@ class _RelationsCreateForm(CremeForm):
     def save(self):
         user = self.user
 
-        Relation.objects.safe_multi_save(
+        Relation.objects.safe_bulk_create(
             Relation(
                 user=user,
                 subject_entity=subject,
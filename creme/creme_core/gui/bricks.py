@@ -18,10 +18,18 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+import hashlib
 import logging
-from collections import defaultdict
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import partial
+from json import dumps as json_dump
+from time import perf_counter, time
 from typing import (
+    Callable,
     DefaultDict,
+    Deque,
     Dict,
     Iterable,
     Iterator,
@@ -34,11 +42,19 @@ from typing import (
     Union,
 )
 
+from django.apps import apps
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import BaseCache, caches
 from django.core.paginator import EmptyPage, InvalidPage, Paginator
+from django.core.signals import setting_changed
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
 from django.db.models import Model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
 from django.template.loader import get_template
+from django.utils import timezone, translation
 from django.utils.functional import cached_property
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
@@ -46,6 +62,7 @@ from django.utils.translation import gettext_lazy as _
 from ..constants import MODELBRICK_ID
 from ..core.entity_cell import EntityCell, EntityCellRegularField
 from ..core.sorter import cell_sorter_registry
+from ..global_info import get_global_info, get_per_request_cache
 from ..models import (
     BrickState,
     CremeEntity,
@@ -53,10 +70,14 @@ from ..models import (
     InstanceBrickConfigItem,
     Relation,
     RelationBrickItem,
+    SetCredentials,
+    UserRole,
 )
+from ..signals import post_bulk_create, post_bulk_update
 from ..utils.meta import OrderedField
 
 logger = logging.getLogger(__name__)
+profiling_logger = logging.getLogger('creme.creme_core.bricks_profiling')
 BrickDependencies = Union[List[Type[Model]], Tuple[Type[Model], ...], str]
 
 
@@ -147,6 +168,22 @@ class Brick:
     template_name: str = 'OVERLOAD_ME.html'  # Used to render the brick of course
     context_class = _BrickContext  # Class of the instance which stores the context in the session.
 
+    # 'True' means that the brick is slow to render ; so, in the pages which
+    # allow it (see the templatetag {% brick_display %}), a placeholder is
+    # rendered instead with the page, & the brick is loaded by the client with
+    # the reloading view.
+    deferred: bool = False
+    deferred_template_name: str = 'creme_core/bricks/base/deferred.html'
+
+    # 'True' means that the HTML of the brick can be stored in the render cache
+    # (see BricksRenderCache & the setting "BRICKS_RENDER_CACHE"). The cached
+    # content is invalidated when an instance of a model in "cache_dependencies"
+    # (<None> means "use the attribute 'dependencies'") is saved or deleted ;
+    # so use it only for read-mostly bricks which display data from these
+    # models, the current entity & the current user.
+    cacheable: bool = False
+    cache_dependencies: Optional[Sequence[Type[Model]]] = None
+
     # ATTRIBUTES USED ONLY BY THE CONFIGURATION GUI FOR THE BRICKS (ie: in creme_config) ----------
     # True means that the Brick appears in the configuration IHM
     # (ie: it appears on classical detail-views/portals)
@@ -192,7 +229,19 @@ class Brick:
         return f'{cls.GENERIC_HAT_BRICK_ID}-{app_name}-{name}'
 
     def _render(self, template_context) -> str:
-        return get_template(self.template_name).render(template_context)
+        with brick_profiler.measure_template():
+            return get_template(self.template_name).render(template_context)
+
+    def deferred_display(self, context: dict) -> str:
+        "Render the placeholder which is displayed while the brick is loaded."
+        return get_template(self.deferred_template_name).render(
+            Brick._build_template_context(
+                self,
+                context=context,
+                brick_id=self.id_,
+                brick_context=self.context_class(),
+            )
+        )
 
     def _simple_detailview_display(self, context: dict) -> str:
         """Helper method to build a basic detailview_display() method for
@@ -1077,3 +1126,498 @@ class _BrickRegistry:
 
 
 brick_registry = _BrickRegistry()
+
+
+class BricksRenderCache:
+    """Cache for the HTML of the bricks which are "cacheable" (see the
+    attributes 'Brick.cacheable' & 'Brick.cache_dependencies').
+
+    The key of a rendered brick is built from:
+        - the ID of the brick & the render method.
+        - the current entity & its modification date.
+        - the current user & the versions of the models used by the credentials.
+        - the state of the brick (opened, empty fields...).
+        - the page & the order of the brick (in the session & in the request).
+        - the reloading information of the brick.
+        - the language, the time zone & the theme.
+        - the versions of the models on which the brick depends.
+
+    The version of a model is a counter stored in the cache, which is increased
+    each time an instance of this model is saved or deleted (see the signal
+    handlers below). So the obsolete contents are never used again (they are
+    purged by the cache itself).
+
+    The cache is disabled when the setting "BRICKS_RENDER_CACHE" is empty.
+    """
+    key_prefix = 'creme_core-brick_render-'
+    version_key_prefix = 'creme_core-brick_render_version-'
+
+    def __init__(self, brick_registry: _BrickRegistry):
+        self._brick_registry = brick_registry
+        self._watched_models: Optional[Set[Type[Model]]] = None
+        self._m2m_senders: List[Type[Model]] = []
+
+    @property
+    def cache(self) -> Optional[BaseCache]:
+        "The cache which stores the contents ; <None> means that caching is disabled."
+        alias = settings.BRICKS_RENDER_CACHE
+
+        return caches[alias] if alias else None
+
+    @staticmethod
+    def credentials_models() -> List[Type[Model]]:
+        "Models which are used to compute the credentials of the users."
+        return [get_user_model(), UserRole, SetCredentials]
+
+    @staticmethod
+    def get_dependencies(brick: Union[Brick, Type[Brick]]) -> Optional[List[Type[Model]]]:
+        """Get the models which invalidate the cached contents of a brick.
+        @return A list of models, or <None> if the brick cannot be cached
+                (it uses the wildcard '*').
+        """
+        deps = brick.cache_dependencies
+
+        if deps is None:
+            deps = brick.dependencies
+
+            if isinstance(deps, str):
+                return None
+
+        return [dep for dep in deps if isinstance(dep, type) and issubclass(dep, Model)]
+
+    @property
+    def watched_models(self) -> Set[Type[Model]]:
+        "Models which get a version counter."
+        watched = self._watched_models
+
+        if watched is None:
+            self._watched_models = watched = {*self.credentials_models()}
+
+            for __, brick_cls in self._brick_registry:
+                if brick_cls.cacheable:
+                    watched.update(self.get_dependencies(brick_cls) or ())
+
+            self._connect_m2m_handlers(watched)
+
+        return watched
+
+    def _m2m_changed_handler(self, sender, instance, action, model, using, **kwargs):
+        if action.startswith('post_'):
+            self.bump_version(type(instance), using=using)
+            self.bump_version(model, using=using)
+
+    def _connect_m2m_handlers(self, watched: Set[Type[Model]]) -> None:
+        # NB: we do not use a global handler, because Django uses a faster
+        #     method to add M2M relationships when there is no handler.
+        for model in apps.get_models():
+            if any(cls in watched for cls in model.__mro__):
+                for field in model._meta.local_many_to_many:
+                    through = field.remote_field.through
+                    m2m_changed.connect(self._m2m_changed_handler, sender=through)
+                    self._m2m_senders.append(through)
+
+    def reset(self) -> None:
+        "Forget the watched models (they are computed again when needed)."
+        for sender in self._m2m_senders:
+            m2m_changed.disconnect(self._m2m_changed_handler, sender=sender)
+
+        self._m2m_senders.clear()
+        self._watched_models = None
+
+    def _version_key(self, model: Type[Model]) -> str:
+        meta = model._meta
+        return f'{self.version_key_prefix}{meta.app_label}.{meta.model_name}'
+
+    @staticmethod
+    def _initial_version() -> int:
+        # NB: we do not start at 0, so the contents built with a counter which
+        #     has been evicted from the cache are not used again.
+        return int(time() * 1000)
+
+    def get_versions(self, cache: BaseCache, models: Iterable[Type[Model]]) -> List[int]:
+        keys = [self._version_key(model) for model in models]
+        found = cache.get_many(keys)
+        versions = []
+
+        for key in keys:
+            version = found.get(key)
+
+            if version is None:
+                version = self._initial_version()
+
+                if not cache.add(key, version, timeout=None):
+                    version = cache.get(key, version)
+
+            versions.append(version)
+
+        return versions
+
+    def _bump_versions(self, cache: BaseCache, models: Iterable[Type[Model]]) -> None:
+        for model in models:
+            key = self._version_key(model)
+
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, self._initial_version(), timeout=None)
+
+    def bump_version(self, model: Type[Model], using: Optional[str] = None) -> None:
+        """Invalidate the cached contents which depend on a model.
+        @param model: Model of the saved/deleted instance ; its parent classes
+               are invalidated too (so a brick can depend on CremeEntity for
+               example).
+        @param using: Alias of the DB used to save/delete the instance.
+        """
+        cache = self.cache
+        if cache is None:
+            return
+
+        watched = self.watched_models
+        models = [cls for cls in model.__mro__ if cls in watched]
+        if not models:
+            return
+
+        self._bump_versions(cache, models)
+
+        # NB: a brick rendered before the end of the transaction would be
+        #     cached with the old data & the new versions.
+        if connections[using or DEFAULT_DB_ALIAS].in_atomic_block:
+            transaction.on_commit(partial(self._bump_versions, cache, models), using=using)
+
+    @staticmethod
+    def _get_brick_context(request, brick_id: str) -> Optional[dict]:
+        base_url = request.GET.get('base_url', request.path)
+
+        return request.session.get(
+            'brickcontexts_manager', {},
+        ).get(base_url, {}).get(brick_id)
+
+    @staticmethod
+    def _set_brick_context(request, brick_id: str, brick_context: dict) -> None:
+        base_url = request.GET.get('base_url', request.path)
+        request.session.setdefault(
+            'brickcontexts_manager', {},
+        ).setdefault(base_url, {})[brick_id] = brick_context
+        request.session.modified = True
+
+    def get_key(self,
+                cache: BaseCache,
+                brick: Brick,
+                render_method: str,
+                dependencies: Iterable[Type[Model]],
+                context: dict) -> str:
+        request = context['request']
+        user = context['user']
+        brick_id = brick.id_
+        state = BricksManager.get(context).get_state(brick_id, user)
+        entity = context.get('object')
+        GET = request.GET
+
+        parts = [
+            brick_id,
+            render_method,
+            f'{entity.id}@{entity.modified}' if isinstance(entity, CremeEntity) else '',
+            str(user.id),
+            f'{state.is_open}/{state.show_empty_fields}',
+            GET.get(f'{brick_id}_page', ''),
+            GET.get(f'{brick_id}_order', ''),
+            json_dump(self._get_brick_context(request, brick_id), sort_keys=True),
+            json_dump(brick.reloading_info, sort_keys=True, default=str),
+            translation.get_language() or '',
+            timezone.get_current_timezone_name(),
+            context.get('THEME_NAME', ''),
+            *map(
+                str,
+                self.get_versions(cache, [*dependencies, *self.credentials_models()]),
+            ),
+        ]
+
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode())
+            digest.update(b'\0')
+
+        return self.key_prefix + digest.hexdigest()
+
+    def _render(self, brick: Brick, render_method: str, render_func, dependencies,
+                context: dict) -> str:
+        cache = self.cache
+        if cache is None:
+            return render_func(context)
+
+        request = context['request']
+        brick_id = brick.id_
+        key = self.get_key(
+            cache=cache, brick=brick, render_method=render_method,
+            dependencies=dependencies, context=context,
+        )
+        cached = cache.get(key)
+
+        if cached is not None:
+            content, brick_context = cached
+
+            # NB: the page & the order are stored in the session by the rendering.
+            if brick_context is not None and \
+               brick_context != self._get_brick_context(request, brick_id):
+                self._set_brick_context(request, brick_id, brick_context)
+
+            return content
+
+        content = render_func(context)
+
+        if content is not None:
+            cache.set(
+                key,
+                (content, self._get_brick_context(request, brick_id)),
+                timeout=settings.BRICKS_RENDER_CACHE_TIMEOUT,
+            )
+
+        return content
+
+    def get_render_function(self,
+                            brick: Brick,
+                            render_method: str,
+                            ) -> Optional[Callable[[dict], str]]:
+        """Get the render method of a brick ; if the brick is cacheable, the
+        returned function uses the cache.
+        @param brick: Instance of Brick.
+        @param render_method: Name of the method, like "detailview_display".
+        @return A function which takes a template context & returns a string,
+                or <None> if the brick has no method with this name.
+        """
+        render_func = getattr(brick, render_method, None)
+
+        if render_func is None or not brick.cacheable or self.cache is None:
+            return render_func
+
+        dependencies = self.get_dependencies(brick)
+        if dependencies is None:
+            logger.warning(
+                'BricksRenderCache: the brick %s cannot be cached '
+                '(use the attribute "cache_dependencies")',
+                brick.id_,
+            )
+            return render_func
+
+        # NB: for the bricks which are not registered.
+        self.watched_models.update(dependencies)
+
+        return partial(self._render, brick, render_method, render_func, dependencies)
+
+
+brick_render_cache = BricksRenderCache(brick_registry)
+
+
+@receiver([post_save, post_delete, post_bulk_create, post_bulk_update])
+def _bump_brick_render_version(sender, **kwargs):
+    brick_render_cache.bump_version(sender, using=kwargs.get('using'))
+
+
+@receiver(setting_changed)
+def _reset_brick_render_cache(sender, setting, **kwargs):
+    if setting == 'BRICKS_RENDER_CACHE':
+        brick_render_cache.reset()
+
+
+class BrickRenderTiming:
+    "Measures of the rendering of a brick (the durations are in milliseconds)."
+    __slots__ = (
+        'brick_id', 'render_method',
+        'wall_time', 'queries_count', 'sql_time', 'template_time',
+    )
+
+    def __init__(self, brick_id: str, render_method: str):
+        self.brick_id = brick_id
+        self.render_method = render_method
+        self.wall_time = 0.0
+        self.queries_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+
+    def __repr__(self):
+        return (
+            f'BrickRenderTiming(brick_id="{self.brick_id}", '
+            f'render_method="{self.render_method}", '
+            f'wall_time={self.wall_time:.2f}, queries_count={self.queries_count}, '
+            f'sql_time={self.sql_time:.2f}, template_time={self.template_time:.2f})'
+        )
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class BricksProfiler:
+    """Measure the rendering of the bricks: wall time, number & duration of
+    the SQL queries (on the default DB), time spent in the template.
+
+    The measures are:
+        - logged (logger "creme.creme_core.bricks_profiling", level INFO).
+        - stored in the per-request cache, so they can be sent in the header
+          "Server-Timing" (see creme_core.middleware.bricks).
+        - stored in a rolling window per brick, to compute statistics (see
+          BricksProfilingBrick in creme_config). These windows are kept in the
+          memory of the current process & are not shared: with several processes
+          (web server workers), the statistics only use the renders done by the
+          process which computes them.
+
+    The profiling is disabled when the setting "BRICKS_PROFILING" is False.
+    """
+    timings_key = 'creme_core-bricks_timings'
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._windows: Dict[str, Deque[BrickRenderTiming]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return settings.BRICKS_PROFILING
+
+    def wrap(self,
+             brick: Brick,
+             render_method: str,
+             render_func: Optional[Callable[[dict], str]],
+             ) -> Optional[Callable[[dict], str]]:
+        """Get a function which renders a brick & measures its rendering.
+        @param brick: Instance of Brick.
+        @param render_method: Name of the render method, like "detailview_display".
+        @param render_func: Function which renders the brick (can be <None>).
+        @return A function, or <None> if "render_func" is <None>.
+        """
+        if render_func is None or not self.enabled:
+            return render_func
+
+        return partial(self._render, brick.id_, render_method, render_func)
+
+    def _render(self, brick_id: str, render_method: str, render_func, context: dict) -> str:
+        local = self._local
+        timing = BrickRenderTiming(brick_id=brick_id, render_method=render_method)
+
+        def sql_wrapper(execute, sql, params, many, sql_context):
+            sql_start = perf_counter()
+
+            try:
+                return execute(sql, params, many, sql_context)
+            finally:
+                timing.queries_count += 1
+                timing.sql_time += (perf_counter() - sql_start) * 1000
+
+        previous_timing = getattr(local, 'timing', None)
+        local.timing = timing
+        start = perf_counter()
+
+        try:
+            with connections[DEFAULT_DB_ALIAS].execute_wrapper(sql_wrapper):
+                return render_func(context)
+        finally:
+            timing.wall_time = (perf_counter() - start) * 1000
+            local.timing = previous_timing
+            self.add(timing)
+
+    @contextmanager
+    def measure_template(self):
+        "Context manager which measures the time spent to render a template."
+        timing = getattr(self._local, 'timing', None)
+
+        if timing is None:
+            yield
+        else:
+            start = perf_counter()
+
+            try:
+                yield
+            finally:
+                timing.template_time += (perf_counter() - start) * 1000
+
+    def add(self, timing: BrickRenderTiming) -> None:
+        profiling_logger.info(
+            'brick=%s method=%s wall=%.2fms queries=%s sql=%.2fms template=%.2fms',
+            timing.brick_id, timing.render_method, timing.wall_time,
+            timing.queries_count, timing.sql_time, timing.template_time,
+            extra={'brick_timing': timing.as_dict()},
+        )
+
+        get_per_request_cache().setdefault(self.timings_key, []).append(timing)
+
+        with self._lock:
+            window = self._windows.get(timing.brick_id)
+            if window is None:
+                self._windows[timing.brick_id] = window = deque(
+                    maxlen=settings.BRICKS_PROFILING_WINDOW,
+                )
+
+            window.append(timing)
+
+    def request_timings(self) -> List[BrickRenderTiming]:
+        "Get the measures of the bricks rendered by the current request."
+        # NB: we do not use get_per_request_cache() which creates a cache if needed.
+        cache = get_global_info('per_request_cache')
+
+        return cache.get(self.timings_key, []) if cache else []
+
+    @staticmethod
+    def _percentile(sorted_values: Sequence[float], percent: int) -> float:
+        # NB: nearest-rank method
+        index = max(0, -(-len(sorted_values) * percent // 100) - 1)
+
+        return sorted_values[index]
+
+    def statistics(self) -> List[dict]:
+        """Get statistics about the rendering of each brick, computed on the
+        last renders (see the setting "BRICKS_PROFILING_WINDOW").
+        @return A list of dictionaries, ordered by decreasing 95th percentile
+                of the wall time.
+        """
+        with self._lock:
+            windows = [(brick_id, [*window]) for brick_id, window in self._windows.items()]
+
+        percentile = self._percentile
+        stats = []
+
+        for brick_id, timings in windows:
+            if not timings:
+                continue
+
+            wall_times = sorted(t.wall_time for t in timings)
+            queries_counts = sorted(t.queries_count for t in timings)
+            sql_times = sorted(t.sql_time for t in timings)
+            template_times = sorted(t.template_time for t in timings)
+
+            stats.append({
+                'brick_id': brick_id,
+                'count': len(timings),
+                'wall_time_p50': percentile(wall_times, 50),
+                'wall_time_p95': percentile(wall_times, 95),
+                'queries_count_p50': percentile(queries_counts, 50),
+                'queries_count_p95': percentile(queries_counts, 95),
+                'sql_time_p50': percentile(sql_times, 50),
+                'sql_time_p95': percentile(sql_times, 95),
+                'template_time_p50': percentile(template_times, 50),
+                'template_time_p95': percentile(template_times, 95),
+            })
+
+        stats.sort(key=lambda d: d['wall_time_p95'], reverse=True)
+
+        return stats
+
+    def clear(self) -> None:
+        "Forget the statistics."
+        with self._lock:
+            self._windows.clear()
+
+
+brick_profiler = BricksProfiler()
+
+
+def get_brick_render_function(brick: Brick, render_method: str) -> Optional[Callable[[dict], str]]:
+    """Get the function which renders a brick, by using the render cache & the
+    profiler when they are enabled.
+    @param brick: Instance of Brick.
+    @param render_method: Name of the method, like "detailview_display".
+    @return A function which takes a template context & returns a string,
+            or <None> if the brick has no method with this name.
+    """
+    return brick_profiler.wrap(
+        brick, render_method,
+        brick_render_cache.get_render_function(brick, render_method),
+    )
@@ -2,7 +2,7 @@
 
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2016-2020  Hybird
+#    Copyright (C) 2016-2021  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -18,6 +18,7 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
 
 
@@ -28,5 +29,17 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         verbosity = options.get('verbosity')
 
-        from creme.creme_core.core.job import JobScheduler
-        JobScheduler().start(verbose=bool(verbosity))
+        from creme.creme_core.core.job import (
+            ClusteredJobScheduler,
+            JobScheduler,
+        )
+
+        if settings.JOBMANAGER_CLUSTERED:
+            scheduler = ClusteredJobScheduler()
+
+            if verbosity:
+                self.stdout.write(f'Clustered mode (node "{scheduler.node_id}").')
+        else:
+            scheduler = JobScheduler()
+
+        scheduler.start(verbose=bool(verbosity))
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2021  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+
+from statistics import mean, median
+from threading import Thread
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the latency & the throughput of the queue(s) used to send '
+        'commands to the job manager.\n'
+        'The job manager must be stopped during the benchmark (it would consume the commands).'
+    )
+
+    def add_arguments(self, parser):
+        add_argument = parser.add_argument
+        add_argument(
+            '-b', '--broker', action='append', dest='brokers', default=[],
+            help='URL of a broker to benchmark (can be used several times). '
+                 '[default: settings.JOBMANAGER_BROKER]',
+        )
+        add_argument(
+            '-c', '--count', type=int, default=1000,
+            help='Number of commands sent for each measure [default: %(default)s]',
+        )
+
+    def _measure_latency(self, queue, jobs):
+        "@return List of round-trip durations (in seconds)."
+        durations = []
+
+        for job in jobs:
+            start = perf_counter()
+            queue.start_job(job)
+            cmd = queue.get_command(1)
+            durations.append(perf_counter() - start)
+
+            if cmd is None:
+                raise CommandError('A command has been lost.')
+
+        return durations
+
+    def _measure_throughput(self, queue, jobs):
+        "@return Number of commands per second."
+        received = []
+
+        def consume():
+            for __ in jobs:
+                cmd = queue.get_command(1)
+                if cmd is None:
+                    break
+
+                received.append(cmd)
+
+        consumer = Thread(target=consume)
+        consumer.start()
+
+        start = perf_counter()
+        for job in jobs:
+            queue.start_job(job)
+
+        consumer.join()
+        duration = perf_counter() - start
+
+        if len(received) != len(jobs):
+            raise CommandError(f'{len(jobs) - len(received)} command(s) have been lost.')
+
+        return len(jobs) / duration
+
+    def handle(self, *args, **options):
+        from creme.creme_core.core import job as job_core
+        from creme.creme_core.creme_jobs import batch_process_type
+        from creme.creme_core.models import Job
+
+        get_queue_class = getattr(job_core, 'get_queue_class', None)
+        if get_queue_class is None:
+            raise CommandError('The benchmark cannot be run with the tests settings.')
+
+        count = options['count']
+        if count < 1:
+            raise CommandError('The number of commands must be positive.')
+
+        jobs = [Job(id=i, type_id=batch_process_type.id) for i in range(1, count + 1)]
+        write = self.stdout.write
+
+        for url in (options['brokers'] or [settings.JOBMANAGER_BROKER]):
+            queue_cls = get_queue_class(url)
+            queue = queue_cls(url)
+
+            try:
+                queue.clear()
+                latencies = [d * 1000 for d in self._measure_latency(queue, jobs)]
+                throughput = self._measure_throughput(queue, jobs)
+            except CommandError:
+                raise
+            except Exception as e:
+                self.stderr.write(f'{url} ({queue_cls.verbose_name}): error [{e}]')
+                continue
+            finally:
+                close = getattr(queue, 'close', None)
+                if close is not None:
+                    close()
+
+            write(
+                f'{url} ({queue_cls.verbose_name}):\n'
+                f'  latency (ms): mean={mean(latencies):.3f} '
+                f'median={median(latencies):.3f} max={max(latencies):.3f}\n'
+                f'  throughput: {throughput:.0f} command(s)/s'
+            )
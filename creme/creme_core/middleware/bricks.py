@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2021  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+
+import re
+
+from django.utils.deprecation import MiddlewareMixin
+
+from ..gui.bricks import brick_profiler
+
+_INVALID_TOKEN_CHARS = re.compile(r"[^a-zA-Z0-9!#$%&'*+.^_`|~-]")
+
+
+class BricksProfilingMiddleware(MiddlewareMixin):
+    """Send the measures of the bricks rendered by the request in the header
+    "Server-Timing" (see the setting "BRICKS_PROFILING").
+    The middleware must be after GlobalInfoMiddleware (it uses the per-request cache) ;
+    it is not in the default setting MIDDLEWARE, add it when you profile the bricks.
+    """
+    def process_response(self, request, response):
+        timings = brick_profiler.request_timings()
+
+        if timings:
+            metrics = [
+                '{name};desc="{count} queries, SQL {sql:.1f}ms, template {tpl:.1f}ms";'
+                'dur={wall:.1f}'.format(
+                    name=_INVALID_TOKEN_CHARS.sub('_', timing.brick_id),
+                    count=timing.queries_count,
+                    sql=timing.sql_time,
+                    tpl=timing.template_time,
+                    wall=timing.wall_time,
+                )
+                for timing in timings
+            ]
+
+            server_timing = response.get('Server-Timing')
+            if server_timing:
+                metrics.insert(0, server_timing)
+
+            response['Server-Timing'] = ', '.join(metrics)
+
+        return response
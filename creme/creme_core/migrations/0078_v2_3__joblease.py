@@ -0,0 +1,26 @@
+from django.db import migrations, models
+from django.db.models.deletion import CASCADE
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('creme_core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobLease',
+            fields=[
+                (
+                    'job',
+                    models.OneToOneField(
+                        to='creme_core.Job', primary_key=True, serialize=False,
+                        on_delete=CASCADE, related_name='lease',
+                    )
+                ),
+                ('owner', models.CharField(max_length=100)),
+                ('heartbeat', models.DateTimeField()),
+                ('expiry', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('creme_core', '0078_v2_3__joblease'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='fileref',
+            name='filedata',
+            field=models.FileField(max_length=200, db_index=True, upload_to=''),
+        ),
+    ]
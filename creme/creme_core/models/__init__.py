@@ -31,7 +31,13 @@ from .header_filter import HeaderFilter  # NOQA
 from .history import HistoryConfigItem, HistoryLine  # NOQA
 from .i18n import Language  # NOQA
 from .imprint import Imprint  # NOQA
-from .job import EntityJobResult, Job, JobResult, MassImportJobResult  # NOQA
+from .job import (  # NOQA
+    EntityJobResult,
+    Job,
+    JobLease,
+    JobResult,
+    MassImportJobResult,
+)
 from .lock import Mutex, MutexAutoLock  # NOQA
 from .relation import Relation, RelationType, SemiFixedRelationType  # NOQA
 from .reminder import DateReminder  # NOQA
@@ -19,7 +19,7 @@
 ################################################################################
 
 import logging
-from typing import Iterable, Type, Union
+from typing import Iterable, List, Type, Union
 
 from django.contrib.contenttypes.models import ContentType
 from django.db import IntegrityError, models
@@ -140,6 +140,56 @@ class CremePropertyManager(models.Manager):
 
         return count
 
+    def safe_bulk_create(self,
+                         properties: Iterable['CremeProperty'],
+                         check_existing: bool = True) -> List['CremeProperty']:
+        """Create several CremeProperties with a constant number of queries,
+        by taking care of the UNIQUE constraint on ('type', 'creme_entity').
+
+        Unlike 'safe_multi_save()', the signal "post_save" is not sent for
+        each instance ; the signal "creme_core.signals.post_bulk_create" is
+        sent once, with all the created instances (see the creation of
+        HistoryLines).
+
+        @param properties: An iterable of CremeProperties (not save yet).
+        @param check_existing: Perform a query to check existing CremeProperties.
+               You can pass False for newly created instances in order to avoid a query.
+        @return: The created CremeProperties.
+        """
+        unique_props = {
+            (prop.type_id, prop.creme_entity_id): prop
+            for prop in properties
+        }
+
+        if not unique_props:
+            return []
+
+        if check_existing:
+            for prop_sig in self.filter(
+                type__in={type_id for type_id, __ in unique_props.keys()},
+                creme_entity__in={entity_id for __, entity_id in unique_props.keys()},
+            ).values_list('type', 'creme_entity'):
+                unique_props.pop(prop_sig, None)
+
+            if not unique_props:
+                return []
+
+        created = [*unique_props.values()]
+
+        try:
+            with atomic():
+                self.bulk_create(created)
+        except IntegrityError:
+            # Concurrent creations ; the CremeProperties are saved one by one.
+            logger.exception('Avoid a CremeProperty duplicate in safe_bulk_create() ?!')
+            self.safe_multi_save(created, check_existing=False)
+
+            return [prop for prop in created if prop.pk is not None]
+
+        signals.post_bulk_create.send(sender=self.model, instances=created)
+
+        return created
+
 
 class CremePropertyType(CremeModel):
     id = models.CharField(primary_key=True, max_length=100)
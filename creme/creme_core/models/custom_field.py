@@ -21,7 +21,7 @@
 import uuid
 # import warnings
 from collections import OrderedDict, defaultdict
-from typing import Any, DefaultDict, Dict, Iterable, Type
+from typing import Any, DefaultDict, Dict, Iterable, Sequence, Type
 
 from django import forms
 from django.core.validators import EMPTY_VALUES
@@ -32,6 +32,7 @@ from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
 
 from ..global_info import get_per_request_cache
+from ..signals import post_bulk_create
 from ..utils.content_type import as_ctype
 from .base import CremeModel
 from .entity import CremeEntity
@@ -201,6 +202,26 @@ class CustomFieldValue(CremeModel):
     def get_related_name(cls):
         return cls.__name__.lower()
 
+    @classmethod
+    def _bulk_clone(cls,
+                    cvalues: Sequence['CustomFieldValue'],
+                    clones: Dict[int, CremeEntity]) -> None:
+        """Copy some values to other entities, with one query.
+        @param cvalues: Instances of <cls>.
+        @param clones: Dictionary {ID of source entity: cloned entity}.
+        """
+        value_attname = cls._meta.get_field('value').attname
+
+        new_cvalues = [
+            cls(
+                custom_field_id=cvalue.custom_field_id,
+                entity=clones[cvalue.entity_id],
+                **{value_attname: getattr(cvalue, value_attname)}
+            ) for cvalue in cvalues
+        ]
+        cls.objects.bulk_create(new_cvalues)
+        post_bulk_create.send(sender=cls, instances=new_cvalues)
+
     # @staticmethod
     # def delete_all(entity):
     #     warnings.warn(
@@ -524,6 +545,45 @@ class CustomFieldMultiEnum(CustomFieldValue):
     def _set_formfield_value(self, field):
         field.initial = self.value.all().values_list('id', flat=True)
 
+    @classmethod
+    def _bulk_clone(cls, cvalues, clones):
+        value_field = cls._meta.get_field('value')
+        through = value_field.remote_field.through
+        cvalue_fk_attname = f'{value_field.m2m_field_name()}_id'
+        enum_fk_attname = f'{value_field.m2m_reverse_field_name()}_id'
+
+        enum_ids = defaultdict(list)
+        for cvalue_id, enum_id in through.objects.filter(
+            **{f'{cvalue_fk_attname}__in': [cvalue.id for cvalue in cvalues]}
+        ).values_list(cvalue_fk_attname, enum_fk_attname):
+            enum_ids[cvalue_id].append(enum_id)
+
+        # NB: empty values are not copied.
+        new_cvalues = {
+            (cvalue.custom_field_id, clones[cvalue.entity_id].id): cvalue.id
+            for cvalue in cvalues
+            if enum_ids[cvalue.id]
+        }
+        if not new_cvalues:
+            return
+
+        new_instances = [
+            cls(custom_field_id=cfield_id, entity_id=entity_id)
+            for cfield_id, entity_id in new_cvalues.keys()
+        ]
+        cls.objects.bulk_create(new_instances)
+
+        # NB: the IDs are not retrieved by bulk_create() with some DB engines (MySQL, SQLite)
+        through.objects.bulk_create([
+            through(**{cvalue_fk_attname: new_cvalue_id, enum_fk_attname: enum_id})
+            for cfield_id, entity_id, new_cvalue_id in cls.objects.filter(
+                custom_field__in={cfield_id for cfield_id, __ in new_cvalues.keys()},
+                entity__in={entity_id for __, entity_id in new_cvalues.keys()},
+            ).values_list('custom_field', 'entity', 'id')
+            for enum_id in enum_ids[new_cvalues.get((cfield_id, entity_id))]
+        ])
+        post_bulk_create.send(sender=cls, instances=new_instances)
+
     def set_value_n_save(self, value):
         if not self.pk:
             self.save()  # M2M field need a pk
@@ -19,6 +19,7 @@
 ################################################################################
 
 import logging
+from collections import defaultdict
 from datetime import date, datetime, time
 from decimal import Decimal
 from functools import partial
@@ -62,7 +63,7 @@ from django.utils.translation import gettext_lazy as _
 from django.utils.translation import pgettext
 
 from ..global_info import get_global_info, set_global_info
-from ..signals import pre_merge_related
+from ..signals import post_bulk_create, post_bulk_update, pre_merge_related
 from ..utils.dates import (
     date_from_ISO8601,
     date_to_ISO8601,
@@ -371,6 +372,14 @@ class _HLTEntityCreation(_HistoryLineType):
         # python object, multiple save() will not generate several
         # HistoryLine objects.
 
+    @classmethod
+    def bulk_create_lines(cls, entities: Sequence[CremeEntity]) -> None:
+        "Create the lines of several new entities with one query (see CremeEntity.bulk_clone())."
+        HistoryLine._bulk_create([
+            HistoryLine._build_line_4_instance(entity, cls.type_id, date=entity.created)
+            for entity in entities
+        ])
+
 
 @TYPES_MAP(TYPE_EDITION)
 class _HLTEntityEdition(_HistoryLineType):
@@ -421,6 +430,20 @@ class _HLTEntityTrash(_HistoryLineType):
                 ),
             )
 
+    @classmethod
+    def bulk_create_lines(cls, entities: Sequence[CremeEntity]) -> None:
+        """Create the lines of several entities which have been sent to the
+        trash (or restored) with a few queries (see the signal "post_bulk_update").
+        @param entities: Entities which field "is_deleted" has been modified.
+        """
+        HistoryLine._bulk_create([
+            HistoryLine._build_line_4_instance(
+                entity, cls.type_id, date=entity.modified, modifs=[entity.is_deleted],
+            )
+            for entity in entities
+            if not getattr(entity, '_hline_disabled', False)
+        ])
+
     def verbose_modifications(self, modifications, entity_ctype, user):
         if modifications[0]:
             yield gettext('Sent to the trash')
@@ -464,6 +487,17 @@ class _HLTPropertyCreation(_HistoryLineType):
             prop.creme_entity, cls.type_id, modifs=[prop.type_id],
         )
 
+    @classmethod
+    def bulk_create_lines(cls, properties: Sequence[CremeProperty]) -> None:
+        """Create the lines of several new CremeProperties with one query
+        (see CremePropertyManager.safe_bulk_create()).
+        """
+        HistoryLine._bulk_create([
+            HistoryLine._build_line_4_instance(
+                prop.creme_entity, cls.type_id, modifs=[prop.type_id],
+            ) for prop in properties
+        ])
+
     def verbose_modifications(self, modifications, entity_ctype, user):
         ptype_id = modifications[0]
 
@@ -519,6 +553,108 @@ class _HLTRelation(_HistoryLineType):
                 _HLTSymRelation, relation.created,
             )
 
+    @classmethod
+    def bulk_create_lines(cls, relations: Sequence[Relation]) -> None:
+        """Create the lines of several new Relations with a few queries
+        (see RelationManager.safe_bulk_create()).
+        @param relations: Created Relations, with their symmetrical instances.
+        """
+        if not HistoryLine.ENABLED:
+            return
+
+        # Entities (the instances which are not cached, in the Relations or
+        # their symmetrical instances, are retrieved in one query)
+        entities: Dict[int, CremeEntity] = {}
+        is_subject_cached = Relation.subject_entity.is_cached
+        is_object_cached = Relation.object_entity.is_cached
+        for relation in relations:
+            if is_subject_cached(relation):
+                entities[relation.subject_entity_id] = relation.subject_entity
+            if is_object_cached(relation):
+                entities[relation.object_entity_id] = relation.object_entity
+
+        relations = [
+            relation
+            for relation in relations
+            if '-subject_' in relation.type_id
+            and not getattr(relation, '_hline_disabled', False)
+            and not getattr(relation.symmetric_relation, '_hline_disabled', False)
+        ]
+        if not relations:
+            return
+
+        missing_ids = {
+            entity_id
+            for relation in relations
+            for entity_id in (relation.subject_entity_id, relation.object_entity_id)
+        }.difference(entities.keys())
+        if missing_ids:
+            entities.update(CremeEntity.objects.in_bulk(missing_ids))
+
+        CremeEntity.populate_real_entities([
+            entity for entity in entities.values() if type(entity) is CremeEntity
+        ])
+
+        user = get_global_info('user')
+        username = user.username if user else ''
+
+        def build_lines(relation, related_ids=(None, None)):
+            subject = entities[relation.subject_entity_id].get_real_entity()
+            obj     = entities[relation.object_entity_id].get_real_entity()
+            build_line = partial(HistoryLine, date=relation.created, username=username)
+
+            return (
+                build_line(
+                    entity=subject,
+                    entity_ctype_id=subject.entity_type_id,
+                    entity_owner_id=subject.user_id,
+                    type=cls.type_id,
+                    value=HistoryLine._encode_attrs(
+                        subject, modifs=[relation.type_id], related_line_id=related_ids[0],
+                    ),
+                ),
+                build_line(
+                    entity=obj,
+                    entity_ctype_id=obj.entity_type_id,
+                    entity_owner_id=obj.user_id,
+                    type=_HLTSymRelation.type_id,
+                    value=HistoryLine._encode_attrs(
+                        obj,
+                        modifs=[relation.symmetric_relation.type_id],
+                        related_line_id=related_ids[1],
+                    ),
+                ),
+            )
+
+        lines_pairs = [build_lines(relation) for relation in relations]
+        lines = [line for pair in lines_pairs for line in pair]
+        HistoryLine.objects.bulk_create(lines)
+
+        # NB: the IDs are not retrieved by bulk_create() with some DB engines
+        #     (MySQL, SQLite) ; the lines which have the same entity, type,
+        #     date & value are interchangeable.
+        if any(line.id is None for line in lines):
+            line_ids = defaultdict(list)
+            for line_id, entity_id, line_type, line_date, value in HistoryLine.objects.filter(
+                date__in={line.date for line in lines},
+                type__in=(cls.type_id, _HLTSymRelation.type_id),
+                entity__in={line.entity_id for line in lines},
+            ).order_by('-id').values_list('id', 'entity', 'type', 'date', 'value'):
+                line_ids[(entity_id, line_type, line_date, value)].append(line_id)
+
+            for line in lines:
+                line.id = line_ids[(line.entity_id, line.type, line.date, line.value)].pop()
+
+        # The lines reference each other
+        for relation, (line, sym_line) in zip(relations, lines_pairs):
+            line.value, sym_line.value = (
+                new_line.value
+                for new_line in build_lines(relation, related_ids=(sym_line.id, line.id))
+            )
+
+        HistoryLine.objects.bulk_update(lines, ['value'])
+        post_bulk_create.send(sender=HistoryLine, instances=lines)
+
     def verbose_modifications(self, modifications, entity_ctype, user):
         rtype_id = modifications[0]
 
@@ -572,6 +708,16 @@ class _HLTAuxCreation(_HistoryLineType):
             modifs=cls._build_modifs(related),
         )
 
+    @classmethod
+    def bulk_create_lines(cls, instances: Sequence[Model]) -> None:
+        "Create the lines of several new auxiliary instances with one query."
+        HistoryLine._bulk_create([
+            HistoryLine._build_line_4_instance(
+                related.get_related_entity(), cls.type_id,
+                modifs=cls._build_modifs(related),
+            ) for related in instances
+        ])
+
     def verbose_modifications(self, modifications, entity_ctype, user):
         # TODO: use aux_id to display an up-to-date value ??
         ct_id, aux_id, str_obj = modifications
@@ -903,10 +1049,26 @@ class HistoryLine(Model):
         @param modifs: List of tuples containing JSONifiable values.
         @param related_line_id: HistoryLine.id.
         """
+        line = cls._build_line_4_instance(
+            instance, ltype, date=date, modifs=modifs, related_line_id=related_line_id,
+        )
+        line.save(force_insert=True)
+
+        return line
+
+    @classmethod
+    def _build_line_4_instance(
+            cls,
+            instance,
+            ltype: int,
+            date=None,
+            modifs=(),
+            related_line_id=None) -> 'HistoryLine':
+        "Build an instance (not saved) ; see _create_line_4_instance()."
         kwargs = {
             'entity': instance,
-            'entity_ctype': instance.entity_type,
-            'entity_owner': instance.user,
+            'entity_ctype_id': instance.entity_type_id,
+            'entity_owner_id': instance.user_id,
             'type': ltype,
             'value': cls._encode_attrs(
                 instance,
@@ -918,7 +1080,22 @@ class HistoryLine(Model):
         if date:
             kwargs['date'] = date
 
-        return cls.objects.create(**kwargs)
+        return cls(**kwargs)
+
+    @classmethod
+    def _bulk_create(cls, lines: Sequence['HistoryLine']) -> None:
+        """Save several new lines with one query ; the signal
+        "creme_core.signals.post_bulk_create" is sent.
+        """
+        if cls.ENABLED and lines:
+            user = get_global_info('user')
+            username = user.username if user else ''
+
+            for line in lines:
+                line.username = username
+
+            cls.objects.bulk_create(lines)
+            post_bulk_create.send(sender=cls, instances=lines)
 
     def save(self, *args, **kwargs):
         if self.ENABLED:
@@ -1001,6 +1178,47 @@ def _log_creation_edition(sender, instance, created, **kwargs):
         )
 
 
+@receiver(post_bulk_create, sender=Relation)
+def _log_relations_creation(sender, instances, **kwargs):
+    try:
+        _HLTRelation.bulk_create_lines(instances)
+    except Exception:
+        logger.exception(
+            'Error in _log_relations_creation() ; HistoryLine may not be created.'
+        )
+
+
+@receiver(post_bulk_create)
+def _log_bulk_creation(sender, instances, **kwargs):
+    instances = [
+        instance for instance in instances
+        if not getattr(instance, '_hline_disabled', False)  # See HistoryLine.disable
+    ]
+
+    try:
+        if issubclass(sender, CremeProperty):
+            _HLTPropertyCreation.bulk_create_lines(instances)
+        elif hasattr(sender, 'get_related_entity'):
+            _HLTAuxCreation.bulk_create_lines(instances)
+        elif issubclass(sender, CremeEntity):
+            _HLTEntityCreation.bulk_create_lines(instances)
+    except Exception:
+        logger.exception(
+            'Error in _log_bulk_creation() ; HistoryLine may not be created.'
+        )
+
+
+@receiver(post_bulk_update)
+def _log_bulk_trash(sender, instances, update_fields, **kwargs):
+    if issubclass(sender, CremeEntity) and 'is_deleted' in update_fields:
+        try:
+            _HLTEntityTrash.bulk_create_lines(instances)
+        except Exception:
+            logger.exception(
+                'Error in _log_bulk_trash() ; HistoryLine may not be created.'
+            )
+
+
 def _get_deleted_entity_ids() -> set:
     del_ids = get_global_info('deleted_entity_ids')
 
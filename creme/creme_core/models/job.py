@@ -2,7 +2,7 @@
 
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2016-2020  Hybird
+#    Copyright (C) 2016-2021  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -311,6 +311,35 @@ class Job(models.Model):
         self.type_id = value.id
 
 
+class JobLease(models.Model):
+    """Ownership of a running Job by a job manager, when several job managers
+    share the jobs (see settings.JOBMANAGER_CLUSTERED).
+
+    The owner (i.e. a node) extends the expiration date regularly while the
+    Job is running (heartbeat) ; a lease which has expired means that its
+    owner is dead, so another node can take the Job.
+    """
+    job = models.OneToOneField(
+        Job, primary_key=True, on_delete=models.CASCADE, related_name='lease',
+    )
+    owner = models.CharField(max_length=100)
+    heartbeat = models.DateTimeField()
+    expiry = models.DateTimeField(db_index=True)
+
+    class Meta:
+        app_label = 'creme_core'
+
+    def __repr__(self):
+        return (
+            f'JobLease('
+            f'job={self.job_id}, '
+            f'owner="{self.owner}", '
+            f'heartbeat={self.heartbeat}, '
+            f'expiry={self.expiry}'
+            f')'
+        )
+
+
 class BaseJobResult(models.Model):
     job          = models.ForeignKey(Job, on_delete=models.CASCADE)
     raw_messages = models.TextField(null=True)  # TODO: use a JSONField ?
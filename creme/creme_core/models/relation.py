@@ -21,7 +21,7 @@
 import logging
 # import warnings
 from collections import defaultdict
-from typing import Iterable, Tuple, Type, Union
+from typing import Dict, Iterable, List, Tuple, Type, Union
 
 from django.contrib.contenttypes.models import ContentType
 from django.db import IntegrityError, models
@@ -32,7 +32,8 @@ from django.http import Http404
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
 
-from ..signals import pre_merge_related
+from ..signals import post_bulk_create, pre_merge_related
+from ..utils import chunktools
 from ..utils.content_type import as_ctype
 from . import fields as creme_fields
 from .base import CremeModel
@@ -164,6 +165,152 @@ class RelationManager(models.Manager):
 
         return count
 
+    @staticmethod
+    def _signatures_q(signatures: Iterable[Tuple[str, int, int]]) -> Q:
+        "Build a Q retrieving the Relations with the given (type, subject, object) signatures."
+        # NB: the signatures are grouped by (type, object) ; so, when we link
+        #     many entities to the same one (the most common case), the
+        #     condition is just a "subject IN (...)".
+        subject_ids_per_key: Dict[Tuple[str, int], List[int]] = defaultdict(list)
+
+        for rtype_id, subject_id, object_id in signatures:
+            subject_ids_per_key[(rtype_id, object_id)].append(subject_id)
+
+        signatures_q = Q()
+        for (rtype_id, object_id), subject_ids in subject_ids_per_key.items():
+            signatures_q |= Q(
+                type_id=rtype_id,
+                object_entity_id=object_id,
+                subject_entity_id__in=subject_ids,
+            )
+
+        return signatures_q
+
+    def _bulk_create_batch(self,
+                           relations: List['Relation'],
+                           symmetric_type_ids: Dict[str, str]) -> None:
+        model = self.model
+        sym_relations = [
+            model(
+                user_id=relation.user_id,
+                type_id=symmetric_type_ids[relation.type_id],
+                subject_entity_id=relation.object_entity_id,
+                object_entity_id=relation.subject_entity_id,
+                created=relation.created,
+            ) for relation in relations
+        ]
+        all_relations = [*relations, *sym_relations]
+
+        self.bulk_create(all_relations)
+
+        # NB: the IDs are not retrieved by bulk_create() with some DB engines (MySQL, SQLite)
+        if any(relation.pk is None for relation in all_relations):
+            ids = {
+                (rtype_id, subject_id, object_id): relation_id
+                for relation_id, rtype_id, subject_id, object_id in self.filter(
+                    self._signatures_q(
+                        (r.type_id, r.subject_entity_id, r.object_entity_id)
+                        for r in all_relations
+                    )
+                ).values_list('id', 'type', 'subject_entity', 'object_entity')
+            }
+
+            for relation in all_relations:
+                relation.pk = ids[
+                    (relation.type_id, relation.subject_entity_id, relation.object_entity_id)
+                ]
+
+        for relation, sym_relation in zip(relations, sym_relations):
+            relation.symmetric_relation = sym_relation
+            sym_relation.symmetric_relation = relation
+
+        self.bulk_update(all_relations, ['symmetric_relation'])
+
+    def safe_bulk_create(self,
+                         relations: Iterable['Relation'],
+                         check_existing: bool = True,
+                         batch_size: int = 256) -> List['Relation']:
+        """Create several Relations (& their symmetrical instances) with a
+        constant number of queries per batch, by taking care of the UNIQUE
+        constraint on ('type', 'subject_entity', 'object_entity').
+
+        Unlike 'safe_multi_save()', the signal "post_save" is not sent for
+        each instance ; the signal "creme_core.signals.post_bulk_create" is
+        sent once, with all the created instances (the symmetrical ones
+        included), so the listeners can process them in batch (see the
+        creation of HistoryLines).
+
+        @param relations: An iterable of Relations (not save yet).
+        @param check_existing: Perform a query per batch to check existing Relations.
+               You can pass False for newly created instances in order to avoid a query.
+        @param batch_size: Number of Relations created with the same queries.
+        @return: The created Relations (in the order of the argument "relations").
+                 NB: the symmetrical instances are not returned.
+        """
+        # Group the relations by their unique "signature" (type, subject, object)
+        unique_relations: Dict[Tuple[str, int, int], Relation] = {}
+
+        for relation in relations:
+            unique_relations[(relation.type_id,
+                              relation.subject_entity_id,
+                              relation.object_entity_id,
+                             )] = relation
+
+        if not unique_relations:
+            return []
+
+        symmetric_type_ids = dict(
+            RelationType.objects.filter(
+                id__in={rtype_id for rtype_id, __, ___ in unique_relations.keys()},
+            ).values_list('id', 'symmetric_type_id')
+        )
+
+        # A Relation & its symmetrical instance cannot be both created.
+        for signature in [*unique_relations.keys()]:
+            rtype_id, subject_id, object_id = signature
+            sym_signature = (symmetric_type_ids[rtype_id], object_id, subject_id)
+
+            if signature in unique_relations and sym_signature != signature:
+                unique_relations.pop(sym_signature, None)
+
+        created: List[Relation] = []
+        bulk_created: List[Relation] = []
+
+        with atomic():
+            for signatures in chunktools.iter_as_chunk(unique_relations.keys(), batch_size):
+                if check_existing:
+                    for rel_sig in self.filter(
+                        self._signatures_q(signatures)
+                    ).values_list('type', 'subject_entity', 'object_entity'):
+                        signatures.remove(rel_sig)
+
+                batch = [unique_relations[sig] for sig in signatures]
+                if not batch:
+                    continue
+
+                try:
+                    with atomic():
+                        self._bulk_create_batch(batch, symmetric_type_ids)
+                except IntegrityError:
+                    # Concurrent creations ; the Relations are saved one by one.
+                    logger.exception('Avoid a Relation duplicate in safe_bulk_create() ?!')
+                    self.safe_multi_save(batch)
+                    created.extend(relation for relation in batch if relation.pk is not None)
+                else:
+                    created.extend(batch)
+                    bulk_created.extend(batch)
+
+            if bulk_created:
+                post_bulk_create.send(
+                    sender=self.model,
+                    instances=[
+                        *bulk_created,
+                        *(relation.symmetric_relation for relation in bulk_created),
+                    ],
+                )
+
+        return created
+
 
 class RelationType(CremeModel):
     """Type of Relations.
@@ -39,3 +39,15 @@ pre_replace_and_delete = Signal()
 pre_uninstall_flush = Signal()
 # Providing arguments: content_types, verbosity, stdout_write, stderr_write, style
 post_uninstall_flush = Signal()
+
+# Signal sent once after the creation of several instances with a few queries
+# (the signal "post_save" is not sent for each instance) ;
+# <sender> is the model (eg: see RelationManager.safe_bulk_create()).
+# Providing argument: instances
+post_bulk_create = Signal()
+
+# Signal sent once after the update of several instances with a few queries
+# (the signal "post_save" is not sent for each instance) ;
+# <sender> is the model (eg: see creme_core.core.entity_deletion.EntitiesDeletor).
+# Providing arguments: instances, update_fields
+post_bulk_update = Signal()
@@ -815,6 +815,10 @@ creme.bricks.Brick = creme.component.Component.sub({
         return this.isBound() && (this._element.attr('data-brick-readonly') === 'true');
     },
 
+    isDeferred: function() {
+        return this.isBound() && this._element.is('.brick-deferred');
+    },
+
     reloadingInfo: function() {
         if (!this.isBound()) {
             return {};
@@ -924,6 +928,14 @@ creme.bricks.BricksReloader.prototype = {
         return this;
     },
 
+    deferredBricks: function() {
+        this._brickFilter = function(brick) {
+            return brick.isDeferred();
+        };
+
+        return this;
+    },
+
     sourceBrick: function(brick) {
         this.containerFromNode(brick._element);
         var src_deps = brick.dependencies();
@@ -1038,6 +1050,21 @@ creme.bricks.BricksReloader.prototype = {
 };
 
 
+/*
+ * The deferred bricks are rendered as placeholders with the page ; they are all
+ * loaded with one query, once the widgets of the page have been created.
+ */
+creme.bricks._deferredLoading = null;
+
+creme.bricks.loadDeferredBricks = function() {
+    if (creme.bricks._deferredLoading === null) {
+        creme.bricks._deferredLoading = setTimeout(function() {
+            creme.bricks._deferredLoading = null;
+            new creme.bricks.BricksReloader().deferredBricks().action().start();
+        }, 0);
+    }
+};
+
 creme.bricks.BrickLauncher = creme.widget.declare('brick', {
     _create: function(element, options, cb, sync, args) {
         var brick = this._brick = new creme.bricks.Brick();
@@ -1046,6 +1073,10 @@ creme.bricks.BrickLauncher = creme.widget.declare('brick', {
 
         element.addClass('widget-ready');
         brick.trigger('ready', [options]);
+
+        if (brick.isDeferred()) {
+            creme.bricks.loadDeferredBricks();
+        }
     },
 
     _destroy: function(element) {
@@ -1,6 +1,6 @@
 /*******************************************************************************
     Creme is a free/open-source Customer Relationship Management software
-    Copyright (C) 2016-2019  Hybird
+    Copyright (C) 2016-2021  Hybird
 
     This program is free software: you can redistribute it and/or modify
     it under the terms of the GNU Affero General Public License as published by
@@ -28,6 +28,8 @@ creme.jobs = {};
 creme.jobs.BaseJobsMonitor = creme.component.Component.sub({
     _init_: function(url) {
         this._url = url;  // URL for jobs information
+        this._progressUrl = null;  // URL for the published progress of the jobs (long-polling)
+        this._versions = {};  // Versions of the last received snapshots, by job ID
         this._onAllJobsFinishedCallBack = function() {};
     },
 
@@ -97,9 +99,64 @@ creme.jobs.BaseJobsMonitor = creme.component.Component.sub({
         return this;
     },
 
+    progressUrl: function(url) {
+        this._progressUrl = url;
+
+        return this;
+    },
+
     start: function() {
         var monitor = this;
 
+        // The jobs which have published their progress are updated with long-polling requests ;
+        // the other ones are updated with their information in the DB (see _fetchInfo()).
+        function _fetchProgress(element, job_ids) {
+            var versions = job_ids.filter(function(job_id) {
+                return monitor._versions[job_id] !== undefined;
+            }).map(function(job_id) {
+                return job_id + ':' + monitor._versions[job_id];
+            });
+
+            $.ajax({url: monitor._progressUrl + '?' + $.param({'id': job_ids, 'version': versions}),
+                    dataType: 'json',
+                    error: function(request, status, error) {
+                        _fetchInfo(element, job_ids, false);
+                    },
+                    success: function(data, status) {
+                        var running = false;
+                        var fallback_ids = [];
+
+                        job_ids.forEach(function (job_id, index, array) {
+                            var snapshot = data[job_id];
+
+                            if (Object.isNone(snapshot)) {
+                                fallback_ids.push(job_id);
+                                return;
+                            }
+
+                            if (Object.isString(snapshot)) {
+                                console.log('Server returned an error for job <', job_id, '> => ', snapshot);
+                                return;
+                            }
+
+                            monitor._versions[job_id] = snapshot['version'];
+
+                            if (monitor.decorate(element, job_id, snapshot['status'], 0, snapshot['progress'])) {
+                                running = true;
+                            }
+                        });
+
+                        if (fallback_ids.length) {
+                            _fetchInfo(element, fallback_ids, running);
+                        } else if (running) {
+                            _process();
+                        } else {
+                            monitor._onAllJobsFinishedCallBack();
+                        }
+                    }
+            });
+        }
+
         function _process() {
             var element = monitor.get_element();
             var job_ids = [];
@@ -116,6 +173,15 @@ creme.jobs.BaseJobsMonitor = creme.component.Component.sub({
                 }
             });
 
+            if (monitor._progressUrl && job_ids.length) {
+                _fetchProgress(element, job_ids);
+            } else {
+                _fetchInfo(element, job_ids, false);
+            }
+        }
+
+        // @param running: Boolean ; true means that some other jobs are still running.
+        function _fetchInfo(element, job_ids, running) {
             var uri = monitor._url;
             if (job_ids.length) {
                 uri += '?' + $.param({'id': job_ids});
@@ -129,7 +195,7 @@ creme.jobs.BaseJobsMonitor = creme.component.Component.sub({
                         error_panel.text(gettext('HTTP server error'));
                     },
                     success: function(data, status) {
-                        var alright = true;  // No error, all jobs are finished.
+                        var alright = !running;  // No error, all jobs are finished.
 
                         var error_panel = element.find('.global-error');
                         var error = data['error'];
@@ -212,6 +278,7 @@ creme.jobs.PopupJobWaitingController = creme.widget.declare('job-waiting-ctrl',
         element.addClass('widget-ready');
 
         new creme.jobs.JobsMonitor(element.attr('data-jobs-info-url'), element)
+                      .progressUrl(element.attr('data-jobs-progress-url'))
                       .onAllJobsFinished(function() {
                           close_button.hide();
                           terminate_button.show();
@@ -1,6 +1,6 @@
 /*******************************************************************************
     Creme is a free/open-source Customer Relationship Management software
-    Copyright (C) 2009-2019 Hybird
+    Copyright (C) 2009-2021 Hybird
 
     This program is free software: you can redistribute it and/or modify it under
     the terms of the GNU Affero General Public License as published by the Free
@@ -21,15 +21,81 @@
 
     var ListViewColumnFilterBuilders = creme.component.FactoryRegistry.sub({
         _build_select: function(element, options, list) {
-            new creme.component.Chosen().activate(element);
+            var self = this;
+            var chosen = new creme.component.Chosen();
+            var value = element.val();
+
+            chosen.activate(element);
+
             this._element = element.bind('change', function(e) {
                 e.stopPropagation();
-                list.submitState(creme.ajax.serializeFormAsDict($(this)));
+
+                // The option "More…" retrieves the next page of choices.
+                var more = $(this).find('option.search-more:selected');
+
+                if (more.length > 0) {
+                    $(this).val(value);
+                    self._loadSelectChoices($(this), more, chosen);
+                } else {
+                    list.submitState(creme.ajax.serializeFormAsDict($(this)));
+                }
             });
 
             return element;
         },
 
+        _loadSelectChoices: function(element, more, chosen) {
+            var offset = parseInt(more.attr('data-offset'));
+            var limit = parseInt(more.attr('data-limit'));
+            var queryOptions = {
+                backend: {
+                    sync: false,
+                    dataType: 'json'
+                }
+            };
+
+            creme.ajax.query(element.attr('data-more-url'), queryOptions, {offset: offset, limit: limit})
+                      .onDone(function(event, data) {
+                          data = Object.isString(data) ? JSON.parse(data) : data;
+
+                          data.choices.forEach(function(choice) {
+                              var value = String(choice.value);
+
+                              // NB: the selected choice can already be displayed.
+                              if (element.find('option').filter(function() {
+                                  return this.value === value;
+                              }).length > 0) {
+                                  return;
+                              }
+
+                              var option = $('<option>').attr('value', value).text(choice.label);
+
+                              if (choice.group) {
+                                  var group = element.find('optgroup').filter(function() {
+                                      return this.label === choice.group;
+                                  }).first();
+
+                                  if (group.length === 0) {
+                                      group = $('<optgroup>').attr('label', choice.group).insertBefore(more);
+                                  }
+
+                                  group.append(option);
+                              } else {
+                                  option.insertBefore(more);
+                              }
+                          });
+
+                          if (data.more) {
+                              more.attr('data-offset', offset + limit);
+                          } else {
+                              more.remove();
+                          }
+
+                          chosen.refresh();
+                       })
+                      .get();
+        },
+
         /* global creme_media_url */
         _build_daterange: function(element, options, list) {
             $(element).find('input').each(function() {
@@ -48,9 +48,10 @@ creme.lv_widget.DeleteSelectedAction = creme.component.Action.sub({
         var message = Object.isType(error, 'string') ? error : (error.message || gettext("Error"));
         var header = creme.ajax.localizedErrorMessage(data);
         var parser = new creme.utils.JSON();
+        var results;
 
         if (!Object.isEmpty(message) && parser.isJSON(message)) {
-            var results = parser.decode(message);
+            results = parser.decode(message);
             var removed_count = results.count - results.errors.length;
 
             header = '';
@@ -71,11 +72,20 @@ creme.lv_widget.DeleteSelectedAction = creme.component.Action.sub({
                                                  return '<li>' + item + '</li>';
                                               }).join('') +
                       '</ul>';
+
+            if (results.job) {
+                header += ' ' + gettext('The other entities are deleted in background.');
+            }
         }
 
         creme.dialogs.warning(message, {header: header})
                      .onClose(function() {
-                          list.reload();
+                          if (results && results.job) {
+                              creme.utils.goTo(results.job);
+                          } else {
+                              list.reload();
+                          }
+
                           self.fail();
                       })
                      .open();
@@ -101,7 +111,13 @@ creme.lv_widget.DeleteSelectedAction = creme.component.Action.sub({
                      self.cancel();
                   })
                  .onDone(function(event, data) {
-                     list.reload();
+                     // Many entities are deleted by a job => go to its page
+                     if (Object.isNone(data) === false && !Object.isEmpty(data.job)) {
+                         creme.utils.goTo(data.job);
+                     } else {
+                         list.reload();
+                     }
+
                      self.done();
                   })
                  .start();
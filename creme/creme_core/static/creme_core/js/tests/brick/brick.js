@@ -884,4 +884,44 @@ QUnit.test('creme.bricks.Brick.refresh (wildcard deps)', function(assert) {
     ], this.mockBackendUrlCalls('mock/brick/all/reload'));
 });
 
+QUnit.test('creme.bricks.Brick.isDeferred', function(assert) {
+    var brick = new creme.bricks.Brick();
+    equal(false, brick.isDeferred());
+
+    brick.bind($('<div class="brick" id="brick-A"></div>'));
+    equal(false, brick.isDeferred());
+
+    brick = new creme.bricks.Brick();
+    brick.bind($('<div class="brick brick-deferred" id="brick-B"></div>'));
+    equal(true, brick.isDeferred());
+});
+
+QUnit.test('creme.bricks.loadDeferredBricks', function(assert) {
+    var htmlA = '<div class="brick ui-creme-widget brick-deferred" widget="brick" id="brick-A"></div>';
+    var htmlB = '<div class="brick ui-creme-widget" widget="brick" id="brick-B"></div>';
+    var htmlC = '<div class="brick ui-creme-widget brick-deferred" widget="brick" id="brick-C"></div>';
+
+    this.setBrickReloadContent('brick-A', '<div class="brick ui-creme-widget" widget="brick" id="brick-A"></div>');
+    this.setBrickReloadContent('brick-C', '<div class="brick ui-creme-widget" widget="brick" id="brick-C"></div>');
+
+    creme.widget.create($(htmlA).appendTo(this.qunitFixture()));
+    creme.widget.create($(htmlB).appendTo(this.qunitFixture()));
+    creme.widget.create($(htmlC).appendTo(this.qunitFixture()));
+
+    // The deferred bricks are loaded with one query, after the creation of the widgets
+    deepEqual([], this.mockBackendUrlCalls('mock/brick/all/reload'));
+
+    stop(1);
+
+    setTimeout(function() {
+        deepEqual([
+            ['GET', {"brick_id": ["brick-A", "brick-C"], "extra_data": "{}"}]
+        ], this.mockBackendUrlCalls('mock/brick/all/reload'));
+
+        equal(false, $('#brick-A').creme().widget().brick().isDeferred());
+        equal(false, $('#brick-C').creme().widget().brick().isDeferred());
+        start();
+    }.bind(this), 100);
+});
+
 }(jQuery));
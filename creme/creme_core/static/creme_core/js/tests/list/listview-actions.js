@@ -261,6 +261,52 @@ QUnit.test('creme.listview.DeleteSelectedAction (partially allowed)', function(a
     ], this.mockBackendUrlCalls('mock/listview/reload'));
 });
 
+QUnit.test('creme.listview.DeleteSelectedAction (partially allowed, job)', function(assert) {
+    var list = this.createDefaultListView().controller();
+    var action = new creme.lv_widget.DeleteSelectedAction(list, {
+        url: 'mock/entity/delete/firstonly/job'
+    }).on(this.listviewActionListeners);
+
+    list.element().find('#selected_rows').val('1,2,3');
+
+    action.start();
+
+    this.assertOpenedDialog();
+    this.acceptConfirmDialog();
+
+    var header = ngettext('%d entity have been deleted.', '%d entities have been deleted.', 1).format(1) +
+                 ngettext(' %d entity cannot be deleted.', ' %d entities cannot be deleted.', 2).format(2) +
+                 ' ' + gettext('The other entities are deleted in background.');
+
+    this.assertOpenedAlertDialog(undefined, header);
+    this.closeDialog();
+
+    deepEqual([['fail']], this.mockListenerCalls('action-fail'));
+    deepEqual([], this.mockBackendUrlCalls('mock/listview/reload'));
+    deepEqual(['mock/job/12'], this.mockRedirectCalls());
+});
+
+QUnit.test('creme.listview.DeleteSelectedAction (ok, job)', function(assert) {
+    var list = this.createDefaultListView().controller();
+    var action = new creme.lv_widget.DeleteSelectedAction(list, {
+        url: 'mock/entity/delete/job'
+    }).on(this.listviewActionListeners);
+
+    list.element().find('#selected_rows').val('1,2,3');
+
+    action.start();
+
+    this.assertOpenedDialog();
+    this.acceptConfirmDialog();
+
+    deepEqual([
+        ['POST', {ids: '1,2,3'}]
+    ], this.mockBackendUrlCalls('mock/entity/delete/job'));
+    deepEqual([['done']], this.mockListenerCalls('action-done'));
+    deepEqual([], this.mockBackendUrlCalls('mock/listview/reload'));
+    deepEqual(['mock/job/12'], this.mockRedirectCalls());
+});
+
 QUnit.test('creme.listview.DeleteSelectedAction (ok)', function(assert) {
     var list = this.createDefaultListView().controller();
     var action = new creme.lv_widget.DeleteSelectedAction(list, {
@@ -682,6 +682,89 @@ QUnit.test('creme.listview.core (filter on <select> change)', function(assert) {
 });
 
 
+QUnit.test('creme.listview.core (load more choices of <select>)', function(assert) {
+    var element = $(this.createListViewHtml({
+        tableclasses: ['listview-standalone'],
+        reloadurl: 'mock/listview/reload',
+        columns: [this.createCheckAllColumnHtml(), {
+                title: '<th class="sorted lv-column sortable cl_lv">Name</th>',
+                search: '<th class="sorted lv-column sortable text">' +
+                            '<select name="search-regular_field-name" data-lv-search-widget="select" title="Name" data-more-url="mock/enumerable/choices">' +
+                                 '<option value="opt-A">A</option>' +
+                                 '<option value="opt-B" selected>B</option>' +
+                                 '<option value="" class="search-more" data-offset="2" data-limit="2">More…</option>' +
+                            '</select>' +
+                        '</th>'
+            }
+        ]
+    })).appendTo(this.qunitFixture());
+    var columnSearch = element.find('table:first .lv-search-header .lv-column select');
+
+    this.setMockBackendGET({
+        'mock/enumerable/choices': this.backend.responseJSON(200, {
+            choices: [{value: 'opt-C', label: 'C'}, {value: 'opt-D', label: 'D', group: 'Group'}],
+            more: true
+        })
+    });
+
+    creme.widget.create(element);
+
+    columnSearch.find('option.search-more').prop('selected', true);
+    columnSearch.trigger('change');
+
+    deepEqual([], this.mockBackendUrlCalls('mock/listview/reload'));
+    deepEqual([
+        ['GET', {offset: 2, limit: 2}]
+    ], this.mockBackendUrlCalls('mock/enumerable/choices'));
+
+    equal('opt-B', columnSearch.val());
+    deepEqual(['opt-A', 'opt-B', 'opt-C', ''], columnSearch.children('option').map(function() {
+        return this.value;
+    }).get());
+    deepEqual(['opt-D'], columnSearch.find('optgroup[label="Group"] option').map(function() {
+        return this.value;
+    }).get());
+    equal('4', columnSearch.find('option.search-more').attr('data-offset'));
+
+    this.setMockBackendGET({
+        'mock/enumerable/choices': this.backend.responseJSON(200, {
+            choices: [{value: 'opt-B', label: 'B'}, {value: 'opt-E', label: 'E'}],
+            more: false
+        })
+    });
+
+    columnSearch.find('option.search-more').prop('selected', true);
+    columnSearch.trigger('change');
+
+    deepEqual([
+        ['GET', {offset: 2, limit: 2}],
+        ['GET', {offset: 4, limit: 2}]
+    ], this.mockBackendUrlCalls('mock/enumerable/choices'));
+
+    equal('opt-B', columnSearch.val());
+    deepEqual(['opt-A', 'opt-B', 'opt-C', 'opt-E'], columnSearch.children('option').map(function() {
+        return this.value;
+    }).get());
+    equal(0, columnSearch.find('option.search-more').length);
+
+    columnSearch.trigger('change');
+
+    deepEqual([
+        ['POST', {
+            ct_id: ['67'],
+            q_filter: ['{}'],
+            content: 1,
+            rows: ['10'],
+            selected_rows: [''],
+            selection: ['multiple'],
+            sort_key: ['regular_field-name'],
+            sort_order: ['ASC'],
+            'search-regular_field-name': ['opt-B']
+        }]
+    ], this.mockBackendUrlCalls('mock/listview/reload'));
+});
+
+
 QUnit.test('creme.listview.core (unknown search widget)', function(assert) {
     var element = $(this.createListViewHtml({
         tableclasses: ['listview-standalone'],
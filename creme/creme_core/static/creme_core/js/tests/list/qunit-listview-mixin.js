@@ -49,6 +49,24 @@
                         })
                     });
                 },
+                'mock/entity/delete/job': function(url, data, options) {
+                    var ids = (data.ids || '').split(',');
+
+                    return backend.responseJSON(200, {
+                        count: ids.length, errors: [], job: 'mock/job/12'
+                    });
+                },
+                'mock/entity/delete/firstonly/job': function(url, data, options) {
+                    var ids = (data.ids || '').split(',');
+
+                    return backend.responseJSON(400, {
+                        count: ids.length,
+                        errors: ids.slice(1).map(function(id) {
+                            return id + ' cannot be deleted';
+                        }),
+                        job: 'mock/job/12'
+                    });
+                },
                 'mock/entity/edit': function(url, data, options) {
                     var value = data.edit[0];
 
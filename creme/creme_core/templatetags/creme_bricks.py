@@ -28,7 +28,12 @@ from django.utils.translation import gettext_lazy
 
 from ..core.entity_cell import EntityCellRegularField
 from ..core.sorter import cell_sorter_registry
-from ..gui.bricks import Brick, BricksManager, brick_registry
+from ..gui.bricks import (
+    Brick,
+    BricksManager,
+    brick_registry,
+    get_brick_render_function,
+)
 from ..gui.bulk_update import bulk_update_registry
 from ..gui.pager import PagerContext
 from ..utils.media import get_current_theme_from_context
@@ -948,9 +953,19 @@ def brick_display(context, *bricks, **kwargs):
     Possible values are:
        - 'detail'  => detailview_display() (default value)
        - 'home'    => home_display()
+
+    The slow bricks (see the attribute 'Brick.deferred') can be rendered as
+    placeholders, which are loaded by the client once the page is displayed,
+    with the keyword argument 'deferred':
+
+        {% brick_display my_brick1 my_brick2 deferred=True %}
+
+    Use it only in pages where the reloading view can render these bricks
+    (like detail-views & home).
     """
     context_dict = context.flatten()
     render_type = kwargs.get('render', 'detail')
+    allow_deferred = kwargs.get('deferred', False)
 
     try:
         brick_render_method = _DISPLAY_METHODS[render_type]
@@ -962,7 +977,10 @@ def brick_display(context, *bricks, **kwargs):
         ) from e
 
     def render(brick):
-        fun = getattr(brick, brick_render_method, None)
+        if allow_deferred and brick.deferred:
+            return brick.deferred_display({**context_dict})
+
+        fun = get_brick_render_function(brick, brick_render_method)
 
         if fun:
             # NB: the context is copied is order to a 'fresh' one for each brick,
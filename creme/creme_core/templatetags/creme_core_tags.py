@@ -31,12 +31,14 @@ from django.template import Node as TemplateNode
 from django.template import Template, TemplateSyntaxError
 from django.template.defaulttags import TemplateLiteral
 from django.template.library import token_kwargs
+from django.urls import reverse
 from django.utils.encoding import force_str  # force_text
 from django.utils.html import escape, format_html_join
 from django.utils.safestring import mark_safe
 
 from mediagenerator.generators.bundles.utils import _render_include_media
 
+from ..core.job import job_progress_channel
 from ..gui.field_printers import field_printers_registry
 from ..http import is_ajax
 from ..models import CremeEntity, Relation
@@ -399,6 +401,17 @@ def url_join(*args, **params):
     return mark_safe(uri)
 
 
+@register.simple_tag
+def jobs_progress_url():
+    """Get the URL of the long-polling view for the progress of the jobs ;
+    it's an empty string when the progress channel is disabled (see the
+    setting JOBS_PROGRESS_CACHE), so the browsers do not send useless requests.
+
+    {% jobs_progress_url as progress_url %}
+    """
+    return reverse('creme_core__jobs_progress') if job_progress_channel.enabled else ''
+
+
 # TAG : "templatize"------------------------------------------------------------
 _templatize_re = compile_re(r'(.*?) as (\w+)')
 
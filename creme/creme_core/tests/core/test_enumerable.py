@@ -2,12 +2,19 @@
 
 from functools import partial
 
+from django.core.cache import caches
 from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.test.utils import override_settings
 from django.utils.translation import gettext as _
 
 from creme.creme_core import enumerators
 from creme.creme_core.core.entity_filter import EF_CREDENTIALS
-from creme.creme_core.core.enumerable import Enumerator, _EnumerableRegistry
+from creme.creme_core.core.enumerable import (
+    EnumerableVersions,
+    Enumerator,
+    _EnumerableRegistry,
+)
 from creme.creme_core.models import (
     CremeUser,
     EntityFilter,
@@ -18,6 +25,7 @@ from creme.creme_core.models import (
     FakeImageCategory,
     FakeOrganisation,
     FakeReport,
+    FakeSector,
     Language,
 )
 from creme.creme_core.models.fields import (
@@ -374,3 +382,213 @@ class EnumerableTestCase(CremeTestCase):
         self.assertFalse(
             [c for c in choices if c['value'] == efilter3.id]
         )
+
+    def test_filter_choices_qs(self):
+        user = self.login()
+        registry = _EnumerableRegistry()
+
+        create_civ = FakeCivility.objects.create
+        civ1 = create_civ(title='Kaiser', shortcut='Ks.')
+        civ2 = create_civ(title='Kaiserin', shortcut='Ksin.')
+        civ3 = create_civ(title='Shogun', shortcut='Sh.')
+
+        enum = registry.enumerator_by_fieldname(model=FakeContact, field_name='civility')
+        self.assertListEqual([FakeCivility], enum.cache_dependencies())
+
+        self.assertListEqual(
+            [
+                {'value': civ1.id, 'label': civ1.title},
+                {'value': civ2.id, 'label': civ2.title},
+            ],
+            enum.filter_choices(user, term='kaiser'),
+        )
+        self.assertListEqual(
+            [{'value': civ3.id, 'label': civ3.title}],
+            enum.filter_choices(user, term='SH.'),  # Shortcut is searched too
+        )
+        self.assertListEqual(
+            [{'value': civ2.id, 'label': civ2.title}],
+            enum.filter_choices(user, term='kaiser', limit=1, offset=1),
+        )
+        self.assertListEqual(
+            [
+                {'value': civ1.id, 'label': civ1.title},
+                {'value': civ3.id, 'label': civ3.title},
+            ],
+            enum.filter_choices(user, values=[str(civ3.id), civ1.id, 'invalid']),
+        )
+        self.assertListEqual([], enum.filter_choices(user, values=[]))
+
+        # Pagination
+        all_choices = enum.choices(user)
+        self.assertGreater(len(all_choices), 3)
+        self.assertListEqual(
+            all_choices,
+            [
+                *enum.filter_choices(user, limit=2),
+                *enum.filter_choices(user, limit=2, offset=2),
+                *enum.filter_choices(user, offset=4),
+            ],
+        )
+
+    def test_filter_choices_python(self):
+        "Enumerator which only implements choices()."
+        user = self.login()
+
+        class SectorEnumerator(Enumerator):
+            def choices(self, user):
+                return [
+                    {'value': 1, 'label': 'Anime'},
+                    {'value': 2, 'label': 'Manga'},
+                    {'value': 3, 'label': 'Anime movies'},
+                ]
+
+        enum = SectorEnumerator(FakeContact._meta.get_field('sector'))
+        self.assertIsNone(enum.cache_dependencies())
+        self.assertListEqual(
+            [
+                {'value': 1, 'label': 'Anime'},
+                {'value': 3, 'label': 'Anime movies'},
+            ],
+            enum.filter_choices(user, term='ANIME'),
+        )
+        self.assertListEqual(
+            [{'value': 3, 'label': 'Anime movies'}],
+            enum.filter_choices(user, term='anime', offset=1, limit=3),
+        )
+        self.assertListEqual(
+            [{'value': 2, 'label': 'Manga'}],
+            enum.filter_choices(user, values=['2']),
+        )
+        self.assertListEqual(
+            [{'value': 1, 'label': 'Anime'}],
+            enum.filter_choices(user, limit=1),
+        )
+
+    def test_filter_choices_user_enumerator(self):
+        user = self.login()
+
+        e = enumerators.UserEnumerator(FakeContact._meta.get_field('user'))
+        self.assertListEqual(
+            [{'value': self.other_user.id, 'label': str(self.other_user)}],
+            e.filter_choices(user, term=self.other_user.last_name),
+        )
+
+        self.assertListEqual(
+            [
+                {'value': user.id, 'label': str(user)},
+                {'value': self.other_user.id, 'label': str(self.other_user)},
+            ],
+            e.filter_choices(user, values=[user.id, self.other_user.id]),
+        )
+
+    def test_filter_choices_user_enumerator_pagination(self):
+        "The pages are ordered by group then label."
+        user = self.login()
+
+        create_user = CremeUser.objects.create
+        create_user(username='noir', first_name='Chloe', last_name='Noir')
+        create_user(username='deunan', is_active=False)
+        create_user(username='briareos', is_active=False)
+
+        team = create_user(username='Team#1', is_team=True)
+        team.teammates = [user, self.other_user]
+
+        e = enumerators.UserEnumerator(FakeContact._meta.get_field('user'))
+        all_choices = e.choices(user)
+        self.assertGreater(len(all_choices), 6)
+        self.assertListEqual(
+            all_choices,
+            [
+                *e.filter_choices(user, limit=2),
+                *e.filter_choices(user, limit=2, offset=2),
+                *e.filter_choices(user, offset=4),
+            ],
+        )
+
+    def test_filter_choices_efilter_enumerator_pagination(self):
+        "The pages are ordered by group then label."
+        user = self.login()
+
+        create_filter = partial(EntityFilter.objects.create, is_custom=True)
+        create_filter(id='test-filter01', name='Zeta', entity_type=FakeContact)
+        create_filter(id='test-filter02', name='beta', entity_type=FakeOrganisation)
+        create_filter(id='test-filter03', name='Alpha', entity_type=FakeContact)
+        create_filter(id='test-filter04', name='Gamma', entity_type=FakeOrganisation)
+
+        e = enumerators.EntityFilterEnumerator(FakeReport._meta.get_field('efilter'))
+        all_choices = e.choices(user)
+        self.assertGreater(len(all_choices), 4)
+
+        pages = []
+        for offset in range(0, len(all_choices), 3):
+            pages.extend(e.filter_choices(user, limit=3, offset=offset))
+
+        self.assertListEqual(
+            [(c['group'], c['label']) for c in all_choices],
+            [(c['group'], c['label']) for c in pages],
+        )
+
+
+@override_settings(
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'enumerable': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'creme_core-tests-enumerable_versions',
+        },
+    },
+    ENUMERABLE_CACHE='enumerable',
+)
+class EnumerableVersionsTestCase(CremeTestCase):
+    def setUp(self):
+        super().setUp()
+        caches['enumerable'].clear()
+
+    def test_watched_models(self):
+        versions = EnumerableVersions(_EnumerableRegistry())
+        watched = versions.watched_models
+        self.assertIn(FakeCivility, watched)
+        self.assertIn(FakeSector, watched)
+        self.assertIn(FakeImageCategory, watched)  # ManyToManyField
+        self.assertIn(CremeUser, watched)
+        self.assertNotIn(FakeAddress, watched)
+
+    def test_versions(self):
+        versions = EnumerableVersions(_EnumerableRegistry())
+
+        civ_versions1 = versions.get_versions([FakeCivility])
+        self.assertIsInstance(civ_versions1, list)
+        self.assertEqual(1, len(civ_versions1))
+        self.assertListEqual(civ_versions1, versions.get_versions([FakeCivility]))
+
+        sector_versions1 = versions.get_versions([FakeSector])
+
+        versions.bump_version(FakeCivility)
+        civ_versions2 = versions.get_versions([FakeCivility])
+        self.assertNotEqual(civ_versions1, civ_versions2)
+        self.assertListEqual(sector_versions1, versions.get_versions([FakeSector]))
+
+        # Not watched model
+        self.assertIsNone(versions.get_versions([FakeAddress]))
+        versions.bump_version(FakeAddress)  # No error
+
+        with override_settings(ENUMERABLE_CACHE=''):
+            self.assertIsNone(versions.get_versions([FakeCivility]))
+
+    def test_signals(self):
+        from creme.creme_core.core.enumerable import enumerable_versions
+
+        get_versions = partial(enumerable_versions.get_versions, [FakeCivility])
+        versions1 = get_versions()
+
+        with transaction.atomic():
+            civ = FakeCivility.objects.create(title='Kaiser', shortcut='Ks.')
+
+        versions2 = get_versions()
+        self.assertNotEqual(versions1, versions2)
+
+        civ.delete()
+        self.assertNotEqual(versions2, get_versions())
@@ -1,19 +1,43 @@
 # -*- coding: utf-8 -*-
 
+import multiprocessing
+import os
+import stat
 from datetime import timedelta
+from functools import partial
+from tempfile import mkdtemp
+from threading import Thread
+from time import sleep
 
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
 from django.test.utils import override_settings
 from django.utils.timezone import now
-
-from creme.creme_core.core.job import JobScheduler, _JobTypeRegistry
+from django.utils.translation import gettext as _
+
+from creme.creme_core import setting_keys
+from creme.creme_core.core.job import (
+    CMD_END,
+    CMD_PING,
+    CMD_REFRESH,
+    CMD_START,
+    ClusteredJobScheduler,
+    Command,
+    JobProgressChannel,
+    JobScheduler,
+    LocalJobSchedulerQueue,
+    _JobTypeRegistry,
+)
+from creme.creme_core.core.job_workers import JobWorkerPool
 from creme.creme_core.core.reminder import Reminder, reminder_registry
-from creme.creme_core.creme_jobs import reminder_type
+from creme.creme_core.creme_jobs import batch_process_type, reminder_type
 from creme.creme_core.creme_jobs.base import JobType
-from creme.creme_core.models import Job
+from creme.creme_core.models import Job, JobLease, SettingValue
 from creme.creme_core.utils.date_period import HoursPeriod
 from creme.creme_core.utils.dates import round_hour
 
-from ..base import CremeTestCase
+from ..base import CremeTestCase, CremeTransactionTestCase
+from ..fake_models import FakeOrganisation
 
 
 class JobTypeRegistryTestCase(CremeTestCase):
@@ -162,3 +186,666 @@ class JobSchedulerTestCase(CremeTestCase):
         self.assertEqual(rounded_hour + timedelta(hours=1),
                          JobScheduler()._next_wakeup(job)
                         )
+
+    def test_crash(self):
+        "The command END is simulated."
+        user = self.create_user()
+        job = Job.objects.create(
+            user=user, type_id=batch_process_type.id, language='en',
+        )
+
+        class FakeProcess:
+            def __init__(self, returncode):
+                self.returncode = returncode
+
+            def poll(self):
+                return self.returncode
+
+            def wait(self):
+                return self.returncode
+
+        scheduler = JobScheduler()
+        scheduler._running_userjob_ids.add(job.id)
+        scheduler._procs[job.id] = FakeProcess(returncode=None)
+        self.assertTrue(scheduler._has_running_jobs())
+
+        scheduler._check_processes()
+        self.assertIn(job.id, scheduler._running_userjob_ids)
+
+        # Exited normally => the command END will come
+        scheduler._procs[job.id].returncode = 0
+        scheduler._check_processes()
+        self.assertIn(job.id, scheduler._running_userjob_ids)
+
+        scheduler._procs[job.id].returncode = 1
+        scheduler._check_processes()
+        self.assertNotIn(job.id, scheduler._running_userjob_ids)
+        self.assertFalse(scheduler._procs)
+        self.assertFalse(scheduler._has_running_jobs())
+
+        job = self.refresh(job)
+        self.assertEqual(Job.STATUS_ERROR, job.status)
+        self.assertEqual(_('The process of the job has crashed.'), job.error)
+
+        # The command END finally arrives
+        scheduler._handle_command_end(Command(cmd_type=CMD_END, data_id=job.id))
+        self.assertEqual(Job.STATUS_ERROR, self.refresh(job).status)
+
+    def test_workers_setting(self):
+        with override_settings(JOBMANAGER_WORKERS=0):
+            self.assertIsNone(JobScheduler()._workers)
+
+        with override_settings(JOBMANAGER_WORKERS=2):
+            workers = JobScheduler()._workers
+
+        self.assertIsInstance(workers, JobWorkerPool)
+        self.assertEqual(0, len(workers))  # Not started
+        self.assertEqual(2, workers._size)
+
+
+class _FakeProcess:
+    def __init__(self, returncode=None):
+        self.returncode = returncode
+        self.killed = False
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self):
+        return self.returncode
+
+    def kill(self):
+        self.killed = True
+        self.returncode = -9
+
+
+class _NoProcessJobScheduler(JobScheduler):
+    "The processes of the jobs are faked."
+    def _start_job(self, job):
+        self._procs[job.id] = _FakeProcess()
+        return True
+
+
+class _TestClusteredJobScheduler(ClusteredJobScheduler, _NoProcessJobScheduler):
+    pass
+
+
+@override_settings(JOBMANAGER_WORKERS=0, JOBMANAGER_LEASE_DURATION=60)
+class ClusteredJobSchedulerTestCase(CremeTestCase):
+    def _create_user_job(self, user):
+        return Job.objects.create(user=user, type_id=batch_process_type.id, language='en')
+
+    def test_node_id(self):
+        scheduler = ClusteredJobScheduler()
+        self.assertIn(str(os.getpid()), scheduler.node_id)
+        self.assertEqual(timedelta(seconds=60), scheduler.lease_duration)
+        self.assertEqual(5, scheduler.poll_period)
+        self.assertTrue(scheduler._needs_polling())
+
+        with override_settings(JOBMANAGER_LEASE_DURATION=6):
+            self.assertEqual(2, ClusteredJobScheduler().poll_period)
+
+        self.assertEqual('node1', ClusteredJobScheduler(node_id='node1').node_id)
+
+    def test_lease(self):
+        user = self.create_user()
+        job = self._create_user_job(user)
+
+        node1 = ClusteredJobScheduler(node_id='node1')
+        node2 = ClusteredJobScheduler(node_id='node2')
+        self.assertTrue(node1._acquire_lease(job))
+        self.assertTrue(node1._acquire_lease(job))  # Already owned
+        self.assertFalse(node2._acquire_lease(job))
+
+        lease = self.get_object_or_fail(JobLease, job=job)
+        self.assertEqual('node1', lease.owner)
+        self.assertDatetimesAlmostEqual(now() + timedelta(seconds=60), lease.expiry)
+
+        # Expired => the node is considered as dead
+        JobLease.objects.filter(job=job).update(expiry=now() - timedelta(seconds=1))
+        self.assertTrue(node2._acquire_lease(job))
+        self.assertEqual('node2', self.refresh(lease).owner)
+
+        node1._release_lease(job.id)  # Not the owner
+        self.assertTrue(JobLease.objects.filter(job=job).exists())
+
+        node2._release_lease(job.id)
+        self.assertFalse(JobLease.objects.filter(job=job).exists())
+
+    def test_start_user_job(self):
+        user = self.create_user()
+        job = self._create_user_job(user)
+
+        node1 = _TestClusteredJobScheduler(node_id='node1')
+        node2 = _TestClusteredJobScheduler(node_id='node2')
+        self.assertTrue(node1._start_job(job))
+        self.assertIn(job.id, node1._procs)
+
+        with self.assertNoException():
+            self.assertFalse(node2._start_job(job))
+
+        self.assertFalse(node2._procs)
+
+        # The END is received by the other node
+        node1._running_userjob_ids.add(job.id)
+        Job.objects.filter(id=job.id).update(status=Job.STATUS_OK)
+        node2._handle_command_end(Command(cmd_type=CMD_END, data_id=job.id))
+        self.assertIn(job.id, node1._running_userjob_ids)
+
+        node1._check_processes()
+        self.assertIn(job.id, node1._running_userjob_ids)
+
+        # The owner detects the end of the process by itself
+        node1._procs[job.id].returncode = 0
+        node1._check_processes()
+        self.assertNotIn(job.id, node1._running_userjob_ids)
+        self.assertFalse(node1._procs)
+        self.assertFalse(JobLease.objects.filter(job=job).exists())
+
+        # The job is finished => not started again
+        self.assertFalse(node2._start_job(self.refresh(job)))
+        self.assertFalse(JobLease.objects.filter(job=job).exists())
+
+    def test_pop_user_job(self):
+        "Per-user fairness."
+        user1 = self.create_user(0)
+        user2 = self.create_user(1)
+
+        running_job = self._create_user_job(user1)
+        JobLease.objects.create(
+            job=running_job, owner='other_node',
+            heartbeat=now(), expiry=now() + timedelta(seconds=60),
+        )
+
+        job1 = self._create_user_job(user1)
+        job2 = self._create_user_job(user1)
+        job3 = self._create_user_job(user2)
+
+        scheduler = ClusteredJobScheduler(node_id='node1')
+        scheduler._users_jobs.extend([job3, job2, job1])  # The oldest at the end
+        self.assertEqual(job3, scheduler._pop_user_job())
+        self.assertEqual(job1, scheduler._pop_user_job())
+        self.assertEqual(job2, scheduler._pop_user_job())
+        self.assertFalse(scheduler._users_jobs)
+
+    def test_system_job(self):
+        job = Job.objects.get(type_id=reminder_type.id)
+        wakeup = now() - timedelta(seconds=1)
+        Job.objects.filter(id=job.id).update(last_run=wakeup - timedelta(hours=1))
+
+        node1 = _TestClusteredJobScheduler(node_id='node1')
+        node1._start_system_job(job, wakeup)
+        self.assertIn(job.id, node1._procs)
+        self.assertEqual(wakeup, node1._system_jobs_starts[job.id])
+        self.assertEqual('node1', self.get_object_or_fail(JobLease, job=job).owner)
+
+        # Running on another node => postponed
+        node2 = _TestClusteredJobScheduler(node_id='node2')
+        node2._start_system_job(job, wakeup)
+        self.assertFalse(node2._procs)
+        self.assertFalse(node2._system_jobs_starts)
+        self.assertEqual(1, len(node2._system_jobs))
+        self.assertGreater(node2._system_jobs[0][0], now())
+
+        Job.objects.filter(id=job.id).update(last_run=now())
+        node1._procs[job.id].returncode = 0
+        node1._check_processes()
+        self.assertFalse(node1._system_jobs_starts)
+        self.assertFalse(JobLease.objects.filter(job=job).exists())
+
+        # Already executed for this wake up by another node
+        node3 = _TestClusteredJobScheduler(node_id='node3')
+        node3._start_system_job(job, wakeup)
+        self.assertFalse(node3._procs)
+        self.assertEqual(1, len(node3._system_jobs))
+        self.assertFalse(JobLease.objects.filter(job=job).exists())
+
+    def test_synchronize(self):
+        user = self.create_user()
+        job1 = self._create_user_job(user)  # Created on another node
+        job2 = self._create_user_job(user)  # Running on this node
+        job3 = self._create_user_job(user)  # Running on another node
+        job4 = self._create_user_job(user)  # Running on a dead node
+
+        old_expiry = now() + timedelta(seconds=10)
+        create_lease = partial(JobLease.objects.create, heartbeat=now(), expiry=old_expiry)
+        create_lease(job=job2, owner='node1')
+        create_lease(job=job3, owner='node2')
+        create_lease(job=job4, owner='node3', expiry=now() - timedelta(seconds=1))
+
+        scheduler = ClusteredJobScheduler(node_id='node1')
+        scheduler._running_userjob_ids.add(job2.id)
+
+        with self.assertLogs(level='WARNING') as logs_manager:
+            scheduler._synchronize()
+
+        self.assertIn('dead node "node3"', logs_manager.output[0])
+        self.assertListEqual([job4, job1], [*scheduler._users_jobs])
+        self.assertFalse(JobLease.objects.filter(job=job4).exists())
+        self.assertGreater(self.refresh(job2.lease).expiry, old_expiry)  # Heartbeat
+        self.assertEqual(old_expiry, self.refresh(job3.lease).expiry)
+
+        # Too early for a new synchronization
+        job5 = self._create_user_job(user)
+        scheduler._synchronize()
+        self.assertNotIn(job5, scheduler._users_jobs)
+
+    def test_lost_lease(self):
+        "The node is alive, but its lease has expired & the job has been recovered."
+        user = self.create_user()
+        job = self._create_user_job(user)
+
+        node1 = _TestClusteredJobScheduler(node_id='node1')
+        self.assertTrue(node1._start_job(job))
+        node1._running_userjob_ids.add(job.id)
+        proc = node1._procs[job.id]
+
+        # node1 has not extended its lease in time
+        JobLease.objects.filter(job=job).update(expiry=now() - timedelta(seconds=1))
+
+        node2 = _TestClusteredJobScheduler(node_id='node2')
+        with self.assertLogs(level='WARNING'):
+            node2._recover_jobs(now())
+        self.assertTrue(node2._start_job(job))
+        lease = self.get_object_or_fail(JobLease, job=job)
+        self.assertEqual('node2', lease.owner)
+
+        with self.assertLogs(level='WARNING') as logs_manager:
+            node1._synchronize()
+
+        self.assertIn(f'the lease of the job id={job.id} has been lost', logs_manager.output[0])
+        self.assertTrue(proc.killed)
+        self.assertNotIn(job.id, node1._running_userjob_ids)
+        self.assertFalse(node1._procs)
+        self.assertEqual('node2', self.refresh(lease).owner)
+        self.assertEqual(lease.expiry, self.refresh(lease).expiry)  # No heartbeat by node1
+
+        # The END of the killed process must not release the lease of node2
+        node1._handle_command_end(Command(cmd_type=CMD_END, data_id=job.id))
+        self.assertEqual('node2', self.refresh(lease).owner)
+        self.assertEqual(Job.STATUS_WAIT, self.refresh(job).status)
+
+    def test_lost_lease_crash(self):
+        "The process stops while the lease has been lost => the job is not marked as crashed."
+        user = self.create_user()
+        job = self._create_user_job(user)
+
+        node1 = _TestClusteredJobScheduler(node_id='node1')
+        self.assertTrue(node1._start_job(job))
+        node1._running_userjob_ids.add(job.id)
+
+        JobLease.objects.filter(job=job).update(
+            owner='node2', expiry=now() + timedelta(seconds=60),
+        )
+
+        node1._procs[job.id].returncode = 1
+        with self.assertLogs(level='WARNING'):
+            node1._check_processes()
+
+        self.assertNotIn(job.id, node1._running_userjob_ids)
+        self.assertEqual(Job.STATUS_WAIT, self.refresh(job).status)
+        self.assertEqual('node2', self.get_object_or_fail(JobLease, job=job).owner)
+
+
+@override_settings(
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'jobs': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'creme_core-tests-jobs_progress',
+        },
+    },
+    JOBS_PROGRESS_CACHE='jobs',
+)
+class JobProgressChannelTestCase(CremeTestCase):
+    def setUp(self):
+        super().setUp()
+        caches['jobs'].clear()
+
+    def _create_job(self):
+        job = Job(
+            user=self.create_user(), type_id=batch_process_type.id, language='en',
+        )
+        job.data = {
+            'ctype': ContentType.objects.get_for_model(FakeOrganisation).id,
+            'actions': [],
+        }
+        job.save()
+
+        return job
+
+    def test_publish(self):
+        job = self._create_job()
+        channel = JobProgressChannel()
+        self.assertIsNotNone(channel.cache)
+        self.assertDictEqual({}, channel.get_many([job.id]))
+
+        channel.publish(job)
+        snapshot1 = channel.get_many([job.id]).get(job.id)
+        self.assertIsInstance(snapshot1, dict)
+        self.assertEqual(Job.STATUS_WAIT, snapshot1['status'])
+        self.assertDictEqual(job.progress.data, snapshot1['progress'])
+        self.assertTrue(snapshot1['version'])
+
+        # Too early
+        job.status = Job.STATUS_OK
+        channel.publish(job)
+        self.assertEqual(snapshot1, channel.get_many([job.id])[job.id])
+
+        channel.publish(job, force=True)
+        snapshot2 = channel.get_many([job.id])[job.id]
+        self.assertEqual(Job.STATUS_OK, snapshot2['status'])
+        self.assertNotEqual(snapshot1['version'], snapshot2['version'])
+
+    def test_publish_disabled(self):
+        job = self._create_job()
+
+        with override_settings(JOBS_PROGRESS_CACHE=''):
+            channel = JobProgressChannel()
+            self.assertIsNone(channel.cache)
+
+            channel.publish(job, force=True)
+            self.assertDictEqual({}, channel.get_many([job.id]))
+
+        self.assertDictEqual({}, channel.get_many([job.id]))
+
+    def test_execute(self):
+        "The job publishes its progress when it starts/ends."
+        job = self._create_job()
+        batch_process_type.execute(job)
+
+        snapshot = JobProgressChannel().get_many([job.id]).get(job.id)
+        self.assertIsInstance(snapshot, dict)
+        self.assertEqual(Job.STATUS_OK, snapshot['status'])
+
+
+class LocalJobSchedulerQueueTestCase(CremeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dir_path = dir_path = mkdtemp()
+        self.queue = queue = LocalJobSchedulerQueue(f'local://{dir_path}/jobs.sock')
+        queue.clear()
+
+    def tearDown(self):
+        super().tearDown()
+        self.queue.close()
+
+        for name in os.listdir(self.dir_path):
+            os.unlink(os.path.join(self.dir_path, name))
+
+        os.rmdir(self.dir_path)
+
+    def test_commands(self):
+        queue = self.queue
+        self.assertEqual(os.path.join(self.dir_path, 'jobs.sock'), queue.path)
+
+        job = Job(id=12, type_id=batch_process_type.id)
+        self.assertFalse(queue.start_job(job))
+        queue.end_job(job)
+        self.assertFalse(queue.refresh_job(job, {'enabled': False}))
+
+        cmd1 = queue.get_command(1)
+        self.assertIsInstance(cmd1, Command)
+        self.assertEqual(CMD_START, cmd1.type)
+        self.assertEqual(12, cmd1.data_id)
+
+        cmd2 = queue.get_command(1)
+        self.assertEqual(CMD_END, cmd2.type)
+        self.assertEqual(12, cmd2.data_id)
+
+        cmd3 = queue.get_command(1)
+        self.assertEqual(CMD_REFRESH, cmd3.type)
+        self.assertEqual(12, cmd3.data_id)
+        self.assertDictEqual({'enabled': False}, cmd3.data)
+
+        # Timeout
+        self.assertIsNone(queue.get_command(0.01))
+
+    def test_socket_mode(self):
+        "The mode does not depend on the umask."
+        path = self.queue.path
+        self.assertEqual(0o660, stat.S_IMODE(os.stat(path).st_mode))
+
+        # World-writable sockets are an explicit choice
+        with override_settings(JOBMANAGER_LOCAL_SOCKET_MODE=0o666):
+            old_umask = os.umask(0o077)
+
+            try:
+                self.queue.clear()
+            finally:
+                os.umask(old_umask)
+
+        self.assertEqual(0o666, stat.S_IMODE(os.stat(path).st_mode))
+
+    def test_invalid_command(self):
+        queue = self.queue
+        LocalJobSchedulerQueue._send('INVALID-12', queue.path)
+
+        with self.assertLogs(level='WARNING'):
+            self.assertIsNone(queue.get_command(1))
+
+    def test_no_manager(self):
+        queue = LocalJobSchedulerQueue(f'local://{self.dir_path}/other.sock')
+
+        with self.assertLogs(level='CRITICAL'):
+            self.assertIs(queue.start_job(Job(id=12, type_id=batch_process_type.id)), True)
+
+        self.assertEqual(str(LocalJobSchedulerQueue._manager_error), queue.ping())
+
+    def test_ping(self):
+        queue = self.queue
+
+        def manager():
+            cmd = queue.get_command(5)
+            if cmd is not None and cmd.type == CMD_PING:
+                queue.pong(cmd.data_id)
+
+        thread = Thread(target=manager)
+        thread.start()
+        error = queue.ping()
+        thread.join()
+
+        self.assertIsNone(error)
+        self.assertListEqual(['jobs.sock'], os.listdir(self.dir_path))
+
+
+@override_settings(JOBMANAGER_WORKERS=0)
+class JobWorkerPoolTestCase(CremeTransactionTestCase):
+    def setUp(self):
+        super().setUp()
+
+        # NB: the processes of the parallel test runner are daemonic, so they cannot fork.
+        if multiprocessing.current_process().daemon:
+            self.skipTest('The workers cannot be forked by a daemonic process.')
+
+        self.results = multiprocessing.get_context('fork').Queue()
+
+    def _execute(self, job_id):
+        "Target of the workers."
+        self.results.put((job_id, os.getpid()))
+
+    def _get_result(self):
+        return self.results.get(timeout=10)
+
+    def _wait_jobs(self, pool):
+        crashed_job_ids = []
+
+        for __ in range(100):
+            crashed_job_ids.extend(pool.poll())
+
+            if not pool.running_job_ids:
+                return crashed_job_ids
+
+            sleep(0.1)
+
+        self.fail(f'The jobs are not finished: {pool.running_job_ids}')
+
+    def test_run(self):
+        pool = JobWorkerPool(size=1, target=self._execute)
+        self.assertEqual(0, len(pool))
+
+        pool.start()
+
+        try:
+            self.assertEqual(1, len(pool))
+
+            pool.run(12)
+            self.assertListEqual([12], pool.running_job_ids)
+
+            job_id1, pid1 = self._get_result()
+            self.assertEqual(12, job_id1)
+            self.assertNotEqual(os.getpid(), pid1)
+            self.assertListEqual([], self._wait_jobs(pool))
+            self.assertEqual(1, len(pool))
+
+            # The worker is re-used
+            pool.run(13)
+            self.assertTupleEqual((13, pid1), self._get_result())
+            self.assertListEqual([], self._wait_jobs(pool))
+        finally:
+            pool.stop()
+
+        self.assertEqual(0, len(pool))
+
+    def test_per_request_cache(self):
+        "The per-request cache is cleared between 2 jobs."
+        skey = setting_keys.block_opening_key
+        SettingValue.objects.set_4_key(skey, True)
+
+        def execute(job_id):
+            value = SettingValue.objects.get_4_key(skey).value
+
+            if job_id == 12:
+                # Modification by another process (the cache is not cleared)
+                SettingValue.objects.filter(key_id=skey.id).update(value_str=str(False))
+
+            self.results.put((job_id, value))
+
+        pool = JobWorkerPool(size=1, target=execute)
+        pool.start()
+
+        try:
+            pool.run(12)
+            self.assertTupleEqual((12, True), self._get_result())
+            self.assertListEqual([], self._wait_jobs(pool))
+
+            pool.run(13)
+            self.assertTupleEqual((13, False), self._get_result())
+            self.assertListEqual([], self._wait_jobs(pool))
+        finally:
+            pool.stop()
+
+    def test_extra_workers(self):
+        "All workers are busy => a new one is forked, & stopped at the end."
+        event = multiprocessing.get_context('fork').Event()
+
+        def execute(job_id):
+            event.wait(10)
+            self._execute(job_id)
+
+        pool = JobWorkerPool(size=1, target=execute)
+        pool.start()
+
+        try:
+            pool.run(12)
+            pool.run(13)
+            self.assertEqual(2, len(pool))
+            self.assertCountEqual([12, 13], pool.running_job_ids)
+
+            event.set()
+            results = dict([self._get_result(), self._get_result()])
+            self.assertCountEqual([12, 13], results.keys())
+            self.assertNotEqual(results[12], results[13])
+
+            self.assertListEqual([], self._wait_jobs(pool))
+            self.assertEqual(1, len(pool))
+        finally:
+            pool.stop()
+
+    def test_recycle(self):
+        pool = JobWorkerPool(size=1, target=self._execute, max_jobs=2)
+        pool.start()
+
+        try:
+            pids = []
+            for job_id in range(1, 4):
+                pool.run(job_id)
+                pids.append(self._get_result()[1])
+                self.assertListEqual([], self._wait_jobs(pool))
+
+            self.assertEqual(pids[0], pids[1])
+            self.assertNotEqual(pids[1], pids[2])
+            self.assertEqual(1, len(pool))
+        finally:
+            pool.stop()
+
+    def test_crash(self):
+        def execute(job_id):
+            if job_id == 666:
+                os._exit(1)
+
+            self._execute(job_id)
+
+        pool = JobWorkerPool(size=1, target=execute)
+        pool.start()
+
+        try:
+            pool.run(666)
+            self.assertListEqual([666], self._wait_jobs(pool))
+            self.assertEqual(1, len(pool))  # The worker has been replaced
+
+            pool.run(12)
+            self.assertEqual(12, self._get_result()[0])
+            self.assertListEqual([], self._wait_jobs(pool))
+        finally:
+            pool.stop()
+
+    def test_interrupt(self):
+        def execute(job_id):
+            if job_id == 666:
+                sleep(60)
+
+            self._execute(job_id)
+
+        pool = JobWorkerPool(size=1, target=execute)
+        pool.start()
+
+        try:
+            pool.run(666)
+
+            with self.assertLogs(level='WARNING'):
+                pool.interrupt(666)
+
+            self.assertListEqual([], pool.running_job_ids)
+            self.assertEqual(1, len(pool))  # The worker has been replaced
+
+            pool.interrupt(666)  # Not running anymore => ignored
+
+            pool.run(12)
+            self.assertEqual(12, self._get_result()[0])
+            self.assertListEqual([], self._wait_jobs(pool))
+        finally:
+            pool.stop()
+
+    def test_exception(self):
+        "An exception does not kill the worker."
+        def execute(job_id):
+            if job_id == 666:
+                raise ValueError('Invalid job')
+
+            self._execute(job_id)
+
+        pool = JobWorkerPool(size=1, target=execute)
+        pool.start()
+
+        try:
+            pool.run(666)
+            self.assertListEqual([], self._wait_jobs(pool))
+
+            pool.run(12)
+            self.assertEqual(12, self._get_result()[0])
+            self.assertListEqual([], self._wait_jobs(pool))
+        finally:
+            pool.stop()
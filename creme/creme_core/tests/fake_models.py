@@ -363,6 +363,7 @@ else:
         ).set_tags(optional=True)
 
         search_score = 101
+        bulk_clonable = True
         creation_label = _('Create a contact')
         save_label     = _('Save the contact')
 
@@ -457,6 +458,7 @@ else:
         )
 
         search_score = 102
+        bulk_clonable = True
         creation_label = _('Create an organisation')
         save_label = _('Save the organisation')
 
@@ -6,6 +6,7 @@ from functools import partial
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.db.models import Q
+from django.urls import reverse
 from django.utils.formats import get_format, number_format
 from django.utils.translation import gettext as _
 from django.utils.translation import pgettext
@@ -183,6 +184,28 @@ class SearchWidgetsTestCase(CremeTestCase):
             widget.render(name=name, value='a'),
         )
 
+    def test_selectwidget_more(self):
+        "Choices are paginated."
+        widget = lv_form.SelectLVSWidget(
+            choices=[
+                {'value': '',  'label': 'All'},
+                {'value': '1', 'label': 'one'},
+            ],
+            more={'url': '/choices/', 'offset': 1, 'limit': 1},
+        )
+
+        name = 'foob'
+        self.assertHTMLEqual(
+            f'<select class="lv-state-field" data-lv-search-widget="select" name="{name}" '
+            f'        data-more-url="/choices/">'
+            '   <option value="">All</option>'
+            '   <option value="1" selected>one</option>'
+            f'   <option value="" class="search-more" data-offset="1" data-limit="1">'
+            f'{_("More…")}</option>'
+            '</select>',
+            widget.render(name=name, value='1'),
+        )
+
     def test_daterangewidget(self):
         widget = lv_form.DateRangeLVSWidget()
         get_value = partial(widget.value_from_datadict, files=None)
@@ -532,6 +555,50 @@ class SearchFieldsTestCase(CremeTestCase):
         # Invalid id
         self.assertEqual(Q(), to_python(value=self.UNUSED_PK))
 
+        self.assertIsNone(widget.more)
+
+    def test_regular_relatedfield_more(self):
+        "Too many choices => only the first page is given to the widget."
+        sectors = [*FakeSector.objects.all()]
+        self.assertGreater(len(sectors), 2)
+
+        class LimitedRelatedField(lv_form.RegularRelatedField):
+            choices_limit = 2
+
+        cell = EntityCellRegularField.build(model=FakeOrganisation, name='sector')
+        field = LimitedRelatedField(cell=cell, user=self.user)
+
+        expected_choices = [
+            {'value': '',           'label': pgettext('creme_core-filter', 'All')},
+            {'value': lv_form.NULL, 'label': _('* is empty *')},
+            *({'value': s.id, 'label': s.title} for s in sectors[:2]),
+        ]
+        self.assertListEqual(expected_choices, field.choices)
+
+        widget = field.widget
+        self.assertDictEqual(
+            {
+                'url': reverse(
+                    'creme_core__enumerable_choices',
+                    args=(ContentType.objects.get_for_model(FakeOrganisation).id, 'sector'),
+                ),
+                'offset': 2,
+                'limit': 2,
+            },
+            widget.more,
+        )
+
+        # Value which is not in the first page
+        last_sector = sectors[-1]
+        to_python = field.to_python
+        self.assertEqual(Q(sector=last_sector.id), to_python(value=str(last_sector.id)))
+        self.assertListEqual(
+            [*expected_choices, {'value': last_sector.id, 'label': last_sector.title}],
+            widget.choices,
+        )
+
+        self.assertEqual(Q(), to_python(value=self.UNUSED_PK))
+
     def test_regular_relatedfield02(self):
         "Not nullable FK."
         cell = EntityCellRegularField.build(model=FakeActivity, name='type')
@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 
 from functools import partial
+from time import sleep
 
 from django.contrib.sessions.backends.base import SessionBase
+from django.core.cache import caches
+from django.db.models.signals import m2m_changed
 from django.template.context import make_context
 from django.template.engine import Engine
-from django.test import RequestFactory
+from django.test import RequestFactory, override_settings
 from django.utils.translation import gettext as _
 
 from creme.creme_core.constants import MODELBRICK_ID
@@ -15,6 +18,7 @@ from creme.creme_core.core.entity_cell import (
 )
 from creme.creme_core.gui.bricks import (
     Brick,
+    BrickRenderTiming,
     BricksManager,
     CustomBrick,
     EntityBrick,
@@ -23,9 +27,15 @@ from creme.creme_core.gui.bricks import (
     SimpleBrick,
     SpecificRelationsBrick,
     _BrickRegistry,
+    brick_profiler,
+    brick_render_cache,
+    get_brick_render_function,
 )
 from creme.creme_core.models import (
+    CremeProperty,
     CustomBrickConfigItem,
+    CustomFieldMultiEnum,
+    CustomFieldValue,
     FakeContact,
     FakeImage,
     FakeOrganisation,
@@ -33,6 +43,7 @@ from creme.creme_core.models import (
     Relation,
     RelationBrickItem,
     RelationType,
+    SetCredentials,
 )
 
 from ..base import CremeTestCase
@@ -1405,3 +1416,252 @@ class BrickTestCase(CremeTestCase):
 
         with self.assertNumQueries(0):
             self.assertSetEqual(expected_models, {*brick.target_ctypes})
+
+
+@override_settings(
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'bricks': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'creme_core-tests-bricks_render',
+        },
+    },
+    BRICKS_RENDER_CACHE='bricks',
+)
+class BricksRenderCacheTestCase(CremeTestCase):
+    class CachedBrick(Brick):
+        id_ = Brick.generate_id('creme_core', 'BricksRenderCacheTestCase')
+        dependencies = (FakeContact,)
+        cacheable = True
+        cache_dependencies = (FakeOrganisation,)
+
+        def __init__(self):
+            super().__init__()
+            self.count = 0
+
+        def detailview_display(self, context):
+            self.count += 1
+            return f'<div>{self.count}</div>'
+
+    def setUp(self):
+        super().setUp()
+        self.user = user = self.login()
+        caches['bricks'].clear()
+
+        self.contact = FakeContact.objects.create(
+            user=user, first_name='Bell', last_name='Cranel',
+        )
+        self.orga = FakeOrganisation.objects.create(user=user, name='Hestia familia')
+
+    def _build_context(self, brick, url='/', user=None):
+        request = RequestFactory().get(url)
+        request.session = SessionBase()
+        request.user = user or self.user
+
+        context = make_context({'object': self.contact}, request)
+
+        for processor in Engine.get_default().template_context_processors:
+            context.update(processor(request))
+
+        context = context.flatten()
+        BricksManager.get(context).add_group(brick.id_, brick)
+
+        return context
+
+    def _render(self, brick, **kwargs):
+        render = brick_render_cache.get_render_function(brick, 'detailview_display')
+
+        return render(self._build_context(brick, **kwargs))
+
+    def test_get_render_function(self):
+        class NotCachedBrick(self.CachedBrick):
+            cacheable = False
+
+        brick1 = NotCachedBrick()
+        self.assertEqual(
+            brick1.detailview_display,
+            brick_render_cache.get_render_function(brick1, 'detailview_display'),
+        )
+
+        brick2 = self.CachedBrick()
+        self.assertIsNone(brick_render_cache.get_render_function(brick2, 'home_display'))
+
+        with override_settings(BRICKS_RENDER_CACHE=''):
+            self.assertEqual(
+                brick2.detailview_display,
+                brick_render_cache.get_render_function(brick2, 'detailview_display'),
+            )
+
+    def test_get_dependencies(self):
+        get_deps = brick_render_cache.get_dependencies
+        self.assertListEqual([FakeOrganisation], get_deps(self.CachedBrick))
+
+        class DepsBrick(self.CachedBrick):
+            cache_dependencies = None
+
+        self.assertListEqual([FakeContact], get_deps(DepsBrick()))
+
+        class WildcardBrick(self.CachedBrick):
+            dependencies = '*'
+            cache_dependencies = None
+
+        self.assertIsNone(get_deps(WildcardBrick()))
+
+    def test_render(self):
+        brick = self.CachedBrick()
+        self.assertEqual('<div>1</div>', self._render(brick))
+        self.assertEqual('<div>1</div>', self._render(brick))
+        self.assertEqual(1, brick.count)
+
+        # Another page
+        self.assertEqual('<div>2</div>', self._render(brick, url=f'/?{brick.id_}_page=2'))
+
+        # Another user
+        self.assertEqual('<div>3</div>', self._render(brick, user=self.other_user))
+        self.assertEqual('<div>1</div>', self._render(brick))
+
+    def test_render_invalidation(self):
+        brick = self.CachedBrick()
+        self.assertEqual('<div>1</div>', self._render(brick))
+
+        # Dependency
+        self.orga.name = 'Loki familia'
+        self.orga.save()
+        self.assertEqual('<div>2</div>', self._render(brick))
+        self.assertEqual('<div>2</div>', self._render(brick))
+
+        self.orga.delete()
+        self.assertEqual('<div>3</div>', self._render(brick))
+
+        # Modification of the current entity
+        contact = self.contact
+        contact.first_name = 'Little rookie'
+        contact.save()
+        self.assertEqual('<div>4</div>', self._render(brick))
+
+        # Credentials
+        self.other_user.save()
+        self.assertEqual('<div>5</div>', self._render(brick))
+
+        # Not a dependency
+        FakeImage.objects.create(user=self.user, name='Bell')
+        self.assertEqual('<div>5</div>', self._render(brick))
+
+    def test_render_versions_evicted(self):
+        brick = self.CachedBrick()
+        self.assertEqual('<div>1</div>', self._render(brick))
+
+        caches['bricks'].delete(brick_render_cache._version_key(FakeOrganisation))
+        sleep(0.002)
+        self.assertEqual('<div>2</div>', self._render(brick))
+
+    def test_watched_models(self):
+        watched = brick_render_cache.watched_models
+        self.assertIn(CremeProperty, watched)
+        self.assertIn(CustomFieldValue, watched)
+        self.assertIn(SetCredentials, watched)
+        self.assertNotIn(FakeImage, watched)
+
+        self.assertTrue(m2m_changed.has_listeners(CustomFieldMultiEnum.value.through))
+
+        with override_settings(BRICKS_RENDER_CACHE=''):
+            self.assertFalse(m2m_changed.has_listeners(CustomFieldMultiEnum.value.through))
+
+
+@override_settings(BRICKS_PROFILING=True)
+class BricksProfilerTestCase(CremeTestCase):
+    class ProfiledBrick(Brick):
+        id_ = Brick.generate_id('creme_core', 'BricksProfilerTestCase')
+        dependencies = (FakeContact,)
+        template_name = 'creme_core/bricks/statistics.html'
+
+        def detailview_display(self, context):
+            return self._render(self.get_template_context(
+                context, items=[], count=FakeContact.objects.count(),
+            ))
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.login()
+        brick_profiler.clear()
+
+    def _render(self, brick):
+        request = RequestFactory().get('/')
+        request.session = SessionBase()
+        request.user = self.user
+
+        context = make_context({}, request)
+        for processor in Engine.get_default().template_context_processors:
+            context.update(processor(request))
+
+        context = context.flatten()
+        BricksManager.get(context).add_group(brick.id_, brick)
+
+        return get_brick_render_function(brick, 'detailview_display')(context)
+
+    def test_render(self):
+        brick = self.ProfiledBrick()
+        self._render(brick)
+
+        timings = brick_profiler.request_timings()
+        self.assertEqual(1, len(timings))
+
+        timing = timings[0]
+        self.assertIsInstance(timing, BrickRenderTiming)
+        self.assertEqual(brick.id_, timing.brick_id)
+        self.assertEqual('detailview_display', timing.render_method)
+        self.assertGreater(timing.wall_time, 0)
+        self.assertGreaterEqual(timing.queries_count, 1)
+        self.assertGreater(timing.template_time, 0)
+        self.assertGreaterEqual(timing.wall_time, timing.template_time)
+
+    def test_disabled(self):
+        brick = self.ProfiledBrick()
+
+        with override_settings(BRICKS_PROFILING=False):
+            self.assertEqual(
+                brick.detailview_display,
+                get_brick_render_function(brick, 'detailview_display'),
+            )
+
+        self.assertIsNone(get_brick_render_function(brick, 'home_display'))
+
+    def test_statistics(self):
+        brick_id = self.ProfiledBrick.id_
+
+        for i in range(1, 21):
+            timing = BrickRenderTiming(brick_id=brick_id, render_method='detailview_display')
+            timing.wall_time = float(i)
+            timing.queries_count = i % 3
+            brick_profiler.add(timing)
+
+        timing = BrickRenderTiming(brick_id='block_creme_core-other', render_method='home_display')
+        timing.wall_time = 100.0
+        brick_profiler.add(timing)
+
+        stats = brick_profiler.statistics()
+        self.assertEqual(2, len(stats))
+        self.assertEqual('block_creme_core-other', stats[0]['brick_id'])
+
+        stat = stats[1]
+        self.assertEqual(brick_id, stat['brick_id'])
+        self.assertEqual(20, stat['count'])
+        self.assertEqual(10.0, stat['wall_time_p50'])
+        self.assertEqual(19.0, stat['wall_time_p95'])
+        self.assertEqual(1, stat['queries_count_p50'])
+        self.assertEqual(2, stat['queries_count_p95'])
+
+    @override_settings(BRICKS_PROFILING_WINDOW=5)
+    def test_statistics_window(self):
+        brick_id = self.ProfiledBrick.id_
+
+        for i in range(1, 11):
+            timing = BrickRenderTiming(brick_id=brick_id, render_method='detailview_display')
+            timing.wall_time = float(i)
+            brick_profiler.add(timing)
+
+        stat = brick_profiler.statistics()[0]
+        self.assertEqual(5, stat['count'])
+        self.assertEqual(8.0, stat['wall_time_p50'])
@@ -2,9 +2,12 @@
 
 from decimal import Decimal
 from functools import partial
+from unittest.mock import patch
 
 from django.contrib.contenttypes.models import ContentType
+from django.db import connection
 from django.db.models.deletion import ProtectedError
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import now
 from django.utils.translation import gettext as _
 
@@ -33,10 +36,12 @@ from creme.creme_core.models import (
     FakeImageCategory,
     FakeOrganisation,
     FakeSector,
+    HistoryLine,
     Language,
     Relation,
     RelationType,
 )
+from creme.creme_core.models.history import TYPE_CREATION, TYPE_PROP_ADD
 
 from ..base import CremeTestCase
 
@@ -304,6 +309,162 @@ class EntityTestCase(CremeTestCase):
                             {*image2.categories.values_list('pk', flat=True)}
                            )
 
+    def test_bulk_clone01(self):
+        "Regular fields, M2M, properties & relationships."
+        user = self.user
+        self._build_rtypes_n_ptypes()
+
+        sasuke = CremeEntity.objects.create(user=user)
+        sakura = CremeEntity.objects.create(user=user)
+
+        create_contact = partial(FakeContact.objects.create, user=user)
+        naruto = create_contact(first_name='Naruto', last_name='Uzumaki', description='Ninja')
+        kakashi = create_contact(first_name='Kakashi', last_name='Hatake')
+
+        language = Language.objects.all()[0]
+        naruto.languages.set([language])
+
+        create_prop = CremeProperty.objects.create
+        create_prop(type=self.ptype01, creme_entity=naruto)
+        create_prop(type=self.ptype02, creme_entity=kakashi)
+
+        create_rel = partial(Relation.objects.create, user=user)
+        create_rel(subject_entity=naruto, type=self.rtype1, object_entity=sasuke)
+        create_rel(subject_entity=naruto, type=self.rtype3, object_entity=sakura)  # Internal
+        create_rel(subject_entity=kakashi, type=self.rtype2, object_entity=sakura)
+
+        count = FakeContact.objects.count()
+        clones = FakeContact.bulk_clone([naruto, kakashi])
+        self.assertEqual(count + 2, FakeContact.objects.count())
+        self.assertEqual(2, len(clones))
+
+        clone1 = self.refresh(clones[0])
+        self.assertNotEqual(naruto.pk, clone1.pk)
+        self.assertNotEqual(naruto.uuid, clone1.uuid)
+        self.assertEqual(naruto.entity_type, clone1.entity_type)
+        self.assertEqual(naruto.header_filter_search_field, clone1.header_filter_search_field)
+
+        for attr in ('user', 'first_name', 'last_name', 'description'):
+            self.assertEqual(getattr(naruto, attr), getattr(clone1, attr))
+
+        self.assertListEqual([language], [*clone1.languages.all()])
+        self.assertSameRelationsNProperties(naruto, clone1)
+        self.assertFalse(clone1.relations.filter(type__is_internal=True))
+
+        clone2 = self.refresh(clones[1])
+        self.assertEqual(kakashi.first_name, clone2.first_name)
+        self.assertSameRelationsNProperties(kakashi, clone2)
+
+    def test_bulk_clone02(self):
+        "Custom values."
+        create_cf = partial(
+            CustomField.objects.create,
+            content_type=ContentType.objects.get_for_model(FakeOrganisation),
+        )
+        cf_int        = create_cf(name='int',        field_type=CustomField.INT)
+        cf_enum       = create_cf(name='enum',       field_type=CustomField.ENUM)
+        cf_multi_enum = create_cf(name='multi_enum', field_type=CustomField.MULTI_ENUM)
+
+        create_evalue = CustomFieldEnumValue.objects.create
+        enum1   = create_evalue(custom_field=cf_enum,       value='Enum1')
+        m_enum1 = create_evalue(custom_field=cf_multi_enum, value='MEnum1')
+        m_enum2 = create_evalue(custom_field=cf_multi_enum, value='MEnum2')
+
+        create_orga = partial(FakeOrganisation.objects.create, user=self.user)
+        orga1 = create_orga(name='Konoha')
+        orga2 = create_orga(name='Suna')
+        orga3 = create_orga(name='Kiri')
+
+        CustomFieldInteger.objects.create(custom_field=cf_int, entity=orga1, value=50)
+        CustomFieldInteger.objects.create(custom_field=cf_int, entity=orga2, value=12)
+        CustomFieldEnum.objects.create(custom_field=cf_enum, entity=orga1, value=enum1)
+        CustomFieldMultiEnum(
+            custom_field=cf_multi_enum, entity=orga1,
+        ).set_value_n_save([m_enum1, m_enum2])
+        CustomFieldMultiEnum(
+            custom_field=cf_multi_enum, entity=orga2,
+        ).set_value_n_save([m_enum2])
+
+        clone1, clone2, clone3 = FakeOrganisation.bulk_clone([orga1, orga2, orga3])
+
+        def get_cf_value(cf, entity):
+            return cf.value_class.objects.get(custom_field=cf, entity=entity).value
+
+        self.assertEqual(50, get_cf_value(cf_int, clone1))
+        self.assertEqual(12, get_cf_value(cf_int, clone2))
+        self.assertEqual(enum1, get_cf_value(cf_enum, clone1))
+        self.assertFalse(CustomFieldEnum.objects.filter(entity__in=[clone2, clone3]))
+
+        self.assertSetEqual({m_enum1, m_enum2}, {*get_cf_value(cf_multi_enum, clone1).all()})
+        self.assertListEqual([m_enum2], [*get_cf_value(cf_multi_enum, clone2).all()])
+        self.assertFalse(CustomFieldMultiEnum.objects.filter(entity=clone3))
+
+    def test_bulk_clone03(self):
+        "Queries count does not depend on the number of entities."
+        user = self.user
+        self._build_rtypes_n_ptypes()
+
+        other = CremeEntity.objects.create(user=user)
+
+        def create_orgas(count):
+            orgas = [
+                FakeOrganisation.objects.create(user=user, name=f'Orga #{i}')
+                for i in range(count)
+            ]
+
+            for orga in orgas:
+                CremeProperty.objects.create(type=self.ptype01, creme_entity=orga)
+                Relation.objects.create(
+                    user=user, subject_entity=orga, type=self.rtype1, object_entity=other,
+                )
+
+            return orgas
+
+        orgas1 = create_orgas(2)
+        orgas2 = create_orgas(6)
+
+        FakeOrganisation.bulk_clone(create_orgas(1))  # Fill the caches
+
+        with CaptureQueriesContext(connection) as ctxt1:
+            FakeOrganisation.bulk_clone(orgas1)
+
+        with CaptureQueriesContext(connection) as ctxt2:
+            clones = FakeOrganisation.bulk_clone(orgas2)
+
+        self.assertEqual(len(ctxt1), len(ctxt2), [q['sql'] for q in ctxt2.captured_queries])
+        self.assertEqual(
+            6,
+            CremeProperty.objects.filter(type=self.ptype01, creme_entity__in=clones).count(),
+        )
+        self.assertEqual(
+            6,
+            Relation.objects.filter(
+                type=self.rtype1, subject_entity__in=clones, object_entity=other,
+            ).count(),
+        )
+        self.assertEqual(
+            6,
+            HistoryLine.objects.filter(entity__in=clones, type=TYPE_CREATION).count(),
+        )
+        self.assertEqual(
+            6,
+            HistoryLine.objects.filter(entity__in=clones, type=TYPE_PROP_ADD).count(),
+        )
+
+    def test_bulk_clone04(self):
+        "Model which is not bulk-clonable => clone() is called."
+        self.assertFalse(FakeImage.bulk_clonable)
+
+        image = FakeImage.objects.create(user=self.user, name='Konoha')
+
+        with patch.object(FakeImage, 'save', autospec=True, side_effect=FakeImage.save) as save:
+            clones = FakeImage.bulk_clone([image])
+
+        self.assertEqual(1, len(clones))
+        self.assertNotEqual(image.pk, clones[0].pk)
+        self.assertEqual(image.name, self.refresh(clones[0]).name)
+        save.assert_called()
+
     def test_delete01(self):
         "Simple delete"
         ce = CremeEntity.objects.create(user=self.user)
@@ -2,6 +2,7 @@
 
 from datetime import date, time
 from decimal import Decimal
+from functools import partial
 from time import sleep
 
 from django.contrib.auth import get_user_model
@@ -811,6 +812,74 @@ about this fantastic animation studio."""
 
         self.assertEqual(hline_sym.id, hline.related_line.id)
 
+    def test_add_relations_bulk(self):
+        "Relation.objects.safe_bulk_create()."
+        user = self.user
+        create_orga = partial(FakeOrganisation.objects.create, user=user)
+        nerv  = create_orga(name='Nerv')
+        seele = create_orga(name='Seele')
+        rei = FakeContact.objects.create(user=user, first_name='Rei', last_name='Ayanami')
+        olds_ids = [*HistoryLine.objects.values_list('id', flat=True)]
+
+        rtype, srtype = RelationType.create(
+            ('test-subject_works6', 'is employed'),
+            ('test-object_works6',  'employs'),
+        )
+        build_rel = partial(Relation, user=user)
+        rel1, rel2 = Relation.objects.safe_bulk_create([
+            build_rel(subject_entity=rei, object_entity=nerv, type=rtype),
+            # NB: only IDs ; the object relation type is used
+            build_rel(subject_entity_id=seele.id, object_entity_id=rei.id, type_id=srtype.id),
+        ])
+
+        hlines = [*HistoryLine.objects.exclude(id__in=olds_ids).order_by('id')]
+        self.assertEqual(4, len(hlines))
+
+        hline1, hline_sym1, hline2, hline_sym2 = hlines
+        self.assertEqual(rei.id,            hline1.entity.id)
+        self.assertEqual(str(rei),          hline1.entity_repr)
+        self.assertEqual(rei.entity_type,   hline1.entity_ctype)
+        self.assertEqual(user,              hline1.entity_owner)
+        self.assertEqual(TYPE_RELATION,     hline1.type)
+        self.assertEqual([rtype.id],        hline1.modifications)
+        self.assertEqual(rel1.created,      hline1.date)
+
+        self.assertEqual(nerv.id,           hline_sym1.entity.id)
+        self.assertEqual(str(nerv),         hline_sym1.entity_repr)
+        self.assertEqual(TYPE_SYM_RELATION, hline_sym1.type)
+        self.assertEqual([srtype.id],       hline_sym1.modifications)
+        self.assertEqual(rel1.created,      hline_sym1.date)
+
+        self.assertEqual(hline_sym1.id, hline1.related_line.id)
+        self.assertEqual(hline1.id,     hline_sym1.related_line.id)
+
+        self.assertEqual(rei.id,            hline2.entity.id)
+        self.assertEqual(TYPE_RELATION,     hline2.type)
+        self.assertEqual([rtype.id],        hline2.modifications)
+
+        self.assertEqual(seele.id,          hline_sym2.entity.id)
+        self.assertEqual(str(seele),        hline_sym2.entity_repr)
+        self.assertEqual(TYPE_SYM_RELATION, hline_sym2.type)
+        self.assertEqual([srtype.id],       hline_sym2.modifications)
+
+        self.assertEqual(hline_sym2.id, hline2.related_line.id)
+        self.assertEqual(hline2.id,     hline_sym2.related_line.id)
+
+    def test_add_relations_bulk_disabled(self):
+        user = self.user
+        nerv = FakeOrganisation.objects.create(user=user, name='Nerv')
+        rei = FakeContact.objects.create(user=user, first_name='Rei', last_name='Ayanami')
+        old_count = HistoryLine.objects.count()
+
+        rtype = RelationType.create(
+            ('test-subject_works7', 'is employed'),
+            ('test-object_works7',  'employs'),
+        )[0]
+        relation = Relation(user=user, subject_entity=rei, object_entity=nerv, type=rtype)
+        HistoryLine.disable(relation)
+        Relation.objects.safe_bulk_create([relation])
+        self.assertEqual(old_count, HistoryLine.objects.count())
+
     def test_delete_relation(self):
         user = self.user
         nerv = FakeOrganisation.objects.create(user=user, name='Nerv')
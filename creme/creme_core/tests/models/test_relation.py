@@ -12,6 +12,7 @@ from creme.creme_core.models import (
     Relation,
     RelationType,
 )
+from creme.creme_core.signals import post_bulk_create
 from creme.creme_core.utils.profiling import CaptureQueriesContext
 
 from ..base import CremeTestCase
@@ -427,3 +428,182 @@ class RelationsTestCase(CremeTestCase):
         self.assertRelationCount(1, subject_entity=ryuko, type_id=rtype2.id, object_entity=satsuki)
 
         self.assertEqual(len(ctxt1), len(ctxt2) + 1)
+
+    def test_manager_safe_bulk_create01(self):
+        "Create several relations & their symmetrical instances."
+        rtype1, srtype1 = RelationType.create(
+            ('test-subject_challenge', 'challenges'),
+            ('test-object_challenge',  'is challenged by')
+        )
+        rtype2, srtype2 = RelationType.create(
+            ('test-subject_foobar', 'loves'),
+            ('test-object_foobar',  'is loved by')
+        )
+
+        user = self.user
+        create_contact = partial(FakeContact.objects.create, user=user)
+        ryuko   = create_contact(first_name='Ryuko',   last_name='Matoi')
+        satsuki = create_contact(first_name='Satsuki', last_name='Kiryuin')
+        mako    = create_contact(first_name='Mako',    last_name='Mankanshoku')
+
+        sent = []
+
+        def receiver(sender, instances, **kwargs):
+            sent.append((sender, instances))
+
+        post_bulk_create.connect(receiver, sender=Relation)
+
+        try:
+            created = Relation.objects.safe_bulk_create([
+                Relation(user=user, subject_entity=ryuko, type=rtype1, object_entity=satsuki),
+                Relation(user=user, subject_entity=ryuko, type=rtype2, object_entity=mako),
+                Relation(user=user, subject_entity=satsuki, type=rtype1, object_entity=ryuko),
+            ])
+        finally:
+            post_bulk_create.disconnect(receiver, sender=Relation)
+
+        self.assertEqual(3, len(created))
+
+        rel1 = self.get_object_or_fail(Relation, type=rtype1, subject_entity=ryuko.id)
+        self.assertEqual(rel1, created[0])
+        self.assertEqual(satsuki.id, rel1.object_entity_id)
+        self.assertEqual(user.id,    rel1.user_id)
+
+        sym1 = rel1.symmetric_relation
+        self.assertEqual(srtype1,    sym1.type)
+        self.assertEqual(satsuki.id, sym1.subject_entity_id)
+        self.assertEqual(ryuko.id,   sym1.object_entity_id)
+        self.assertEqual(user.id,    sym1.user_id)
+        self.assertEqual(rel1.id,    sym1.symmetric_relation_id)
+
+        rel2 = self.get_object_or_fail(Relation, type=rtype2)
+        self.assertEqual(rel2, created[1])
+        self.assertEqual(srtype2, rel2.symmetric_relation.type)
+        self.assertEqual(rel2.id, rel2.symmetric_relation.symmetric_relation_id)
+
+        self.assertRelationCount(1, subject_entity=satsuki, type_id=rtype1.id, object_entity=ryuko)
+        self.assertEqual(5, Relation.objects.filter(subject_entity__in=[ryuko, satsuki]).count())
+
+        self.assertEqual(1, len(sent))
+        sender, instances = sent[0]
+        self.assertEqual(Relation, sender)
+        self.assertEqual(6, len(instances))
+        self.assertSetEqual(
+            {*Relation.objects.filter(
+                subject_entity__in=[ryuko, satsuki, mako],
+            ).values_list('id', flat=True)},
+            {r.id for r in instances},
+        )
+
+    def test_manager_safe_bulk_create02(self):
+        "De-duplicates arguments ; avoid creating existing relations."
+        rtype, srtype = RelationType.create(
+            ('test-subject_foobar', 'challenges'),
+            ('test-object_foobar',  'is challenged by')
+        )
+
+        user = self.user
+        create_contact = partial(FakeContact.objects.create, user=user)
+        ryuko   = create_contact(first_name='Ryuko',   last_name='Matoi')
+        satsuki = create_contact(first_name='Satsuki', last_name='Kiryuin')
+        mako    = create_contact(first_name='Mako',    last_name='Mankanshoku')
+
+        existing = Relation.objects.create(
+            user=user, subject_entity=ryuko, type=rtype, object_entity=mako,
+        )
+
+        build_rel = partial(Relation, user=user)
+
+        with self.assertNoException():
+            created = Relation.objects.safe_bulk_create([
+                build_rel(subject_entity=ryuko, type=rtype, object_entity=satsuki),
+                build_rel(subject_entity=ryuko, type=rtype, object_entity=satsuki),
+                # Symmetrical of the first one
+                build_rel(subject_entity=satsuki, type=srtype, object_entity=ryuko),
+                # Already exists
+                build_rel(subject_entity=ryuko, type=rtype, object_entity=mako),
+                build_rel(subject_entity=mako, type=srtype, object_entity=ryuko),
+            ])
+
+        self.assertEqual(1, len(created))
+        self.assertStillExists(existing)
+        self.assertRelationCount(1, subject_entity=ryuko, type_id=rtype.id, object_entity=satsuki)
+        self.assertRelationCount(1, subject_entity=satsuki, type_id=srtype.id, object_entity=ryuko)
+        self.assertRelationCount(1, subject_entity=ryuko, type_id=rtype.id, object_entity=mako)
+        self.assertEqual(4, Relation.objects.filter(type__in=[rtype, srtype]).count())
+
+    def test_manager_safe_bulk_create03(self):
+        "No query if no relations."
+        with self.assertNumQueries(0):
+            created = Relation.objects.safe_bulk_create([])
+
+        self.assertListEqual([], created)
+
+    def test_manager_safe_bulk_create04(self):
+        "The number of queries does not depend on the number of relations."
+        rtype = RelationType.create(
+            ('test-subject_foobar', 'challenges'),
+            ('test-object_foobar',  'is challenged by')
+        )[0]
+
+        user = self.user
+        create_contact = partial(FakeContact.objects.create, user=user)
+        ryuko = create_contact(first_name='Ryuko', last_name='Matoi')
+        contacts = [
+            create_contact(first_name=f'Student#{i}', last_name='Honnouji') for i in range(20)
+        ]
+
+        build_rel = partial(Relation, user=user, subject_entity=ryuko, type=rtype)
+
+        with CaptureQueriesContext() as ctxt1:
+            Relation.objects.safe_bulk_create(
+                [build_rel(object_entity=contact) for contact in contacts[:2]],
+            )
+
+        with CaptureQueriesContext() as ctxt2:
+            Relation.objects.safe_bulk_create(
+                [build_rel(object_entity=contact) for contact in contacts[2:]],
+            )
+
+        self.assertEqual(len(ctxt1), len(ctxt2))
+        self.assertEqual(20, Relation.objects.filter(type=rtype, subject_entity=ryuko).count())
+
+        # Argument "check_existing"
+        with CaptureQueriesContext() as ctxt3:
+            Relation.objects.safe_bulk_create(
+                [build_rel(object_entity=ryuko)], check_existing=False,
+            )
+
+        self.assertEqual(len(ctxt1), len(ctxt3) + 1)
+
+    def test_manager_safe_bulk_create05(self):
+        "Argument <batch_size>."
+        rtype = RelationType.create(
+            ('test-subject_foobar', 'challenges'),
+            ('test-object_foobar',  'is challenged by')
+        )[0]
+
+        user = self.user
+        create_contact = partial(FakeContact.objects.create, user=user)
+        ryuko = create_contact(first_name='Ryuko', last_name='Matoi')
+        contacts = [
+            create_contact(first_name=f'Student#{i}', last_name='Honnouji') for i in range(5)
+        ]
+
+        created = Relation.objects.safe_bulk_create(
+            [
+                Relation(user=user, subject_entity=ryuko, type=rtype, object_entity=contact)
+                for contact in contacts
+            ],
+            batch_size=2,
+        )
+        self.assertListEqual(
+            [contact.id for contact in contacts],
+            [relation.object_entity_id for relation in created],
+        )
+
+        for relation in Relation.objects.filter(type=rtype).select_related('symmetric_relation'):
+            self.assertEqual(relation.id, relation.symmetric_relation.symmetric_relation_id)
+            self.assertEqual(
+                relation.subject_entity_id, relation.symmetric_relation.object_entity_id,
+            )
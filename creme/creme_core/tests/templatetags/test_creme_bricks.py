@@ -161,6 +161,45 @@ class CremeBricksTagsTestCase(CremeTestCase, BrickTestCaseMixin):
 
         self.assertFalse(render.strip())
 
+    def test_brick_declare_n_display03(self):
+        "Deferred Brick."
+        self.login()
+
+        class FooBrick(Brick):
+            id_ = Brick.generate_id(
+                'creme_core',
+                'CremeBricksTagsTestCase__brick_test_brick_declare_n_display03',
+            )
+            verbose_name = 'Slow brick'
+            deferred = True
+
+            def detailview_display(self, context):
+                return '<div>FOOBAR</div>'
+
+        template = Template(
+            '{% load creme_bricks %}'
+            '{% brick_declare my_brick %}'
+            '{% brick_display my_brick deferred=allowed %}'
+        )
+
+        with self.assertNoException():
+            render = template.render(RequestContext(
+                self._build_request(), {'my_brick': FooBrick(), 'allowed': True},
+            ))
+
+        brick_node = self.get_brick_node(self.get_html_tree(render), FooBrick.id_)
+        self.assertIn('brick-deferred', brick_node.attrib.get('class'))
+        self.assertNotIn('FOOBAR', render)
+        self.assertIn(FooBrick.verbose_name, render)
+
+        # Not allowed by the page
+        with self.assertNoException():
+            render = template.render(RequestContext(
+                self._build_request(), {'my_brick': FooBrick(), 'allowed': False},
+            ))
+
+        self.assertEqual('<div>FOOBAR</div>', render.strip())
+
     def test_brick_end(self):
         self.login()
 
@@ -7,6 +7,8 @@ from json import loads as json_load
 
 from django.contrib.contenttypes.models import ContentType
 from django.template import Context, Template
+from django.test.utils import override_settings
+from django.urls import reverse
 from django.utils.translation import gettext, gettext_lazy
 
 from creme.creme_core.auth.entity_credentials import EntityCredentials
@@ -679,6 +681,22 @@ class CremeCoreTagsTestCase(CremeTestCase):
             render.strip()
         )
 
+    def test_jobs_progress_url(self):
+        with self.assertNoException():
+            template = Template(
+                '{% load creme_core_tags %}'
+                '{% jobs_progress_url as progress_url %}'
+                '[{{progress_url}}]'
+            )
+
+        with override_settings(JOBS_PROGRESS_CACHE=''):
+            self.assertEqual('[]', template.render(Context()).strip())
+
+        with override_settings(JOBS_PROGRESS_CACHE='jobs'):
+            render = template.render(Context())
+
+        self.assertEqual(f"[{reverse('creme_core__jobs_progress')}]", render.strip())
+
     def test_escapecss(self):
         with self.assertNoException():
             template = Template(
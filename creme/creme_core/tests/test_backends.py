@@ -1,8 +1,14 @@
 # -*- coding: utf-8 -*-
 
+from os import path
+from tempfile import TemporaryDirectory
+
 from creme.creme_core.backends import _BackendRegistry, base
+from creme.creme_core.backends.csv_export import CSVExportBackend
 from creme.creme_core.backends.csv_import import CSVImportBackend
+from creme.creme_core.backends.xls_export import XLSExportBackend
 from creme.creme_core.backends.xls_import import XLSImportBackend
+from creme.creme_core.utils.xlrd_utils import XlrdReader
 
 from .base import CremeTestCase
 
@@ -68,3 +74,30 @@ class BackendsTestCase(CremeTestCase):
 
         with self.assertRaises(registry.InvalidClass):
             registry.get_backend_class(CSVImportBackend.id)
+
+    def test_write_file_csv(self):
+        rows = iter([['Name', 'Age'], ['Rei', '14'], ['Asuka', '14']])
+
+        with TemporaryDirectory() as dir_path:
+            file_path = path.join(dir_path, 'export.csv')
+            CSVExportBackend().write_file(file_path, rows)
+
+            with open(file_path, 'rb') as f:
+                content = f.read().decode()
+
+        self.assertListEqual(
+            ['"Name","Age"', '"Rei","14"', '"Asuka","14"'],
+            [s for s in content.split('\r\n') if s],
+        )
+
+    def test_write_file_xls(self):
+        rows = iter([['Name', 'Age'], ['Rei', '14']])
+
+        with TemporaryDirectory() as dir_path:
+            file_path = path.join(dir_path, 'export.xls')
+            XLSExportBackend().write_file(file_path, rows)
+
+            self.assertListEqual(
+                [['Name', 'Age'], ['Rei', '14']],
+                [*XlrdReader(filedata=file_path)],
+            )
@@ -1,14 +1,25 @@
 # -*- coding: utf-8 -*-
 
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from json import dumps as json_dump
+from threading import current_thread
 
+from django.test import override_settings
+from django.test.client import RequestFactory
 from django.urls import reverse
+from django.utils import timezone, translation
 
 from creme.creme_core.auth.entity_credentials import EntityCredentials
-from creme.creme_core.bricks import RelationsBrick
+from creme.creme_core.bricks import PropertiesBrick, RelationsBrick
 from creme.creme_core.constants import MODELBRICK_ID
 from creme.creme_core.core.entity_cell import EntityCellRegularField
+from creme.creme_core.global_info import (
+    clear_global_info,
+    get_global_info,
+    get_per_request_cache,
+    set_global_info,
+)
 from creme.creme_core.gui.bricks import (
     Brick,
     BricksManager,
@@ -19,6 +30,8 @@ from creme.creme_core.gui.bricks import (
 from creme.creme_core.models import (
     BrickDetailviewLocation,
     BrickState,
+    CremeProperty,
+    CremePropertyType,
     CustomBrickConfigItem,
     FakeAddress,
     FakeContact,
@@ -30,6 +43,7 @@ from creme.creme_core.models import (
     RelationType,
     SetCredentials,
 )
+from creme.creme_core.views.bricks import BricksReloading
 
 from ..base import CremeTestCase
 from .base import BrickTestCaseMixin
@@ -473,6 +487,103 @@ class BrickViewTestCase(CremeTestCase, BrickTestCaseMixin):
             response.json()
         )
 
+    def test_reload_threaded_render(self):
+        "The bricks rendered by other threads get the user, language & time zone."
+        user = self.login()
+
+        view = BricksReloading()
+        view.request = request = RequestFactory().get('/')
+        request.user = user
+
+        set_global_info(user=user, per_request_cache={})
+
+        try:
+            cache = get_per_request_cache()
+
+            with translation.override('fr'), timezone.override('Asia/Tokyo'):
+                render = view._build_threaded_render()
+
+            def render_func(context):
+                return (
+                    current_thread(),
+                    get_global_info('user'),
+                    get_per_request_cache(),
+                    translation.get_language(),
+                    timezone.get_current_timezone_name(),
+                    context['foo'],
+                )
+
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                thread, *info = executor.submit(render, render_func, {'foo': 'bar'}).result()
+                after = executor.submit(get_global_info, 'user').result()
+        finally:
+            clear_global_info()
+
+        self.assertIsNot(current_thread(), thread)
+        self.assertListEqual([user, cache, 'fr', 'Asia/Tokyo', 'bar'], info)
+        self.assertIsNot(cache, info[1])
+        self.assertIsNone(after)
+
+    def test_reload_thread_context(self):
+        "The threads get their own entity & shared data."
+        user = self.login()
+        contact = FakeContact.objects.create(user=user, first_name='Rei', last_name='Ayanami')
+        contact.get_properties()
+        shared = {'foo': 'bar'}
+
+        context = BricksReloading().get_thread_context({
+            'object': contact, 'shared': shared, 'user': user,
+        })
+        self.assertIs(user, context['user'])
+
+        shared_copy = context['shared']
+        self.assertDictEqual(shared, shared_copy)
+        self.assertIsNot(shared, shared_copy)
+
+        contact_copy = context['object']
+        self.assertIsInstance(contact_copy, FakeContact)
+        self.assertIsNot(contact, contact_copy)
+        self.assertEqual(contact.id, contact_copy.id)
+        self.assertEqual(contact.last_name, contact_copy.last_name)
+        self.assertIsNot(contact._relations_map, contact_copy._relations_map)
+        self.assertIsNot(contact._cvalues_map, contact_copy._cvalues_map)
+        self.assertIsNot(contact._state, contact_copy._state)
+        self.assertListEqual(contact._properties, contact_copy._properties)
+        self.assertIsNot(contact._properties, contact_copy._properties)
+
+    @override_settings(
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+            'bricks': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'creme_core-tests-views-bricks_render',
+            },
+        },
+        BRICKS_RENDER_CACHE='bricks',
+    )
+    def test_reload_cached_brick(self):
+        "The cached content is invalidated when a property is added."
+        user = self.login()
+        atom = FakeContact.objects.create(user=user, first_name='Atom', last_name='Tenma')
+
+        url = reverse('creme_core__reload_detailview_bricks', args=(atom.id,))
+        data = {'brick_id': PropertiesBrick.id_}
+
+        def get_content():
+            content = self.assertGET200(url, data=data).json()
+            self.assertEqual(1, len(content))
+
+            return content[0][1]
+
+        ptype = CremePropertyType.create(str_pk='test-prop_robot', text='Is a robot')
+        self.assertNotIn(ptype.text, get_content())
+        self.assertNotIn(ptype.text, get_content())
+
+        CremeProperty.objects.create(type=ptype, creme_entity=atom)
+        self.assertIn(ptype.text, get_content())
+
     def test_relations_brick01(self):
         user = self.login()
 
@@ -11,6 +11,7 @@ from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from django.db.models import Max
 from django.forms import CharField
+from django.test.utils import override_settings
 from django.urls import reverse
 from django.utils.translation import gettext as _
 from django.utils.translation import ngettext
@@ -20,7 +21,11 @@ from creme.creme_config.models import FakeConfigEntity
 from creme.creme_core import constants
 from creme.creme_core.auth.entity_credentials import EntityCredentials
 from creme.creme_core.bricks import EntityJobErrorsBrick, TrashBrick
-from creme.creme_core.creme_jobs import reminder_type, trash_cleaner_type
+from creme.creme_core.creme_jobs import (
+    entities_deletor_type,
+    reminder_type,
+    trash_cleaner_type,
+)
 from creme.creme_core.forms.bulk import (
     _CUSTOMFIELD_FORMAT,
     BulkDefaultEditForm,
@@ -564,6 +569,198 @@ class EntityViewsTestCase(ViewsTestCase, BrickTestCaseMixin):
 
         self.get_object_or_fail(CremeEntity, pk=forbidden.id)
 
+    def test_delete_entities_bulk_trash(self):
+        "Entities of several models are sent to the trash in bulk, with their history."
+        user = self.login(is_superuser=False)
+
+        create_orga = partial(FakeOrganisation.objects.create, user=user)
+        orga1 = create_orga(name='Nerv')
+        orga2 = create_orga(name='Seele')
+        orga3 = create_orga(name='Wille', is_deleted=True)
+        contact = FakeContact.objects.create(user=user, first_name='Rei', last_name='Ayanami')
+        forbidden = create_orga(name='Gehirn', user=self.other_user)
+
+        old_hline_ids = [*HistoryLine.objects.values_list('id', flat=True)]
+        response = self.assertPOST403(
+            self.DEL_ENTITIES_URL,
+            data={'ids': f'{orga1.id},{orga2.id},{orga3.id},{contact.id},{forbidden.id}'},
+        )
+        self.assertDictEqual(
+            {
+                'count': 5,
+                'errors': [
+                    _('{entity} : <b>Permission denied</b>').format(
+                        entity=forbidden.allowed_str(user),
+                    ),
+                ],
+            },
+            response.json(),
+        )
+
+        self.assertIs(self.refresh(orga1).is_deleted, True)
+        self.assertIs(self.refresh(orga2).is_deleted, True)
+        self.assertIs(self.refresh(contact).is_deleted, True)
+        self.assertDoesNotExist(orga3)
+        self.assertIs(self.refresh(forbidden).is_deleted, False)
+
+        hlines = HistoryLine.objects.exclude(id__in=old_hline_ids).filter(
+            type=history.TYPE_TRASH,
+        )
+        self.assertCountEqual(
+            [orga1.id, orga2.id, contact.id],
+            [hline.entity_id for hline in hlines],
+        )
+
+        hline = hlines.get(entity=orga1.id)
+        self.assertEqual(user.username, hline.username)
+        self.assertEqual(user, hline.entity_owner)
+        self.assertListEqual([_('Sent to the trash')], hline.get_verbose_modifications(user))
+
+    @override_settings(ENTITIES_DELETION_JOB_THRESHOLD=2)
+    def test_delete_entities_job(self):
+        "Too many definitive deletions => job."
+        user = self.login()
+
+        create_orga = partial(FakeOrganisation.objects.create, user=user)
+        orga1 = create_orga(name='Nerv')
+        orgas = [create_orga(name=f'Seele #{i}', is_deleted=True) for i in range(3)]
+
+        rtype = RelationType.create(
+            ('test-subject_daughter', 'is a daughter of'),
+            ('test-object_daughter',  'has a daughter'),
+            is_internal=True,
+        )[0]
+        Relation.objects.create(
+            user=user, type=rtype, subject_entity=orgas[0], object_entity=orga1,
+        )
+
+        response = self.assertPOST200(
+            self.DEL_ENTITIES_URL,
+            data={'ids': ','.join(str(e.id) for e in [orga1, *orgas])},
+        )
+        self.assertIs(self.refresh(orga1).is_deleted, True)
+
+        job = self.get_object_or_fail(Job, type_id=entities_deletor_type.id)
+        self.assertEqual(user, job.user)
+        self.assertCountEqual([o.id for o in orgas], job.data['entities'])
+        self.assertDictEqual(
+            {'count': 4, 'errors': [], 'job': job.get_absolute_url()},
+            response.json(),
+        )
+        self.assertListEqual(
+            [
+                ngettext(
+                    'Delete {count} entity definitively',
+                    'Delete {count} entities definitively',
+                    3
+                ).format(count=3),
+            ],
+            entities_deletor_type.get_description(job),
+        )
+        self.assertEqual(0, entities_deletor_type.progress(job).percentage)
+
+        entities_deletor_type.execute(job)
+        self.assertStillExists(orgas[0])
+        self.assertDoesNotExist(orgas[1])
+        self.assertDoesNotExist(orgas[2])
+
+        jresults = EntityJobResult.objects.filter(job=job)
+        self.assertEqual(1, len(jresults))
+
+        jresult = jresults[0]
+        self.assertEqual(orgas[0].id, jresult.entity_id)
+        self.assertListEqual(
+            [
+                _(
+                    '«{entity}» can not be deleted because of its '
+                    'dependencies ({dependencies}).'
+                ).format(
+                    entity=orgas[0].name,
+                    dependencies=f'is a daughter of «{orga1.name}»',
+                ),
+            ],
+            jresult.messages,
+        )
+
+        self.assertEqual(100, entities_deletor_type.progress(job).percentage)
+        self.assertListEqual(
+            [
+                ngettext(
+                    '{count} entity deleted.', '{count} entities deleted.', 2,
+                ).format(count=2),
+                ngettext(
+                    '{count} entity cannot be deleted.', '{count} entities cannot be deleted.', 1,
+                ).format(count=1),
+            ],
+            entities_deletor_type.get_stats(job),
+        )
+
+    @override_settings(ENTITIES_DELETION_JOB_THRESHOLD=1, MAX_JOBS_PER_USER=1)
+    def test_delete_entities_job_limit(self):
+        "Too many jobs."
+        user = self.login()
+        Job.objects.create(type_id=entities_deletor_type.id, user=user, data={'entities': []})
+
+        create_orga = partial(FakeOrganisation.objects.create, user=user, is_deleted=True)
+        orga1 = create_orga(name='Nerv')
+        orga2 = create_orga(name='Seele')
+
+        response = self.assertPOST409(
+            self.DEL_ENTITIES_URL, data={'ids': f'{orga1.id},{orga2.id}'},
+        )
+        self.assertDictEqual(
+            {
+                'count': 2,
+                'errors': [
+                    ngettext(
+                        '{count} entity cannot be deleted now, because you have '
+                        'too many jobs which are not finished.',
+                        '{count} entities cannot be deleted now, because you have '
+                        'too many jobs which are not finished.',
+                        2
+                    ).format(count=2),
+                ],
+            },
+            response.json(),
+        )
+        self.assertStillExists(orga1)
+        self.assertStillExists(orga2)
+        self.assertEqual(1, Job.objects.filter(type_id=entities_deletor_type.id).count())
+
+    def test_entities_deletor_job_restored(self):
+        "The credentials are checked again, & restored entities are not deleted."
+        user = self.login(is_superuser=False)
+
+        create_orga = partial(FakeOrganisation.objects.create, user=user, is_deleted=True)
+        orga1 = create_orga(name='Nerv')
+        orga2 = create_orga(name='Seele', is_deleted=False)
+        orga3 = create_orga(name='Gehirn', user=self.other_user)
+
+        job = Job.objects.create(
+            type_id=entities_deletor_type.id,
+            user=user,
+            data={'entities': [orga1.id, orga2.id, orga3.id]},
+        )
+        entities_deletor_type.execute(job)
+        self.assertDoesNotExist(orga1)
+        self.assertStillExists(orga2)
+        self.assertStillExists(orga3)
+
+        self.assertDictEqual(
+            {
+                orga2.id: [_('The entity has been restored in the meantime.')],
+                orga3.id: [
+                    _('{entity} : <b>Permission denied</b>').format(
+                        entity=orga3.allowed_str(user),
+                    ),
+                ],
+            },
+            {
+                jresult.entity_id: jresult.messages
+                for jresult in EntityJobResult.objects.filter(job=job)
+            },
+        )
+
     # TODO ??
     # def test_delete_entities04(self):
     #     self.login()
@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
 
+from functools import partial
+
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
 from django.utils.translation import gettext as _
 
@@ -176,6 +181,125 @@ class EnumerableViewsTestCase(ViewsTestCase):
         response = self.assertGET404(self._build_choices_url(models.FakeContact, 'unknown'))
         self.assertIn('This field does not exist.', response.content.decode())
 
+    def test_choices_paginated(self):
+        self.login()
+
+        create_civ = models.FakeCivility.objects.create
+        civ1 = create_civ(title='Kaiser', shortcut='Ks.')
+        civ2 = create_civ(title='Kaiserin', shortcut='Ksin.')
+        civ3 = create_civ(title='Kaiserling', shortcut='Ksl.')
+
+        url = self._build_choices_url(models.FakeContact, 'civility')
+        response1 = self.assertGET200(url, data={'term': 'kaiser', 'limit': 2})
+        self.assertDictEqual(
+            {
+                'choices': [
+                    {'value': civ1.id, 'label': civ1.title},
+                    {'value': civ2.id, 'label': civ2.title},
+                ],
+                'more': True,
+            },
+            response1.json(),
+        )
+
+        response2 = self.assertGET200(url, data={'term': 'kaiser', 'limit': 2, 'offset': 2})
+        self.assertDictEqual(
+            {
+                'choices': [{'value': civ3.id, 'label': civ3.title}],
+                'more': False,
+            },
+            response2.json(),
+        )
+
+        response3 = self.assertGET200(url, data={'value': [civ3.id, civ1.id]})
+        self.assertDictEqual(
+            {
+                'choices': [
+                    {'value': civ1.id, 'label': civ1.title},
+                    {'value': civ3.id, 'label': civ3.title},
+                ],
+                'more': False,
+            },
+            response3.json(),
+        )
+
+        self.assertGET404(url, data={'limit': 'notint'})
+
+    def test_choices_paginated_max_limit(self):
+        self.login()
+
+        count = models.FakeCivility.objects.count()
+        self.assertGreater(count, 2)
+
+        from ...views.enumerable import ChoicesView
+
+        url = self._build_choices_url(models.FakeContact, 'civility')
+        old_max_limit = ChoicesView.max_limit
+
+        try:
+            ChoicesView.max_limit = 2
+            response = self.assertGET200(url, data={'limit': 1000})
+        finally:
+            ChoicesView.max_limit = old_max_limit
+
+        data = response.json()
+        self.assertEqual(2, len(data['choices']))
+        self.assertIs(data['more'], True)
+
+    def test_choices_etag(self):
+        "ETag computed from the content."
+        self.login()
+
+        url = self._build_choices_url(models.FakeContact, 'civility')
+        response1 = self.assertGET200(url)
+        etag = response1['ETag']
+        self.assertTrue(etag)
+        self.assertIn('private', response1['Cache-Control'])
+
+        response2 = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, response2.status_code)
+
+        models.FakeCivility.objects.create(title='Kaiser', shortcut='Ks.')
+        response3 = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response3.status_code)
+        self.assertNotEqual(etag, response3['ETag'])
+
+    @override_settings(
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+            'enumerable': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'creme_core-tests-enumerable_versions',
+            },
+        },
+        ENUMERABLE_CACHE='enumerable',
+    )
+    def test_choices_etag_versions(self):
+        "ETag computed from the versions of the models."
+        self.login()
+        caches['enumerable'].clear()
+
+        url = self._build_choices_url(models.FakeContact, 'civility')
+        etag = self.assertGET200(url)['ETag']
+
+        with CaptureQueriesContext(connection) as ctxt:
+            response2 = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(304, response2.status_code)
+
+        civ_table = models.FakeCivility._meta.db_table
+        self.assertFalse([q for q in ctxt.captured_queries if civ_table in q['sql']])
+
+        # Another page => another ETag
+        self.assertNotEqual(etag, self.assertGET200(url, data={'limit': 2})['ETag'])
+
+        models.FakeCivility.objects.create(title='Kaiser', shortcut='Ks.')
+        response3 = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response3.status_code)
+        self.assertIn('Kaiser', [c['label'] for c in response3.json()])
+
     def test_custom_enum_not_exists(self):
         self.login()
 
@@ -203,3 +327,42 @@ class EnumerableViewsTestCase(ViewsTestCase):
                          ],
                          response.json()
                         )
+
+    def test_custom_enum_paginated(self):
+        self.login()
+
+        custom_field = models.CustomField.objects.create(
+            name='Eva',
+            field_type=models.CustomField.ENUM,
+            content_type=models.FakeContact,
+        )
+
+        create_evalue = partial(
+            models.CustomFieldEnumValue.objects.create, custom_field=custom_field,
+        )
+        eva02 = create_evalue(value='Eva-02')
+        eva00 = create_evalue(value='Eva-00')
+        create_evalue(value='Mark.06')
+        eva01 = create_evalue(value='Eva-01')
+
+        url = reverse('creme_core__cfield_enums', args=(custom_field.id,))
+        response1 = self.assertGET200(url, data={'term': 'eva', 'limit': 2})
+        self.assertDictEqual(
+            {
+                'choices': [[eva00.id, eva00.value], [eva01.id, eva01.value]],
+                'more': True,
+            },
+            response1.json(),
+        )
+
+        response2 = self.assertGET200(url, data={'term': 'eva', 'limit': 2, 'offset': 2})
+        self.assertDictEqual(
+            {'choices': [[eva02.id, eva02.value]], 'more': False},
+            response2.json(),
+        )
+
+        response3 = self.assertGET200(url, data={'value': [eva01.id, 'invalid']})
+        self.assertDictEqual(
+            {'choices': [[eva01.id, eva01.value]], 'more': False},
+            response3.json(),
+        )
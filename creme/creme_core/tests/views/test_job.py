@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from json import dumps as json_dump
+from unittest.mock import patch
 
 from django.contrib.contenttypes.models import ContentType
 from django.db.models import Max
@@ -18,7 +19,7 @@ from creme.creme_core.bricks import (
     JobErrorsBrick,
 )
 # Should be a test queue
-from creme.creme_core.core.job import JobSchedulerQueue
+from creme.creme_core.core.job import JobSchedulerQueue, job_progress_channel
 from creme.creme_core.creme_jobs import (
     batch_process_type,
     reminder_type,
@@ -27,6 +28,7 @@ from creme.creme_core.creme_jobs import (
 from creme.creme_core.creme_jobs.base import JobType
 from creme.creme_core.models import EntityJobResult, Job
 from creme.creme_core.utils.dates import dt_to_ISO8601
+from creme.creme_core.views.job import JobsProgress
 
 from ..fake_models import FakeOrganisation
 from .base import BrickTestCaseMixin, ViewsTestCase
@@ -36,6 +38,7 @@ class JobViewsTestCase(ViewsTestCase, BrickTestCaseMixin):
     LIST_URL = reverse('creme_core__jobs')
     MINE_URL = reverse('creme_core__my_jobs')
     INFO_URL = reverse('creme_core__jobs_info')
+    PROGRESS_URL = reverse('creme_core__jobs_progress')
 
     @classmethod
     def setUpClass(cls):
@@ -101,6 +104,20 @@ class JobViewsTestCase(ViewsTestCase, BrickTestCaseMixin):
         doc = self.get_html_tree(response.content)
         self.get_brick_node(doc, EntityJobErrorsBrick.id_)
 
+        # No progress channel => no long-polling request
+        self.assertNotIn(self.PROGRESS_URL, smart_str(response.content))
+
+    @override_settings(JOBS_PROGRESS_CACHE='default')
+    def test_detailview01_progress(self):
+        "Progress channel is enabled."
+        self.login()
+
+        job = self._create_batchprocess_job()
+        response = self.assertGET200(job.get_absolute_url())
+        self.assertIn(
+            f".progressUrl('{self.PROGRESS_URL}')", smart_str(response.content),
+        )
+
     def test_detailview02(self):
         "List URL"
         self.login()
@@ -691,6 +708,86 @@ class JobViewsTestCase(ViewsTestCase, BrickTestCaseMixin):
             response.json()
         )
 
+    def test_progress01(self):
+        "No cache => the client must use the view for information."
+        self.login(is_superuser=False)
+
+        job1 = self._create_batchprocess_job()
+        job2 = self._create_batchprocess_job(user=self.other_user)
+        job_progress_channel.publish(job1, force=True)
+
+        response = self.assertGET200(
+            self.PROGRESS_URL, data={'id': [job1.id, job2.id, 'invalid']},
+        )
+        self.assertEqual('application/json', response['Content-Type'])
+        self.assertDictEqual(
+            {str(job1.id): None, str(job2.id): 'Job is not allowed'},
+            response.json(),
+        )
+
+    @override_settings(
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+            'jobs': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'creme_core-tests-jobs_progress',
+            },
+        },
+        JOBS_PROGRESS_CACHE='jobs',
+    )
+    def test_progress02(self):
+        "Published snapshots."
+        self.login(is_superuser=False)
+
+        job1 = self._create_batchprocess_job()
+        job2 = self._create_batchprocess_job()  # Not started => no snapshot
+        job_progress_channel.publish(job1, force=True)
+
+        url = self.PROGRESS_URL
+        response1 = self.assertGET200(url, data={'id': [job1.id, job2.id]})
+
+        content1 = response1.json()
+        self.assertIsNone(content1[str(job2.id)])
+
+        snapshot1 = content1[str(job1.id)]
+        self.assertEqual(Job.STATUS_WAIT, snapshot1['status'])
+        self.assertDictEqual(
+            {
+                'label': ngettext(
+                    '{count} entity has been processed.',
+                    '{count} entities have been processed.',
+                    0
+                ).format(count=0),
+                'percentage': None,
+            },
+            snapshot1['progress'],
+        )
+
+        version = snapshot1['version']
+        self.assertTrue(version)
+
+        # Known version => wait for a new snapshot (until the time-out)
+        with patch.object(JobsProgress, 'timeout', 0):
+            response2 = self.assertGET200(
+                url, data={'id': [job1.id], 'version': [f'{job1.id}:{version}']},
+            )
+
+        self.assertDictEqual({str(job1.id): snapshot1}, response2.json())
+
+        # New snapshot
+        job1.status = Job.STATUS_OK
+        job1.save()
+        job_progress_channel.publish(job1, force=True)
+
+        response3 = self.assertGET200(
+            url, data={'id': [job1.id], 'version': [f'{job1.id}:{version}']},
+        )
+        snapshot3 = response3.json()[str(job1.id)]
+        self.assertEqual(Job.STATUS_OK, snapshot3['status'])
+        self.assertNotEqual(version, snapshot3['version'])
+
     def _aux_test_reload(self, job, brick_id):
         response = self.assertGET200(reverse('creme_core__reload_job_bricks', args=(job.id,)),
                                      data={'brick_id': brick_id},
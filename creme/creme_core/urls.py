@@ -315,6 +315,9 @@ job_patterns = [
     re_path(r'^mine[/]?$',            job.MyJobs.as_view(),          name='creme_core__my_jobs'),
     re_path(r'^info[/]?$',            job.JobsInformation.as_view(), name='creme_core__jobs_info'),
     re_path(r'^(?P<job_id>\d+)[/]?$', job.JobDetail.as_view(),       name='creme_core__job'),
+    re_path(
+        r'^progress[/]?$', job.JobsProgress.as_view(), name='creme_core__jobs_progress',
+    ),
 
     re_path(
         r'^(?P<job_id>\d+)/',
@@ -19,21 +19,31 @@
 ################################################################################
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
 # import warnings
 from json import loads as json_load
-from typing import Dict, List, Tuple, Type
+from typing import Callable, Dict, List, Tuple, Type
 
+from django.conf import settings
 from django.core.exceptions import PermissionDenied
-from django.db import IntegrityError
+from django.db import IntegrityError, connection, connections
 from django.http.response import Http404, HttpResponse, HttpResponseBase
 from django.template.context import make_context
 from django.template.engine import Engine
+from django.utils import timezone, translation
 
 from .. import utils
+from ..global_info import (
+    clear_global_info,
+    get_per_request_cache,
+    set_global_info,
+)
 from ..gui.bricks import Brick, BricksManager, _BrickRegistry
 from ..gui.bricks import brick_registry as global_brick_registry
+from ..gui.bricks import get_brick_render_function
 from ..http import CremeJsonResponse
-from ..models import BrickState
+from ..models import BrickState, CremeEntity
 from . import generic
 
 logger = logging.getLogger(__name__)
@@ -258,7 +268,7 @@ class BricksReloading(generic.CheckedView):
             if reloading_info is not None:
                 brick.reloading_info = reloading_info
 
-            render_func = getattr(brick, render_method, None)
+            render_func = get_brick_render_function(brick, render_method)
 
             if render_func is None:
                 logger.warning(
@@ -266,13 +276,102 @@ class BricksReloading(generic.CheckedView):
                     render_method, brick.__class__, brick.id_,
                 )
             else:
-                # NB: the context is copied is order to a 'fresh' one for each
-                # brick, & so avoid annoying side-effects
-                # Notice that build_context() creates a shared dictionary with
-                # the "shared" key in order to explicitly share data between 2+ bricks.
-                brick_renders.append((brick.id_, render_func({**context})))
+                brick_renders.append((brick.id_, render_func))
+
+        # NB: the context is copied is order to a 'fresh' one for each
+        # brick, & so avoid annoying side-effects
+        # Notice that build_context() creates a shared dictionary with
+        # the "shared" key in order to explicitly share data between 2+ bricks.
+        workers = min(self.get_workers_count(), len(brick_renders))
+
+        # NB: the threads use their own connections to the DB, so they cannot
+        #     see the data of the current transaction.
+        if workers > 1 and not connection.in_atomic_block:
+            # NB: the states of the bricks, the used relation types & the session
+            #     are loaded once by the current thread (their caches are not
+            #     thread-safe) ; then the BricksManager is only read.
+            bricks_manager.get_state(brick_renders[0][0], request.user)
+            bricks_manager.used_relationtypes_ids  # NOQA
+            request.session.get('brickcontexts_manager')
+
+            render = self._build_threaded_render()
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                contents = [
+                    *executor.map(
+                        render,
+                        [render_func for __, render_func in brick_renders],
+                        [self.get_thread_context(context) for __ in brick_renders],
+                    ),
+                ]
+        else:
+            contents = [render_func({**context}) for __, render_func in brick_renders]
 
-        return brick_renders
+        return [
+            (brick_id, content)
+            for (brick_id, __), content in zip(brick_renders, contents)
+        ]
+
+    def get_workers_count(self) -> int:
+        "Number of threads used to render the bricks concurrently."
+        return settings.BRICKS_RELOADING_WORKERS
+
+    @staticmethod
+    def _copy_entity(entity: CremeEntity) -> CremeEntity:
+        "Copy of an entity with its own caches (relationships, properties...)."
+        entity_copy = copy(entity)  # NB: the model state is copied too
+        entity_copy._relations_map = {**entity._relations_map}
+        entity_copy._cvalues_map = {**entity._cvalues_map}
+
+        properties = entity._properties
+        if properties is not None:
+            entity_copy._properties = [*properties]
+
+        real_entity = entity._real_entity
+        if isinstance(real_entity, CremeEntity):
+            entity_copy._real_entity = BricksReloading._copy_entity(real_entity)
+
+        return entity_copy
+
+    def get_thread_context(self, context) -> dict:
+        """Build the context of a brick rendered by another thread.
+        The entity (key "object") & the dictionary "shared" are copied, because
+        their caches/contents are not thread-safe ; so the data shared by 2
+        bricks are shared only if they are rendered by the same thread.
+        """
+        thread_context = {**context}
+
+        entity = thread_context.get('object')
+        if isinstance(entity, CremeEntity):
+            thread_context['object'] = self._copy_entity(entity)
+
+        shared = thread_context.get('shared')
+        if isinstance(shared, dict):
+            thread_context['shared'] = {**shared}
+
+        return thread_context
+
+    def _build_threaded_render(self) -> Callable[[Callable, dict], str]:
+        """Build a function which renders a brick in another thread, with the
+        same user, language & time zone as the current one, & a copy of the
+        per-request cache.
+        """
+        user = self.request.user
+        cache = get_per_request_cache()
+        language = translation.get_language()
+        tz = timezone.get_current_timezone()
+
+        def render(render_func, context):
+            set_global_info(user=user, per_request_cache={**cache})
+
+            try:
+                with translation.override(language), timezone.override(tz):
+                    return render_func(context)
+            finally:
+                clear_global_info()
+                connections.close_all()
+
+        return render
 
     def get_bricks_context(self):
         request = self.request
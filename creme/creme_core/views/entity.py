@@ -20,7 +20,6 @@
 
 import logging
 from collections import defaultdict
-from itertools import islice
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
@@ -43,12 +42,9 @@ from .. import constants
 from ..auth import SUPERUSER_PERM
 from ..auth.decorators import login_required
 from ..auth.entity_credentials import EntityCredentials
-from ..core.exceptions import (
-    BadRequestError,
-    ConflictError,
-    SpecificProtectedError,
-)
-from ..creme_jobs import trash_cleaner_type
+from ..core.entity_deletion import EntitiesDeletor
+from ..core.exceptions import BadRequestError, ConflictError
+from ..creme_jobs import entities_deletor_type, trash_cleaner_type
 from ..forms import CremeEntityForm
 from ..forms.bulk import BulkDefaultEditForm
 from ..forms.merge import MergeEntitiesBaseForm
@@ -62,7 +58,6 @@ from ..models import (
     EntityJobResult,
     FieldsConfig,
     Job,
-    Relation,
     Sandbox,
     TrashCleaningCommand,
 )
@@ -751,134 +746,35 @@ class EntityRestoration(base.EntityRelatedMixin, base.CheckedView):
 # TODO: used by EntityFilterDeletion => split ? rename ?
 class EntityDeletionMixin:
     dependencies_limit = 3
+    deletor_class = EntitiesDeletor
 
-    def check_entity_for_deletion(self, entity, user):
-        if entity.get_delete_absolute_url() != CremeEntity.get_delete_absolute_url(entity):
-            raise ConflictError(
-                gettext('«{entity}» does not use the generic deletion view.').format(
-                    entity=entity.allowed_str(user),
-                )
-            )
-
-        if hasattr(entity, 'get_related_entity'):
-            related = entity.get_related_entity()
+    def get_deletor(self, user) -> EntitiesDeletor:
+        deletor = self.deletor_class(user=user)
+        deletor.dependencies_limit = self.dependencies_limit
 
-            if related is None:
-                logger.critical(
-                    'delete_entity(): an auxiliary entity seems orphan (id=%s)',
-                    entity.id,
-                )
-                raise PermissionDenied(
-                    gettext('You are not allowed to delete this entity: {}').format(
-                        entity.allowed_str(user),
-                    )
-                )
+        return deletor
 
-            if not user.has_perm_to_change(related):
-                raise PermissionDenied(
-                    gettext('{entity} : <b>Permission denied</b>').format(
-                        entity=entity.allowed_str(user),
-                    )
-                )
-        else:
-            if not user.has_perm_to_delete(entity):
-                raise PermissionDenied(
-                    gettext('{entity} : <b>Permission denied</b>').format(
-                        entity=entity.allowed_str(user),
-                    )
-                )
+    def check_entity_for_deletion(self, entity, user):
+        self.get_deletor(user).check_entity(entity)
 
     def delete_entity(self, entity, user):
-        try:
-            if self.move_to_trash(entity):
-                entity.trash()
-            else:
-                entity.delete()
-        except SpecificProtectedError as e:
-            raise ConflictError(
-                '{} {}'.format(
-                    gettext('«{entity}» can not be deleted.').format(
-                        entity=entity.allowed_str(user),
-                    ),
-                    e.args[0],
-                ),
-            ) from e
-        except ProtectedError as e:
-            raise ConflictError(
-                gettext(
-                    '«{entity}» can not be deleted because of its dependencies '
-                    '({dependencies}).'
-                ).format(
-                    entity=entity.allowed_str(user),
-                    dependencies=self.dependencies_to_str(
-                        dependencies=e.args[1],
-                        user=user,
-                    ),
-                ),
-            ) from e
-        except Exception as e:
-            logger.exception('Error when trying to empty the trash')
-            raise ConflictError(
-                gettext('«{entity}» deletion caused an unexpected error [{error}].').format(
-                    entity=entity.allowed_str(user),
-                    error=e,
-                ),
-            ) from e
+        self.get_deletor(user).delete_entity(entity)
 
     def dependencies_to_str(self, *, dependencies, user):
-        def deps_generator():
-            not_viewable_count = 0
-            can_view = user.has_perm_to_view
-
-            def is_printable_relation(dep):
-                return isinstance(dep, Relation) and '-object_' not in dep.type_id
-
-            for dep in dependencies:
-                if isinstance(dep, CremeEntity):
-                    if can_view(dep):
-                        yield gettext('«{object}» ({model})').format(
-                            object=dep, model=dep.entity_type,
-                        )
-                    else:
-                        not_viewable_count += 1
-
-            for dep in dependencies:
-                if is_printable_relation(dep) and can_view(dep.object_entity):
-                    yield f'{dep.type.predicate} «{dep.object_entity}»'
-
-            if not_viewable_count:
-                yield ngettext(
-                    '{count} not viewable entity',
-                    '{count} not viewable entities',
-                    not_viewable_count
-                ).format(count=not_viewable_count)
-
-            for dep in dependencies:
-                if is_printable_relation(dep) and not can_view(dep.object_entity):
-                    yield f'{dep.type.predicate} «{settings.HIDDEN_VALUE}»'
-
-            for dep in dependencies:
-                if not isinstance(dep, (CremeEntity, Relation)):
-                    yield str(dep)
-
-        limit = self.dependencies_limit
-        str_deps = [*islice(deps_generator(), limit + 1)]
-
-        do_ellipsis = False
-        if len(str_deps) > limit:
-            str_deps.pop()
-            do_ellipsis = True
-
-        result = ', '.join(str_deps[:limit])
-
-        return result + '…' if do_ellipsis else result
+        return self.get_deletor(user).dependencies_to_str(dependencies)
 
     def move_to_trash(self, entity):
-        return False if hasattr(entity, 'get_related_entity') else not entity.is_deleted
+        return self.deletor_class.move_to_trash(entity)
 
 
 class EntitiesDeletion(EntityDeletionMixin, base.CheckedView):
-    "Delete several CremeEntities, with a Ajax call (POST method)."
+    """Delete several CremeEntities, with a Ajax call (POST method).
+
+    The entities are checked & sent to the trash in bulk ; when too many
+    entities have to be deleted definitively (see the setting
+    "ENTITIES_DELETION_JOB_THRESHOLD"), they are deleted by a job.
+    """
+    job_type = entities_deletor_type
 
     def get_entity_ids(self):
         try:
@@ -897,47 +793,97 @@ class EntitiesDeletion(EntityDeletionMixin, base.CheckedView):
 
         return entity_ids
 
+    def create_job(self, entities):
+        "Create a job which deletes the entities ; returns None if it is not possible."
+        user = self.request.user
+
+        if Job.not_finished_jobs(user).count() >= settings.MAX_JOBS_PER_USER:
+            return None
+
+        return Job.objects.create(
+            type_id=self.job_type.id,
+            user=user,
+            data={'entities': [entity.id for entity in entities]},
+        )
+
     def post(self, request, *args, **kwargs):
         entity_ids = self.get_entity_ids()
-        user = request.user
+        deletor = self.get_deletor(request.user)
         errors = defaultdict(list)
+        job = None
+
+        def add_errors(deletion_errors):
+            for __, e in deletion_errors:
+                errors[403 if isinstance(e, PermissionDenied) else 409].append(e.args[0])
+
+        entities = [*CremeEntity.objects.filter(pk__in=entity_ids)]
+
+        len_diff = len(entity_ids) - len(entities)
+        if len_diff:
+            errors[404].append(
+                ngettext(
+                    "{count} entity doesn't exist or has been removed.",
+                    "{count} entities don't exist or have been removed.",
+                    len_diff
+                ).format(count=len_diff)
+            )
 
-        with atomic():
-            entities = [*CremeEntity.objects.select_for_update().filter(pk__in=entity_ids)]
+        CremeEntity.populate_real_entities(entities)
 
-            len_diff = len(entity_ids) - len(entities)
-            if len_diff:
-                errors[404].append(
-                    ngettext(
-                        "{count} entity doesn't exist or has been removed.",
-                        "{count} entities don't exist or have been removed.",
-                        len_diff
-                    ).format(count=len_diff)
-                )
+        allowed_entities, check_errors = deletor.check_entities(
+            [entity.get_real_entity() for entity in entities]
+        )
+        add_errors(check_errors)
 
-            CremeEntity.populate_real_entities(entities)
+        entities_to_trash = []
+        entities_to_delete = []
+        for entity in allowed_entities:
+            if deletor.move_to_trash(entity):
+                entities_to_trash.append(entity)
+            else:
+                entities_to_delete.append(entity)
 
-            for entity in entities:
-                real_entity = entity.get_real_entity()
+        add_errors(deletor.trash_entities(entities_to_trash))
 
-                try:
-                    self.check_entity_for_deletion(entity=real_entity, user=user)
-                    self.delete_entity(entity=entity.get_real_entity(), user=user)
-                except PermissionDenied as e:
-                    errors[403].append(e.args[0])
-                except ConflictError as e:
-                    errors[409].append(e.args[0])
+        if len(entities_to_delete) > settings.ENTITIES_DELETION_JOB_THRESHOLD:
+            job = self.create_job(entities_to_delete)
 
-        if not errors:
+            if job is None:
+                errors[409].append(
+                    ngettext(
+                        '{count} entity cannot be deleted now, because you have '
+                        'too many jobs which are not finished.',
+                        '{count} entities cannot be deleted now, because you have '
+                        'too many jobs which are not finished.',
+                        len(entities_to_delete)
+                    ).format(count=len(entities_to_delete))
+                )
+        elif entities_to_delete:
+            with atomic():
+                locked_ids = {
+                    *CremeEntity.objects.select_for_update().filter(
+                        pk__in=[entity.id for entity in entities_to_delete],
+                    ).values_list('id', flat=True)
+                }
+                add_errors(deletor.delete_entities(
+                    entity for entity in entities_to_delete if entity.id in locked_ids
+                ))
+
+        if not errors and job is None:
             status = 200
             message = gettext('Operation successfully completed')
             content_type = None
         else:
-            status = min(errors)
-            message = json_encode({
+            status = min(errors) if errors else 200
+            data = {
                 'count': len(entity_ids),
                 'errors': [msg for error_messages in errors.values() for msg in error_messages],
-            })
+            }
+
+            if job is not None:
+                data['job'] = job.get_absolute_url()
+
+            message = json_encode(data)
             content_type = 'application/json'
 
         return HttpResponse(message, content_type=content_type, status=status)
@@ -18,21 +18,86 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+from hashlib import md5
+
 from django.core.exceptions import FieldDoesNotExist
 from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.utils.translation import get_language
 
-from ..core.enumerable import enumerable_registry
+from ..core.enumerable import enumerable_registry, enumerable_versions
 from ..core.exceptions import ConflictError
 from ..http import CremeJsonResponse
 from ..models import CustomField, CustomFieldEnumValue
+from ..utils import get_from_GET_or_404
 from .generic import base
 
 
-class ChoicesView(base.ContentTypeRelatedMixin, base.CheckedView):
+class PaginatedChoicesMixin:
+    """Mixin for the views which return some choices, with the optional
+    GET arguments:
+      - "term": only the choices whose label contains this string are returned.
+      - "value" (can be given several times): only these values are returned.
+      - "limit" & "offset": to paginate the choices ; "limit" is bounded by
+        the attribute "max_limit".
+
+    When one of these arguments is given, the response is a dictionary
+    {"choices": [...], "more": boolean} ("more" indicates that there are
+    other choices after this page) ; otherwise it is the list of all choices.
+    """
+    term_arg = 'term'
+    values_arg = 'value'
+    limit_arg = 'limit'
+    offset_arg = 'offset'
+    max_limit = 200
+
+    def is_paginated(self) -> bool:
+        GET = self.request.GET
+
+        return any(
+            arg in GET
+            for arg in (self.term_arg, self.values_arg, self.limit_arg, self.offset_arg)
+        )
+
+    def get_filter_kwargs(self) -> dict:
+        "Get the arguments of the filtering (the limit is increased by one)."
+        GET = self.request.GET
+        max_limit = self.max_limit
+
+        return {
+            'term': GET.get(self.term_arg, '').strip(),
+            'values': GET.getlist(self.values_arg) if self.values_arg in GET else None,
+            # NB: we retrieve one additional choice to know if there are other ones.
+            'limit': min(
+                max(get_from_GET_or_404(GET, self.limit_arg, cast=int, default=max_limit), 1),
+                max_limit,
+            ) + 1,
+            'offset': max(get_from_GET_or_404(GET, self.offset_arg, cast=int, default=0), 0),
+        }
+
+    @staticmethod
+    def paginated_data(choices: list, limit: int) -> dict:
+        return {
+            'choices': choices[:limit],
+            'more': len(choices) > limit,
+        }
+
+
+class ChoicesView(PaginatedChoicesMixin, base.ContentTypeRelatedMixin, base.CheckedView):
+    """Get the choices of an enumerable field (see PaginatedChoicesMixin for
+    the optional arguments).
+
+    The response gets an ETag, so the browser can re-validate its cached
+    choices ; when the setting "ENUMERABLE_CACHE" is set, the ETag is computed
+    from the versions of the models (see EnumerableVersions) without query
+    (so the choices are not even retrieved when they have not changed).
+    """
     response_class = CremeJsonResponse
     field_url_kwarg = 'field'
     registry = enumerable_registry
+    versions = enumerable_versions
 
     def check_related_ctype(self, ctype):
         self.request.user.has_perm_to_access_or_die(ctype.app_label)
@@ -51,21 +116,99 @@ class ChoicesView(base.ContentTypeRelatedMixin, base.CheckedView):
         except ValueError as e:
             raise ConflictError(e) from e
 
-    def get(self, request, *args, **kwargs):
-        return self.response_class(
-            self.get_enumerator().choices(user=request.user),
-            safe=False,  # Result is not a dictionary
+    def get_choices_data(self, enumerator):
+        user = self.request.user
+
+        if not self.is_paginated():
+            return enumerator.choices(user=user)
+
+        kwargs = self.get_filter_kwargs()
+
+        return self.paginated_data(
+            enumerator.filter_choices(user, **kwargs),
+            limit=kwargs['limit'] - 1,
         )
 
+    def get_etag(self, enumerator):
+        """Get the ETag computed from the versions of the models used by the
+        enumerator.
+        @return A string, or <None> if the versions are not available.
+        """
+        dependencies = enumerator.cache_dependencies()
+        if dependencies is None:
+            return None
 
-class CustomFieldEnumsView(base.CheckedView):
+        versions = self.versions.get_versions(dependencies)
+        if versions is None:
+            return None
+
+        request = self.request
+        digest = md5()
+        for part in (
+            request.user.id,
+            get_language(),
+            request.get_full_path(),
+            *versions,
+        ):
+            digest.update(f'{part}#'.encode())
+
+        return quote_etag(digest.hexdigest())
+
+    def get(self, request, *args, **kwargs):
+        enumerator = self.get_enumerator()
+        etag = self.get_etag(enumerator)
+        response = None if etag is None else get_conditional_response(request, etag=etag)
+
+        if response is None:
+            response = self.response_class(
+                self.get_choices_data(enumerator),
+                safe=False,  # Result is not a dictionary
+            )
+
+            if etag is None:
+                etag = quote_etag(md5(response.content).hexdigest())
+                response = get_conditional_response(request, etag=etag, response=response)
+
+        response['ETag'] = etag
+
+        # NB: the browser has to re-validate its cached choices at each call.
+        patch_cache_control(response, private=True, no_cache=True)
+
+        return response
+
+
+class CustomFieldEnumsView(PaginatedChoicesMixin, base.CheckedView):
+    """Get the choices of a CustomField (ENUM or MULTI_ENUM) as a list of
+    pairs (id, value) ; see PaginatedChoicesMixin for the optional arguments.
+    """
     response_class = CremeJsonResponse
     cfield_id_url_kwarg = 'cf_id'
 
     def get(self, request, *args, **kwargs):
         cf = get_object_or_404(CustomField, pk=kwargs[self.cfield_id_url_kwarg])
+        qs = CustomFieldEnumValue.objects.filter(custom_field=cf)
+
+        if self.is_paginated():
+            kwargs = self.get_filter_kwargs()
+            values = kwargs['values']
+            term = kwargs['term']
+            limit = kwargs['limit']
+            offset = kwargs['offset']
+
+            if values is not None:
+                qs = qs.filter(id__in=[v for v in values if v.isdigit()])
+
+            if term:
+                qs = qs.filter(value__icontains=term)
+
+            data = self.paginated_data(
+                [*qs.order_by('value', 'id').values_list('id', 'value')[offset:offset + limit]],
+                limit=limit - 1,
+            )
+        else:
+            data = [*qs.values_list('id', 'value')]
 
         return self.response_class(
-            [*CustomFieldEnumValue.objects.filter(custom_field=cf).values_list('id', 'value')],
+            data,
             safe=False,  # Result is not a dictionary
         )
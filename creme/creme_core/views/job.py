@@ -18,6 +18,8 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+from time import monotonic, sleep
+
 from django.db.transaction import atomic
 from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
@@ -29,7 +31,7 @@ from django.utils.translation import gettext_lazy as _
 from ..auth import SUPERUSER_PERM
 from ..bricks import JobBrick
 from ..core.exceptions import ConflictError
-from ..core.job import JobSchedulerQueue
+from ..core.job import JobSchedulerQueue, job_progress_channel
 from ..http import CremeJsonResponse
 from ..models import Job
 from . import bricks as bricks_views
@@ -209,6 +211,95 @@ class JobsInformation(generic.CheckedView):
         return self.response_class(self.get_jobs_info())
 
 
+class JobsProgress(generic.CheckedView):
+    """Long-polling view which returns the progress of some jobs, as soon as
+    one of them has published a new snapshot (see JobProgressChannel).
+
+    The GET arguments are:
+        - "id": ID of a job (can be given several times).
+        - "version": "<job_id>:<version>", with the version of the last
+          snapshot known by the client (can be given several times).
+
+    The value for a job without snapshot is <null> ; the client has to
+    get its information with the view JobsInformation (i.e. from the DB).
+
+    Notice that a request holds a worker of the web server (a process/thread
+    with a synchronous WSGI server) until a new snapshot is published or the
+    time-out is reached ; so each opened job brick/popup keeps a worker busy
+    most of the time while its jobs are running. Configure enough workers (or
+    reduce the attribute "timeout") if many jobs are monitored at the same time.
+    """
+    response_class = CremeJsonResponse
+    job_ids_arg = 'id'
+    versions_arg = 'version'
+    # Maximum duration (in seconds) of a request.
+    timeout = 5
+    # Delay (in seconds) between 2 readings of the snapshots.
+    poll_period = 0.5
+
+    def get_job_ids(self):
+        return [
+            int(ji)
+            for ji in self.request.GET.getlist(self.job_ids_arg)
+            if ji.isdigit()
+        ]
+
+    def get_versions(self):
+        versions = {}
+
+        for arg in self.request.GET.getlist(self.versions_arg):
+            job_id, __, version = arg.partition(':')
+
+            if job_id.isdigit():
+                versions[int(job_id)] = version
+
+        return versions
+
+    def get_allowed_job_ids(self, job_ids):
+        user = self.request.user
+        jobs = Job.objects.filter(id__in=job_ids)
+
+        if not user.is_superuser:
+            jobs = jobs.filter(user=user)
+
+        return {*jobs.values_list('id', flat=True)}
+
+    def wait_snapshots(self, job_ids, versions):
+        deadline = monotonic() + self.timeout
+
+        while True:
+            snapshots = job_progress_channel.get_many(job_ids)
+
+            if (
+                len(snapshots) != len(job_ids)
+                or any(
+                    snapshot['version'] != versions.get(job_id)
+                    for job_id, snapshot in snapshots.items()
+                )
+                or monotonic() >= deadline
+            ):
+                return snapshots
+
+            sleep(self.poll_period)
+
+    def get(self, *args, **kwargs):
+        job_ids = self.get_job_ids()
+        allowed_ids = self.get_allowed_job_ids(job_ids)
+        info = {
+            job_id: 'Job is not allowed'
+            for job_id in job_ids
+            if job_id not in allowed_ids
+        }
+
+        if allowed_ids:
+            snapshots = self.wait_snapshots(allowed_ids, self.get_versions())
+
+            for job_id in allowed_ids:
+                info[job_id] = snapshots.get(job_id)
+
+        return self.response_class(info)
+
+
 class JobBricksReloading(bricks_views.BricksReloading):
     check_bricks_permission = False
     job_id_url_kwarg = 'job_id'
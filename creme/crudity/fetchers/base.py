@@ -2,7 +2,7 @@
 
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2009-2020  Hybird
+#    Copyright (C) 2009-2021  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -38,5 +38,15 @@ class CrudityFetcher:
         """Make the fetcher do his job.
         @returns: iterable of fetcher managed type
                   (i.e: emails objects for email fetcher for example).
+                  It can be a generator ; in this case an item is considered
+                  as handled successfully when the next item is requested,
+                  excepted if handling_failed() has been called for this item.
         """
         raise NotImplementedError
+
+    def handling_failed(self, data) -> None:
+        """Called when the handling of an item returned by fetch() has failed
+        (it is called before the next item is requested).
+        @param data: The item.
+        """
+        pass
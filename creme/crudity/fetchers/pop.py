@@ -2,7 +2,7 @@
 
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2009-2020  Hybird
+#    Copyright (C) 2009-2021  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -23,13 +23,18 @@ import logging
 import poplib
 import re
 from datetime import datetime
-from typing import Iterable, List, Tuple
+from typing import Dict, Iterable, List, Tuple
 
 from django.conf import settings
-from django.core.files.uploadedfile import SimpleUploadedFile, UploadedFile
+from django.core.files.uploadedfile import (
+    SimpleUploadedFile,
+    TemporaryUploadedFile,
+    UploadedFile,
+)
 
 from creme.creme_core.utils import safe_unicode
 
+from ..models import FetchedMessage
 from .base import CrudityFetcher
 
 logger = logging.getLogger(__name__)
@@ -59,116 +64,232 @@ class PopEmail:
 
         self.attachments: List[Tuple[str, UploadedFile]] = [*attachments]
 
+        # Has the handling of the email failed? (see PopFetcher.handling_failed())
+        self.failed = False
 
-class PopFetcher(CrudityFetcher):
-    def fetch(self, delete=True):  # TODO: args read from configuration instead ?
-        client = None
-        emails = []
 
+class PopFetcher(CrudityFetcher):
+    """Fetch the emails from a POP3 server (see the settings CREME_GET_EMAIL_*).
+
+    The emails are retrieved & yielded one by one ; the big attachments are
+    stored in temporary files (see settings.FILE_UPLOAD_MAX_MEMORY_SIZE), which
+    are removed once the email has been handled.
+    An email is considered as handled successfully when the next one is
+    requested (i.e. the handling has not raised an exception) ; then its
+    unique ID (UIDL) is stored (see FetchedMessage), so it is not processed
+    again if it is still in the mailbox, & it is deleted if 'delete' is True.
+    An email whose handling has failed (see handling_failed()) is kept in the
+    mailbox, so it can be inspected, but its UID is stored too (with the flag
+    "failed"), so it is skipped by the next fetches (see the command
+    "crudity_retry_failed" to handle it again).
+    """
+    def _connect(self) -> poplib.POP3:
         CREME_GET_EMAIL_SERVER = settings.CREME_GET_EMAIL_SERVER
         CREME_GET_EMAIL_PORT   = settings.CREME_GET_EMAIL_PORT
 
-        try:
-            if settings.CREME_GET_EMAIL_SSL:
-                client = poplib.POP3_SSL(CREME_GET_EMAIL_SERVER, CREME_GET_EMAIL_PORT,
-                                         settings.CREME_GET_EMAIL_SSL_KEYFILE,
-                                         settings.CREME_GET_EMAIL_SSL_CERTFILE,
-                                        )
-            else:
-                client = poplib.POP3(CREME_GET_EMAIL_SERVER, CREME_GET_EMAIL_PORT)
+        if settings.CREME_GET_EMAIL_SSL:
+            client = poplib.POP3_SSL(CREME_GET_EMAIL_SERVER, CREME_GET_EMAIL_PORT,
+                                     settings.CREME_GET_EMAIL_SSL_KEYFILE,
+                                     settings.CREME_GET_EMAIL_SSL_CERTFILE,
+                                    )
+        else:
+            client = poplib.POP3(CREME_GET_EMAIL_SERVER, CREME_GET_EMAIL_PORT)
 
+        try:
             client.user(settings.CREME_GET_EMAIL_USERNAME)
             client.pass_(settings.CREME_GET_EMAIL_PASSWORD)
+        except Exception:
+            client.quit()
+            raise
+
+        return client
+
+    @staticmethod
+    def _mailbox_id() -> str:
+        return '{}@{}:{}'.format(
+            settings.CREME_GET_EMAIL_USERNAME,
+            settings.CREME_GET_EMAIL_SERVER,
+            settings.CREME_GET_EMAIL_PORT,
+        )
+
+    @staticmethod
+    def _get_uids(client: poplib.POP3) -> Dict[int, str]:
+        """Get the unique IDs of the messages.
+        @return A dictionary {message_number: uid} ; it is empty if the
+                server does not support the command UIDL.
+        """
+        try:
+            response, lines, octets = client.uidl()
+        except poplib.error_proto as e:
+            logger.warning('PopFetcher.fetch: the command UIDL is not supported (%s)', e)
+            return {}
 
-            client.stat()  # TODO: useful ?
-            response, messages, total_size = client.list()
-        except Exception:  # TODO: Define better exception
-            logger.exception("PopFetcher.fetch: POP connection error")
-
-            if client is not None:
-                client.quit()
+        uids = {}
+        for line in lines:
+            message_number, uid = line.split()
+            uids[int(message_number)] = uid.decode()
 
-            return []
+        return uids
 
-        getaddresses = email.utils.getaddresses
-        parsedate    = email.utils.parsedate
+    @staticmethod
+    def _build_attachment(filename: str, payload: bytes, content_type: str) -> UploadedFile:
+        size = len(payload)
 
-        for msg_info in messages:
-            attachments = []
-            message_number, message_size = msg_info.split()
-            r, raw_message_lines, message_size = client.retr(int(message_number))
+        if size <= settings.FILE_UPLOAD_MAX_MEMORY_SIZE:
+            return SimpleUploadedFile(filename, payload, content_type=content_type)
 
-            out_str = b'\n'.join(raw_message_lines)
-            out_str = re.sub(b'\r(?!=\n)', b'\r\n', out_str)
+        # NB: the temporary file is removed when it is closed.
+        attachment = TemporaryUploadedFile(
+            filename, content_type=content_type, size=size, charset=None,
+        )
+        attachment.write(payload)
+        attachment.seek(0)
 
-            email_message = email.message_from_bytes(out_str)
-            get_all = email_message.get_all
+        return attachment
 
-            to_emails   = [addr for name, addr in getaddresses(get_all('to', []))]
-            from_emails = [addr for name, addr in getaddresses(get_all('from', []))]
-            cc_emails   = [addr for name, addr in getaddresses(get_all('cc', []))]
+    def _parse(self, raw_message_lines: List[bytes]) -> PopEmail:
+        getaddresses = email.utils.getaddresses
+        parsedate    = email.utils.parsedate
 
-            subject = ''.join(
-                s.decode(enc) if enc is not None else safe_unicode(s)
-                for s, enc in email.header.decode_header(email_message.get('subject', []))
-            )
+        attachments = []
+
+        out_str = b'\n'.join(raw_message_lines)
+        out_str = re.sub(b'\r(?!=\n)', b'\r\n', out_str)
+
+        email_message = email.message_from_bytes(out_str)
+        del out_str
+
+        get_all = email_message.get_all
+
+        to_emails   = [addr for name, addr in getaddresses(get_all('to', []))]
+        from_emails = [addr for name, addr in getaddresses(get_all('from', []))]
+        cc_emails   = [addr for name, addr in getaddresses(get_all('cc', []))]
+
+        subject = ''.join(
+            s.decode(enc) if enc is not None else safe_unicode(s)
+            for s, enc in email.header.decode_header(email_message.get('subject', []))
+        )
+
+        dates = [datetime(*parsedate(d)[:-3]) for d in get_all('date', []) if d is not None]
+
+        body_html = ''
+        body = ''
+        # CONTENT HTML / PLAIN
+        if email_message.is_multipart():
+            for part in email_message.walk():
+                payload = part.get_payload(decode=True)
+
+                mct = part.get_content_maintype()
+                cst = part.get_content_subtype()
+
+                if mct == 'multipart':
+                    continue
+
+                filename = part.get_filename()
+
+                if mct != 'text' or (mct == 'text' and filename is not None):
+                    attachments.append((
+                        filename,
+                        self._build_attachment(
+                            filename, payload, content_type=part.get_content_type(),
+                        ),
+                    ))
+
+                else:
+                    content = payload
+                    if cst == 'html':
+                        body_html = safe_unicode(content)
+                    elif cst == 'plain':
+                        body = safe_unicode(content)
+                    # else:  TODO ??
+        else:
+            cst = email_message.get_content_subtype()
+            content = email_message.get_payload(decode=True)
+            if cst == 'plain':
+                body = safe_unicode(content)
+            elif cst == 'html':
+                body_html = body = safe_unicode(content)
+
+        return PopEmail(
+            body=body,
+            body_html=body_html,
+            senders=from_emails,
+            tos=to_emails,
+            ccs=cc_emails,
+            subject=subject,
+            dates=dates,
+            attachments=attachments,
+        )
+
+    def handling_failed(self, data):
+        if isinstance(data, PopEmail):
+            data.failed = True
 
-            dates = [datetime(*parsedate(d)[:-3]) for d in get_all('date', []) if d is not None]
+    def fetch(self, delete=True):  # TODO: args read from configuration instead ?
+        try:
+            client = self._connect()
+            response, messages, total_size = client.list()
+        except Exception:  # TODO: Define better exception
+            logger.exception("PopFetcher.fetch: POP connection error")
+            return
 
-            body_html = ''
-            body = ''
-            # CONTENT HTML / PLAIN
-            if email_message.is_multipart():
-                for part in email_message.walk():
-                    payload = part.get_payload(decode=True)
+        try:
+            mailbox = self._mailbox_id()
+            uids = self._get_uids(client)
+            fetched_uids = set()
+            failed_uids = set()
+
+            for uid, failed in FetchedMessage.objects.filter(
+                mailbox=mailbox,
+            ).values_list('uid', 'failed'):
+                (failed_uids if failed else fetched_uids).add(uid)
+
+            for msg_info in messages:
+                message_number = int(msg_info.split()[0])
+                uid = uids.get(message_number)
+
+                if uid is not None and uid in failed_uids:
+                    logger.info('PopFetcher.fetch: the message "%s" has failed & is skipped', uid)
+                    continue
+
+                if uid is None or uid not in fetched_uids:
+                    r, raw_message_lines, message_size = client.retr(message_number)
+                    pop_email = self._parse(raw_message_lines)
+                    del raw_message_lines
+
+                    try:
+                        yield pop_email
+                    finally:
+                        for filename, attachment in pop_email.attachments:
+                            attachment.close()
+
+                    # NB: we get here only when the email has been handled
+                    #     (successfully, or with an error caught by the caller).
+                    failed = pop_email.failed
+
+                    if uid is not None:
+                        FetchedMessage.objects.create(mailbox=mailbox, uid=uid, failed=failed)
+                        (failed_uids if failed else fetched_uids).add(uid)
+
+                    if failed:
+                        logger.warning(
+                            'PopFetcher.fetch: the handling of the message "%s" has failed ; '
+                            'it is kept in the mailbox & skipped.',
+                            uid,
+                        )
+                        continue
+                else:
+                    logger.info('PopFetcher.fetch: the message "%s" has already been handled', uid)
 
-                    mct = part.get_content_maintype()
-                    cst = part.get_content_subtype()
+                if delete:
+                    # NB: the messages are really deleted by the command QUIT
+                    client.dele(message_number)
 
-                    if mct == 'multipart':
-                        continue
+            # The messages which are not in the mailbox anymore are forgotten
+            if uids:
+                removed_uids = (fetched_uids | failed_uids).difference(uids.values())
 
-                    filename = part.get_filename()
-
-                    if mct != 'text' or (mct == 'text' and filename is not None):
-                        attachments.append((
-                            filename,
-                            SimpleUploadedFile(
-                                filename, payload, content_type=part.get_content_type(),
-                            ),
-                        ))
-
-                    else:
-                        content = payload
-                        if cst == 'html':
-                            body_html = safe_unicode(content)
-                        elif cst == 'plain':
-                            body = safe_unicode(content)
-                        # else:  TODO ??
-            else:
-                cst = email_message.get_content_subtype()
-                content = email_message.get_payload(decode=True)
-                if cst == 'plain':
-                    body = safe_unicode(content)
-                elif cst == 'html':
-                    body_html = body = safe_unicode(content)
-
-            emails.append(PopEmail(
-                body=body,
-                body_html=body_html,
-                senders=from_emails,
-                tos=to_emails,
-                ccs=cc_emails,
-                subject=subject,
-                dates=dates,
-                attachments=attachments,
-            ))
-
-            if delete:
-                # We delete the mail from the server when treated
-                # TODO: delete only when we are sure it has been saved (clean() method ?)
-                client.dele(message_number)
-
-        client.quit()
-
-        return emails
+                if removed_uids:
+                    FetchedMessage.objects.filter(mailbox=mailbox, uid__in=removed_uids).delete()
+        finally:
+            client.quit()
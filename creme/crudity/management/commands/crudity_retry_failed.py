@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2021  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from django.core.management.base import BaseCommand
+
+from creme.crudity.models import FetchedMessage
+
+
+class Command(BaseCommand):
+    help = (
+        'Retry the handling of the e-mails (app "crudity") which have failed ; '
+        'they are handled again by the next fetch, if they are still in the '
+        'mailbox. By default, all the failed e-mails are retried.'
+    )
+    leave_locale_alone = True
+
+    def add_arguments(self, parser):
+        add_argument = parser.add_argument
+        add_argument(
+            '-u', '--uid',
+            action='append', dest='uids', default=[],
+            help='Unique ID of the e-mail to retry (can be used several times).',
+        )
+        add_argument(
+            '-m', '--mailbox',
+            action='store', dest='mailbox', default='',
+            help='Retry only the e-mails of this mailbox (i.e. "user@server:port").',
+        )
+        add_argument(
+            '-l', '--list',
+            action='store_true', dest='list_failed', default=False,
+            help='List the failed e-mails, without retrying them.',
+        )
+
+    def handle(self, **options):
+        verbosity = options.get('verbosity')
+        messages = FetchedMessage.objects.filter(failed=True)
+
+        uids = options.get('uids')
+        if uids:
+            messages = messages.filter(uid__in=uids)
+
+        mailbox = options.get('mailbox')
+        if mailbox:
+            messages = messages.filter(mailbox=mailbox)
+
+        if options.get('list_failed'):
+            for message in messages.order_by('created'):
+                self.stdout.write(f'{message.mailbox} {message.uid} ({message.created})')
+
+            return
+
+        # NB: without its FetchedMessage, an e-mail is handled again by the next fetch.
+        count = messages.delete()[0]
+
+        if verbosity >= 1:
+            self.stdout.write(f'{count} e-mail(s) will be handled again by the next fetch.')
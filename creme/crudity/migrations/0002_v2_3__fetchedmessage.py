@@ -0,0 +1,33 @@
+from django.db import migrations, models
+from django.utils.timezone import now
+
+from creme.creme_core.models import fields as creme_fields
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('crudity', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FetchedMessage',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        verbose_name='ID', serialize=False, auto_created=True, primary_key=True,
+                    )
+                ),
+                ('mailbox', models.CharField(max_length=200, editable=False)),
+                ('uid', models.CharField(max_length=100, editable=False)),
+                (
+                    'created',
+                    creme_fields.CreationDateTimeField(default=now, editable=False, blank=True)
+                ),
+            ],
+            options={
+                'unique_together': {('mailbox', 'uid')},
+            },
+        ),
+    ]
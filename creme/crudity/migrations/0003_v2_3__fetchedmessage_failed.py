@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('crudity', '0002_v2_3__fetchedmessage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fetchedmessage',
+            name='failed',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
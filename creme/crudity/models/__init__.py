@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
 
 from .actions import WaitingAction  # NOQA
+from .fetchers import FetchedMessage  # NOQA
 from .history import History  # NOQA
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2021  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+
+from django.db import models
+
+from creme.creme_core.models import CremeModel
+from creme.creme_core.models import fields as core_fields
+
+
+class FetchedMessage(CremeModel):
+    """Unique ID of a message which has been fetched & handled ; it avoids
+    processing a message again when it is still in the mailbox (not deleted,
+    the deletion has failed, or the handling has failed).
+    See crudity.fetchers.pop.PopFetcher.
+    """
+    # ID of the mailbox (i.e: "user@server:port")
+    mailbox = models.CharField(max_length=200, editable=False)
+    # ID of the message given by the server (e.g: the UIDL with POP3)
+    uid = models.CharField(max_length=100, editable=False)
+    created = core_fields.CreationDateTimeField()
+    # The handling has failed ; the message is kept in the mailbox (so it can
+    # be inspected) but it is skipped (the command "crudity_retry_failed"
+    # removes these instances, so the messages are handled again).
+    failed = models.BooleanField(default=False, editable=False)
+
+    class Meta:
+        app_label = 'crudity'
+        unique_together = ('mailbox', 'uid')
+
+    def __str__(self):
+        return f'FetchedMessage(mailbox="{self.mailbox}", uid="{self.uid}")'
@@ -2,7 +2,7 @@
 
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2009-2020  Hybird
+#    Copyright (C) 2009-2021  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -36,6 +36,7 @@ from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from django.core.serializers.base import DeserializationError
 from django.core.serializers.python import _get_model
+from django.db.transaction import atomic
 
 from creme.creme_core.models import CremeEntity
 from creme.creme_core.utils.collections import OrderedSet
@@ -82,13 +83,14 @@ class FetcherInterface:
     def get_inputs(self) -> Iterator[Dict[str, CrudityInput]]:
         return iter(self._inputs.values())
 
-    def fetch(self) -> list:
-        data: list = []
-
+    def handling_failed(self, data) -> None:
+        "See CrudityFetcher.handling_failed()."
         for fetcher in self.fetchers:
-            data.extend(fetcher.fetch())
+            fetcher.handling_failed(data)
 
-        return data
+    def fetch(self) -> Iterator:
+        for fetcher in self.fetchers:
+            yield from fetcher.fetch()
 
     def get_default_backend(self) -> Optional[CrudityBackend]:
         """Special case, for retrieving the backend defined as the default one.
@@ -400,7 +402,17 @@ class CRUDityRegistry:
                 continue
 
             for data in fetcher_multiplex.fetch():
-                backend = _handle_data(fetcher_multiplex, data)
+                # NB: an error with an item must not prevent the other items
+                #     from being handled (the fetcher is notified, so it
+                #     does not consider the item as handled successfully).
+                try:
+                    # NB: an item which fails does not leave partial data.
+                    with atomic():
+                        backend = _handle_data(fetcher_multiplex, data)
+                except Exception:
+                    logger.exception('CRUDityRegistry.fetch: error when handling %r', data)
+                    fetcher_multiplex.handling_failed(data)
+                    continue
 
                 if backend:
                     used_backends.append(backend)
@@ -1,11 +1,25 @@
 # -*- coding: utf-8 -*-
 
-from os.path import join
+import poplib
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from io import StringIO
+from os.path import exists, join
 
 from django.conf import settings
+from django.core.files.uploadedfile import (
+    SimpleUploadedFile,
+    TemporaryUploadedFile,
+)
+from django.core.management import call_command
 from django.test.utils import override_settings
 
 from ..fetchers.filesystem import FileSystemFetcher
+from ..fetchers.pop import PopFetcher
+from ..fetchers.pop import logger as pop_logger
+from ..management.commands.crudity_retry_failed import Command as RetryCommand
+from ..models import FetchedMessage
 from .base import CrudityTestCase
 
 
@@ -46,3 +60,269 @@ class FetcherFileSystemTestCase(CrudityTestCase):
         paths = FileSystemFetcher(setting_name='MY_FILESYS_FETCHER_DIR').fetch()
         self.assertIsInstance(paths, list)
         self.assertIn(join(settings.MY_FILESYS_FETCHER_DIR, 'LICENSE.txt'), paths)
+
+
+class _FakePOP3:
+    def __init__(self, messages, uidl=True):
+        # messages: list of tuples (uid, raw_message)
+        self.messages = messages
+        self.uidl_supported = uidl
+        self.deleted = []
+        self.retrieved = []
+        self.quitted = False
+
+    def list(self):
+        return (
+            b'+OK',
+            [f'{i} {len(raw)}'.encode() for i, (uid, raw) in enumerate(self.messages, start=1)],
+            sum(len(raw) for uid, raw in self.messages),
+        )
+
+    def uidl(self):
+        if not self.uidl_supported:
+            raise poplib.error_proto('-ERR unknown command')
+
+        return (
+            b'+OK',
+            [f'{i} {uid}'.encode() for i, (uid, raw) in enumerate(self.messages, start=1)],
+            0,
+        )
+
+    def retr(self, which):
+        self.retrieved.append(which)
+        raw = self.messages[which - 1][1]
+
+        return b'+OK', raw.split(b'\n'), len(raw)
+
+    def dele(self, which):
+        self.deleted.append(which)
+
+    def quit(self):
+        self.quitted = True
+
+
+class _TestPopFetcher(PopFetcher):
+    def __init__(self, client, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.client = client
+
+    def _connect(self):
+        return self.client
+
+
+@override_settings(
+    CREME_GET_EMAIL_SERVER='pop.example.org',
+    CREME_GET_EMAIL_PORT=110,
+    CREME_GET_EMAIL_USERNAME='creme',
+)
+class FetcherPopTestCase(CrudityTestCase):
+    MAILBOX = 'creme@pop.example.org:110'
+
+    @staticmethod
+    def _build_message(subject, body='Body', attachment=None):
+        if attachment is None:
+            msg = MIMEText(body)
+        else:
+            msg = MIMEMultipart()
+            msg.attach(MIMEText(body))
+
+            part = MIMEApplication(attachment)
+            part.add_header('Content-Disposition', 'attachment', filename='data.bin')
+            msg.attach(part)
+
+        msg['Subject'] = subject
+        msg['From'] = 'spike@bebop.mrs'
+        msg['To'] = 'jet@bebop.mrs'
+
+        return msg.as_bytes()
+
+    def test_fetch(self):
+        "Messages are yielded one by one & deleted once they are handled."
+        client = _FakePOP3([
+            ('uid1', self._build_message('Subject #1', body='Hello')),
+            ('uid2', self._build_message('Subject #2')),
+        ])
+        emails = _TestPopFetcher(client).fetch()
+
+        email1 = next(emails)
+        self.assertEqual('Subject #1', email1.subject)
+        self.assertEqual('Hello', email1.body)
+        self.assertListEqual(['spike@bebop.mrs'], email1.senders)
+        self.assertListEqual(['jet@bebop.mrs'], email1.tos)
+        self.assertListEqual([1], client.retrieved)
+        self.assertListEqual([], client.deleted)
+        self.assertFalse(FetchedMessage.objects.all())
+
+        email2 = next(emails)
+        self.assertEqual('Subject #2', email2.subject)
+        self.assertListEqual([1, 2], client.retrieved)
+        self.assertListEqual([1], client.deleted)
+        self.assertListEqual(
+            ['uid1'],
+            [*FetchedMessage.objects.filter(mailbox=self.MAILBOX).values_list('uid', flat=True)],
+        )
+
+        with self.assertRaises(StopIteration):
+            next(emails)
+
+        self.assertListEqual([1, 2], client.deleted)
+        self.assertTrue(client.quitted)
+
+    def test_fetch_no_delete(self):
+        client = _FakePOP3([('uid1', self._build_message('Subject #1'))])
+        self.assertEqual(1, len([*_TestPopFetcher(client).fetch(delete=False)]))
+        self.assertListEqual([], client.deleted)
+        self.assertTrue(FetchedMessage.objects.filter(mailbox=self.MAILBOX, uid='uid1'))
+
+    def test_fetch_error(self):
+        "The message is not deleted if its handling fails."
+        client = _FakePOP3([
+            ('uid1', self._build_message('Subject #1')),
+            ('uid2', self._build_message('Subject #2')),
+        ])
+        emails = _TestPopFetcher(client).fetch()
+        next(emails)
+
+        with self.assertRaises(ValueError):
+            emails.throw(ValueError('Invalid data'))
+
+        self.assertListEqual([1], client.retrieved)
+        self.assertListEqual([], client.deleted)
+        self.assertFalse(FetchedMessage.objects.all())
+        self.assertTrue(client.quitted)
+
+    def test_fetch_handling_failed(self):
+        "The message is kept in the mailbox, but it is skipped by the next fetches."
+        client = _FakePOP3([
+            ('uid1', self._build_message('Subject #1')),
+            ('uid2', self._build_message('Subject #2')),
+        ])
+        fetcher = _TestPopFetcher(client)
+        emails = fetcher.fetch()
+        fetcher.handling_failed(next(emails))
+
+        with self.assertLogs(pop_logger, level='WARNING'):
+            self.assertEqual('Subject #2', next(emails).subject)
+
+        self.assertListEqual([], client.deleted)
+
+        with self.assertRaises(StopIteration):
+            next(emails)
+
+        self.assertListEqual([2], client.deleted)
+        self.assertSetEqual(
+            {'uid1', 'uid2'},
+            {*FetchedMessage.objects.filter(mailbox=self.MAILBOX).values_list('uid', flat=True)},
+        )
+
+        self.assertTrue(
+            FetchedMessage.objects.get(mailbox=self.MAILBOX, uid='uid1').failed
+        )
+        self.assertFalse(
+            FetchedMessage.objects.get(mailbox=self.MAILBOX, uid='uid2').failed
+        )
+
+        # Next fetch
+        client.deleted = []
+        client.retrieved = []
+        client.messages = client.messages[:1]
+        self.assertListEqual([], [*_TestPopFetcher(client).fetch()])
+        self.assertListEqual([], client.retrieved)
+        self.assertListEqual([], client.deleted)
+
+    def test_retry_failed(self):
+        "The command 'crudity_retry_failed' makes the next fetch handle the failed messages again."
+        client = _FakePOP3([
+            ('uid1', self._build_message('Subject #1')),
+            ('uid2', self._build_message('Subject #2')),
+        ])
+
+        create_msg = FetchedMessage.objects.create
+        create_msg(mailbox=self.MAILBOX, uid='uid1', failed=True)
+        create_msg(mailbox=self.MAILBOX, uid='uid2', failed=True)
+        other = create_msg(mailbox='other@pop.example.org:110', uid='uid1', failed=True)
+        handled = create_msg(mailbox='other@pop.example.org:110', uid='uid3')
+
+        stdout = StringIO()
+        call_command(RetryCommand(), list_failed=True, stdout=stdout)
+        self.assertEqual(3, len(stdout.getvalue().splitlines()))
+        self.assertEqual(4, FetchedMessage.objects.count())
+
+        call_command(RetryCommand(), uids=['uid2'], mailbox=self.MAILBOX, verbosity=0)
+        self.assertFalse(FetchedMessage.objects.filter(mailbox=self.MAILBOX, uid='uid2'))
+        self.assertTrue(FetchedMessage.objects.filter(mailbox=self.MAILBOX, uid='uid1'))
+
+        with self.assertLogs(pop_logger, level='INFO'):
+            emails = [*_TestPopFetcher(client).fetch()]
+
+        self.assertListEqual(['Subject #2'], [e.subject for e in emails])
+        self.assertListEqual([2], client.deleted)
+
+        call_command(RetryCommand(), verbosity=0)
+        self.assertDoesNotExist(other)
+        self.assertStillExists(handled)
+        self.assertFalse(FetchedMessage.objects.filter(failed=True))
+
+    def test_fetch_already_handled(self):
+        "Messages which have already been handled are skipped ; old UIDs are removed."
+        create_msg = FetchedMessage.objects.create
+        create_msg(mailbox=self.MAILBOX, uid='uid1')
+        create_msg(mailbox=self.MAILBOX, uid='uid_old')
+        other = create_msg(mailbox='other@pop.example.org:110', uid='uid_old')
+
+        client = _FakePOP3([
+            ('uid1', self._build_message('Subject #1')),
+            ('uid2', self._build_message('Subject #2')),
+        ])
+        emails = [*_TestPopFetcher(client).fetch()]
+        self.assertListEqual(['Subject #2'], [e.subject for e in emails])
+        self.assertListEqual([2], client.retrieved)
+        self.assertListEqual([1, 2], client.deleted)
+        self.assertSetEqual(
+            {'uid1', 'uid2'},
+            {*FetchedMessage.objects.filter(mailbox=self.MAILBOX).values_list('uid', flat=True)},
+        )
+        self.assertStillExists(other)
+
+    def test_fetch_uidl_not_supported(self):
+        client = _FakePOP3([('uid1', self._build_message('Subject #1'))], uidl=False)
+        self.assertEqual(1, len([*_TestPopFetcher(client).fetch()]))
+        self.assertListEqual([1], client.deleted)
+        self.assertFalse(FetchedMessage.objects.all())
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=100)
+    def test_fetch_attachments(self):
+        "Big attachments are stored in temporary files."
+        client = _FakePOP3([
+            ('uid1', self._build_message('Small', attachment=b'0' * 50)),
+            ('uid2', self._build_message('Big', attachment=b'0' * 500)),
+        ])
+        emails = _TestPopFetcher(client).fetch()
+
+        email1 = next(emails)
+        self.assertEqual(1, len(email1.attachments))
+
+        filename1, attachment1 = email1.attachments[0]
+        self.assertEqual('data.bin', filename1)
+        self.assertIsInstance(attachment1, SimpleUploadedFile)
+        self.assertEqual(b'0' * 50, attachment1.read())
+
+        email2 = next(emails)
+        filename2, attachment2 = email2.attachments[0]
+        self.assertIsInstance(attachment2, TemporaryUploadedFile)
+        self.assertEqual(b'0' * 500, attachment2.read())
+
+        tmp_path = attachment2.temporary_file_path()
+        self.assertTrue(exists(tmp_path))
+
+        with self.assertRaises(StopIteration):
+            next(emails)
+
+        self.assertFalse(exists(tmp_path))
+
+    def test_fetch_connection_error(self):
+        class BrokenPopFetcher(PopFetcher):
+            def _connect(self):
+                raise OSError('Connection refused')
+
+        self.assertListEqual([], [*BrokenPopFetcher().fetch()])
@@ -3,6 +3,8 @@
 from django.core.exceptions import ImproperlyConfigured
 
 from .. import registry
+from ..fetchers.base import CrudityFetcher
+from ..inputs.base import CrudityInput
 from .base import CrudityTestCase, FakeFetcher, FakeInput
 from .fake_crudity_register import (
     FakeContact,
@@ -348,3 +350,81 @@ class CrudityRegistryTestCase(CrudityTestCase):
                 'body_map':    {},
                 'subject':     '*',
             }])
+
+    def test_fetch_error(self):
+        "An error with an item does not prevent the other items from being handled."
+        user = self.login()
+        crudity_registry = self.crudity_registry
+        backend = object()
+
+        class TestFetcher(CrudityFetcher):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.failed = []
+
+            def fetch(self, *args, **kwargs):
+                yield from ['item1', 'invalid', 'item2']
+
+            def handling_failed(self, data):
+                self.failed.append(data)
+
+        class TestInput(CrudityInput):
+            name = 'test'
+            method = 'create'
+            has_backends = True
+
+            def __init__(self):
+                super().__init__()
+                self.handled = []
+
+            def create(self, data):
+                if data == 'invalid':
+                    raise ValueError('Invalid data')
+
+                self.handled.append(data)
+
+                return backend
+
+        fetcher = TestFetcher()
+        crud_input = TestInput()
+        crudity_registry.register_fetchers('test', [fetcher])
+        crudity_registry.register_inputs('test', [crud_input])
+
+        with self.assertLogs(registry.logger, level='ERROR'):
+            used_backends = crudity_registry.fetch(user=user)
+
+        self.assertListEqual([backend, backend], used_backends)
+        self.assertListEqual(['item1', 'item2'], crud_input.handled)
+        self.assertListEqual(['invalid'], fetcher.failed)
+
+    def test_fetch_error_rollback(self):
+        "The data created by an item which fails are not kept."
+        user = self.login()
+        crudity_registry = self.crudity_registry
+
+        class TestFetcher(CrudityFetcher):
+            def fetch(self, *args, **kwargs):
+                yield from ['Konoha', 'Suna']
+
+        class TestInput(CrudityInput):
+            name = 'test'
+            method = 'create'
+            has_backends = True
+
+            def create(self, data):
+                FakeOrganisation.objects.create(user=user, name=data)
+
+                if data == 'Suna':
+                    raise ValueError('Invalid data')
+
+                return object()
+
+        crudity_registry.register_fetchers('test', [TestFetcher()])
+        crudity_registry.register_inputs('test', [TestInput()])
+
+        with self.assertLogs(registry.logger, level='ERROR'):
+            used_backends = crudity_registry.fetch(user=user)
+
+        self.assertEqual(1, len(used_backends))
+        self.assertTrue(FakeOrganisation.objects.filter(name='Konoha'))
+        self.assertFalse(FakeOrganisation.objects.filter(name='Suna'))
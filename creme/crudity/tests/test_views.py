@@ -84,6 +84,10 @@ class FakePOP3:
         # response, messages, total_size
         return None, [], 0  # TODO: complete
 
+    def uidl(self, which=None):
+        # response, uids, octets
+        return None, [], 0
+
 
 class FakePOP3_SSL(FakePOP3):
     def __init__(self, host, port=None, keyfile=None, certfile=None):
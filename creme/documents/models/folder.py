@@ -167,10 +167,6 @@ class AbstractFolder(CremeEntity):
 
         super().save(*args, **kwargs)
 
-    def trash(self):
-        self._check_deletion()
-        super().trash()
-
 
 class Folder(AbstractFolder):
     class Meta(AbstractFolder.Meta):
@@ -102,7 +102,6 @@ class AddContactsToEventForm(CremeForm):
         event = self.event
         user  = self.user
         relations = Relation.objects
-        create_relation = relations.create
 
         related_contacts = self.cleaned_data['related_contacts']
 
@@ -115,6 +114,7 @@ class AddContactsToEventForm(CremeForm):
             relations_map[relation.object_entity_id].append(relation)
 
         relations2del = []
+        relations2create = []
 
         for relationtype, contact in related_contacts:
             relationtype_id = relationtype.id
@@ -137,12 +137,14 @@ class AddContactsToEventForm(CremeForm):
                     lambda relation: relation.type_id == relationtype_id,
                     None
             ) is None:
-                create_relation(
+                relations2create.append(Relation(
                     subject_entity=event,
                     type=relationtype,
                     object_entity=contact,
                     user=user,
-                )
+                ))
+
+        relations.safe_bulk_create(relations2create, check_existing=False)
 
         if relations2del:
             relations.filter(pk__in=relations2del).delete()
@@ -7,3 +7,6 @@ DEFAULT_OSM_TILEMAP_URL = 'https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png'
 DEFAULT_OSM_TILEMAP_COPYRIGHT = (
     '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
 )
+
+# Length of the geohashes stored with the locations (about 5 meters)
+GEOHASH_PRECISION = 9
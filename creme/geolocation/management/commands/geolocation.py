@@ -266,6 +266,10 @@ class Command(BaseCommand):
             '-p', '--populate', action='store_true', dest='populate',
             help='Populate addresses', default=False,
         )
+        add_argument(
+            '--batch-size', type=int, dest='batch_size', default=1000,
+            help='Number of addresses populated per query [default: %(default)s]',
+        )
         add_argument(
             '-s', '--stat', action='store_true', dest='stats',
             help='Display geolocation database stats', default=False,
@@ -274,6 +278,11 @@ class Command(BaseCommand):
             '-i', '--import', action='store_true', dest='import', default=False,
             help='Import towns configured in GEOLOCATION_TOWNS setting',
         )
+        add_argument(
+            '-g', '--geohash', action='store_true', dest='geohash', default=False,
+            help='Compute the geohashes of the located addresses '
+                 '(useful if the locations have been modified without GeoAddress.save())',
+        )
 
     def sysout(self, message, visible):
         if visible:
@@ -282,9 +291,21 @@ class Command(BaseCommand):
     def syserr(self, message):
         self.stderr.write(message)
 
-    def populate_addresses(self, verbosity=0):
+    def populate_addresses(self, verbosity=0, batch_size=1000):
         self.sysout('Populate geolocation information of addresses...', verbosity > 0)
-        GeoAddress.populate_geoaddresses(get_address_model().objects.exclude(zipcode='', city=''))
+        addresses = get_address_model().objects.exclude(zipcode='', city='')
+        total = addresses.count() if verbosity > 1 else 0
+
+        def progress(processed):
+            self.sysout(f'{processed}/{total} address(es) processed', verbosity > 1)
+
+        created, updated = GeoAddress.populate_all_geoaddresses(
+            addresses, batch_size=batch_size, progress=progress,
+        )
+        self.sysout(
+            f'{created} geolocation(s) created, {updated} geolocation(s) updated.',
+            verbosity > 0,
+        )
 
     def import_town_database(self, url, defaults):
         try:
@@ -299,6 +320,11 @@ class Command(BaseCommand):
             self.sysout(url, verbosity > 1)
             self.import_town_database(url, defaults)
 
+    def update_geohashes(self, verbosity=0):
+        self.sysout('Computing the geohashes of addresses...', verbosity > 0)
+        count = GeoAddress.update_geohashes()
+        self.sysout(f'{count} geohash(es) updated.', verbosity > 0)
+
     def print_stats(self):
         self.sysout(f'{Town.objects.count()} town(s) in database.')
 
@@ -306,6 +332,7 @@ class Command(BaseCommand):
         populate = options.get('populate')
         stats = options.get('stats')
         imports = options.get('import')
+        geohashes = options.get('geohash')
         verbosity = options.get('verbosity')
 
         if stats:
@@ -315,4 +342,7 @@ class Command(BaseCommand):
             self.import_town_all(verbosity)
 
         if populate:
-            self.populate_addresses(verbosity)
+            self.populate_addresses(verbosity, batch_size=options.get('batch_size') or 1000)
+
+        if geohashes:
+            self.update_geohashes(verbosity)
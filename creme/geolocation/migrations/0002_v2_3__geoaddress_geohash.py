@@ -0,0 +1,71 @@
+from django.db import migrations, models
+
+# NB: frozen copy of creme.geolocation.utils.geohash() (the migration must not
+#     depend on the current code).
+_GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def geohash(latitude, longitude, precision=9):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bits_count = 0
+    even = True  # NB: the first bit is for the longitude.
+
+    while len(chars) < precision:
+        value, interval = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (interval[0] + interval[1]) / 2
+
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+
+        even = not even
+        bits_count += 1
+
+        if bits_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits = 0
+            bits_count = 0
+
+    return ''.join(chars)
+
+
+def fill_geohashes(apps, schema_editor):
+    GeoAddress = apps.get_model('geolocation', 'GeoAddress')
+    located = GeoAddress.objects.filter(
+        latitude__isnull=False, longitude__isnull=False,
+    ).order_by('address_id')
+    last_id = None
+
+    while True:
+        page = located if last_id is None else located.filter(address_id__gt=last_id)
+        geoaddresses = [*page[:1000]]
+
+        if not geoaddresses:
+            break
+
+        for geoaddress in geoaddresses:
+            geoaddress.geohash = geohash(geoaddress.latitude, geoaddress.longitude)
+
+        GeoAddress.objects.bulk_update(geoaddresses, ['geohash'])
+        last_id = geoaddresses[-1].address_id
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('geolocation', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='geoaddress',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12),
+        ),
+        migrations.RunPython(fill_geohashes),
+    ]
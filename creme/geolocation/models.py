@@ -18,7 +18,8 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
-from itertools import chain, groupby
+from collections import defaultdict
+from itertools import chain
 
 from django.conf import settings
 from django.db import models
@@ -31,7 +32,7 @@ from django.utils.translation import pgettext_lazy
 from creme.creme_core.utils import update_model_instance
 from creme.creme_core.utils.chunktools import iter_as_slices
 
-from .utils import location_bounding_box
+from .utils import geohash, geohash_filter, location_bounding_box
 
 
 class GeoAddress(models.Model):
@@ -71,6 +72,10 @@ class GeoAddress(models.Model):
         # choices=STATUS_LABELS.items(), default=UNDEFINED,
         choices=Status.choices, default=Status.UNDEFINED,
     )
+    # Geohash of the location (see utils.geohash()) ; it's used to retrieve
+    # quickly the close locations. It's updated by save() -- see the command
+    # "geolocation --geohash" if you modify the locations with update().
+    geohash = models.CharField(max_length=12, blank=True, editable=False, db_index=True)
 
     creation_label = pgettext_lazy('geolocation-address', 'Create an address')
 
@@ -84,6 +89,60 @@ class GeoAddress(models.Model):
         super().__init__(*args, **kwargs)
         self._neighbours = {}
 
+    def save(self, *args, **kwargs):
+        self.update_geohash()
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and \
+           ('latitude' in update_fields or 'longitude' in update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+
+        super().save(*args, **kwargs)
+
+    def update_geohash(self):
+        "Set the field 'geohash' from the latitude & the longitude."
+        latitude = self.latitude
+        longitude = self.longitude
+
+        self.geohash = (
+            ''
+            if latitude is None or longitude is None else
+            geohash(float(latitude), float(longitude))
+        )
+
+    @classmethod
+    def update_geohashes(cls, batch_size=1000):
+        """Compute the field 'geohash' of all the located instances.
+        @param batch_size: Number of instances retrieved & updated per query.
+        @return The number of updated instances.
+        """
+        count = 0
+        last_id = None
+        located = cls.objects.filter(
+            latitude__isnull=False, longitude__isnull=False,
+        ).order_by('address_id')
+
+        while True:
+            page = located if last_id is None else located.filter(address_id__gt=last_id)
+            geoaddresses = [*page[:batch_size]]
+
+            if not geoaddresses:
+                break
+
+            modified = []
+            for geoaddress in geoaddresses:
+                old_geohash = geoaddress.geohash
+                geoaddress.update_geohash()
+
+                if geoaddress.geohash != old_geohash:
+                    modified.append(geoaddress)
+
+            cls.objects.bulk_update(modified, ['geohash'])
+            count += len(modified)
+            last_id = geoaddresses[-1].address_id
+
+        return count
+
     @property
     def is_complete(self):
         # return self.status == self.COMPLETE
@@ -113,33 +172,88 @@ class GeoAddress(models.Model):
         return geoaddress
 
     @classmethod
-    def populate_geoaddresses(cls, addresses):
-        for addresses in iter_as_slices(addresses, 50):
-            create = []
-            update = []
+    def _populate_page(cls, addresses, search_towns):
+        """Create/update the GeoAddresses (without location) of some addresses
+        with the position of their town.
+        @param addresses: Sequence of addresses.
+        @param search_towns: Function which takes a sequence of addresses &
+               returns an iterable of Towns (or None) ; see Town.search_all().
+        @return A tuple (number of created instances, number of updated instances).
+        """
+        existing = cls.objects.in_bulk([address.id for address in addresses])
+        create = []
+        update = []
 
-            # TODO: regroup queries ?
-            for address in addresses:
-                try:
-                    geoaddress = address.geoaddress
-
-                    if geoaddress.latitude is None:
-                        update.append(geoaddress)
-                except GeoAddress.DoesNotExist:
-                    create.append(GeoAddress(address=address))
+        for address in addresses:
+            geoaddress = existing.get(address.id)
+
+            if geoaddress is None:
+                create.append(cls(address=address))
+            elif geoaddress.latitude is None:
+                # NB: avoid a query per address ; the cache of "address.geoaddress"
+                #     is set too.
+                geoaddress.address = address
+                update.append(geoaddress)
+
+        # NB: the latitude of the instances to update is None.
+        old_values = [(geo.longitude, geo.status) for geo in update]
+        towns = search_towns([geo.address for geo in chain(create, update)])
+
+        for geoaddress, town in zip(chain(create, update), towns):
+            geoaddress.set_town_position(town)
+
+        # Only modified instances are saved
+        update = [
+            geoaddress
+            for geoaddress, old in zip(update, old_values)
+            if geoaddress.latitude is not None or (geoaddress.longitude, geoaddress.status) != old
+        ]
 
-            towns = Town.search_all([geo.address for geo in chain(create, update)])
+        if create or update:
+            with atomic():
+                cls.objects.bulk_create(create)
+                cls.objects.bulk_update(update, ['latitude', 'longitude', 'status', 'geohash'])
 
-            for geoaddress, town in zip(chain(create, update), towns):
-                geoaddress.set_town_position(town)
+        return len(create), len(update)
 
-            GeoAddress.objects.bulk_create(create)
+    @classmethod
+    def populate_geoaddresses(cls, addresses):
+        for addresses in iter_as_slices(addresses, 50):
+            cls._populate_page(addresses, Town.search_all)
 
-            # TODO: only if has changed
-            # TODO: bulk_update() ?
-            with atomic():
-                for geoaddress in update:
-                    geoaddress.save(force_update=True)
+    @classmethod
+    def populate_all_geoaddresses(cls, addresses, batch_size=1000, progress=None):
+        """Version of populate_geoaddresses() for a large number of addresses.
+        The addresses are retrieved by pages ; for each page, only the Towns
+        related to the zip codes & cities of its addresses are retrieved (see
+        Town.search_all()), so the whole table of Towns is never loaded.
+        @param addresses: Queryset on Address.
+        @param batch_size: Number of addresses per page.
+        @param progress: Function called after each page, with the number of
+               processed addresses as argument (or None).
+        @return A tuple (number of created instances, number of updated instances).
+        """
+        addresses = addresses.order_by('id').only('id', 'zipcode', 'city')
+        last_id = None
+        processed = created = updated = 0
+
+        while True:
+            page = [
+                *(addresses if last_id is None else addresses.filter(id__gt=last_id))[:batch_size]
+            ]
+            if not page:
+                break
+
+            page_created, page_updated = cls._populate_page(page, Town.search_all)
+            created += page_created
+            updated += page_updated
+            processed += len(page)
+            last_id = page[-1].id
+
+            if progress is not None:
+                progress(processed)
+
+        return created, updated
 
     def set_town_position(self, town):
         if town is not None:
@@ -153,6 +267,9 @@ class GeoAddress(models.Model):
             # self.status = GeoAddress.UNDEFINED
             self.status = self.Status.UNDEFINED
 
+        # NB: bulk_create() does not call save()
+        self.update_geohash()
+
     def update(self, **kwargs):
         update_model_instance(self, **kwargs)
 
@@ -173,7 +290,11 @@ class GeoAddress(models.Model):
 
         upper_left, lower_right = location_bounding_box(latitude, longitude, distance)
 
-        return GeoAddress.objects.exclude(
+        # NB: the filter on the (indexed) geohash prunes the search ; the filter
+        #     on the latitude/longitude is exact.
+        return GeoAddress.objects.filter(
+            geohash_filter(upper_left, lower_right),
+        ).exclude(
             address_id=self.address.pk,
         ).exclude(
             address__object_id=self.address.object_id,
@@ -233,30 +354,60 @@ class Town(models.Model):
 
     @classmethod
     def search_all(cls, addresses):
-        candidates = [
-            *Town.objects.filter(
-                Q(zipcode__in=(a.zipcode for a in addresses if a.zipcode))
-                | Q(slug__in=(slugify(a.city) for a in addresses if a.city))
-            ).order_by('zipcode'),
-        ]
+        yield from TownIndex.for_addresses(addresses).search_all(addresses)
+
+
+class TownIndex:
+    """In-memory index of Towns by zip code & by slug, to match many addresses
+    without query (see Town.search() for the rules).
+    """
+    def __init__(self, towns):
+        """Constructor.
+        @param towns: Iterable of Towns.
+        """
+        self._zipcodes = zipcodes = defaultdict(list)
+        self._slugs = slugs = defaultdict(list)
+
+        for town in towns:
+            zipcodes[town.zipcode].append(town)
+            slugs[town.slug].append(town)
+
+    @classmethod
+    def for_addresses(cls, addresses):
+        """Build an index which contains only the Towns which can match some
+        addresses (one query at most).
+        @param addresses: Sequence of Addresses.
+        """
+        zipcodes = {a.zipcode for a in addresses if a.zipcode}
+        slugs = {slugify(a.city) for a in addresses if a.city}
+
+        if not zipcodes and not slugs:
+            return cls(())
+
+        return cls(
+            Town.objects.filter(
+                Q(zipcode__in=zipcodes) | Q(slug__in=slugs)
+            ).order_by('zipcode')
+        )
+
+    def search(self, address):
+        zipcode = address.zipcode
+        slug = slugify(address.city) if address.city else None
 
-        cities = {key: [*c] for key, c in groupby(candidates, lambda c: c.slug)}
-        zipcodes = {key: [*c] for key, c in groupby(candidates, lambda c: c.zipcode)}
+        if zipcode:
+            towns = self._zipcodes.get(zipcode, ())
+        elif slug:
+            towns = self._slugs.get(slug, ())
+        else:
+            return None
+
+        if len(towns) > 1 and slug:
+            return next((t for t in towns if t.slug == slug), None)
+
+        return towns[0] if len(towns) == 1 else None
 
-        get_city = cities.get
-        get_zipcode = zipcodes.get
+    def search_all(self, addresses):
+        search = self.search
 
         for address in addresses:
-            zipcode = address.zipcode
-            slug = slugify(address.city) if address.city else None
-            towns = []
-
-            if zipcode:
-                towns = get_zipcode(zipcode, [])
-            elif slug:
-                towns = get_city(slug, [])
-
-            if len(towns) > 1 and slug:
-                yield next((t for t in towns if t.slug == slug), None)
-            else:
-                yield towns[0] if len(towns) == 1 else None
+            yield search(address)
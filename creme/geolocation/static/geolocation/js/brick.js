@@ -329,7 +329,7 @@ creme.geolocation.AddressesBrick = creme.component.Component.sub({
         }
 
         query.onDone(function(event, data) {
-                  self._onUpdateAddresses(data.addresses);
+                  self._onUpdateAddresses(data.addresses, data.clusters);
               })
              .onFail(function() {
                   self._onUpdateAddresses([]);
@@ -339,8 +339,9 @@ creme.geolocation.AddressesBrick = creme.component.Component.sub({
         return query.start();
     },
 
-    _onUpdateAddresses: function(addresses) {
+    _onUpdateAddresses: function(addresses, clusters) {
         addresses = addresses || [];
+        clusters = clusters || [];
         var controller = this._controller;
 
         controller.toggleAllMarkers(false);
@@ -362,8 +363,22 @@ creme.geolocation.AddressesBrick = creme.component.Component.sub({
             return location;
         });
 
+        // Too many addresses ; the server has grouped them by area.
+        var clustered = 0;
+
+        clusters.forEach(function(cluster) {
+            controller.updateOrAddMarker('cluster-' + cluster.geohash, {
+                title: ngettext('%0$d address', '%0$d addresses', cluster.count).format(cluster.count),
+                position: {lat: cluster.latitude, lng: cluster.longitude},
+                visible: true,
+                draggable: false
+            });
+
+            clustered += cluster.count;
+        });
+
         controller.adjustMap();
-        this._renderCount(controller.markers({visible: true}).length);
+        this._renderCount(controller.markers({visible: true}).length - clusters.length + clustered);
     },
 
     _onMarkerClick: function(event, data) {
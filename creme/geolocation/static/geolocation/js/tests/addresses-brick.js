@@ -19,6 +19,13 @@ QUnit.module("creme.geolocation.addresses-brick", new QUnitMixin(QUnitEventMixin
                     })
                 });
             },
+            'mock/addresses/clusters': backend.responseJSON(200, {
+                addresses: [],
+                clusters: [
+                    {geohash: 'spey', count: 12, latitude: 43.29, longitude: 5.40},
+                    {geohash: 'u05r', count: 3, latitude: 46.38, longitude: 4.91}
+                ]
+            }),
             'mock/addresses/fail': backend.response(400, 'Invalid addresses')
         });
     },
@@ -305,6 +312,50 @@ QUnit.parametrize('creme.geolocation.brick.AddressesBrick (load addresses, fail)
     stop(1);
 });
 
+QUnit.parametrize('creme.geolocation.brick.AddressesBrick (load addresses, clusters)', [
+    [new creme.geolocation.GoogleMapController()],
+    [new creme.geolocation.LeafletMapController()]
+], function(mapController, assert) {
+    var brick = this.createAddressesBrick({
+        filters: [
+            {
+                name: 'Group A',
+                items: [
+                    {value: 'A1', label: 'Contact A1'}
+                ]
+            }
+        ]
+    }).brick();
+    var canvas = brick.element().find('.brick-geoaddress-canvas');
+
+    this.bindTestOn(canvas, 'geomap-status-enabled', function() {
+        var controller = this.controller;
+
+        setTimeout(function() {
+            deepEqual([
+                ['mock/addresses/clusters', 'GET', {id: 'A1'}]
+            ], this.mockBackendUrlCalls());
+
+            deepEqual([], controller.addresses());
+            equal(gettext('%0$d addresses from').format(15), brick.element().find('.brick-geoaddress-counter').text());
+            equal(2, controller.mapController().markers().length);
+            ok(controller.mapController().hasMarker('cluster-spey'));
+            ok(controller.mapController().hasMarker('cluster-u05r'));
+
+            start();
+        }.bind(this), 0);
+
+        stop(1);
+    });
+
+    this.controller = new creme.geolocation.AddressesBrick(brick, {
+        mapController: mapController,
+        addressesUrl: 'mock/addresses/clusters'
+    });
+
+    stop(1);
+});
+
 QUnit.parametrize('creme.geolocation.brick.AddressesBrick (google, click, redirect)', [
     [new creme.geolocation.GoogleMapController()],
     [new creme.geolocation.LeafletMapController()]
@@ -10,7 +10,7 @@ from creme.persons.tests.base import (
     skipIfCustomOrganisation,
 )
 
-from ..models import GeoAddress, Town
+from ..models import GeoAddress, Town, TownIndex
 from .base import Address, Contact, GeoLocationBaseTestCase, Organisation
 
 
@@ -503,6 +503,74 @@ class GeoLocationModelsTestCase(GeoLocationBaseTestCase):
             status=GeoAddress.Status.UNDEFINED,
         )
 
+    def test_populate_all_addresses(self):
+        town1 = self.marseille1
+        town2 = self.marseille2
+        town3 = self.aubagne
+
+        create_address = partial(Address.objects.create, owner=self.orga, address='Mairie')
+        addresses = [
+            create_address(address='La Major', zipcode=town2.zipcode, city=town2.name),
+            create_address(zipcode=town1.zipcode, city=town1.name),
+            create_address(zipcode=town3.zipcode),
+            create_address(city=town1.name),
+            create_address(),
+        ]
+
+        GeoAddress.objects.filter(address=addresses[0]).delete()
+        GeoAddress.objects.filter(address=addresses[1]).update(latitude=None, longitude=None)
+        GeoAddress.objects.filter(address=addresses[2]).update(
+            latitude=1.0, longitude=2.0, status=GeoAddress.Status.MANUAL,
+        )
+
+        progress_calls = []
+        # 3 pages * (addresses + GeoAddresses) + Towns of the first page (the
+        # other pages have no address to locate) + (creation + update) + last page
+        with self.assertNumQueries(3 * 2 + 1 + 4 + 1):
+            created, updated = GeoAddress.populate_all_geoaddresses(
+                Address.objects.filter(id__in=[a.id for a in addresses]),
+                batch_size=2,
+                progress=progress_calls.append,
+            )
+
+        self.assertEqual(1, created)
+        self.assertEqual(1, updated)
+        self.assertListEqual([2, 4, 5], progress_calls)
+
+        def get_geoaddress(address):
+            return GeoAddress.objects.get(address=address)
+
+        self.assertGeoAddress(
+            get_geoaddress(addresses[0]),
+            address=addresses[0],
+            latitude=town2.latitude, longitude=town2.longitude,
+            status=GeoAddress.Status.PARTIAL,
+        )
+        self.assertGeoAddress(
+            get_geoaddress(addresses[1]),
+            address=addresses[1],
+            latitude=town1.latitude, longitude=town1.longitude,
+            status=GeoAddress.Status.PARTIAL,
+        )
+
+        # Not modified (already located)
+        self.assertGeoAddress(
+            get_geoaddress(addresses[2]),
+            address=addresses[2],
+            latitude=1.0, longitude=2.0, status=GeoAddress.Status.MANUAL,
+        )
+        self.assertGeoAddress(
+            get_geoaddress(addresses[4]),
+            address=addresses[4],
+            latitude=None, longitude=None, status=GeoAddress.Status.UNDEFINED,
+        )
+
+        # Nothing to do
+        self.assertTupleEqual(
+            (0, 0),
+            GeoAddress.populate_all_geoaddresses(Address.objects.all()),
+        )
+
     def test_dispose_on_address_delete(self):
         town = self.marseille2
         address = Address.objects.create(
@@ -648,6 +716,55 @@ class GeoLocationModelsTestCase(GeoLocationBaseTestCase):
         self.assertFalse(address.geoaddress.neighbours(distance=1000))
         self.assertFalse(address.geoaddress.neighbours(distance=10000))
 
+    def test_geohash(self):
+        address = self.create_address(
+            self.orga, address='St Victor', zipcode='13007', town='Marseille',
+            geoloc=(43.290347, 5.365572),
+        )
+        geoaddress = self.refresh(address).geoaddress
+        self.assertEqual('spey60g0d', geoaddress.geohash)
+
+        geoaddress.latitude = 43.301963
+        geoaddress.longitude = 5.462410
+        geoaddress.save(update_fields=['latitude', 'longitude'])
+        self.assertEqual('speyk6cs5', self.refresh(geoaddress).geohash)
+
+        geoaddress.latitude = None
+        geoaddress.save()
+        self.assertEqual('', self.refresh(geoaddress).geohash)
+
+    def test_geohash_populate(self):
+        "Geohash is set by bulk_create() too."
+        address = self.create_address(self.orga, zipcode='13002', town='Marseille')
+        GeoAddress.objects.all().delete()
+
+        GeoAddress.populate_geoaddresses([self.refresh(address)])
+        self.assertEqual(
+            'spey6468u',
+            GeoAddress.objects.get(address=address).geohash,
+        )
+
+    def test_update_geohashes(self):
+        create_address = self.create_address
+        address1 = create_address(
+            self.orga, address='St Victor', zipcode='13007', town='Marseille',
+            geoloc=(43.290347, 5.365572),
+        )
+        address2 = create_address(
+            self.orga, address='Commanderie', zipcode='13011', town='Marseille',
+            geoloc=(43.301963, 5.462410),
+        )
+        address3 = create_address(self.orga, address='Unknown', zipcode='0', town='Unknown')
+        GeoAddress.populate_geoaddress(address3)
+
+        GeoAddress.objects.update(geohash='')
+        self.assertEqual(2, GeoAddress.update_geohashes(batch_size=1))
+        self.assertEqual('spey60g0d', self.refresh(address1).geoaddress.geohash)
+        self.assertEqual('speyk6cs5', self.refresh(address2).geoaddress.geohash)
+        self.assertEqual('', self.refresh(address3).geoaddress.geohash)
+
+        self.assertEqual(0, GeoAddress.update_geohashes())
+
     def test_town_unicode(self):
         self.assertEqual('13001 Marseille FRANCE', str(self.marseille1))
         self.assertEqual('13002 Marseille FRANCE', str(self.marseille2))
@@ -708,3 +825,47 @@ class GeoLocationModelsTestCase(GeoLocationBaseTestCase):
             [town2, town1, town3, town3, None, None, town1, None],
             [*Town.search_all(addresses)],
         )
+
+    def test_town_index(self):
+        town1 = self.marseille1
+        town2 = self.marseille2
+        town3 = self.aubagne
+
+        create_address = partial(Address.objects.create, owner=self.orga, address='Mairie')
+        addresses = [
+            create_address(address='La Major', zipcode=town2.zipcode, city=town2.name),
+            create_address(zipcode=town1.zipcode, city=town1.name),
+            create_address(zipcode=town3.zipcode),
+            create_address(zipcode=town3.zipcode, city=town1.name),
+            create_address(),
+            create_address(zipcode='unknown'),
+            create_address(city=town1.name),
+            create_address(city='unknown'),
+        ]
+
+        with self.assertNumQueries(1):
+            index = TownIndex.for_addresses(addresses)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(town2, index.search(addresses[0]))
+            self.assertListEqual(
+                [town2, town1, town3, town3, None, None, town1, None],
+                [*index.search_all(addresses)],
+            )
+
+        # Restricted index
+        index = TownIndex([town2, town3])
+        self.assertListEqual(
+            [town2, None, town3, town3, None, None, town2, None],
+            [*index.search_all(addresses)],
+        )
+
+        # Only the Towns related to the addresses are retrieved
+        index = TownIndex.for_addresses(addresses[2:3])
+        self.assertEqual(town3, index.search(addresses[2]))
+        self.assertIsNone(index.search(addresses[0]))  # Town not retrieved
+
+        with self.assertNumQueries(0):
+            index = TownIndex.for_addresses(addresses[4:5])
+
+        self.assertIsNone(index.search(addresses[0]))
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 
 from functools import partial
+from io import StringIO
+
+from django.core.management.base import OutputWrapper
 
 from creme.creme_core.tests.base import CremeTestCase
 from creme.persons.tests.base import (
@@ -401,6 +404,51 @@ class TownPopulatorTestCase(GeoLocationBaseTestCase):
                               draggable=True, geocoded=False,
                              )
 
+    @skipIfCustomOrganisation
+    @skipIfCustomAddress
+    def test_populate_progress(self):
+        user = self.login()
+        self.command.import_town_database(
+            [self.HEADER, self.OZAN, self.PERON, self.ACOUA, self.STBONNET],
+            {'country': 'FRANCE'},
+        )
+
+        orga = Organisation.objects.create(name='Orga 1', user=user)
+        create_address = partial(
+            Address.objects.create,
+            name='Addresse', address='13 rue du yahourt', owner=orga,
+        )
+        address1 = create_address(zipcode='01630', city='Péron')
+        address2 = create_address(zipcode='01190', city='Ozan')
+        address3 = create_address(zipcode='13008', city='Marseille')
+
+        GeoAddress.objects.all().delete()
+
+        stdout = StringIO()
+        self.command.stdout = OutputWrapper(stdout)
+        self.command.populate_addresses(verbosity=2, batch_size=2)
+
+        self.assertListEqual(
+            [
+                'Populate geolocation information of addresses...',
+                '2/3 address(es) processed',
+                '3/3 address(es) processed',
+                '3 geolocation(s) created, 0 geolocation(s) updated.',
+            ],
+            stdout.getvalue().splitlines(),
+        )
+
+        get_geoaddress = GeoAddress.objects.get
+        self.assertGeoAddress(
+            get_geoaddress(address=address1), longitude=5.93333, latitude=46.2,
+        )
+        self.assertGeoAddress(
+            get_geoaddress(address=address2), longitude=4.91667, latitude=46.3833,
+        )
+        self.assertGeoAddress(
+            get_geoaddress(address=address3), longitude=None, latitude=None,
+        )
+
     @skipIfCustomOrganisation
     @skipIfCustomAddress
     def test_populate_empty(self):
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from django.conf import settings
+from django.db.models import Q
 from django.test.utils import override_settings
 from django.utils.translation import gettext as _
 
@@ -17,6 +18,11 @@ from ..models import GeoAddress
 from ..utils import (
     address_as_dict,
     addresses_from_persons,
+    cluster_locations,
+    geohash,
+    geohash_cell_size,
+    geohash_cells,
+    geohash_filter,
     get_google_api_key,
     get_radius,
     location_bounding_box,
@@ -299,3 +305,79 @@ class GeoLocationUtilsTestCase(GeoLocationBaseTestCase):
             ),
             location_bounding_box(20.0, 5.0, 10000)
         )
+
+    def test_geohash(self):
+        self.assertEqual('u4pruydqqvj', geohash(57.64911, 10.40744, precision=11))
+        self.assertEqual('u4pru', geohash(57.64911, 10.40744, precision=5))
+        self.assertEqual('spey60g0d', geohash(43.290347, 5.365572))
+        self.assertEqual(constants.GEOHASH_PRECISION, len(geohash(0.0, 0.0)))
+
+        self.assertEqual('0', geohash(-90.0, -180.0, precision=1))
+        self.assertEqual('z', geohash(89.9, 179.9, precision=1))
+
+    def test_geohash_cell_size(self):
+        self.assertTupleEqual((180.0, 360.0), geohash_cell_size(0))
+        self.assertTupleEqual((45.0, 45.0), geohash_cell_size(1))
+        self.assertTupleEqual((180.0 / 32, 360.0 / 32), geohash_cell_size(2))
+
+    def test_geohash_cells(self):
+        # ~ 5km around Marseille
+        self.assertListEqual(['spey'], geohash_cells((43.28, 5.36), (43.31, 5.47)))
+
+        # Across the border of 2 cells (meridian of Greenwich)
+        self.assertListEqual(
+            ['gbpbp', 'u0000'],
+            geohash_cells((45.0, -0.01), (45.01, 0.01)),
+        )
+
+        # Whole earth
+        self.assertListEqual([''], geohash_cells((-90.0, -180.0), (90.0, 180.0)))
+
+    def test_geohash_filter(self):
+        self.assertEqual(
+            Q(geohash__startswith='spey'),
+            geohash_filter((43.28, 5.36), (43.31, 5.47)),
+        )
+        self.assertEqual(
+            Q(geoaddress__geohash__startswith='gbpbp')
+            | Q(geoaddress__geohash__startswith='u0000'),
+            geohash_filter((45.0, -0.01), (45.01, 0.01), field_name='geoaddress__geohash'),
+        )
+        self.assertEqual(Q(), geohash_filter((-90.0, -180.0), (90.0, 180.0)))
+
+    def test_cluster_locations(self):
+        self.assertListEqual([], cluster_locations([], max_clusters=10))
+
+        marseille1 = (geohash(43.290347, 5.365572), 43.290347, 5.365572)
+        marseille2 = ('', 43.301963, 5.462410)  # Geohash is computed
+        ozan = (geohash(46.3833, 4.91667), 46.3833, 4.91667)
+
+        # Enough clusters => one cluster per location
+        clusters = cluster_locations([marseille1, marseille2, ozan], max_clusters=3)
+        self.assertListEqual(
+            [1, 1, 1], [cluster['count'] for cluster in clusters],
+        )
+        self.assertListEqual(
+            ['spey60g0d', 'speyk6cs5', 'u05rzgu4q'],
+            [cluster['geohash'] for cluster in clusters],
+        )
+
+        # Locations in Marseille are grouped
+        clusters = cluster_locations([marseille1, marseille2, ozan], max_clusters=2)
+        self.assertEqual(2, len(clusters))
+
+        cluster1 = clusters[0]
+        self.assertEqual('spey', cluster1['geohash'])
+        self.assertEqual(2, cluster1['count'])
+        self.assertAlmostEqual((43.290347 + 43.301963) / 2, cluster1['latitude'])
+        self.assertAlmostEqual((5.365572 + 5.462410) / 2, cluster1['longitude'])
+
+        cluster2 = clusters[1]
+        self.assertEqual('u05r', cluster2['geohash'])
+        self.assertEqual(1, cluster2['count'])
+        self.assertEqual(46.3833, cluster2['latitude'])
+
+        # Only one cluster
+        clusters = cluster_locations([marseille1, marseille2, ozan], max_clusters=1)
+        self.assertListEqual([''], [cluster['geohash'] for cluster in clusters])
+        self.assertEqual(3, clusters[0]['count'])
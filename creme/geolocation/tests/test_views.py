@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+from django.test.utils import override_settings
 from django.urls import reverse
 
 from creme.creme_core.auth.entity_credentials import EntityCredentials
@@ -370,6 +371,89 @@ class GetAddressesTestCase(GeoLocationBaseTestCase):
 
         self.assertEqual(3, GeoAddress.objects.count())
 
+    def test_get_addresses_bounds(self):
+        user = self.login()
+
+        orga1 = create_orga(name='Orga 1', user=user)
+        orga2 = create_orga(name='Orga 2', user=user)
+        orga3 = create_orga(name='Orga 3', user=user)
+
+        address1 = self.create_billing_address(
+            orga1, zipcode='13007', town='Marseille', geoloc=(43.290347, 5.365572),
+        )
+        address2 = self.create_billing_address(
+            orga2, zipcode='13011', town='Marseille', geoloc=(43.301963, 5.462410),
+        )
+        self.create_billing_address(
+            orga3, zipcode='01190', town='Ozan', geoloc=(46.3833, 4.91667),
+        )
+
+        url = self.GET_ADDRESSES_URL
+        response = self.assertGET200(url, data={'bounds': '43.28,5.36,43.31,5.47'})
+        self.assertListAddressAsDict(
+            response.json()['addresses'],
+            address_as_dict(address1),
+            address_as_dict(address2),
+        )
+
+        response = self.assertGET200(url, data={'bounds': '43.28,5.36,43.30,5.40'})
+        self.assertDictEqual(
+            response.json(), {'addresses': [address_as_dict(address1)]},
+        )
+
+        self.assertGET(400, url, data={'bounds': '43.28,5.36,43.30'})
+        self.assertGET(400, url, data={'bounds': '43.28,5.36,43.30,notafloat'})
+
+    @override_settings(GEOLOCATION_CLUSTERING_THRESHOLD=2, GEOLOCATION_MAX_CLUSTERS=2)
+    def test_get_addresses_clusters(self):
+        user = self.login()
+
+        orga1 = create_orga(name='Orga 1', user=user)
+        orga2 = create_orga(name='Orga 2', user=user)
+        orga3 = create_orga(name='Orga 3', user=user)
+
+        address1 = self.create_billing_address(
+            orga1, zipcode='13007', town='Marseille', geoloc=(43.290347, 5.365572),
+        )
+        self.create_billing_address(
+            orga2, zipcode='13011', town='Marseille', geoloc=(43.301963, 5.462410),
+        )
+
+        url = self.GET_ADDRESSES_URL
+        response = self.assertGET200(url)
+        self.assertEqual(2, len(response.json()['addresses']))
+
+        self.create_billing_address(
+            orga3, zipcode='01190', town='Ozan', geoloc=(46.3833, 4.91667),
+        )
+
+        response = self.assertGET200(url)
+        self.assertDictEqual(
+            {
+                'addresses': [],
+                'clusters': [
+                    {
+                        'geohash': 'spey',
+                        'count': 2,
+                        'latitude': (43.290347 + 43.301963) / 2,
+                        'longitude': (5.365572 + 5.462410) / 2,
+                    }, {
+                        'geohash': 'u05r',
+                        'count': 1,
+                        'latitude': 46.3833,
+                        'longitude': 4.91667,
+                    },
+                ],
+            },
+            response.json(),
+        )
+
+        # Under the threshold in the box
+        response = self.assertGET200(url, data={'bounds': '43.28,5.36,43.30,5.40'})
+        self.assertDictEqual(
+            response.json(), {'addresses': [address_as_dict(address1)]},
+        )
+
 
 class GetNeighboursTestCase(GeoLocationBaseTestCase):
     GET_NEIGHBOURS_URL = reverse('geolocation__neighbours')
@@ -2,7 +2,7 @@
 
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2014-2020  Hybird
+#    Copyright (C) 2014-2021  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -142,3 +142,142 @@ def location_bounding_box(latitude, longitude, distance):
         (latitude - offset_latitude, longitude - offset_longitude),
         (latitude + offset_latitude, longitude + offset_longitude),
     )
+
+
+# Geohash ----------------------------------------------------------------------
+# A geohash is a string which identifies a cell of a grid on the earth ; the
+# cell of a prefix contains the cells of the longer geohashes (so close
+# locations generally share a prefix).
+# See https://en.wikipedia.org/wiki/Geohash
+_GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def geohash(latitude, longitude, precision=constants.GEOHASH_PRECISION):
+    """Encode a location into a geohash.
+    @param latitude: Float in [-90, 90].
+    @param longitude: Float in [-180, 180].
+    @param precision: Length of the returned string.
+    @return A string.
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bits_count = 0
+    even = True  # NB: the first bit is for the longitude.
+
+    while len(chars) < precision:
+        value, interval = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (interval[0] + interval[1]) / 2
+
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+
+        even = not even
+        bits_count += 1
+
+        if bits_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits = 0
+            bits_count = 0
+
+    return ''.join(chars)
+
+
+def geohash_cell_size(precision):
+    """Size of the cells of the geohashes with a given precision.
+    @return A tuple (height in degrees of latitude, width in degrees of longitude).
+    """
+    bits = 5 * precision
+    lon_bits = (bits + 1) // 2
+
+    return 180.0 / 2 ** (bits - lon_bits), 360.0 / 2 ** lon_bits
+
+
+def geohash_cells(upper_left, lower_right):
+    """Get the geohashes of the cells which cover a box.
+    The precision is the greatest one with cells bigger than the box ; so there
+    are 4 cells at most (the box can be across the borders of the cells).
+    @param upper_left: Tuple (latitude, longitude) of the lower bounds.
+    @param lower_right: Tuple (latitude, longitude) of the upper bounds.
+    @return A list of strings (empty string means "the whole earth").
+    """
+    lat_min = max(-90.0, upper_left[0])
+    lat_max = min(90.0, lower_right[0])
+    lon_min = max(-180.0, upper_left[1])
+    lon_max = min(180.0, lower_right[1])
+
+    precision = 0
+    while precision < constants.GEOHASH_PRECISION:
+        height, width = geohash_cell_size(precision + 1)
+
+        if height < lat_max - lat_min or width < lon_max - lon_min:
+            break
+
+        precision += 1
+
+    if not precision:
+        return ['']
+
+    return sorted({
+        geohash(latitude, longitude, precision)
+        for latitude in (lat_min, lat_max)
+        for longitude in (lon_min, lon_max)
+    })
+
+
+def geohash_filter(upper_left, lower_right, field_name='geohash'):
+    """Build a Q instance which retrieves the instances in the cells covering
+    a box (see geohash_cells()). Notice that some instances in these cells are
+    out of the box.
+    """
+    q = Q()
+
+    for cell in geohash_cells(upper_left, lower_right):
+        if not cell:
+            return Q()
+
+        q |= Q(**{f'{field_name}__startswith': cell})
+
+    return q
+
+
+def cluster_locations(locations, max_clusters):
+    """Group some locations by geohash cells ; it's useful to display a map
+    with too many markers.
+    The precision of the cells is the greatest one which produces at most
+    "max_clusters" clusters.
+    @param locations: Iterable of tuples (geohash, latitude, longitude) ; the
+           geohash can be empty (it is computed in this case).
+    @param max_clusters: Maximum number of returned clusters.
+    @return A list of dictionaries with keys "geohash", "count", "latitude" &
+            "longitude" (mean position of the grouped locations).
+    """
+    located = [
+        (code or geohash(latitude, longitude), latitude, longitude)
+        for code, latitude, longitude in locations
+    ]
+
+    precision = constants.GEOHASH_PRECISION
+    while precision and len({code[:precision] for code, __, __ in located}) > max_clusters:
+        precision -= 1
+
+    clusters = {}
+    for code, latitude, longitude in located:
+        cluster = clusters.setdefault(code[:precision], [0, 0.0, 0.0])
+        cluster[0] += 1
+        cluster[1] += latitude
+        cluster[2] += longitude
+
+    return [
+        {
+            'geohash':   code,
+            'count':     count,
+            'latitude':  lat_sum / count,
+            'longitude': lon_sum / count,
+        } for code, (count, lat_sum, lon_sum) in sorted(clusters.items())
+    ]
@@ -20,18 +20,27 @@
 
 from functools import partial
 
+from django.conf import settings
+from django.db.models import Q
 from django.db.transaction import atomic
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 
 from creme import persons
+from creme.creme_core.core.exceptions import BadRequestError
 from creme.creme_core.http import CremeJsonResponse
 from creme.creme_core.models import EntityFilter
 from creme.creme_core.utils import get_from_GET_or_404, get_from_POST_or_404
 from creme.creme_core.views.generic import CheckedView
 
 from .models import GeoAddress
-from .utils import address_as_dict, addresses_from_persons, get_radius
+from .utils import (
+    address_as_dict,
+    addresses_from_persons,
+    cluster_locations,
+    geohash_filter,
+    get_radius,
+)
 
 Address = persons.get_address_model()
 
@@ -85,10 +94,37 @@ class BaseAddressesInformation(CheckedView):
 
 
 class AddressesInformation(BaseAddressesInformation):
+    """Information on the addresses of some persons.
+
+    GET arguments:
+      - "id": ID of an EntityFilter (optional).
+      - "bounds": "lat_min,lon_min,lat_max,lon_max" (optional) ; only the
+        addresses located in this box are returned.
+
+    When there are too many addresses (see 'GEOLOCATION_CLUSTERING_THRESHOLD'),
+    the addresses are grouped by area, & the key "clusters" of the response
+    contains the areas (see utils.cluster_locations()) instead of the addresses.
+    """
     entity_classes = [
         persons.get_contact_model(),
         persons.get_organisation_model(),
     ]
+    bounds_arg = 'bounds'
+
+    def get_bounds(self):
+        """Get the box from the GET arguments.
+        @return A tuple ((lat_min, lon_min), (lat_max, lon_max)) or None.
+        """
+        bounds = self.request.GET.get(self.bounds_arg)
+        if not bounds:
+            return None
+
+        try:
+            lat_min, lon_min, lat_max, lon_max = map(float, bounds.split(','))
+        except ValueError as e:
+            raise BadRequestError(f'Invalid argument "{self.bounds_arg}": {e}') from e
+
+        return (lat_min, lon_min), (lat_max, lon_max)
 
     def get_info(self, request):
         entity_filter = self.get_efilter()
@@ -103,15 +139,53 @@ class AddressesInformation(BaseAddressesInformation):
                 for model in self.entity_classes:
                     yield model.objects.all()
 
-        addresses = [
-            address
-            for owners in owner_groups()
-            for address in addresses_from_persons(owners, user)
-        ]
+        address_groups = [addresses_from_persons(owners, user) for owners in owner_groups()]
 
-        GeoAddress.populate_geoaddresses(addresses)
+        # The addresses without location are located with their town
+        GeoAddress.populate_geoaddresses([
+            address
+            for addresses in address_groups
+            for address in addresses.filter(
+                Q(geoaddress__isnull=True) | Q(geoaddress__latitude__isnull=True)
+            )
+        ])
+
+        bounds = self.get_bounds()
+        if bounds is not None:
+            (lat_min, lon_min), (lat_max, lon_max) = bounds
+            address_groups = [
+                addresses.filter(
+                    geohash_filter(*bounds, field_name='geoaddress__geohash'),
+                    geoaddress__latitude__range=(lat_min, lat_max),
+                    geoaddress__longitude__range=(lon_min, lon_max),
+                ) for addresses in address_groups
+            ]
+
+        if sum(
+            addresses.count() for addresses in address_groups
+        ) > settings.GEOLOCATION_CLUSTERING_THRESHOLD:
+            locations = [
+                location
+                for addresses in address_groups
+                for location in GeoAddress.objects.filter(
+                    address__in=addresses, latitude__isnull=False,
+                ).values_list('geohash', 'latitude', 'longitude')
+            ]
+
+            return {
+                'addresses': [],
+                'clusters': cluster_locations(
+                    locations, max_clusters=settings.GEOLOCATION_MAX_CLUSTERS,
+                ),
+            }
 
-        return {'addresses': [address_as_dict(address) for address in addresses]}
+        return {
+            'addresses': [
+                address_as_dict(address)
+                for addresses in address_groups
+                for address in addresses.select_related('geoaddress')
+            ],
+        }
 
 
 class NeighboursInformation(BaseAddressesInformation):
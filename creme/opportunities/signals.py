@@ -2,7 +2,7 @@
 
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2015-2020  Hybird
+#    Copyright (C) 2015-2021  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -26,6 +26,7 @@ if apps.is_installed('creme.billing'):
     from django.dispatch import receiver
 
     from creme.billing import get_quote_model
+    from creme.creme_core import signals as core_signals
     from creme.creme_core.models import Relation, SettingValue
     from creme.opportunities.constants import REL_SUB_LINKED_QUOTE
 
@@ -71,6 +72,11 @@ if apps.is_installed('creme.billing'):
             if isinstance(doc, Quote) and use_current_quote():
                 update_sales(instance.object_entity.get_real_entity())
 
+    @receiver(core_signals.post_bulk_create, sender=Relation)
+    def _handle_current_quotes_set(sender, instances, **kwargs):
+        for relation in instances:
+            _handle_current_quote_set(sender=sender, instance=relation)
+
     @receiver(post_delete, sender=Relation)
     def _handle_linked_quote_deletion(sender, instance, **kwargs):
         if instance.type_id == REL_SUB_LINKED_QUOTE:
@@ -183,10 +183,6 @@ class AbstractContact(CremeEntity, PersonWithAddressesMixin):
                 email=self.email or '',
             )
 
-    def trash(self):
-        self._check_deletion()
-        super().trash()
-
     @classmethod
     def _create_linked_contact(cls, user, **kwargs):
         # TODO: assert user is not a team + enforce non team clean() ?
@@ -153,10 +153,6 @@ class AbstractOrganisation(CremeEntity, base.PersonWithAddressesMixin):
     def _post_save_clone(self, source):
         self._aux_post_save_clone(source)
 
-    def trash(self):
-        self._check_deletion()
-        super().trash()
-
 
 class Organisation(AbstractOrganisation):
     class Meta(AbstractOrganisation.Meta):
@@ -122,8 +122,14 @@ class PersonsReportsTestCase(BrickTestCaseMixin, CremeTestCase):
         )
 
         contact = user.linked_contact
-        response = self.assertGET200(contact.get_absolute_url())
-        dom = self.get_html_tree(response.content)
+        self.assertGET200(contact.get_absolute_url())
+
+        # NB: the graph bricks are loaded after the page
+        response = self.assertGET200(
+            reverse('creme_core__reload_detailview_bricks', args=(contact.id,)),
+            data={'brick_id': ibci.brick_id},
+        )
+        dom = self.get_html_tree(response.json()[0][1])
         brick_node = self.get_brick_node(dom, brick_id=ibci.brick_id)
         self.assertBrickHasNotClass(brick_node, 'is-empty')
 
@@ -176,8 +182,13 @@ class PersonsReportsTestCase(BrickTestCaseMixin, CremeTestCase):
             zone=BrickDetailviewLocation.RIGHT, model=Contact,
         )
 
-        response1 = self.assertGET200(contact.get_absolute_url())
-        dom = self.get_html_tree(response1.content)
+        self.assertGET200(contact.get_absolute_url())
+
+        response1 = self.assertGET200(
+            reverse('creme_core__reload_detailview_bricks', args=(contact.id,)),
+            data={'brick_id': ibci.brick_id},
+        )
+        dom = self.get_html_tree(response1.json()[0][1])
         brick_node = self.get_brick_node(dom, brick_id=ibci.brick_id)
         self.assertBrickHasClass(brick_node, 'is-empty')
 
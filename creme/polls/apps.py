@@ -2,7 +2,7 @@
 
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2015-2020  Hybird
+#    Copyright (C) 2015-2021  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -40,6 +40,8 @@ class PollsConfig(CremeAppConfig):
         self.PollReply    = get_pollreply_model()
         super().all_apps_ready()
 
+        from . import signals  # NOQA
+
     def register_entity_models(self, creme_registry):
         creme_registry.register_entity_models(
             self.PollForm,
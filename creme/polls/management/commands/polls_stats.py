@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2021  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#
+#    GNU Affero General Public License for more details.
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from django.core.management.base import BaseCommand
+
+from ...models import PollFormLine, PollFormLineStat
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the statistics of the forms from their replies '
+        '(useful if the replies have been modified without PollReplyLine.save()).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-f', '--form', type=int, action='append', dest='forms', default=[],
+            help='ID of a form to rebuild (can be used several times) '
+                 '[default: all the forms]',
+        )
+
+    def sysout(self, message, visible):
+        if visible:
+            self.stdout.write(message)
+
+    def handle(self, *args, **options):
+        form_ids = options.get('forms')
+        verbosity = options.get('verbosity')
+
+        self.sysout('Rebuilding the statistics of the forms...', verbosity > 0)
+        count = PollFormLineStat.objects.rebuild(
+            PollFormLine.objects.filter(pform__in=form_ids) if form_ids else None,
+        )
+        self.sysout(f'{count} statistic(s) created.', verbosity > 0)
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.deletion import CASCADE
+from django.utils.translation import override
+
+from creme.creme_core.utils.serializers import json_encode
+
+
+def populate_stats(apps, schema_editor):
+    from creme.polls.core import PollLineType
+
+    stats = {}
+
+    with override(settings.LANGUAGE_CODE):
+        for rline in apps.get_model('polls', 'PollReplyLine').objects.filter(
+            applicable=True, raw_answer__isnull=False,
+        ).order_by('id').iterator():
+            line_type = PollLineType.build_from_serialized_args(rline.type, rline.type_args)
+
+            for order, (label, count) in enumerate(line_type.get_stats(rline.raw_answer) or ()):
+                key = (rline.pform_line_id, json_encode(label))
+                stat = stats.get(key)
+
+                if stat is None:
+                    stats[key] = {
+                        'pform_line_id': key[0], 'order': order, 'label': key[1],
+                        'count': count, 'occurrences': 1,
+                    }
+                else:
+                    stat['count'] += count
+                    stat['occurrences'] += 1
+
+    PollFormLineStat = apps.get_model('polls', 'PollFormLineStat')
+    PollFormLineStat.objects.bulk_create(
+        [PollFormLineStat(**kwargs) for kwargs in stats.values()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('polls', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PollFormLineStat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order', models.PositiveIntegerField(default=0, editable=False)),
+                ('label', models.TextField(editable=False)),
+                ('count', models.IntegerField(default=0, editable=False)),
+                ('occurrences', models.IntegerField(default=0, editable=False)),
+                (
+                    'pform_line',
+                    models.ForeignKey(
+                        editable=False, on_delete=CASCADE,
+                        related_name='stats', to='polls.PollFormLine',
+                    )
+                ),
+            ],
+        ),
+        migrations.RunPython(populate_stats),
+    ]
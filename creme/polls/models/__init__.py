@@ -6,6 +6,7 @@ from .poll_form import (  # NOQA
     PollForm,
     PollFormLine,
     PollFormLineCondition,
+    PollFormLineStat,
     PollFormSection,
 )
 from .poll_reply import (  # NOQA
@@ -19,15 +19,18 @@
 ################################################################################
 
 from functools import partial
+from typing import Iterable, Optional, Tuple
 
 from django.conf import settings
 from django.db import models
+from django.db.transaction import atomic
 from django.urls import reverse
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
 
 from creme.creme_core.models import CremeEntity, CremeModel
 from creme.creme_core.utils import split_filter
+from creme.creme_core.utils.serializers import json_encode
 
 from .. import get_pollform_model, get_pollreply_model
 from .base import _PollLine
@@ -354,3 +357,120 @@ class PollFormLineCondition(CremeModel):
                 changed = True
 
         return changed
+
+
+class PollFormLineStatManager(models.Manager):
+    def apply_deltas(self,
+                     pform_line_id: int,
+                     deltas: Iterable[Tuple[int, object, int, int]],
+                     ) -> None:
+        """Update the statistics of a question when an answer changes.
+        @param pform_line_id: ID of the related PollFormLine.
+        @param deltas: Tuples (order, label, count_delta, occurrences_delta) ;
+               see PollReplyLine.stats_deltas().
+        """
+        deltas = [delta for delta in deltas if delta[2] or delta[3]]
+        if not deltas:
+            return
+
+        stat_ids = {}
+        for stat_id, label in self.filter(
+            pform_line=pform_line_id,
+        ).order_by('id').values_list('id', 'label'):
+            stat_ids.setdefault(label, stat_id)
+
+        for order, label, count_delta, occurrences_delta in deltas:
+            encoded_label = json_encode(label)
+            stat_id = stat_ids.get(encoded_label)
+
+            if stat_id is not None:
+                self.filter(id=stat_id).update(
+                    count=models.F('count') + count_delta,
+                    occurrences=models.F('occurrences') + occurrences_delta,
+                )
+            elif occurrences_delta > 0:
+                self.create(
+                    pform_line_id=pform_line_id,
+                    order=order,
+                    label=encoded_label,
+                    count=count_delta,
+                    occurrences=occurrences_delta,
+                )
+
+    def rebuild(self, pform_lines: Optional[Iterable[PollFormLine]] = None) -> int:
+        """Compute again the statistics from the lines of the replies.
+        @param pform_lines: The statistics of these questions are rebuilt ;
+               <None> means all the questions.
+        @return The number of created PollFormLineStat.
+        """
+        from .poll_reply import PollReplyLine
+
+        stats_qs = self.all()
+        rlines_qs = PollReplyLine.objects.order_by('id')
+
+        if pform_lines is not None:
+            fline_ids = [fline.id for fline in pform_lines]
+            stats_qs = stats_qs.filter(pform_line__in=fline_ids)
+            rlines_qs = rlines_qs.filter(pform_line__in=fline_ids)
+
+        stats = {}
+
+        with atomic():
+            stats_qs.delete()
+
+            for rline in rlines_qs.iterator():
+                fline_id = rline.pform_line_id
+
+                for order, (label, count) in enumerate(rline.stored_stats):
+                    key = (fline_id, json_encode(label))
+                    stat = stats.get(key)
+
+                    if stat is None:
+                        stats[key] = self.model(
+                            pform_line_id=fline_id, order=order, label=key[1],
+                            count=count, occurrences=1,
+                        )
+                    else:
+                        stat.count += count
+                        stat.occurrences += 1
+
+            self.bulk_create(stats.values(), batch_size=500)
+
+        return len(stats)
+
+
+class PollFormLineStat(CremeModel):
+    """Aggregated statistics of the answers to a question (ie: PollFormLine).
+
+    There is an instance per label of statistic (see PollLineType.get_stats()) ;
+    the counters are updated when the lines of the replies are saved/deleted,
+    so the statistics of a form can be displayed without reading all the
+    replies. The labels are JSON-encoded, & translated in the language
+    settings.LANGUAGE_CODE.
+    The command "polls_stats" rebuilds the statistics from the replies.
+    """
+    pform_line = models.ForeignKey(
+        PollFormLine, editable=False, related_name='stats', on_delete=models.CASCADE,
+    )
+    # Position of the label in the statistics of a reply line
+    order = models.PositiveIntegerField(editable=False, default=0)
+    label = models.TextField(editable=False)
+    # Sum of the counts of the reply lines for this label
+    count = models.IntegerField(editable=False, default=0)
+    # Number of reply lines which have this label in their statistics
+    occurrences = models.IntegerField(editable=False, default=0)
+
+    objects = PollFormLineStatManager()
+
+    class Meta:
+        app_label = 'polls'
+
+    def __repr__(self):
+        return (
+            f'PollFormLineStat('
+            f'pform_line={self.pform_line_id}, '
+            f'label={self.label}, '
+            f'count={self.count}, '
+            f'occurrences={self.occurrences}'
+            f')'
+        )
@@ -18,17 +18,21 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+from collections import OrderedDict
+
 from django.conf import settings
 from django.db import models
+from django.db.transaction import atomic
 from django.urls import reverse
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
+from django.utils.translation import override as override_language
 from django.utils.translation import pgettext_lazy
 
 from creme.creme_core.models import CremeEntity, CremeModel
 
 from .base import _PollLine
-from .poll_form import PollFormLine
+from .poll_form import PollFormLine, PollFormLineStat
 from .poll_type import PollType
 
 
@@ -155,6 +159,48 @@ class PollReplyLine(CremeModel, _PollLine):
             f')'
         )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+
+        # Used to update the statistics of the question (see save())
+        if 'applicable' in field_names and 'raw_answer' in field_names:
+            instance._initial_answer = (instance.applicable, instance.raw_answer)
+
+        return instance
+
+    def _get_initial_answer(self):
+        initial_answer = getattr(self, '_initial_answer', None)
+
+        if initial_answer is None and not self._state.adding:
+            # Instance retrieved with deferred fields
+            initial_answer = type(self)._default_manager.filter(
+                id=self.id,
+            ).values_list('applicable', 'raw_answer').first()
+
+        return initial_answer
+
+    def save(self, *args, **kwargs):
+        initial_answer = self._get_initial_answer()
+        old_stats = [] if initial_answer is None else self._get_stored_stats(*initial_answer)
+
+        with atomic():
+            super().save(*args, **kwargs)
+            PollFormLineStat.objects.apply_deltas(
+                self.pform_line_id, self.stats_deltas(old_stats, self.stored_stats),
+            )
+
+        self._initial_answer = (self.applicable, self.raw_answer)
+
+    def discard_stats(self):
+        "Remove the current answer from the statistics of the question."
+        initial_answer = self._get_initial_answer()
+        if initial_answer is not None:
+            PollFormLineStat.objects.apply_deltas(
+                self.pform_line_id,
+                self.stats_deltas(self._get_stored_stats(*initial_answer), []),
+            )
+
     @classmethod
     def _get_condition_class(cls):  # See _PollLine
         return PollReplyLineCondition
@@ -189,6 +235,42 @@ class PollReplyLine(CremeModel, _PollLine):
 
         return self.poll_line_type.get_stats(self.raw_answer)
 
+    def _get_stored_stats(self, applicable, raw_answer):
+        if not applicable:
+            return []
+
+        with override_language(settings.LANGUAGE_CODE):
+            return self.poll_line_type.get_stats(raw_answer) or []
+
+    @property
+    def stored_stats(self):
+        "Statistics with the labels translated like in PollFormLineStat."
+        return self._get_stored_stats(self.applicable, self.raw_answer)
+
+    @staticmethod
+    def stats_deltas(old_stats, new_stats):
+        """Compute the changes of statistics between 2 answers.
+        @param old_stats: List of tuples (label, count) ; see PollLineType.get_stats().
+        @param new_stats: Same as 'old_stats'.
+        @return A list of tuples (order, label, count_delta, occurrences_delta).
+        """
+        deltas = OrderedDict()
+
+        for sign, stats in ((-1, old_stats), (1, new_stats)):
+            for order, (label, count) in enumerate(stats):
+                delta = deltas.get(label)
+
+                if delta is None:
+                    deltas[label] = delta = [order, 0, 0]
+
+                delta[1] += sign * count
+                delta[2] += sign
+
+        return [
+            (order, label, count, occurrences)
+            for label, (order, count, occurrences) in deltas.items()
+        ]
+
 
 class PollReplyLineCondition(CremeModel):
     line = models.ForeignKey(
@@ -5,6 +5,7 @@ from functools import partial
 from json import dumps as dump_json
 from json import loads as load_json
 
+from django.core.management import call_command
 from django.forms.widgets import Select
 from django.urls import reverse
 from django.utils.translation import gettext as _
@@ -27,6 +28,7 @@ from ..core import PollLineType
 from ..models import (
     PollFormLine,
     PollFormLineCondition,
+    PollFormLineStat,
     PollFormSection,
     PollReplyLine,
     PollReplyLineCondition,
@@ -2224,7 +2226,7 @@ class PollRepliesTestCase(_PollsTestCase, BrickTestCaseMixin):
             preply4, answer_1_4, answer_2_4, 2, [1, 2, 4], {'answer_0': 0, 'answer_1': 'Red'},
         )
 
-        with self.assertNumQueries(3):  # 1 for sections, 1 for lines, 1 for replies
+        with self.assertNumQueries(3):  # 1 for sections, 1 for lines, 1 for statistics
             stree = StatsTree(pform)
 
         with self.assertNumQueries(0):
@@ -2289,3 +2291,152 @@ class PollRepliesTestCase(_PollsTestCase, BrickTestCaseMixin):
         self.assertContains(response, fline2.question)
         self.assertContains(response, answer1)
         self.assertContains(response, answer2)
+        self.assertContains(response, reverse('polls__export_form_stats', args=(pform.id,)))
+
+    def test_stats_counters(self):
+        "The statistics are updated when the answers change."
+        user = self.login()
+        pform = PollForm.objects.create(user=user, name='Form#1')
+
+        create_line = self._get_formline_creator(pform)
+        fline1 = create_line(
+            'What type of swallow?', qtype=PollLineType.ENUM,
+            choices=[[1, 'European'], [2, 'African']],
+        )
+        fline2 = create_line('How many swallows have you seen?', qtype=PollLineType.INT)
+
+        preply1 = self._build_preply_from_pform(pform, 'Reply#1')
+        preply2 = self._build_preply_from_pform(pform, 'Reply#2')
+        self.assertFalse(PollFormLineStat.objects.filter(pform_line__pform=pform))
+
+        self._fill(preply1, 1, 5)
+        self._fill(preply2, 2, 5)
+
+        def get_stats(fline):
+            return {
+                (load_json(stat.label), stat.count, stat.occurrences)
+                for stat in PollFormLineStat.objects.filter(pform_line=fline)
+            }
+
+        self.assertSetEqual({('European', 1, 2), ('African', 1, 2)}, get_stats(fline1))
+        self.assertSetEqual({(5, 2, 2)}, get_stats(fline2))
+
+        # Edition of answers
+        rline1_1 = PollReplyLine.objects.get(preply=preply1, pform_line=fline1)
+        self._edit_answer(preply1, rline1_1, 2, is_complete=True)
+        self.assertSetEqual({('European', 0, 2), ('African', 2, 2)}, get_stats(fline1))
+
+        rline1_2 = PollReplyLine.objects.get(preply=preply1, pform_line=fline2)
+        self._edit_answer(preply1, rline1_2, 8, is_complete=True)
+        self.assertSetEqual({(5, 1, 1), (8, 1, 1)}, get_stats(fline2))
+
+        stats2 = StatsTree(pform).find_line(fline2.id).answer_stats
+        self.assertListEqual([(5, 1, 50.0), (8, 1, 50.0)], stats2)
+
+        # Not applicable
+        rline2_2 = self.refresh(PollReplyLine.objects.get(preply=preply2, pform_line=fline2))
+        rline2_2.applicable = False
+        rline2_2.save()
+        self.assertSetEqual({(5, 0, 0), (8, 1, 1)}, get_stats(fline2))
+        self.assertListEqual(
+            [(8, 1, 100.0)],
+            StatsTree(pform).find_line(fline2.id).answer_stats,
+        )
+
+        # Cleaning
+        self.assertPOST200(reverse('polls__clean_reply'), follow=True, data={'id': preply1.id})
+        self.assertSetEqual({('European', 0, 1), ('African', 1, 1)}, get_stats(fline1))
+        self.assertSetEqual({(5, 0, 0), (8, 0, 0)}, get_stats(fline2))
+
+        # Deletion
+        preply2.delete()
+        self.assertSetEqual({('European', 0, 0), ('African', 0, 0)}, get_stats(fline1))
+
+        stree = StatsTree(pform)
+        self.assertFalse(stree.find_line(fline1.id).answer_stats)
+        self.assertFalse(stree.find_line(fline2.id).answer_stats)
+
+    def test_stats_rebuild_command(self):
+        user = self.login()
+        pform1 = PollForm.objects.create(user=user, name='Form#1')
+        pform2 = PollForm.objects.create(user=user, name='Form#2')
+
+        fline1 = self._get_formline_creator(pform1)(
+            'What type of swallow?', qtype=PollLineType.ENUM,
+            choices=[[1, 'European'], [2, 'African']],
+        )
+        fline2 = self._get_formline_creator(pform2)(
+            'How many swallows have you seen?', qtype=PollLineType.INT,
+        )
+
+        self._fill(self._build_preply_from_pform(pform1, 'Reply#1'), 2)
+        self._fill(self._build_preply_from_pform(pform1, 'Reply#2'), 2)
+        self._fill(self._build_preply_from_pform(pform2, 'Reply#3'), 3)
+
+        stats1 = StatsTree(pform1).find_line(fline1.id).answer_stats
+        self.assertListEqual([('European', 0, 0.0), ('African', 2, 100.0)], stats1)
+
+        stats2 = StatsTree(pform2).find_line(fline2.id).answer_stats
+        self.assertListEqual([(3, 1, 100.0)], stats2)
+
+        # Statistics modified without PollReplyLine.save()
+        PollFormLineStat.objects.update(count=12)
+
+        call_command('polls_stats', verbosity=0, forms=[pform1.id])
+        self.assertListEqual(stats1, StatsTree(pform1).find_line(fline1.id).answer_stats)
+        self.assertEqual(12, self.get_object_or_fail(PollFormLineStat, pform_line=fline2).count)
+
+        PollFormLineStat.objects.all().delete()
+        call_command('polls_stats', verbosity=0)
+        self.assertListEqual(stats1, StatsTree(pform1).find_line(fline1.id).answer_stats)
+        self.assertListEqual(stats2, StatsTree(pform2).find_line(fline2.id).answer_stats)
+
+    def test_stats_export(self):
+        user = self.login()
+        pform = PollForm.objects.create(user=user, name='Form#1')
+
+        create_line = self._get_formline_creator(pform)
+        create_line('What type of swallow?', qtype=PollLineType.ENUM,
+                    choices=[[1, 'European'], [2, 'African']],
+                   )
+        create_line('What do you think about swallows?')
+
+        self._fill(self._build_preply_from_pform(pform, 'Reply#1'), 2, 'Cool')
+        self._fill(self._build_preply_from_pform(pform, 'Reply#2'), 2, 'Very cool')
+        self._fill(self._build_preply_from_pform(pform, 'Reply#3'), 1, 'Meh')
+
+        url = reverse('polls__export_form_stats', args=(pform.id,))
+        response = self.assertGET200(url)
+        self.assertEqual('text/csv', response['Content-Type'])
+        self.assertListEqual(
+            [
+                '"{}","{}","{}","{}","{}"'.format(
+                    _('Number'), _('Question'), _('Answer'), _('Count'), _('Percentage'),
+                ),
+                '"1","What type of swallow?","European","1","33.33"',
+                '"1","What type of swallow?","African","2","66.67"',
+            ],
+            [
+                line
+                for line in b''.join(response.streaming_content).decode().split('\r\n')
+                if line
+            ],
+        )
+
+        response = self.assertGET200(url, data={'type': 'scsv'})
+        self.assertTrue(
+            b''.join(response.streaming_content).decode().startswith(f'"{_("Number")}";')
+        )
+
+        self.assertGET404(url, data={'type': 'unknown'})
+
+    def test_stats_export_perms(self):
+        user = self.login(is_superuser=False, allowed_apps=['polls'])
+        SetCredentials.objects.create(
+            role=user.role,
+            value=EntityCredentials.VIEW,
+            set_type=SetCredentials.ESET_OWN,
+        )
+
+        pform = PollForm.objects.create(user=self.other_user, name='Form#1')
+        self.assertGET403(reverse('polls__export_form_stats', args=(pform.id,)))
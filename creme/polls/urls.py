@@ -13,6 +13,11 @@ urlpatterns = [
         poll_form.Statistics.as_view(),
         name='polls__form_stats',
     ),
+    re_path(
+        r'^poll_form/stats/(?P<pform_id>\d+)/export[/]?$',
+        poll_form.StatisticsExport.as_view(),
+        name='polls__export_form_stats',
+    ),
 
     # Form lines
     re_path(
@@ -2,7 +2,7 @@
 
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2012-2020  Hybird
+#    Copyright (C) 2012-2021  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -18,14 +18,18 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
-from collections import Counter, defaultdict
+from collections import defaultdict
 from itertools import count
+from json import loads as json_load
+
+from django.db.models import Min, Sum
 
 from creme.creme_core.utils import int_2_roman
 
 from . import get_pollform_model, get_pollreply_model
 from .models import (
     PollFormLine,
+    PollFormLineStat,
     PollFormSection,
     PollReplyLine,
     PollReplySection,
@@ -184,26 +188,36 @@ class ReplySectionTree(SectionTree):
 
 
 class StatsTree(SectionTree):
+    """Section tree of a PollForm, where each question node gets an attribute
+    "answer_stats" which is a list of tuples (label, count, percentage).
+    The statistics are read from the aggregated counters (see PollFormLineStat).
+    """
     def __init__(self, pform):
         super().__init__(pform)
         flines = [node for node in self if not node.is_section]
-        replies_map = defaultdict(list)
-
-        for rline in PollReplyLine.objects.filter(pform_line__in=flines):
-            replies_map[rline.pform_line_id].append(rline)
+        stats_map = defaultdict(list)
+
+        for stat in PollFormLineStat.objects.filter(
+            pform_line__in=flines,
+        ).values(
+            'pform_line', 'label',
+        ).annotate(
+            total_count=Sum('count'),
+            total_occurrences=Sum('occurrences'),
+            min_order=Min('order'),
+            min_id=Min('id'),
+        ).filter(
+            total_occurrences__gt=0,
+        ).order_by('min_order', 'min_id'):
+            stats_map[stat['pform_line']].append(
+                (json_load(stat['label']), stat['total_count'])
+            )
 
         for fline in flines:
-            stats = Counter()
-            total = 0
-
-            for rline in replies_map[fline.id]:
-                rline_stats = rline.stats or []
-
-                for choice_label, choice_count in rline_stats:
-                    total += choice_count
-                    stats[choice_label] += choice_count
+            stats = stats_map[fline.id]
+            total = sum(stat_count for __, stat_count in stats)
 
             fline.answer_stats = [
                 (stat_label, stat_count, round(float(stat_count * 100) / float(total), 2))
-                for stat_label, stat_count in stats.items()
+                for stat_label, stat_count in stats
             ] if total > 0 else []
@@ -28,7 +28,9 @@ from creme.creme_core.auth.decorators import (
     login_required,
     permission_required,
 )
+from creme.creme_core.backends import export_backend_registry
 from creme.creme_core.http import CremeJsonResponse, is_ajax
+from creme.creme_core.utils import get_from_GET_or_404
 from creme.creme_core.views import generic
 from creme.creme_core.views.generic import base
 
@@ -90,10 +92,47 @@ class Statistics(generic.EntityDetail):
         context = super().get_context_data(**kwargs)
         context['nodes'] = StatsTree(self.object)
         context['style'] = NodeStyle()
+        context['export_backends'] = export_backend_registry.backend_classes
 
         return context
 
 
+class StatisticsExport(base.EntityRelatedMixin, base.CheckedView):
+    permissions = 'polls'
+    entity_classes = PollForm
+    entity_id_url_kwarg = 'pform_id'
+    doc_type_arg = 'type'
+
+    def check_related_entity_permissions(self, entity, user):
+        user.has_perm_to_view_or_die(entity)
+
+    def get_backend_class(self):
+        doc_type = get_from_GET_or_404(self.request.GET, self.doc_type_arg, default='csv')
+
+        backend_class = export_backend_registry.get_backend_class(doc_type)
+        if backend_class is None:
+            raise Http404(f'No such exporter for extension "{doc_type}"')
+
+        return backend_class
+
+    def get_rows(self, pform):
+        yield [_('Number'), _('Question'), _('Answer'), _('Count'), _('Percentage')]
+
+        for node in StatsTree(pform):
+            if not node.is_section:
+                for label, count, percent in node.answer_stats:
+                    yield [node.number, node.question, str(label), count, percent]
+
+    def get(self, request, *args, **kwargs):
+        pform = self.get_related_entity()
+
+        return self.get_backend_class()().stream(
+            filename=_('Statistics of {form}').format(form=pform),
+            user=request.user,
+            rows=self.get_rows(pform),
+        )
+
+
 class LineChoices(base.CheckedView):
     response_class = CremeJsonResponse
     permissions = 'polls'
@@ -362,6 +362,9 @@ class PollReplyCleaning(generic.base.EntityRelatedMixin, generic.CheckedView):
     entity_select_for_update = True
 
     def clean(self, preply):
+        for line in preply.lines.all():
+            line.discard_stats()
+
         preply.lines.update(raw_answer=None, applicable=True)  # Avoids statistics artifacts
         update_model_instance(preply, is_complete=False)
 
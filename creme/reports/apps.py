@@ -56,6 +56,7 @@ class ReportsConfig(CremeAppConfig):
         brick_registry.register(
             bricks.ReportFieldsBrick,
             bricks.ReportGraphsBrick,
+            bricks.ReportSchedulesBrick,
             bricks.InstanceBricksInfoBrick,
         ).register_4_instance(
             bricks.ReportGraphBrick,
@@ -28,7 +28,7 @@ from creme.creme_core.gui import bricks as core_bricks
 from creme.creme_core.models import InstanceBrickConfigItem
 
 from .core.graph import GraphFetcher
-from .models import Field
+from .models import Field, ReportGraphResult, ReportSchedule
 from .report_chart_registry import report_chart_registry
 
 Report = reports.get_report_model()
@@ -84,6 +84,23 @@ class ReportGraphsBrick(core_bricks.QuerysetBrick):
         return self._render(btc)
 
 
+class ReportSchedulesBrick(core_bricks.QuerysetBrick):
+    id_ = core_bricks.QuerysetBrick.generate_id('reports', 'schedules')
+    verbose_name = _('Scheduled generations of the report')
+    dependencies = (ReportSchedule,)
+    template_name = 'reports/bricks/schedules.html'
+    order_by = 'id'
+    target_ctypes = (Report,)
+
+    def detailview_display(self, context):
+        return self._render(self.get_template_context(
+            context,
+            ReportSchedule.objects.filter(report=context['object'].id)
+                                  .select_related('user')
+                                  .prefetch_related('files'),
+        ))
+
+
 class InstanceBricksInfoBrick(core_bricks.QuerysetBrick):
     id_ = core_bricks.QuerysetBrick.generate_id('reports', 'instance_bricks_info')
     verbose_name = _('Blocks')
@@ -106,6 +123,7 @@ class ReportGraphBrick(core_bricks.InstanceBrick):
     dependencies = (ReportGraph,)
     verbose_name = "Report's graph"  # Overloaded by __init__()
     template_name = 'reports/bricks/graph.html'
+    deferred = True
 
     def __init__(self, instance_brick_config_item):
         super().__init__(instance_brick_config_item)
@@ -149,10 +167,12 @@ class ReportGraphBrick(core_bricks.InstanceBrick):
     def detailview_display(self, context):
         kwargs = {}
         try:
-            x, y = self.fetcher.fetch_4_entity(
+            kwargs['graph_result'] = result = ReportGraphResult.objects.fetch(
+                fetcher=self.fetcher,
                 entity=context['object'],
                 user=context['user'],
             )
+            x, y = result.data
         except GraphFetcher.IncompatibleContentType as e:
             x = y = None
             kwargs['error'] = str(e)
@@ -163,9 +183,10 @@ class ReportGraphBrick(core_bricks.InstanceBrick):
         return self._auxiliary_display(context=context, x=x, y=y, **kwargs)
 
     def home_display(self, context):
-        x, y = self.fetcher.fetch(user=context['user'])
+        result = ReportGraphResult.objects.fetch(fetcher=self.fetcher, user=context['user'])
+        x, y = result.data
 
-        return self._auxiliary_display(context=context, x=x, y=y)
+        return self._auxiliary_display(context=context, x=x, y=y, graph_result=result)
 
     @property
     def target_ctypes(self):
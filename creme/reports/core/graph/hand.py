@@ -537,29 +537,41 @@ class RGHRelation(ReportGraphHand):
         self._rtype = rtype
 
     def _fetch(self, *, entities, order, user, extra_q):
-        # TODO: Optimize ! (populate real entities)
         # TODO: sort alphabetically (with header_filter_search_field ?
         #       Queryset is not paginated so we can sort the "list") ?
-        # TODO: make listview url for this case
+        rtype = self._rtype
         build_url = self._listview_url_builder(extra_q=extra_q)
-        relations = Relation.objects.filter(
-            type=self._rtype, subject_entity__entity_type=self._graph.linked_report.ct,
+
+        # NB: all the entities related to an entity of the model are used as
+        #     abscissa, even if their Y value is 0 (filter, credentials, extra_q...).
+        obj_ids = [
+            *Relation.objects
+                     .filter(type=rtype, subject_entity__entity_type=self._graph.linked_report.ct)
+                     .order_by('object_entity_id')
+                     .values_list('object_entity_id', flat=True)
+                     .distinct()
+        ]
+
+        # NB: order_by() removes the default ordering from the GROUP BY clause.
+        y_values = dict(
+            entities.filter(relations__type=rtype)
+                    .values('relations__object_entity')
+                    .order_by()
+                    .annotate(value=self._y_calculator.annotate())
+                    .values_list('relations__object_entity', 'value')
         )
-        rel_filter = relations.filter
-        ce_objects_get = CremeEntity.objects.get
-        entities_filter = entities.filter
-        y_value_func = self._y_calculator.aggregrate
 
-        for obj_id in relations.values_list('object_entity', flat=True).distinct():
-            subj_ids = rel_filter(
-                object_entity=obj_id,
-            ).order_by('subject_entity__id').values_list('subject_entity')
+        obj_entities = CremeEntity.objects.in_bulk(obj_ids)
+        CremeEntity.populate_real_entities([*obj_entities.values()])
 
+        for obj_id in obj_ids:
             yield (
-                str(ce_objects_get(pk=obj_id).get_real_entity()),
+                str(obj_entities[obj_id].get_real_entity()),
                 [
-                    y_value_func(entities_filter(pk__in=subj_ids)),
-                    build_url({'pk__in': [e[0] for e in subj_ids]}),
+                    y_values.get(obj_id) or 0,
+                    # NB: the URL does not contain the IDs of the subjects
+                    #     (it would be very long with a lot of entities).
+                    build_url({'relations__type': rtype.id, 'relations__object_entity': obj_id}),
                 ],
             )
 
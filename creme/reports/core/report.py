@@ -26,6 +26,7 @@ from typing import (
     Iterator,
     List,
     Optional,
+    Sequence,
     Tuple,
     Type,
     Union,
@@ -34,7 +35,12 @@ from typing import (
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
-from django.db.models import ForeignKey, ManyToManyField
+from django.db.models import (
+    ForeignKey,
+    ManyToManyField,
+    Prefetch,
+    prefetch_related_objects,
+)
 from django.utils.formats import number_format
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
@@ -159,13 +165,21 @@ class ReportHand:
         """Used as _get_value() method by subclasses which manage
         sub-reports (no sub-report case).
         """
-        qs = self._get_related_instances(entity, user)
         extract = self._related_model_value_extractor
+        instances = self._get_prefetched_instances(entity)
+
+        if instances is None:
+            qs = self._get_related_instances(entity, user)
 
-        if issubclass(qs.model, CremeEntity):
-            qs = EntityCredentials.filter(user, qs)
+            if issubclass(qs.model, CremeEntity):
+                qs = EntityCredentials.filter(user, qs)
 
-        return ', '.join(str(extract(instance)) for instance in qs)
+            instances = qs
+        elif instances and isinstance(instances[0], CremeEntity):
+            has_perm = user.has_perm_to_view
+            instances = [instance for instance in instances if has_perm(instance)]
+
+        return ', '.join(str(extract(instance)) for instance in instances)
 
     def _get_value_single(self,
                           entity: CremeEntity,
@@ -198,6 +212,13 @@ class ReportHand:
             for rfield in self._report_field.sub_report.columns
         ]
 
+    def _get_prefetched_instances(self, entity: CremeEntity) -> Optional[list]:
+        """Get the related instances of an entity retrieved by prefetch()
+        (used by _get_value_no_subreport()).
+        @return A list of instances, or None if they have not been retrieved.
+        """
+        return None
+
     def _related_model_value_extractor(self, instance: 'Model'):
         return instance
 
@@ -229,6 +250,16 @@ class ReportHand:
 
         return '' if value is None else value
 
+    def prefetch(self, entities: Sequence[CremeEntity], user) -> None:
+        """Retrieve with grouped queries the data needed by get_value() for
+        several entities (eg: a page of the report), in order to avoid some
+        queries per entity.
+        Overload this method in child classes ; the default implementation does nothing.
+        @param entities: Sequence of CremeEntities (the model of the report).
+        @param user: User instance ; used to compute credentials.
+        """
+        pass
+
     @property
     def hidden(self) -> bool:
         "Is the hand hidden ? (see FieldsConfig or deleted CustomFields)."
@@ -357,15 +388,21 @@ class RHForeignKey(RHRegularField):
         else:
             # Small optimization: only used by _get_value_no_subreport()
             if len(field_info) > 1:
+                sub_field = field_info[1]
                 self._value_extractor = field_printers_registry.build_field_printer(
                     model=field_info[0].remote_field.model,
-                    field_name=field_info[1].name,
+                    field_name=sub_field.name,
                     output='csv',
                 )
+
+                if isinstance(sub_field, ForeignKey):
+                    qs = qs.select_related(sub_field.name)
             else:
                 self._value_extractor = lambda fk_instance, user: str(fk_instance)
 
         self._qs = qs
+        # Instances retrieved by prefetch() ; key: FK ID ; value: instance or None.
+        self._fk_instances: Dict[int, Optional['Model']] = {}
         super().__init__(
             report_field,
             support_subreport=True,
@@ -375,8 +412,15 @@ class RHForeignKey(RHRegularField):
     # NB: cannot rename to _get_related_instances() because forbidden entities
     #     are filtered instead of outputting '??'
     def _get_fk_instance(self, entity: CremeEntity) -> Optional[CremeEntity]:
+        fk_id = getattr(entity, self._fk_attr_name)
+
         try:
-            rel_entity = self._qs.get(pk=getattr(entity, self._fk_attr_name))
+            return self._fk_instances[fk_id]
+        except KeyError:
+            pass
+
+        try:
+            rel_entity = self._qs.get(pk=fk_id)
         except ObjectDoesNotExist:
             rel_entity = None
 
@@ -400,6 +444,22 @@ class RHForeignKey(RHRegularField):
 
             return self._value_extractor(fk_instance, user)
 
+    def prefetch(self, entities, user):
+        attr_name = self._fk_attr_name
+        fk_ids = {getattr(entity, attr_name) for entity in entities}
+        fk_ids.discard(None)
+
+        # NB: the instances which are excluded by the filter of the sub-report are stored as None
+        instances = self._qs.in_bulk(fk_ids) if fk_ids else {}
+        self._fk_instances = {fk_id: instances.get(fk_id) for fk_id in fk_ids}
+
+        sub_report = self._report_field.sub_report
+        if sub_report and instances:
+            sub_entities = [*instances.values()]
+
+            for column in sub_report.columns:
+                column.prefetch(sub_entities, user)
+
     def get_linkable_ctypes(self):
         return (
             ContentType.objects.get_for_model(self._qs.model),
@@ -423,9 +483,23 @@ class RHManyToManyField(RHRegularField):
         else:
             self._related_model_value_extractor = str
 
+    @property
+    def _prefetch_attr_name(self) -> str:
+        return f'_report_m2m_{self._field_info[0].name}'
+
+    def _get_prefetched_instances(self, entity):
+        return getattr(entity, self._prefetch_attr_name, None)
+
     def _get_related_instances(self, entity, user):
         return getattr(entity, self._field_info[0].name).all()
 
+    def prefetch(self, entities, user):
+        if not self._report_field.sub_report:
+            prefetch_related_objects(
+                entities,
+                Prefetch(self._field_info[0].name, to_attr=self._prefetch_attr_name),
+            )
+
     def get_linkable_ctypes(self):
         m2m_model = self._field_info[0].remote_field.model
 
@@ -448,6 +522,9 @@ class RHCustomField(ReportHand):
 
         super().__init__(report_field, title=cf.name)
 
+    def prefetch(self, entities, user):
+        CremeEntity.populate_custom_values(entities, [self._cfield])
+
     def _get_value_single_on_allowed(self, entity, user, scope):
         cvalue = entity.get_custom_value(self._cfield)
         # TODO: use a EntityCellCustomField & remove __str__ methods of CustomFieldValue models ?
@@ -498,6 +575,11 @@ class RHRelation(ReportHand):
             if has_perm(e)
         )
 
+    def prefetch(self, entities, user):
+        if not self._report_field.sub_report:
+            # NB: the real object entities are retrieved too.
+            CremeEntity.populate_relations(entities, [self._rtype.id])
+
     def get_linkable_ctypes(self):
         return self._rtype.object_ctypes.all()
 
@@ -522,6 +604,9 @@ class RHFunctionField(ReportHand):
 
         super().__init__(report_field, title=str(funcfield.verbose_name))
 
+    def prefetch(self, entities, user):
+        self._funcfield.populate_entities(entities, user)
+
     def _get_value_single_on_allowed(self, entity, user, scope):
         return self._funcfield(entity, user).for_csv()
 
@@ -691,9 +776,27 @@ class RHRelated(ReportHand):
 
         return field
 
+    @property
+    def _prefetch_attr_name(self) -> str:
+        return f'_report_related_{self._attr_name}'
+
+    def _get_prefetched_instances(self, entity):
+        return getattr(entity, self._prefetch_attr_name, None)
+
     def _get_related_instances(self, entity, user):
         return getattr(entity, self._attr_name).filter(is_deleted=False)
 
+    def prefetch(self, entities, user):
+        if not self._report_field.sub_report:
+            prefetch_related_objects(
+                entities,
+                Prefetch(
+                    self._attr_name,
+                    queryset=self._related_field.related_model.objects.filter(is_deleted=False),
+                    to_attr=self._prefetch_attr_name,
+                ),
+            )
+
     def get_linkable_ctypes(self):
         return (
             ContentType.objects.get_for_model(self._related_field.related_model),
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2021  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+import logging
+from datetime import timedelta
+from os import path
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.utils.encoding import smart_str
+from django.utils.timezone import localtime, now
+from django.utils.translation import gettext as _
+from django.utils.translation import gettext_lazy
+
+from creme.creme_core.backends import export_backend_registry
+from creme.creme_core.creme_jobs.base import JobType
+from creme.creme_core.models import FileRef, JobResult
+from creme.creme_core.utils.date_range import date_range_registry
+from creme.creme_core.utils.file_handling import FileCreator
+from creme.creme_core.utils.secure_filename import secure_filename
+
+from .models import ReportGraphResult, ReportSchedule
+
+logger = logging.getLogger(__name__)
+
+
+class _GraphsResultsRefresherType(JobType):
+    """Refresh the stored results of the graphs which are expensive to compute
+    before they expire, & remove the other expired results.
+    Only the results which have been read during the last TTL are refreshed ;
+    the results which are not read anymore are removed.
+    See the settings "REPORTS_GRAPHS_RESULTS_TTL" & "REPORTS_GRAPHS_EXPENSIVE_DURATION".
+    """
+    id           = JobType.generate_id('reports', 'graphs_results_refresher')
+    verbose_name = gettext_lazy('Refresh the results of the graphs')
+    periodic     = JobType.PERIODIC
+
+    def _execute(self, job):
+        results = ReportGraphResult.objects.all()
+        ttl = settings.REPORTS_GRAPHS_RESULTS_TTL
+
+        if not ttl:
+            results.delete()
+            return
+
+        now_value = now()
+        limit = now_value - timedelta(minutes=ttl)
+        expensive_duration = settings.REPORTS_GRAPHS_EXPENSIVE_DURATION
+        results.filter(created__lt=limit, duration__lt=expensive_duration).delete()
+        results.filter(accessed__lt=limit).delete()
+
+        # NB: the results which would expire before the next run are refreshed now.
+        for result in results.filter(
+            created__lt=limit + job.periodicity.as_timedelta(),
+            duration__gte=expensive_duration,
+            accessed__gte=limit,
+        ).select_related('graph', 'user'):
+            try:
+                result.refresh()
+            except Exception as e:
+                logger.exception('Error when refreshing the result of graph (id=%s)', result.id)
+                JobResult.objects.create(
+                    job=job,
+                    messages=[
+                        _('The result of the graph «{}» cannot be refreshed.').format(
+                            result.graph,
+                        ),
+                        _('Original error: {}').format(e),
+                    ],
+                )
+                result.delete()
+
+    def get_description(self, job):
+        return [
+            _(
+                'Refresh the results of the graphs which take at least {duration} '
+                'second(s) to be computed, before they expire ({ttl} minute(s)).'
+            ).format(
+                duration=settings.REPORTS_GRAPHS_EXPENSIVE_DURATION,
+                ttl=settings.REPORTS_GRAPHS_RESULTS_TTL,
+            ),
+        ]
+
+
+class _ReportSchedulesType(JobType):
+    """Generate the files of the scheduled reports (see ReportSchedule).
+    The lines are written page by page, so the memory usage does not depend on
+    the size of the report. Only the last files of each schedule are kept ; the
+    older ones are marked as temporary, so the job "Temporary files cleaner"
+    removes them.
+    """
+    id           = JobType.generate_id('reports', 'schedules')
+    verbose_name = gettext_lazy('Generate the scheduled reports')
+    periodic     = JobType.PSEUDO_PERIODIC
+
+    relative_dir_path = 'upload/reports'
+
+    def _get_schedules(self, now_value):
+        return ReportSchedule.objects.filter(enabled=True).filter(
+            Q(last_run__isnull=True, first_run__lte=now_value)
+            | Q(last_run__isnull=False)
+        )
+
+    def _get_q(self, schedule, now_value):
+        date_field = schedule.date_field
+
+        if date_field:
+            date_range = date_range_registry.get_range(name=schedule.date_range)
+
+            if date_range is not None:
+                return Q(**date_range.get_q_dict(date_field, now_value))
+
+        return None
+
+    def _generate(self, schedule, now_value):
+        report = schedule.report
+        user = schedule.user
+
+        backend_cls = export_backend_registry.get_backend_class(schedule.doc_type)
+        if backend_cls is None:
+            raise ValueError(
+                _('The extension «{}» is not available.').format(schedule.doc_type)
+            )
+
+        basename = secure_filename('{}_{}.{}'.format(
+            smart_str(report.name),
+            localtime(now_value).strftime('%Y%m%d_%H%M'),
+            backend_cls.id,
+        ))
+        file_path = FileCreator(
+            dir_path=path.join(settings.MEDIA_ROOT, *self.relative_dir_path.split('/')),
+            name=basename,
+        ).create()
+
+        def rows():
+            yield [
+                smart_str(column.title) for column in report.get_children_fields_flat()
+            ]
+
+            for line in report.fetch_lines(
+                extra_q=self._get_q(schedule, now_value), user=user,
+            ):
+                yield [smart_str(value) for value in line]
+
+        backend_cls().write_file(file_path, rows())
+
+        return FileRef.objects.create(
+            user=user,
+            filedata=f'{self.relative_dir_path}/{path.basename(file_path)}',
+            basename=basename,
+            temporary=False,
+        )
+
+    def _rotate_files(self, schedule):
+        old_ids = [
+            *schedule.files.order_by('-id').values_list('id', flat=True)[schedule.kept_files:],
+        ]
+
+        if old_ids:
+            schedule.files.remove(*old_ids)
+            FileRef.objects.filter(id__in=old_ids).update(temporary=True)
+
+    def _notify(self, job, schedule, file_ref):
+        email = schedule.user.email
+        if not email:
+            return
+
+        message = EmailMessage(
+            _('The report «{}» has been generated').format(schedule.report),
+            _('The file of the report «{report}» is available here:\n{url}').format(
+                report=schedule.report,
+                url=settings.SITE_DOMAIN + file_ref.get_download_absolute_url(),
+            ),
+            settings.EMAIL_SENDER,
+            [email],
+        )
+
+        try:
+            with get_connection() as connection:
+                connection.send_messages([message])
+        except Exception as e:
+            logger.critical('Error while sending the e-mail of a scheduled report (%s)', e)
+            JobResult.objects.create(
+                job=job,
+                messages=[
+                    _('An error occurred while sending the e-mail related to «{}»').format(
+                        schedule.report,
+                    ),
+                    _('Original error: {}').format(e),
+                ],
+            )
+
+    def _execute(self, job):
+        for schedule in self._get_schedules(now()).select_related('report', 'user'):
+            next_run = schedule.next_run
+            now_value = now()
+
+            if next_run > now_value:
+                continue
+
+            try:
+                file_ref = self._generate(schedule, now_value)
+            except Exception as e:
+                logger.exception('Error when generating the scheduled report (id=%s)', schedule.id)
+                JobResult.objects.create(
+                    job=job,
+                    messages=[
+                        _('The report «{}» cannot be generated.').format(schedule.report),
+                        _('Original error: {}').format(e),
+                    ],
+                )
+            else:
+                schedule.files.add(file_ref)
+                self._rotate_files(schedule)
+                self._notify(job, schedule, file_ref)
+
+            # NB: the missed runs (eg: the job manager was stopped) are skipped.
+            period = schedule.periodicity.as_timedelta()
+            while next_run + period <= now_value:
+                next_run += period
+
+            schedule.last_run = next_run
+            schedule.save()
+
+    def get_description(self, job):
+        return [
+            _('Generate the files of the reports which have been scheduled.'),
+        ]
+
+    # We have to implement it because it is a PSEUDO_PERIODIC JobType
+    def next_wakeup(self, job, now_value):
+        wakeup = None
+
+        for schedule in self._get_schedules(now_value):
+            next_run = schedule.next_run
+
+            if next_run <= now_value:
+                return now_value
+
+            wakeup = next_run if wakeup is None else min(wakeup, next_run)
+
+        return wakeup
+
+
+graphs_results_refresher_type = _GraphsResultsRefresherType()
+report_schedules_type = _ReportSchedulesType()
+jobs = (graphs_results_refresher_type, report_schedules_type)
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2021  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+from django.utils.translation import pgettext_lazy
+
+from creme.creme_core.backends import export_backend_registry
+from creme.creme_core.forms import CremeModelForm
+from creme.creme_core.utils.date_range import date_range_registry
+from creme.creme_core.utils.meta import is_date_field
+
+from ..models import ReportSchedule
+
+
+class ReportScheduleForm(CremeModelForm):
+    doc_type = forms.ChoiceField(label=_('Extension'), choices=())
+    date_field = forms.ChoiceField(label=_('Date field'), required=False, choices=())
+    date_range = forms.ChoiceField(label=_('Date filter'), required=False, choices=())
+
+    error_messages = {
+        'no_date_range': _('If you chose a Date field, you have to select a date filter.'),
+    }
+
+    class Meta(CremeModelForm.Meta):
+        model = ReportSchedule
+
+    def __init__(self, entity, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.instance.report = entity
+        fields = self.fields
+
+        # NB: the report is generated with the credentials of this user, & the
+        #     files belong to this user ; so a regular user cannot choose another one.
+        user = self.user
+        if not user.is_superuser:
+            user_f = fields['user']
+            user_f.queryset = user_f.queryset.filter(id=user.id)
+            user_f.initial = user.id
+
+        fields['doc_type'].choices = [
+            (backend.id, backend.verbose_name)
+            for backend in export_backend_registry.backend_classes
+        ]
+        fields['date_field'].choices = [
+            ('', pgettext_lazy('reports-date_filter', 'None')),
+            *(
+                (field.name, field.verbose_name)
+                for field in entity.ct.model_class()._meta.fields
+                if is_date_field(field)
+            ),
+        ]
+        fields['date_range'].choices = [
+            ('', '---------'),
+            *((name, str(drange)) for name, drange in date_range_registry.choices()),
+        ]
+
+    def clean(self):
+        cleaned_data = super().clean()
+
+        if cleaned_data.get('date_field') and not cleaned_data.get('date_range'):
+            raise ValidationError(
+                self.error_messages['no_date_range'], code='no_date_range',
+            )
+
+        return cleaned_data
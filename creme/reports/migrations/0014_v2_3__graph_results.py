@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.deletion import CASCADE
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        migrations.swappable_dependency(settings.REPORTS_GRAPH_MODEL),
+        ('creme_core', '0001_initial'),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportGraphResult',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fetcher_type', models.CharField(editable=False, max_length=100)),
+                ('fetcher_value', models.CharField(default='', editable=False, max_length=100)),
+                ('order', models.CharField(editable=False, max_length=4)),
+                ('language', models.CharField(editable=False, max_length=10)),
+                ('created', models.DateTimeField(editable=False)),
+                ('duration', models.FloatField(default=0.0, editable=False)),
+                ('json_data', models.TextField(editable=False)),
+                (
+                    'entity',
+                    models.ForeignKey(
+                        editable=False, null=True, on_delete=CASCADE,
+                        related_name='+', to='creme_core.cremeentity',
+                    )
+                ),
+                (
+                    'graph',
+                    models.ForeignKey(
+                        editable=False, on_delete=CASCADE, to=settings.REPORTS_GRAPH_MODEL,
+                    )
+                ),
+                (
+                    'user',
+                    models.ForeignKey(
+                        editable=False, null=True, on_delete=CASCADE, to=settings.AUTH_USER_MODEL,
+                    )
+                ),
+            ],
+        ),
+    ]
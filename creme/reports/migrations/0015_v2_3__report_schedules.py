@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.deletion import CASCADE
+
+from creme.creme_core.models import fields as creme_fields
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        migrations.swappable_dependency(settings.REPORTS_REPORT_MODEL),
+        ('creme_core', '0001_initial'),
+        ('reports', '0014_v2_3__graph_results'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportSchedule',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('doc_type', models.CharField(max_length=100, verbose_name='Extension')),
+                ('date_field', models.CharField(blank=True, max_length=100, verbose_name='Date field')),
+                ('date_range', models.CharField(blank=True, max_length=100, verbose_name='Date filter')),
+                ('first_run', models.DateTimeField(verbose_name='Date of the first generation')),
+                (
+                    'last_run',
+                    models.DateTimeField(
+                        editable=False, null=True, verbose_name='Date of the last generation',
+                    )
+                ),
+                (
+                    'periodicity',
+                    creme_fields.DatePeriodField(verbose_name='Periodicity of the generation')
+                ),
+                (
+                    'kept_files',
+                    models.PositiveIntegerField(default=5, verbose_name='Number of kept files')
+                ),
+                ('enabled', models.BooleanField(default=True, verbose_name='Enabled')),
+                (
+                    'files',
+                    models.ManyToManyField(
+                        editable=False, related_name='_reportschedule_files_+',
+                        to='creme_core.FileRef',
+                    )
+                ),
+                (
+                    'report',
+                    models.ForeignKey(
+                        editable=False, on_delete=CASCADE, related_name='schedules',
+                        to=settings.REPORTS_REPORT_MODEL,
+                    )
+                ),
+                (
+                    'user',
+                    creme_fields.CremeUserForeignKey(
+                        to=settings.AUTH_USER_MODEL, verbose_name='Owner user',
+                    )
+                ),
+            ],
+            options={
+                'verbose_name': 'Scheduled generation',
+                'verbose_name_plural': 'Scheduled generations',
+                'ordering': ('id',),
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations, models
+from django.utils.timezone import now
+
+
+def delete_results(apps, schema_editor):
+    # NB: the results are only a cache ; they are computed again when needed.
+    apps.get_model('reports', 'ReportGraphResult').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('reports', '0015_v2_3__report_schedules'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_results),
+        migrations.AddField(
+            model_name='reportgraphresult',
+            name='key',
+            field=models.CharField(default='', editable=False, max_length=40, unique=True),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='reportgraphresult',
+            name='accessed',
+            field=models.DateTimeField(default=now, editable=False),
+            preserve_default=False,
+        ),
+    ]
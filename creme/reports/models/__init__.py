@@ -2,8 +2,9 @@
 
 from django.conf import settings
 
-from .graph import AbstractReportGraph, ReportGraph  # NOQA
+from .graph import AbstractReportGraph, ReportGraph, ReportGraphResult  # NOQA
 from .report import AbstractReport, Field, Report  # NOQA
+from .schedule import ReportSchedule  # NOQA
 
 if settings.TESTS_ON:
     from creme.reports.tests.fake_models import *  # NOQA
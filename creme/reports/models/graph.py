@@ -18,22 +18,33 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+import json
 import logging
 # import warnings
+from datetime import timedelta
+from hashlib import sha1
+from time import perf_counter
 from typing import TYPE_CHECKING, List, Optional, Tuple, Type
 
 from django.conf import settings
-from django.db import models
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, models
+from django.db.transaction import atomic
 from django.urls import reverse
+from django.utils.timezone import now
 # from django.utils.translation import gettext
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
+from django.utils.translation import override as override_language
 from django.utils.translation import pgettext_lazy
 
 from creme.creme_core.auth.entity_credentials import EntityCredentials
 from creme.creme_core.models import (  # RelationType
     CremeEntity,
+    CremeModel,
     InstanceBrickConfigItem,
 )
+from creme.creme_core.utils.serializers import json_encode
 
 # from ..constants import AGGREGATOR_TYPES, GROUP_TYPES
 from .. import constants
@@ -43,6 +54,7 @@ from ..core.graph import (
     abscissa_constraints,
     ordinate_constraints,
 )
+from ..core.graph.fetcher import GraphFetcher
 from ..graph_fetcher_registry import graph_fetcher_registry
 
 if TYPE_CHECKING:
@@ -303,3 +315,198 @@ class AbstractReportGraph(CremeEntity):
 class ReportGraph(AbstractReportGraph):
     class Meta(AbstractReportGraph.Meta):
         swappable = 'REPORTS_GRAPH_MODEL'
+
+
+class ReportGraphResultManager(models.Manager):
+    def fetch(self, *,
+              fetcher: GraphFetcher,
+              user,
+              order: str = 'ASC',
+              entity: Optional[CremeEntity] = None,
+              ) -> 'ReportGraphResult':
+        """Get the result of a graph (through a fetcher) ; the stored result is
+        used if it is still valid, otherwise the result is computed (& stored).
+        See the setting "REPORTS_GRAPHS_RESULTS_TTL".
+
+        @param fetcher: Instance of GraphFetcher.
+        @param user: Logged user.
+        @param order: 'ASC' or 'DESC'.
+        @param entity: If an entity is given, the data are narrowed to this
+               entity (see GraphFetcher.fetch_4_entity()).
+        @return An instance of ReportGraphResult (not saved if the results are not stored).
+        @raise GraphFetcher.IncompatibleContentType, GraphFetcher.UselessResult
+               (see GraphFetcher.fetch_4_entity()).
+        """
+        graph = fetcher.graph
+        result = self.model(
+            graph=graph,
+            fetcher_type=fetcher.type_id,
+            fetcher_value=fetcher.value or '',
+            entity=entity,
+            # NB: the superusers can see all the entities, so they share their results.
+            user=None if user.is_superuser else user,
+            order=order,
+            language=get_language(),
+        )
+
+        if settings.REPORTS_GRAPHS_RESULTS_TTL:
+            result.key = key = result.build_key()
+            now_value = now()
+            stored = self.filter(key=key).first()
+
+            if stored is not None:
+                stored.graph = graph
+
+                if not stored.expired:
+                    # NB: the results which are not read anymore are not
+                    #     refreshed by the job (see "accessed").
+                    self.filter(id=stored.id).update(accessed=now_value)
+                    stored.accessed = now_value
+
+                    return stored
+
+                result = stored
+
+            result.compute(fetcher=fetcher, user=user)
+            result.accessed = now_value
+
+            if result.pk is None:
+                try:
+                    with atomic():
+                        result.save()
+                except IntegrityError:
+                    # The result has been created by another request in the meantime
+                    self.filter(key=key).update(
+                        created=result.created,
+                        accessed=now_value,
+                        duration=result.duration,
+                        json_data=result.json_data,
+                    )
+                    result = self.get(key=key)
+                    result.graph = graph
+            else:
+                result.save()
+        else:
+            result.compute(fetcher=fetcher, user=user)
+
+        return result
+
+
+class ReportGraphResult(CremeModel):
+    """Result of a ReportGraph (computed by a GraphFetcher), stored to avoid
+    the computing of the aggregates at each display.
+    The results are stored per credentials' scope (ie: per user, except for
+    superusers who share their results), order & language.
+    """
+    graph = models.ForeignKey(
+        settings.REPORTS_GRAPH_MODEL, on_delete=models.CASCADE, editable=False,
+    )
+    fetcher_type = models.CharField(max_length=100, editable=False)
+    fetcher_value = models.CharField(max_length=100, editable=False, default='')
+    entity = models.ForeignKey(
+        CremeEntity, on_delete=models.CASCADE, editable=False, null=True, related_name='+',
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, editable=False, null=True,
+    )
+    order = models.CharField(max_length=4, editable=False)
+    language = models.CharField(max_length=10, editable=False)
+    # Hash of the previous fields (see build_key()) ; the UNIQUE constraint
+    # avoids duplicates when the result is computed by concurrent requests
+    # (the fields "entity" & "user" are nullable, so they cannot be used in a
+    # UNIQUE constraint).
+    key = models.CharField(max_length=40, editable=False, unique=True)
+
+    created = models.DateTimeField(editable=False)
+    # Last time the result has been read (the job only refreshes the results
+    # which are still read).
+    accessed = models.DateTimeField(editable=False)
+    # Duration of the computing (in seconds)
+    duration = models.FloatField(editable=False, default=0.0)
+    json_data = models.TextField(editable=False)  # TODO: JSONField ?
+
+    objects = ReportGraphResultManager()
+
+    class Meta:
+        app_label = 'reports'
+
+    def __str__(self):
+        return f'ReportGraphResult(graph={self.graph_id}, created={self.created})'
+
+    def build_key(self) -> str:
+        "Key identifying the scope of the result (graph, fetcher, entity, user...)."
+        return sha1(
+            '#'.join(
+                str(value) for value in (
+                    self.graph_id,
+                    self.fetcher_type,
+                    self.fetcher_value,
+                    self.entity_id or '',
+                    self.user_id or '',
+                    self.order,
+                    self.language,
+                )
+            ).encode()
+        ).hexdigest()
+
+    @property
+    def data(self) -> Tuple[list, list]:
+        "Tuple (X, Y) ; see ReportGraphHand.fetch()."
+        x, y = json.loads(self.json_data)
+
+        return x, y
+
+    @property
+    def expired(self) -> bool:
+        "Has the result to be computed again? (TTL exceeded, graph modified...)."
+        created = self.created
+
+        return (
+            created is None
+            or created < now() - timedelta(minutes=settings.REPORTS_GRAPHS_RESULTS_TTL)
+            or created < self.graph.modified
+        )
+
+    @property
+    def expensive(self) -> bool:
+        "Is the result refreshed in background? (see setting REPORTS_GRAPHS_EXPENSIVE_DURATION)."
+        return self.duration >= settings.REPORTS_GRAPHS_EXPENSIVE_DURATION
+
+    def compute(self, *, fetcher: GraphFetcher, user) -> None:
+        "Compute the data (the instance is not saved)."
+        entity = self.entity
+        start = perf_counter()
+
+        if entity is None:
+            x, y = fetcher.fetch(user=user, order=self.order)
+        else:
+            x, y = fetcher.fetch_4_entity(entity=entity, user=user, order=self.order)
+
+        self.duration = perf_counter() - start
+        self.created = now()
+        self.json_data = json_encode([x, y])
+
+    def refresh(self) -> None:
+        """Compute the data again & save them (used by the job which refreshes
+        the expensive results in background).
+        """
+        graph = self.graph.get_real_entity()
+        fetcher = graph.fetcher_registry.get(
+            graph=graph,
+            fetcher_dict={
+                GraphFetcher.DICT_KEY_TYPE:  self.fetcher_type,
+                GraphFetcher.DICT_KEY_VALUE: self.fetcher_value,
+            },
+        )
+
+        entity = self.entity
+        if entity is not None:
+            self.entity = entity.get_real_entity()
+
+        with override_language(self.language):
+            self.compute(
+                fetcher=fetcher,
+                user=self.user or get_user_model()(is_superuser=True),
+            )
+
+        self.save()
@@ -26,6 +26,7 @@ from typing import (  # Tuple
     Iterator,
     List,
     Optional,
+    Sequence,
     Set,
     Type,
     Union,
@@ -40,6 +41,7 @@ from django.utils.translation import gettext_lazy as _
 
 from creme.creme_core.auth.entity_credentials import EntityCredentials
 from creme.creme_core.core.entity_filter import EF_USER
+from creme.creme_core.core.paginator import FlowPaginator
 from creme.creme_core.models import (
     CremeEntity,
     CremeModel,
@@ -66,6 +68,9 @@ class AbstractReport(CremeEntity):
     creation_label = _('Create a report')
     save_label     = _('Save the report')
 
+    # Number of entities retrieved by query when the lines are fetched
+    fetch_page_size = 256
+
     _columns: Optional[List['Field']] = None
 
     class Meta:
@@ -154,9 +159,10 @@ class AbstractReport(CremeEntity):
                extra_q: Optional[models.Q] = None,
                user=None) -> Iterator[list]:
         user = user or get_user_model()(is_superuser=True)
+        model = self.ct.model_class()
         entities = EntityCredentials.filter(
             user,
-            self.ct.model_class().objects.filter(is_deleted=False),
+            model.objects.filter(is_deleted=False),
         )
 
         if self.filter is not None:
@@ -165,22 +171,58 @@ class AbstractReport(CremeEntity):
         if extra_q is not None:
             entities = entities.filter(extra_q)
 
+        fields = self.filtered_columns
+
         if limit_to:
             entities = entities[:limit_to]
+            pages = [entities]
+        else:
+            # NB: the entities are retrieved page by page (with a KEYSET
+            #     pagination) in order to keep a bounded memory usage.
+            # NB: we order by ID too, in order to get consistent pages
+            #     (see creme_core.core.sorter.QuerySorter).
+            ordering = [*model._meta.ordering, model._meta.pk.attname]
+            pages = (
+                page.object_list
+                for page in FlowPaginator(
+                    queryset=entities.order_by(*ordering),
+                    key=ordering[0],
+                    per_page=self.fetch_page_size,
+                ).pages()
+            )
+
+        for page_entities in pages:
+            page_entities = [*page_entities]
+
+            # NB: the columns retrieve their data for the whole page with grouped
+            #     queries (instead of some queries per entity).
+            for field in fields:
+                field.prefetch(page_entities, user=user)
+
+            for entity in page_entities:
+                yield [
+                    # NB: the scope is the whole queryset (used by aggregates)
+                    field.get_value(entity, scope=entities, user=user)
+                    for field in fields
+                ]
+
+    def fetch_lines(self,
+                    extra_q: Optional[models.Q] = None,
+                    user=None) -> Iterator[List[str]]:
+        """Generate the lines of the report (the sub-reports are expanded).
+        The entities are retrieved page by page, so the memory usage does not
+        depend on the size of the report.
+        """
+        from ..core.report import ExpandableLine  # Lazy loading
 
-        fields = self.filtered_columns
-
-        for entity in entities:
-            yield [
-                field.get_value(entity, scope=entities, user=user)
-                for field in fields
-            ]
+        for values in self._fetch(extra_q=extra_q, user=user):
+            yield from ExpandableLine(values).get_lines()
 
-    # TODO: transform into generator (--> StreamResponse)
     def fetch_all_lines(self,
                         limit_to: Optional[int] = None,
                         extra_q: Optional[models.Q] = None,
                         user=None) -> List[List[str]]:
+        "Get the lines of the report as a list ; see fetch_lines() too."
         from ..core.report import ExpandableLine  # Lazy loading
 
         lines = []
@@ -329,6 +371,16 @@ class Field(CremeModel):
 
         return children
 
+    def prefetch(self, entities: Sequence[CremeEntity], user) -> None:
+        """Retrieve with grouped queries the data needed by get_value() for
+        several entities.
+        @param entities: Sequence of CremeEntities.
+        @param user: User instance, used to check credentials.
+        """
+        hand = self.hand
+        if hand:
+            hand.prefetch(entities, user)
+
     def get_value(self,
                   entity: Optional[CremeEntity],
                   user,
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2021  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.db import models
+from django.urls import reverse
+from django.utils.translation import gettext_lazy as _
+from django.utils.translation import pgettext_lazy
+
+from creme.creme_core.models import CremeModel, FileRef
+from creme.creme_core.models.fields import CremeUserForeignKey, DatePeriodField
+
+
+class ReportSchedule(CremeModel):
+    """Generation of a Report into files, periodically & in background
+    (see the job 'Scheduled reports').
+    """
+    report = models.ForeignKey(
+        settings.REPORTS_REPORT_MODEL, related_name='schedules',
+        editable=False, on_delete=models.CASCADE,
+    )
+    # NB: the credentials of this user are used to generate the files,
+    #     & he is notified by e-mail.
+    user = CremeUserForeignKey(verbose_name=_('Owner user'))
+
+    doc_type = models.CharField(_('Extension'), max_length=100)
+    date_field = models.CharField(_('Date field'), max_length=100, blank=True)
+    date_range = models.CharField(_('Date filter'), max_length=100, blank=True)
+
+    first_run = models.DateTimeField(_('Date of the first generation'))
+    last_run = models.DateTimeField(
+        _('Date of the last generation'), null=True, editable=False,
+    )
+    periodicity = DatePeriodField(_('Periodicity of the generation'))
+    kept_files = models.PositiveIntegerField(_('Number of kept files'), default=5)
+    enabled = models.BooleanField(pgettext_lazy('reports-schedule', 'Enabled'), default=True)
+
+    # The generated files (only the last ones are kept ; see "kept_files").
+    files = models.ManyToManyField(FileRef, editable=False, related_name='+')
+
+    creation_label = _('Create a schedule')
+    save_label     = _('Save the schedule')
+
+    class Meta:
+        app_label = 'reports'
+        verbose_name = _('Scheduled generation')
+        verbose_name_plural = _('Scheduled generations')
+        ordering = ('id',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__init_refreshing_cache()
+
+    def __init_refreshing_cache(self):
+        self._old_first_run = self.first_run
+        self._old_periodicity = self.periodicity
+        self._old_enabled = self.enabled
+
+    def __str__(self):
+        return str(self.report)
+
+    def get_edit_absolute_url(self):
+        return reverse('reports__edit_schedule', args=(self.id,))
+
+    def get_related_entity(self):  # For generic views
+        return self.report
+
+    @property
+    def next_run(self) -> Optional[datetime]:
+        "Date of the next generation (None if the schedule is disabled)."
+        if not self.enabled:
+            return None
+
+        last = self.last_run
+
+        return self.first_run if last is None else last + self.periodicity.as_timedelta()
+
+    def save(self, *args, **kwargs):
+        from ..creme_jobs import report_schedules_type
+
+        created = bool(not self.pk)
+        super().save(*args, **kwargs)
+
+        if (
+            created
+            or self._old_first_run != self.first_run
+            or self._old_periodicity != self.periodicity
+            or self._old_enabled != self.enabled
+        ):
+            report_schedules_type.refresh_job()
+            self.__init_refreshing_cache()
@@ -2,7 +2,7 @@
 
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2009-2020  Hybird
+#    Copyright (C) 2009-2021  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -21,6 +21,7 @@
 import logging
 
 from django.apps import apps
+from django.conf import settings
 from django.utils.translation import gettext as _
 
 from creme.creme_core import bricks as core_bricks
@@ -31,10 +32,12 @@ from creme.creme_core.models import (
     BrickDetailviewLocation,
     CustomFormConfigItem,
     HeaderFilter,
+    Job,
     SearchConfigItem,
 )
+from creme.creme_core.utils.date_period import date_period_registry
 
-from . import bricks, constants, custom_forms, get_report_model
+from . import bricks, constants, creme_jobs, custom_forms, get_report_model
 from .forms.report import FilteredCTypeSubCell, FilterSubCell
 
 logger = logging.getLogger(__name__)
@@ -130,6 +133,23 @@ class Populator(BasePopulator):
         # ---------------------------
         SearchConfigItem.objects.create_if_needed(Report, ['name'])
 
+        # ---------------------------
+        Job.objects.get_or_create(
+            type_id=creme_jobs.graphs_results_refresher_type.id,
+            defaults={
+                'language':    settings.LANGUAGE_CODE,
+                'periodicity': date_period_registry.get_period('minutes', 15),
+                'status':      Job.STATUS_OK,
+            },
+        )
+        Job.objects.get_or_create(
+            type_id=creme_jobs.report_schedules_type.id,
+            defaults={
+                'language': settings.LANGUAGE_CODE,
+                'status':   Job.STATUS_OK,
+            },
+        )
+
         # ---------------------------
         # NB: no straightforward way to test that this populate script has not been already run
         if not BrickDetailviewLocation.objects.filter_for_model(Report).exists():
@@ -142,6 +162,7 @@ class Populator(BasePopulator):
                     {'brick': core_bricks.CustomFieldsBrick, 'order':  40},
                     {'brick': bricks.ReportFieldsBrick,      'order':  50},
                     {'brick': bricks.ReportGraphsBrick,      'order':  60},
+                    {'brick': bricks.ReportSchedulesBrick,   'order':  70},
                     {'brick': core_bricks.PropertiesBrick,   'order': 450},
                     {'brick': core_bricks.RelationsBrick,    'order': 500},
 
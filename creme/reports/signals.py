@@ -2,7 +2,7 @@
 
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2015-2020  Hybird
+#    Copyright (C) 2015-2021  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -18,10 +18,22 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+from django.db.models import signals
 from django.dispatch import receiver
 
+from creme.creme_core.models import FileRef
 from creme.creme_core.signals import pre_uninstall_flush
 
+from .models import ReportSchedule
+
+
+@receiver(signals.pre_delete, sender=ReportSchedule)
+def _release_schedule_files(sender, instance, **kwargs):
+    # NB: the generated files are removed by the job "Temporary files cleaner".
+    FileRef.objects.filter(
+        id__in=[*instance.files.values_list('id', flat=True)],
+    ).update(temporary=True)
+
 
 @receiver(pre_uninstall_flush)
 def _uninstall_reports(sender, content_types, verbosity, stdout_write, style, **kwargs):
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+from datetime import timedelta
 from decimal import Decimal
 from functools import partial
 from json import loads as json_load
@@ -7,9 +8,13 @@ from urllib.parse import parse_qs, urlparse
 
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, connection
 from django.db.models import ProtectedError
 from django.db.models.query_utils import Q
+from django.db.transaction import atomic
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
+from django.utils.timezone import now
 from django.utils.translation import gettext as _
 from django.utils.translation import pgettext
 from parameterized import parameterized
@@ -35,6 +40,8 @@ from creme.creme_core.models import (
     FakeSector,
     FieldsConfig,
     InstanceBrickConfigItem,
+    Job,
+    JobResult,
     Relation,
     RelationType,
     SetCredentials,
@@ -71,6 +78,8 @@ from ..core.graph.fetcher import (
     RegularFieldLinkedGraphFetcher,
     SimpleGraphFetcher,
 )
+from ..creme_jobs import graphs_results_refresher_type
+from ..models import ReportGraphResult
 from .base import (
     AxisFieldsMixin,
     BaseReportsTestCase,
@@ -2249,11 +2258,12 @@ class ReportGraphTestCase(BrickTestCaseMixin,
         create_rel(subject_entity=starks,     object_entity=aria)
         create_rel(subject_entity=starks,     object_entity=jon)
 
+        rtype_id = fake_constants.FAKE_REL_SUB_EMPLOYED_BY
         report = self._create_simple_contacts_report(efilter=efilter)
         rgraph = ReportGraph.objects.create(
             user=user, linked_report=report,
             name='Number of employees',
-            abscissa_cell_value=fake_constants.FAKE_REL_SUB_EMPLOYED_BY,
+            abscissa_cell_value=rtype_id,
             # abscissa_type=RGT_RELATION,
             abscissa_type=ReportGraph.Group.RELATION,
             # ordinate_type=RGA_COUNT,
@@ -2275,11 +2285,15 @@ class ReportGraphTestCase(BrickTestCaseMixin,
 
         fmt = '/tests/contacts?q_filter={}&filter=test-filter'.format
         self.assertListEqual(
-            [1, fmt(self._serialize_qfilter(pk__in=[tyrion.id]))],
+            [1, fmt(self._serialize_qfilter(
+                relations__type=rtype_id, relations__object_entity=lannisters.id,
+            ))],
             y_asc[lannisters_idx],
         )
         self.assertListEqual(
-            [2, fmt(self._serialize_qfilter(pk__in=[ned.id, aria.id, jon.id]))],
+            [2, fmt(self._serialize_qfilter(
+                relations__type=rtype_id, relations__object_entity=starks.id,
+            ))],
             y_asc[starks_idx],
         )  # Not 3, because of the filter
 
@@ -2297,9 +2311,10 @@ class ReportGraphTestCase(BrickTestCaseMixin,
         self.assertURL(
             url=xtra_url,
             model=FakeContact,
-            expected_q=extra_q & Q(pk__in=[ned.id, aria.id, jon.id]),
+            expected_q=extra_q & Q(relations__type=rtype_id, relations__object_entity=starks.id),
             expected_efilter_id=efilter.id,
         )
+        self.assertEqual(0, y_xtra[x_xtra.index(str(lannisters))][0])
 
     def test_fetch_by_relation02(self):
         "Aggregate."
@@ -2347,11 +2362,15 @@ class ReportGraphTestCase(BrickTestCaseMixin,
 
         fmt = '/tests/organisations?q_filter={}'.format
         self.assertListEqual(
-            [100, fmt(self._serialize_qfilter(pk__in=[lannisters.pk]))],
+            [100, fmt(self._serialize_qfilter(
+                relations__type=rtype.id, relations__object_entity=tywin.id,
+            ))],
             y_asc[tywin_index],
         )
         self.assertListEqual(
-            [90,  fmt(self._serialize_qfilter(pk__in=[starks.id, tullies.id]))],
+            [90,  fmt(self._serialize_qfilter(
+                relations__type=rtype.id, relations__object_entity=ned.id,
+            ))],
             y_asc[ned_index],
         )
 
@@ -2415,14 +2434,58 @@ class ReportGraphTestCase(BrickTestCaseMixin,
         index = x_asc.index
         fmt = '/tests/contacts?q_filter={}'.format
         self.assertListEqual(
-            [600, fmt(self._serialize_qfilter(pk__in=[jaime.id, tyrion.id]))],
+            [600, fmt(self._serialize_qfilter(
+                relations__type=rtype_id, relations__object_entity=lannisters.id,
+            ))],
             y_asc[index(str(lannisters))],
         )
         self.assertListEqual(
-            [800, fmt(self._serialize_qfilter(pk__in=[ned.id, robb.id]))],
+            [800, fmt(self._serialize_qfilter(
+                relations__type=rtype_id, relations__object_entity=starks.id,
+            ))],
             y_asc[index(str(starks))],
         )
 
+    def test_fetch_by_relation_queries(self):
+        "The number of queries does not depend on the number of related entities."
+        user = self.login()
+
+        report = self._create_simple_contacts_report()
+        rtype_id = fake_constants.FAKE_REL_SUB_EMPLOYED_BY
+        rgraph = ReportGraph.objects.create(
+            user=user, linked_report=report,
+            name='Number of employees',
+            abscissa_cell_value=rtype_id,
+            abscissa_type=ReportGraph.Group.RELATION,
+            ordinate_type=ReportGraph.Aggregator.COUNT,
+        )
+
+        def create_employees(count):
+            for i in range(count):
+                orga = FakeOrganisation.objects.create(user=user, name=f'House #{i}')
+                Relation.objects.create(
+                    user=user, type_id=rtype_id, object_entity=orga,
+                    subject_entity=FakeContact.objects.create(
+                        user=user, first_name='Bob', last_name=f'#{i}',
+                    ),
+                )
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as context:
+                x, y = self.refresh(rgraph).fetch(user=user)
+
+            return len(x), len(context)
+
+        create_employees(2)
+        count_queries()  # Fill the caches (ContentTypes etc...)
+        x_count1, queries_count1 = count_queries()
+
+        create_employees(5)
+        x_count2, queries_count2 = count_queries()
+        self.assertEqual(2, x_count1)
+        self.assertEqual(7, x_count2)
+        self.assertEqual(queries_count1, queries_count2)
+
     def test_fetch_by_relation04(self):
         "Invalid RelationType."
         user = self.login()
@@ -2867,8 +2930,13 @@ class ReportGraphTestCase(BrickTestCaseMixin,
         BrickHomeLocation.objects.all().delete()
         BrickHomeLocation.objects.create(brick_id=brick_id, order=1)
         response = self.assertGET200('/')
+        brick_node = self.get_brick_node(self.get_html_tree(response.content), brick_id)
+        self.assertIn('brick-deferred', brick_node.attrib.get('class'))
+
+        response = self.assertGET200(
+            reverse('creme_core__reload_home_bricks'), data={'brick_id': brick_id},
+        )
         self.assertTemplateUsed(response, 'reports/bricks/graph.html')
-        self.get_brick_node(self.get_html_tree(response.content), brick_id)
 
         # ----------------------------------------------------------------------
         # Display on detailview
@@ -2889,9 +2957,14 @@ class ReportGraphTestCase(BrickTestCaseMixin,
         self._create_invoice(orga1, orga3, issuing_date='2014-11-03')
 
         response = self.assertGET200(invoice.get_absolute_url())
-        self.assertTemplateUsed(response, 'reports/bricks/graph.html')
         self.get_brick_node(self.get_html_tree(response.content), brick_id)
 
+        response = self.assertGET200(
+            reverse('creme_core__reload_detailview_bricks', args=(invoice.id,)),
+            data={'brick_id': brick_id},
+        )
+        self.assertTemplateUsed(response, 'reports/bricks/graph.html')
+
         # ----------------------------------------------------------------------
         response = self.assertGET200(self._build_fetchfrombrick_url(item, invoice, 'ASC'))
 
@@ -2988,7 +3061,11 @@ class ReportGraphTestCase(BrickTestCaseMixin,
             zone=BrickDetailviewLocation.RIGHT, model=FakeReportsFolder,
         )
 
-        response = self.assertGET200(folder1.get_absolute_url())
+        self.assertGET200(folder1.get_absolute_url())
+        response = self.assertGET200(
+            reverse('creme_core__reload_detailview_bricks', args=(folder1.id,)),
+            data={'brick_id': item.brick_id},
+        )
         self.assertTemplateUsed(response, 'reports/bricks/graph.html')
 
         # fetcher = ReportGraph.get_fetcher_from_instance_brick(item)
@@ -3567,3 +3644,183 @@ class ReportGraphTestCase(BrickTestCaseMixin,
         result = response.json()
         self.assertListEqual([str(doc1.created.year)], result.get('x'))
         self.assertEqual(2, result.get('y')[0][0])
+
+    def test_results_not_stored(self):
+        "Default settings: REPORTS_GRAPHS_RESULTS_TTL == 0."
+        user = self.login()
+        rgraph = self._create_documents_rgraph()
+
+        result = ReportGraphResult.objects.fetch(
+            fetcher=SimpleGraphFetcher(graph=rgraph), user=user,
+        )
+        self.assertIsNone(result.pk)
+        self.assertTupleEqual(([], []), result.data)
+        self.assertFalse(ReportGraphResult.objects.filter(graph=rgraph))
+
+    @override_settings(REPORTS_GRAPHS_RESULTS_TTL=10)
+    def test_results_stored(self):
+        user = self.login()
+
+        folder = FakeReportsFolder.objects.create(title='my Folder', user=user)
+        create_doc = partial(FakeReportsDocument.objects.create, linked_folder=folder, user=user)
+        doc1 = create_doc(title='Doc#1')
+
+        rgraph = self._create_documents_rgraph()
+        fetch = partial(
+            ReportGraphResult.objects.fetch,
+            fetcher=SimpleGraphFetcher(graph=rgraph), user=user,
+        )
+
+        result1 = fetch()
+        self.assertIsNotNone(result1.pk)
+        self.assertEqual(rgraph.id, result1.graph_id)
+        self.assertIsNone(result1.user)  # Superuser
+        self.assertIsNone(result1.entity)
+        self.assertEqual('ASC', result1.order)
+        self.assertEqual(RGF_NOLINK, result1.fetcher_type)
+        self.assertFalse(result1.expired)
+        self.assertEqual(result1.build_key(), result1.key)
+        self.assertDatetimesAlmostEqual(now(), result1.accessed)
+
+        year = str(doc1.created.year)
+        x1, y1 = result1.data
+        self.assertListEqual([year], x1)
+        self.assertEqual(1, y1[0][0])
+
+        # The stored result is used ---
+        create_doc(title='Doc#2')
+        accessed = now() - timedelta(minutes=5)
+        ReportGraphResult.objects.filter(id=result1.id).update(accessed=accessed)
+        result2 = fetch()
+        self.assertEqual(result1.id, result2.id)
+        self.assertEqual(1, result2.data[1][0][0])
+        self.assertGreater(self.refresh(result1).accessed, accessed)
+
+        # Only one result per key
+        with self.assertRaises(IntegrityError):
+            with atomic():
+                ReportGraphResult.objects.create(
+                    graph=rgraph, fetcher_type=result1.fetcher_type, order='ASC',
+                    language=result1.language, key=result1.key,
+                    created=now(), accessed=now(), json_data='[[], []]',
+                )
+
+        self.assertNotEqual(result1.id, fetch(order='DESC').id)
+
+        # The result is expired ---
+        ReportGraphResult.objects.filter(id=result1.id).update(
+            created=now() - timedelta(minutes=11),
+        )
+        result3 = fetch()
+        self.assertEqual(result1.id, result3.id)
+        self.assertEqual(2, result3.data[1][0][0])
+
+        # The graph has been modified ---
+        create_doc(title='Doc#3')
+        rgraph.name = 'Number of documents'
+        rgraph.save()
+        self.assertEqual(3, fetch().data[1][0][0])
+
+        self.assertEqual(2, ReportGraphResult.objects.filter(graph=rgraph).count())
+
+        # Brick ---
+        ibci = SimpleGraphFetcher(graph=rgraph).create_brick_config_item()
+        BrickHomeLocation.objects.all().delete()
+        BrickHomeLocation.objects.create(brick_id=ibci.brick_id, order=1)
+
+        response = self.assertGET200(
+            reverse('creme_core__reload_home_bricks'), data={'brick_id': ibci.brick_id},
+        )
+        brick_node = self.get_brick_node(
+            self.get_html_tree(response.json()[0][1]), ibci.brick_id,
+        )
+        self.assertIsNotNone(brick_node.find('.//div[@class="graph-result-date"]'))
+
+    @override_settings(REPORTS_GRAPHS_RESULTS_TTL=10)
+    def test_results_stored_credentials(self):
+        user = self.login(is_superuser=False, allowed_apps=['creme_core', 'reports'])
+        SetCredentials.objects.create(
+            role=self.role,
+            value=EntityCredentials.VIEW,
+            set_type=SetCredentials.ESET_OWN,
+        )
+
+        folder = FakeReportsFolder.objects.create(title='my Folder', user=user)
+        create_doc = partial(FakeReportsDocument.objects.create, linked_folder=folder)
+        create_doc(title='Doc#1', user=user)
+        create_doc(title='Doc#2', user=self.other_user)
+
+        rgraph = self._create_documents_rgraph()
+        fetcher = SimpleGraphFetcher(graph=rgraph)
+
+        result1 = ReportGraphResult.objects.fetch(fetcher=fetcher, user=user)
+        self.assertEqual(user, result1.user)
+        self.assertEqual(1, result1.data[1][0][0])
+
+        result2 = ReportGraphResult.objects.fetch(fetcher=fetcher, user=self.other_user)
+        self.assertNotEqual(result1.id, result2.id)
+        self.assertIsNone(result2.user)  # Superuser
+        self.assertEqual(2, result2.data[1][0][0])
+
+    @override_settings(REPORTS_GRAPHS_RESULTS_TTL=60, REPORTS_GRAPHS_EXPENSIVE_DURATION=2.0)
+    def test_results_refresher_job(self):
+        job = self.get_object_or_fail(Job, type_id=graphs_results_refresher_type.id)
+        self.assertIsNone(job.user)
+        self.assertIsNotNone(job.periodicity)
+
+        user = self.login()
+
+        folder = FakeReportsFolder.objects.create(title='my Folder', user=user)
+        create_doc = partial(FakeReportsDocument.objects.create, linked_folder=folder, user=user)
+        create_doc(title='Doc#1')
+
+        rgraph = self._create_documents_rgraph()
+        fetch = partial(
+            ReportGraphResult.objects.fetch,
+            fetcher=SimpleGraphFetcher(graph=rgraph), user=user,
+        )
+
+        # Expensive & expires before the next run => refreshed
+        result1 = fetch()
+        created1 = now() - timedelta(minutes=55)
+        ReportGraphResult.objects.filter(id=result1.id).update(created=created1, duration=3.0)
+
+        # Not expensive & expired => removed
+        result2 = fetch(order='DESC')
+        ReportGraphResult.objects.filter(id=result2.id).update(
+            created=now() - timedelta(minutes=61), duration=0.5,
+        )
+
+        # Recent => not modified
+        result3 = fetch(
+            fetcher=RegularFieldLinkedGraphFetcher(graph=rgraph, value='linked_folder'),
+            entity=folder,
+        )
+        self.assertEqual(1, result3.data[1][0][0])
+
+        # Expensive, but not read anymore => removed
+        result4 = fetch(
+            fetcher=RegularFieldLinkedGraphFetcher(graph=rgraph, value='linked_folder'),
+            entity=folder, order='DESC',
+        )
+        ReportGraphResult.objects.filter(id=result4.id).update(
+            created=created1, accessed=now() - timedelta(minutes=61), duration=3.0,
+        )
+
+        create_doc(title='Doc#2')
+        graphs_results_refresher_type.execute(job)
+        self.assertFalse(JobResult.objects.filter(job=job))
+
+        result1 = self.refresh(result1)
+        self.assertGreater(result1.created, created1)
+        self.assertEqual(2, result1.data[1][0][0])
+
+        self.assertDoesNotExist(result2)
+        self.assertEqual(1, self.refresh(result3).data[1][0][0])
+        self.assertDoesNotExist(result4)
+
+        # TTL == 0 => all results are removed
+        with override_settings(REPORTS_GRAPHS_RESULTS_TTL=0):
+            graphs_results_refresher_type.execute(job)
+
+        self.assertFalse(ReportGraphResult.objects.filter(graph=rgraph))
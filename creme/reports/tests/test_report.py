@@ -6,6 +6,9 @@ from functools import partial
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.encoding import smart_str
 from django.utils.formats import date_format, number_format
@@ -51,6 +54,7 @@ from creme.creme_core.models import (
     FakePosition,
     FieldsConfig,
     HeaderFilter,
+    Language,
     Relation,
     RelationType,
     SetCredentials,
@@ -1182,7 +1186,7 @@ class ReportTestCase(BaseReportsTestCase):
             '"{}","{}","{}","{}"\r\n'.format(
                 _('Name'), _('Owner user'), rt.predicate, _('Properties'),
             ),
-            response.content.decode(),
+            response.getvalue().decode(),
         )
 
     def test_report_csv02(self):
@@ -1196,7 +1200,7 @@ class ReportTestCase(BaseReportsTestCase):
             self._build_export_url(report), data={'doc_type': 'csv'},
         )
 
-        content = (s for s in response.content.decode().split('\r\n') if s)
+        content = (s for s in response.getvalue().decode().split('\r\n') if s)
         self.assertEqual(
             smart_str('"{}","{}","{}","{}"'.format(
                 _('Last name'), _('Owner user'), _('owns'), _('Properties'),
@@ -1229,7 +1233,7 @@ class ReportTestCase(BaseReportsTestCase):
             },
         )
 
-        content = [s for s in response.content.decode().split('\r\n') if s]
+        content = [s for s in response.getvalue().decode().split('\r\n') if s]
         self.assertEqual(3, len(content))
 
         self.assertEqual(f'"Ayanami","{user}","","Kawaii"', content[1])
@@ -1255,7 +1259,7 @@ class ReportTestCase(BaseReportsTestCase):
             },
         )
 
-        content = [s for s in response.content.decode().split('\r\n') if s]
+        content = [s for s in response.getvalue().decode().split('\r\n') if s]
         self.assertEqual(2, len(content))
         self.assertEqual(f'"Baby","{user}","",""', content[1])
 
@@ -1306,7 +1310,7 @@ class ReportTestCase(BaseReportsTestCase):
 
         response = self.assertGET200(self._build_export_url(report), data={'doc_type': 'csv'})
 
-        content = (s for s in response.content.decode().split('\r\n') if s)
+        content = (s for s in response.getvalue().decode().split('\r\n') if s)
         self.assertEqual(smart_str('"{}"'.format(_('Last name'))), next(content))
 
         self.assertEqual('"Ayanami"',   next(content))
@@ -1329,12 +1333,37 @@ class ReportTestCase(BaseReportsTestCase):
 
         response = self.assertGET200(self._build_export_url(report), data={'doc_type': 'csv'})
 
-        content = (s for s in response.content.decode().split('\r\n') if s)
+        content = (s for s in response.getvalue().decode().split('\r\n') if s)
         self.assertEqual(smart_str('"{}"'.format(_('Last name'))), next(content))
 
         self.assertEqual('"Ayanami"',   next(content))
         self.assertEqual('"Katsuragi"', next(content))
 
+    def test_report_csv_streaming(self):
+        "Lines are generated page by page & streamed."
+        self.login()
+        self._create_persons()
+
+        report = self._create_simple_contacts_report()
+        report.fetch_page_size = 2
+
+        lines = [*report.fetch_lines()]
+        self.assertGreater(len(lines), 2)
+        self.assertListEqual(report.fetch_all_lines(), lines)
+        self.assertListEqual(
+            [[c.last_name] for c in FakeContact.objects.filter(is_deleted=False)],
+            lines,
+        )
+
+        response = self.assertGET200(self._build_export_url(report), data={'doc_type': 'csv'})
+        self.assertTrue(response.streaming)
+
+        content = [s for s in response.getvalue().decode().split('\r\n') if s]
+        self.assertListEqual(
+            [smart_str('"{}"'.format(_('Last name'))), *(f'"{line[0]}"' for line in lines)],
+            content,
+        )
+
     def test_report_xls(self):
         "With date filter."
         self.login()
@@ -3331,3 +3360,71 @@ class ReportTestCase(BaseReportsTestCase):
             ],
             report.fetch_all_lines(),
         )
+
+    def test_fetch_prefetch(self):
+        "The number of queries does not depend on the number of entities."
+        user = self.login()
+
+        create_ptype = CremePropertyType.create
+        ptype = create_ptype(str_pk='test-prop_kawaii', text='Kawaii')
+
+        cfield = CustomField.objects.create(
+            content_type=FakeContact, name='Size', field_type=CustomField.INT,
+        )
+
+        report = Report.objects.create(user=user, name='Contacts report', ct=FakeContact)
+        create_field = partial(Field.objects.create, report=report, type=RFT_FIELD)
+        create_field(name='last_name',       order=1)
+        create_field(name='position__title', order=2)
+        create_field(name='image',           order=3)
+        create_field(name='languages__name', order=4)
+        create_field(name=str(cfield.id),             order=5, type=RFT_CUSTOM)
+        create_field(name=FAKE_REL_SUB_EMPLOYED_BY,   order=6, type=RFT_RELATION)
+        create_field(name='get_pretty_properties',    order=7, type=RFT_FUNCTION)
+        report = self.refresh(report)
+
+        position = FakePosition.objects.create(title='Ninja')
+        orga = FakeOrganisation.objects.create(user=user, name='Dojo')
+        rtype = RelationType.objects.get(pk=FAKE_REL_SUB_EMPLOYED_BY)
+
+        create_language = Language.objects.create
+        languages = [create_language(name='Japanese'), create_language(name='Klingon')]
+
+        def create_contacts(count):
+            for i in range(count):
+                contact = FakeContact.objects.create(
+                    user=user, last_name=f'Ninja #{i}', position=position,
+                    image=FakeImage.objects.create(user=user, name=f'Portrait #{i}'),
+                )
+                contact.languages.set(languages)
+                cfield.value_class.objects.create(
+                    custom_field=cfield, entity=contact, value=i,
+                )
+                Relation.objects.create(
+                    user=user, subject_entity=contact, type=rtype, object_entity=orga,
+                )
+                CremeProperty.objects.create(type=ptype, creme_entity=contact)
+
+        def count_queries():
+            # NB: the report is refreshed to get fresh columns/hands
+            with CaptureQueriesContext(connection) as context:
+                lines = self.refresh(report).fetch_all_lines()
+
+            return len(lines), len(context)
+
+        create_contacts(2)
+        count_queries()  # Fill the caches (ContentTypes etc...)
+        lines_count1, queries_count1 = count_queries()
+
+        create_contacts(5)
+        lines_count2, queries_count2 = count_queries()
+
+        self.assertEqual(lines_count1 + 5, lines_count2)
+        self.assertEqual(queries_count1, queries_count2)
+
+        line = report.fetch_all_lines(extra_q=Q(last_name='Ninja #0'))[0]
+        self.assertEqual(position.title,       line[1])
+        self.assertEqual('Portrait #0',        line[2])
+        self.assertEqual('Japanese, Klingon',  line[3])
+        self.assertEqual(str(orga), line[5])
+        self.assertEqual(ptype.text, line[6])
@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+
+from datetime import date, timedelta
+from functools import partial
+
+from django.contrib.contenttypes.models import ContentType
+from django.core import mail
+from django.urls import reverse
+from django.utils.timezone import localtime, now
+from django.utils.translation import gettext as _
+
+from creme.creme_core.auth.entity_credentials import EntityCredentials
+from creme.creme_core.models import (
+    FakeContact,
+    FileRef,
+    Job,
+    JobResult,
+    SetCredentials,
+)
+from creme.creme_core.utils.date_period import date_period_registry
+
+from ..creme_jobs import report_schedules_type
+from ..models import ReportSchedule
+from .base import BaseReportsTestCase, skipIfCustomReport
+
+
+@skipIfCustomReport
+class ReportScheduleTestCase(BaseReportsTestCase):
+    @staticmethod
+    def _get_job():
+        return Job.objects.get(type_id=report_schedules_type.id)
+
+    def _create_schedule(self, report, **kwargs):
+        kwargs.setdefault('first_run', now() - timedelta(hours=1))
+        kwargs.setdefault('doc_type', 'csv')
+
+        return ReportSchedule.objects.create(
+            report=report,
+            user=self.user,
+            periodicity=date_period_registry.get_period('days', 1),
+            **kwargs
+        )
+
+    @staticmethod
+    def _format_datetime(dt):
+        return localtime(dt).strftime('%d-%m-%Y %H:%M')
+
+    def _get_alone_file(self, schedule):
+        files = [*schedule.files.all()]
+        self.assertEqual(1, len(files))
+
+        return files[0]
+
+    @staticmethod
+    def _read_lines(file_ref):
+        with open(file_ref.filedata.path, 'rb') as f:
+            return [s for s in f.read().decode().split('\r\n') if s]
+
+    def test_create(self):
+        user = self.login()
+        report = self._create_simple_contacts_report()
+
+        url = reverse('reports__create_schedule', args=(report.id,))
+        context = self.assertGET200(url).context
+        self.assertEqual(
+            _('New scheduled generation for «{entity}»').format(entity=report),
+            context.get('title'),
+        )
+
+        with self.assertNoException():
+            fields = context['form'].fields
+            doc_type_choices = [*fields['doc_type'].choices]
+            date_field_choices = [*fields['date_field'].choices]
+
+        self.assertIn('csv', [k for k, v in doc_type_choices])
+        self.assertIn(('birthday', _('Birthday')), date_field_choices)
+
+        first_run = now().replace(microsecond=0) + timedelta(days=1)
+        response = self.client.post(
+            url,
+            data={
+                'user': user.id,
+                'doc_type': 'csv',
+                'date_field': 'created',
+                'date_range': 'previous_month',
+                'first_run': self._format_datetime(first_run),
+                'periodicity_0': 'months',
+                'periodicity_1': '1',
+                'kept_files': 3,
+                'enabled': 'on',
+            },
+        )
+        self.assertNoFormError(response)
+
+        schedule = self.get_object_or_fail(ReportSchedule, report=report)
+        self.assertEqual(user, schedule.user)
+        self.assertEqual('csv', schedule.doc_type)
+        self.assertEqual('created', schedule.date_field)
+        self.assertEqual('previous_month', schedule.date_range)
+        self.assertEqual(first_run.date(), schedule.first_run.date())
+        self.assertEqual({'type': 'months', 'value': 1}, schedule.periodicity.as_dict())
+        self.assertEqual(3, schedule.kept_files)
+        self.assertIsNone(schedule.last_run)
+        self.assertEqual(schedule.first_run, schedule.next_run)
+        self.assertEqual(report, schedule.get_related_entity())
+
+    def test_create_error(self):
+        "Date field without date range."
+        user = self.login()
+        report = self._create_simple_contacts_report()
+
+        response = self.assertPOST200(
+            reverse('reports__create_schedule', args=(report.id,)),
+            data={
+                'user': user.id,
+                'doc_type': 'csv',
+                'date_field': 'created',
+                'first_run': self._format_datetime(now()),
+                'periodicity_0': 'days',
+                'periodicity_1': '1',
+                'kept_files': 3,
+            },
+        )
+        self.assertFormError(
+            response, 'form', None,
+            _('If you chose a Date field, you have to select a date filter.'),
+        )
+
+    def test_create_not_superuser(self):
+        "The user of the schedule is the current user."
+        user = self.login(is_superuser=False, allowed_apps=['reports'])
+        SetCredentials.objects.create(
+            role=self.role,
+            value=EntityCredentials.VIEW | EntityCredentials.CHANGE,
+            set_type=SetCredentials.ESET_OWN,
+        )
+
+        report = self._create_simple_contacts_report(user=user)
+        url = reverse('reports__create_schedule', args=(report.id,))
+
+        with self.assertNoException():
+            user_f = self.assertGET200(url).context['form'].fields['user']
+
+        self.assertListEqual([user], [*user_f.queryset])
+
+        data = {
+            'doc_type': 'csv',
+            'first_run': self._format_datetime(now() + timedelta(days=1)),
+            'periodicity_0': 'days',
+            'periodicity_1': '1',
+            'kept_files': 3,
+        }
+        response = self.assertPOST200(url, data={**data, 'user': self.other_user.id})
+        self.assertFormError(
+            response, 'form', 'user',
+            _('Select a valid choice. That choice is not one of the available choices.'),
+        )
+
+        self.assertNoFormError(self.client.post(url, data={**data, 'user': user.id}))
+        self.assertEqual(user, self.get_object_or_fail(ReportSchedule, report=report).user)
+
+    def test_brick_files(self):
+        "Only the owner of a file can download it."
+        user = self.login()
+        report = self._create_simple_contacts_report()
+        schedule = self._create_schedule(report)
+
+        create_fileref = partial(FileRef.objects.create, temporary=False)
+        file_ref1 = create_fileref(
+            user=user, filedata='upload/reports/foo.csv', basename='foo.csv',
+        )
+        file_ref2 = create_fileref(
+            user=self.other_user, filedata='upload/reports/bar.csv', basename='bar.csv',
+        )
+        schedule.files.set([file_ref1, file_ref2])
+
+        content = self.assertGET200(report.get_absolute_url()).content.decode()
+        self.assertIn(file_ref1.get_download_absolute_url(), content)
+        self.assertNotIn(file_ref2.get_download_absolute_url(), content)
+        self.assertIn('bar.csv', content)
+
+    def test_edit(self):
+        self.login()
+        report = self._create_simple_contacts_report()
+        schedule = self._create_schedule(report)
+
+        url = schedule.get_edit_absolute_url()
+        self.assertGET200(url)
+
+        response = self.client.post(
+            url,
+            data={
+                'user': self.other_user.id,
+                'doc_type': 'csv',
+                'first_run': self._format_datetime(schedule.first_run),
+                'periodicity_0': 'weeks',
+                'periodicity_1': '2',
+                'kept_files': 1,
+            },
+        )
+        self.assertNoFormError(response)
+
+        schedule = self.refresh(schedule)
+        self.assertEqual(self.other_user, schedule.user)
+        self.assertEqual({'type': 'weeks', 'value': 2}, schedule.periodicity.as_dict())
+        self.assertEqual(1, schedule.kept_files)
+        self.assertFalse(schedule.enabled)
+        self.assertIsNone(schedule.next_run)
+
+    def test_delete(self):
+        self.login()
+        report = self._create_simple_contacts_report()
+        schedule = self._create_schedule(report)
+
+        file_ref = FileRef.objects.create(
+            user=self.user, filedata='upload/reports/foo.csv', basename='foo.csv',
+            temporary=False,
+        )
+        schedule.files.add(file_ref)
+
+        self.assertPOST(
+            302,
+            reverse(
+                'creme_core__delete_related_to_entity',
+                args=(ContentType.objects.get_for_model(ReportSchedule).id,),
+            ),
+            data={'id': schedule.id},
+        )
+        self.assertDoesNotExist(schedule)
+        self.assertTrue(self.refresh(file_ref).temporary)
+
+    def test_job(self):
+        user = self.login()
+        job = self._get_job()
+        self.assertIsNone(job.user)
+        self.assertIsNone(job.periodicity)
+
+        now_value = now()
+        self.assertIsNone(report_schedules_type.next_wakeup(job, now_value))
+
+        create_contact = partial(FakeContact.objects.create, user=user)
+        create_contact(last_name='Ayanami', first_name='Rei')
+        create_contact(last_name='Katsuragi', first_name='Misato')
+
+        report = self._create_simple_contacts_report()
+        schedule = self._create_schedule(report)
+        self.assertDatetimesAlmostEqual(now_value, report_schedules_type.next_wakeup(job, now()))
+
+        report_schedules_type.execute(job)
+        self.assertFalse(JobResult.objects.filter(job=job))
+
+        schedule = self.refresh(schedule)
+        self.assertEqual(schedule.first_run, schedule.last_run)
+        self.assertEqual(
+            schedule.first_run + timedelta(days=1),
+            report_schedules_type.next_wakeup(job, now()),
+        )
+
+        file_ref = self._get_alone_file(schedule)
+        self.assertFalse(file_ref.temporary)
+        self.assertEqual(user, file_ref.user)
+        self.assertTrue(file_ref.basename.endswith('.csv'))
+        self.assertTrue(file_ref.filedata.name.startswith('upload/reports/'))
+        self.assertListEqual(
+            [f'"{_("Last name")}"', '"Ayanami"', '"Katsuragi"'],
+            self._read_lines(file_ref),
+        )
+
+        messages = mail.outbox
+        self.assertEqual(1, len(messages))
+
+        message = messages[0]
+        self.assertListEqual([user.email], message.to)
+        self.assertIn(file_ref.get_download_absolute_url(), message.body)
+
+        # Not yet
+        report_schedules_type.execute(job)
+        self.assertEqual(1, schedule.files.count())
+
+    def test_job_date_filter(self):
+        user = self.login()
+        job = self._get_job()
+
+        create_contact = partial(FakeContact.objects.create, user=user)
+        create_contact(last_name='Ayanami', birthday=date.today())
+        create_contact(last_name='Katsuragi', birthday=date.today() - timedelta(days=800))
+        create_contact(last_name='Langley')
+
+        report = self._create_simple_contacts_report()
+        schedule = self._create_schedule(
+            report, date_field='birthday', date_range='current_year',
+        )
+
+        report_schedules_type.execute(job)
+
+        file_ref = self._get_alone_file(schedule)
+        self.assertListEqual(
+            [f'"{_("Last name")}"', '"Ayanami"'], self._read_lines(file_ref),
+        )
+
+    def test_job_kept_files(self):
+        "Only the last files are kept ; missed runs are skipped."
+        self.login()
+        job = self._get_job()
+        report = self._create_simple_contacts_report()
+        first_run = now() - timedelta(days=2, hours=1)
+        schedule = self._create_schedule(report, first_run=first_run, kept_files=1)
+
+        report_schedules_type.execute(job)
+
+        schedule = self.refresh(schedule)
+        self.assertEqual(first_run + timedelta(days=2), schedule.last_run)
+        file_ref1 = self._get_alone_file(schedule)
+
+        ReportSchedule.objects.filter(id=schedule.id).update(
+            last_run=now() - timedelta(days=1, minutes=1),
+        )
+        report_schedules_type.execute(job)
+
+        file_ref2 = self._get_alone_file(self.refresh(schedule))
+        self.assertNotEqual(file_ref1, file_ref2)
+        self.assertFalse(file_ref2.temporary)
+        self.assertTrue(self.refresh(file_ref1).temporary)
+        self.assertEqual(2, len(mail.outbox))
+
+    def test_job_error(self):
+        self.login()
+        job = self._get_job()
+        report = self._create_simple_contacts_report()
+        schedule = self._create_schedule(report, doc_type='invalid')
+
+        report_schedules_type.execute(job)
+
+        jresults = JobResult.objects.filter(job=job)
+        self.assertEqual(1, len(jresults))
+
+        jresult = jresults[0]
+        self.assertListEqual(
+            [
+                _('The report «{}» cannot be generated.').format(report),
+                _('Original error: {}').format(
+                    _('The extension «{}» is not available.').format('invalid'),
+                ),
+            ],
+            jresult.messages,
+        )
+        self.assertFalse(self.refresh(schedule).files.all())
+        self.assertFalse(mail.outbox)
+
+    def test_job_disabled(self):
+        self.login()
+        job = self._get_job()
+        report = self._create_simple_contacts_report()
+        schedule = self._create_schedule(report, enabled=False)
+        self.assertIsNone(report_schedules_type.next_wakeup(job, now()))
+
+        report_schedules_type.execute(job)
+        self.assertIsNone(self.refresh(schedule).last_run)
@@ -6,7 +6,7 @@ from django.urls import re_path
 from creme.creme_core.conf.urls import Swappable, swap_manager
 
 from . import report_model_is_custom, rgraph_model_is_custom
-from .views import bricks, export, graph, report
+from .views import bricks, export, graph, report, schedule
 
 urlpatterns = [
     re_path(
@@ -53,6 +53,17 @@ urlpatterns = [
         name='reports__edit_fields',
     ),
 
+    re_path(
+        r'^report/(?P<report_id>\d+)/schedule/add[/]?$',
+        schedule.ReportScheduleCreation.as_view(),
+        name='reports__create_schedule',
+    ),
+    re_path(
+        r'^schedule/edit/(?P<schedule_id>\d+)[/]?$',
+        schedule.ReportScheduleEdition.as_view(),
+        name='reports__edit_schedule',
+    ),
+
     # re_path(
     #     r'^graph/get_available_types/(?P<ct_id>\d+)[/]?$',
     #     graph.get_available_report_graph_types,
@@ -147,15 +147,13 @@ class Export(generic.base.EntityRelatedMixin, generic.CheckedView):
         if writer is None:
             raise ConflictError('Unknown extension')
 
-        writerow = writer.writerow
+        def rows():
+            yield [
+                smart_str(column.title) for column in report.get_children_fields_flat()
+            ]
 
-        writerow([
-            smart_str(column.title) for column in report.get_children_fields_flat()
-        ])
+            for line in report.fetch_lines(extra_q=q_filter, user=user):
+                yield [smart_str(value) for value in line]
 
-        for line in report.fetch_all_lines(extra_q=q_filter, user=user):
-            writerow([smart_str(value) for value in line])
-
-        writer.save(smart_str(report.name), user)
-
-        return writer.response
+        # NB: the lines are sent while they are generated if the back-end allows it.
+        return writer.stream(smart_str(report.name), user, rows())
@@ -40,7 +40,9 @@ from creme.creme_core.views.generic import base
 
 # from .. import constants
 from ..core.graph import GraphFetcher  # RGRAPH_HANDS_MAP
+from ..core.graph.fetcher import SimpleGraphFetcher
 from ..forms.graph import ReportGraphForm
+from ..models import ReportGraphResult
 from ..report_chart_registry import report_chart_registry
 
 logger = logging.getLogger(__name__)
@@ -259,7 +261,9 @@ class GraphFetching(base.EntityRelatedMixin, GraphFetchingBase):
 
     def get_graph_data(self, request, order):
         rgraph = self.get_related_entity()
-        x, y = rgraph.fetch(user=request.user, order=order)
+        x, y = ReportGraphResult.objects.fetch(
+            fetcher=SimpleGraphFetcher(graph=rgraph), user=request.user, order=order,
+        ).data
 
         return rgraph, x, y
 
@@ -293,10 +297,10 @@ class GraphFetchingForInstance(base.EntityRelatedMixin, GraphFetchingBase):
             raise ConflictError('Invalid brick: {e}') from e  # TODO: test
 
         try:
-            x, y = fetcher.fetch_4_entity(
-                entity=entity,
+            x, y = ReportGraphResult.objects.fetch(
+                fetcher=fetcher, entity=entity,
                 order=order, user=request.user,
-            )
+            ).data
         except (GraphFetcher.IncompatibleContentType, GraphFetcher.UselessResult):
             logger.exception(
                 'Fetching error in %s.get_graph_data()',
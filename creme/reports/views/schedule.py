@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2021  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from django.utils.translation import gettext_lazy as _
+
+from creme.creme_core.views import generic
+
+from .. import get_report_model
+from ..forms.schedule import ReportScheduleForm
+from ..models import ReportSchedule
+
+
+class ReportScheduleCreation(generic.AddingInstanceToEntityPopup):
+    model = ReportSchedule
+    form_class = ReportScheduleForm
+    title = _('New scheduled generation for «{entity}»')
+    entity_id_url_kwarg = 'report_id'
+    entity_classes = get_report_model()
+
+
+class ReportScheduleEdition(generic.RelatedToEntityEditionPopup):
+    model = ReportSchedule
+    form_class = ReportScheduleForm
+    pk_url_kwarg = 'schedule_id'
+    title = _('Scheduled generation for «{entity}»')